@@ -45,6 +45,7 @@ builder.Services.Configure<ApiBehaviorOptions>(options =>
     };
 });
 builder.Services.AddMemoryCache();
+builder.Services.AddRequestDecompression();
 builder.Services.AddHealthChecks();
 builder.Services.AddEndpointsApiExplorer();
 builder.Services.AddSwaggerGen(c =>
@@ -257,6 +258,10 @@ if (!app.Environment.IsDevelopment() && enforceHttpsRedirection)
     app.UseHttpsRedirection();
 }
 app.UseRequestLocalization(localizationOptions);
+// Descompressao (gzip) apenas na importacao de relatorios do load test
+app.UseWhen(
+    context => context.Request.Path.StartsWithSegments("/api/admin/loadtests/import", StringComparison.OrdinalIgnoreCase),
+    branch => branch.UseRequestDecompression());
 app.UseMiddleware<CorrelationIdMiddleware>();
 var webRootPath = app.Environment.WebRootPath;
 if (string.IsNullOrWhiteSpace(webRootPath))
@@ -6,26 +6,181 @@ ConsertaPraMim API Load Test Runner
 from __future__ import annotations
 
 import argparse
+import array
 import asyncio
+import base64
+import bisect
+import concurrent.futures
+import copy
+import csv
+import functools
+import gzip
+import hashlib
+import heapq
+import itertools
 import json
 import math
+import mmap
+import multiprocessing
+import operator
+import os
+import queue
 import random
 import re
+import shutil
+import signal
+import ssl
+import struct
 import sys
+import threading
 import time
+import urllib.parse
 import uuid
-from collections import Counter, defaultdict
+import zlib
+from collections import Counter, OrderedDict, defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional
 
 import httpx
 
 
 DEFAULT_TIMEOUT_SECONDS = 20.0
+DEFAULT_DRAIN_TIMEOUT_SECONDS = 10.0
+PUBLISH_CHUNK_BYTES = 64 * 1024
 DEFAULT_OUTPUT_DIR = Path(__file__).resolve().parent / "output"
 
+RAW_LOG_MAGIC = b"CPMRAW01"
+RAW_LOG_HEADER = struct.Struct("<8sII")
+# timestamp, duration_ms, vu, endpoint id, status (0 = sem resposta), correlation id (hi/lo)
+RAW_LOG_RECORD = struct.Struct("<dfIIHQQ")
+RAW_LOG_BUFFER_RECORDS = 4096
+
+# buckets logaritmicos com ~2% de erro relativo; contagem esparsa e mesclavel
+LATENCY_HISTOGRAM_LOG_BASE = math.log1p(0.02)
+
+FEEDER_STRATEGIES = ("sequential", "random", "unique")
+
+THINK_TIME_MODELS = ("uniform", "exponential", "lognormal", "empirical", "pacing")
+THINK_TIME_BATCH_SIZE = 256
+
+UPLOAD_SIZE_DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "weighted")
+UPLOAD_PAYLOAD_BLOCK_BYTES = 4 * 1024 * 1024
+UPLOAD_PAYLOAD_SEED = 20240601
+UPLOAD_CHUNK_BYTES = 64 * 1024
+UPLOAD_MAGIC_BYTES = {
+    "image/jpeg": b"\xff\xd8\xff\xe0\x00\x10JFIF\x00",
+    "image/png": b"\x89PNG\r\n\x1a\n",
+    "image/gif": b"GIF89a",
+    "image/webp": b"RIFF\x00\x00\x00\x00WEBP",
+    "application/pdf": b"%PDF-1.4\n",
+    "video/mp4": b"\x00\x00\x00\x18ftypmp42",
+}
+
+AUTOTUNE_STRATEGIES = ("binary", "aimd")
+
+CHART_MAX_TIME_BUCKETS = 240
+PROGRESS_RECENT_SECONDS = 10
+ENDPOINT_SERIES_MAX_BUCKETS = CHART_MAX_TIME_BUCKETS * 2
+CHART_MAX_ENDPOINT_SERIES = 8
+CHART_MAX_CDF_POINTS = 200
+EXEMPLARS_PER_ENDPOINT = 5
+FAIRNESS_DIMENSIONS = ("vu", "tenant", "account")
+FAIRNESS_MAX_KEYS = 1000
+FAIRNESS_MIN_SAMPLES = 20
+FAIRNESS_REPORT_ROWS = 10
+FAIRNESS_OVERFLOW_KEY = "(outros)"
+
+POPULATION_REPORT_ENDPOINTS = 8
+
+SCENARIO_EXECUTORS = ("constant", "soak", "spike")
+SOAK_DEFAULT_WINDOW_SECONDS = 60
+SOAK_DEFAULT_SNAPSHOT_SECONDS = 300.0
+SOAK_DEFAULT_MAX_WINDOWS = 480
+SOAK_DEFAULT_ALPHA = 0.01
+SOAK_DEFAULT_MIN_DRIFT_PERCENT = 10.0
+SOAK_DEFAULT_MIN_ERROR_DRIFT_POINTS = 0.5
+SOAK_DEFAULT_MIN_REQUESTS = 20
+SOAK_MIN_TREND_WINDOWS = 8
+SPIKE_DEFAULT_MULTIPLIER = 5.0
+SPIKE_DEFAULT_BASELINE_SECONDS = 60.0
+SPIKE_DEFAULT_SPIKE_SECONDS = 30.0
+SPIKE_DEFAULT_RECOVERY_SECONDS = 120.0
+SPIKE_DEFAULT_WINDOW_SECONDS = 5
+SPIKE_DEFAULT_STABLE_SECONDS = 10
+SPIKE_DEFAULT_P95_TOLERANCE_PERCENT = 20.0
+SPIKE_DEFAULT_ERROR_TOLERANCE_POINTS = 1.0
+
+RETRY_CONDITIONS = ("timeout", "network", "4xx", "5xx")
+RETRY_JITTER_MODES = ("full", "equal", "decorrelated", "none")
+RETRY_IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+RETRY_DEFAULT_MAX_ATTEMPTS = 3
+RETRY_DEFAULT_ON = ("timeout", "network", "5xx")
+RETRY_DEFAULT_BASE_DELAY_MS = 200.0
+RETRY_DEFAULT_MAX_DELAY_MS = 5000.0
+RETRY_DEFAULT_MULTIPLIER = 2.0
+RETRY_DEFAULT_BUDGET_PERCENT = 20.0
+RETRY_DEFAULT_BUDGET_MAX_TOKENS = 10.0
+
+CACHE_METHODS = ("GET", "HEAD")
+CACHE_OUTCOMES = ("cold", "revalidated", "changed", "busted", "noValidator", "error")
+CACHE_MAX_ENTRIES_PER_VU = 128
+CACHE_MAX_BODY_BYTES = 256 * 1024
+CACHE_DEFAULT_BUST_QUERY_PARAM = "_lt"
+
+COMPRESSION_CODINGS = ("identity", "gzip", "deflate", "br", "zstd")
+COMPRESSION_DEFAULT_PROFILE = "default"
+TRANSFER_REPORT_ROWS = 20
+
+SERVER_METRICS_SOURCE_TYPES = ("health", "json", "prometheus", "docker")
+SERVER_METRICS_DEFAULT_INTERVAL_SECONDS = 5.0
+SERVER_METRICS_DEFAULT_SATURATION = {"cpuPercent": 85.0, "memoryPercent": 90.0}
+SERVER_METRICS_PROMETHEUS_DEFAULTS = {
+    "cpuPercent": {"name": "process_cpu_seconds_total", "rate": True, "scale": 100.0},
+    "workingSetMb": {"name": "process_working_set_bytes", "scale": 1.0 / (1024.0 * 1024.0)},
+    "gcHeapMb": {"name": "dotnet_total_memory_bytes", "scale": 1.0 / (1024.0 * 1024.0)},
+}
+SERVER_METRICS_MAX_SERIES_PER_SOURCE = 12
+SERVER_METRICS_CHART_SERIES = 8
+HEALTH_STATUS_VALUES = {"healthy": 1.0, "degraded": 0.5, "unhealthy": 0.0}
+PROMETHEUS_SAMPLE_PATTERN = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})?\s+(\S+)")
+DOCKER_SIZE_PATTERN = re.compile(r"^([\d.]+)\s*([a-zA-Z]*)$")
+DOCKER_SIZE_UNITS = {
+    "b": 1.0,
+    "kb": 1000.0,
+    "kib": 1024.0,
+    "mb": 1000.0**2,
+    "mib": 1024.0**2,
+    "gb": 1000.0**3,
+    "gib": 1024.0**3,
+}
+OTLP_BATCH_SPANS = 512
+OTLP_SPAN_KIND_CLIENT = 3
+OTLP_STATUS_ERROR = 2
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WEBSOCKET_OP_TEXT = 0x1
+WEBSOCKET_OP_CLOSE = 0x8
+WEBSOCKET_OP_PING = 0x9
+WEBSOCKET_OP_PONG = 0xA
+WEBSOCKET_MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+SIGNALR_RECORD_SEPARATOR = "\x1e"
+SIGNALR_KEEPALIVE_SECONDS = 15.0
+SIGNALR_MARKER_PATTERN = re.compile(r"\[lt:(\d+(?:\.\d+)?)\]")
+
+METRICS_LATENCY_EDGES_SECONDS = [0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.4, 0.6, 1.0, 1.5, 2.5, 4.0, 6.0, 10.0, 20.0]
+METRICS_LOOP_LAG_EDGES_SECONDS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+METRICS_LOOP_LAG_INTERVAL_SECONDS = 0.1
+CHART_HEATMAP_EDGES_MS = [0, 2, 5, 10, 20, 35, 50, 75, 100, 150, 250, 400, 600, 1000, 1500, 2500, 4000, 6000, 10000, 20000]
+
+
+GUID_PATTERN = re.compile(
+    r"\b[0-9a-f]{8}\-[0-9a-f]{4}\-[0-9a-f]{4}\-[0-9a-f]{4}\-[0-9a-f]{12}\b",
+    flags=re.IGNORECASE,
+)
+
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -74,12 +229,7 @@ def normalize_error_message(raw: str) -> str:
     normalized = raw.strip()
     normalized = re.sub(r"[\r\n\t]+", " ", normalized)
     normalized = re.sub(r"\s+", " ", normalized)
-    normalized = re.sub(
-        r"\b[0-9a-f]{8}\-[0-9a-f]{4}\-[0-9a-f]{4}\-[0-9a-f]{4}\-[0-9a-f]{12}\b",
-        "{guid}",
-        normalized,
-        flags=re.IGNORECASE,
-    )
+    normalized = GUID_PATTERN.sub("{guid}", normalized)
     normalized = re.sub(r"\b\d{2,}\b", "{n}", normalized)
 
     if len(normalized) > 180:
@@ -111,6 +261,1107 @@ def weighted_choice(items: list[dict[str, Any]], rng: random.Random) -> dict[str
     return items[-1]
 
 
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    @staticmethod
+    def index_for(value_ms: float) -> int:
+        micros = value_ms * 1000.0
+        if micros < 1.0:
+            return 0
+        return 1 + int(math.log(micros) / LATENCY_HISTOGRAM_LOG_BASE)
+
+    @staticmethod
+    def bucket_upper_ms(index: int) -> float:
+        if index <= 0:
+            return 0.001
+        return math.exp(index * LATENCY_HISTOGRAM_LOG_BASE) / 1000.0
+
+    @staticmethod
+    def bucket_mid_ms(index: int) -> float:
+        if index <= 0:
+            return 0.0
+        return math.exp((index - 0.5) * LATENCY_HISTOGRAM_LOG_BASE) / 1000.0
+
+    def add(self, index: int, value_ms: float) -> None:
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms < self.min:
+            self.min = value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def record(self, value_ms: float) -> None:
+        self.add(self.index_for(value_ms), value_ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def mean(self) -> float:
+        return (self.total / self.count) if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        if p <= 0:
+            return self.min
+        if p >= 100:
+            return self.max
+
+        target = max(1, math.ceil(self.count * (p / 100.0)))
+        cumulative = 0
+        for index in sorted(self.counts):
+            cumulative += self.counts[index]
+            if cumulative >= target:
+                return min(max(self.bucket_mid_ms(index), self.min), self.max)
+        return self.max
+
+    def cumulative_points(self) -> list[tuple[float, int]]:
+        points = []
+        cumulative = 0
+        for index in sorted(self.counts):
+            cumulative += self.counts[index]
+            points.append((min(self.bucket_upper_ms(index), self.max), cumulative))
+        return points
+
+
+class RawSampleLog:
+    def __init__(self, path: Path, *, run_id: str, started_epoch: float) -> None:
+        self.path = path
+        self.meta_path = path.with_name(path.name + ".json")
+        self.run_id = run_id
+        self.started_epoch = started_epoch
+        self.endpoint_ids: dict[str, int] = {}
+        self.records_written = 0
+        self.records_dropped = 0
+
+        self._buffer = bytearray(RAW_LOG_RECORD.size * RAW_LOG_BUFFER_RECORDS)
+        self._offset = 0
+        self._queue: queue.Queue[Optional[bytes]] = queue.Queue(maxsize=64)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("wb")
+        self._file.write(RAW_LOG_HEADER.pack(RAW_LOG_MAGIC, 2, RAW_LOG_RECORD.size))
+        self._writer = threading.Thread(target=self._write_loop, name="raw-sample-log", daemon=True)
+        self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            self._file.write(chunk)
+
+    def _enqueue(self, chunk: bytes) -> None:
+        # nunca bloqueia o event loop: se o disco nao acompanha, o bloco e descartado e contado
+        try:
+            self._queue.put_nowait(chunk)
+        except queue.Full:
+            self.records_dropped += len(chunk) // RAW_LOG_RECORD.size
+
+    def append(
+        self,
+        *,
+        endpoint_key: str,
+        status_code: Optional[int],
+        duration_ms: float,
+        timestamp_epoch: float,
+        vu_index: int,
+        correlation_id: Optional[str],
+    ) -> None:
+        endpoint_id = self.endpoint_ids.get(endpoint_key)
+        if endpoint_id is None:
+            endpoint_id = len(self.endpoint_ids)
+            self.endpoint_ids[endpoint_key] = endpoint_id
+
+        correlation_int = 0
+        if correlation_id:
+            try:
+                correlation_int = uuid.UUID(correlation_id).int
+            except ValueError:
+                correlation_int = 0
+
+        RAW_LOG_RECORD.pack_into(
+            self._buffer,
+            self._offset,
+            timestamp_epoch,
+            duration_ms,
+            max(vu_index, 0),
+            endpoint_id,
+            status_code or 0,
+            correlation_int >> 64,
+            correlation_int & 0xFFFFFFFFFFFFFFFF,
+        )
+        self._offset += RAW_LOG_RECORD.size
+        self.records_written += 1
+
+        if self._offset >= len(self._buffer):
+            self._enqueue(bytes(self._buffer))
+            self._offset = 0
+
+    def close(self) -> None:
+        if self._offset:
+            self._enqueue(bytes(self._buffer[: self._offset]))
+            self._offset = 0
+        self._queue.put(None)
+        self._writer.join()
+        self._file.close()
+
+        endpoints = sorted(self.endpoint_ids.items(), key=lambda item: item[1])
+        meta = {
+            "runId": self.run_id,
+            "startedEpoch": self.started_epoch,
+            "recordSize": RAW_LOG_RECORD.size,
+            "records": self.records_written - self.records_dropped,
+            "droppedRecords": self.records_dropped,
+            "endpoints": [key for key, _ in endpoints],
+        }
+        self.meta_path.write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+class FeederExhaustedError(Exception):
+    def __init__(self, feeder_name: str, message: str) -> None:
+        super().__init__(message)
+        self.feeder_name = feeder_name
+
+
+class FeederSource:
+    def __init__(
+        self,
+        *,
+        name: str,
+        path: Path,
+        file_format: str,
+        strategy: str,
+        shard_index: int = 0,
+        shard_count: int = 1,
+    ) -> None:
+        if not path.exists():
+            raise FileNotFoundError(f"Arquivo do feeder '{name}' nao encontrado: {path}")
+        if strategy not in FEEDER_STRATEGIES:
+            raise ValueError(f"Feeder '{name}': strategy '{strategy}' invalida. Use: {', '.join(FEEDER_STRATEGIES)}")
+
+        self.name = name
+        self.path = path
+        self.file_format = file_format
+        self.strategy = strategy
+        self.shard_index = shard_index
+        self.shard_count = max(shard_count, 1)
+
+        self._file = path.open("rb")
+        self._map: Optional[mmap.mmap] = None
+        self._offsets = array.array("q")
+        self._columns: list[str] = []
+        self._cursor = 0
+        self._vu_cursors: dict[int, int] = {}
+        self.exhausted_vus: set[int] = set()
+        self._build_index()
+
+    def _build_index(self) -> None:
+        if self.path.stat().st_size == 0:
+            return
+
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        position = 0
+        size = len(self._map)
+
+        if self.file_format == "csv":
+            header_end = self._map.find(b"\n")
+            header_end = size if header_end < 0 else header_end
+            header = self._map[:header_end].decode("utf-8-sig").strip()
+            self._columns = next(csv.reader([header]), [])
+            position = header_end + 1
+
+        line_number = 0
+        while position < size:
+            line_end = self._map.find(b"\n", position)
+            line_end = size if line_end < 0 else line_end
+            if self._map[position:line_end].strip():
+                if line_number % self.shard_count == self.shard_index:
+                    self._offsets.append(position)
+                line_number += 1
+            position = line_end + 1
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _read(self, index: int) -> dict[str, Any]:
+        assert self._map is not None
+        start = self._offsets[index]
+        end = self._map.find(b"\n", start)
+        line = self._map[start : (len(self._map) if end < 0 else end)].decode("utf-8-sig").strip()
+
+        if self.file_format == "csv":
+            values = next(csv.reader([line]), [])
+            return dict(zip(self._columns, values))
+
+        record = json.loads(line)
+        return record if isinstance(record, dict) else {"value": record}
+
+    def next_record(self, *, vu_index: int, vu_count: int, rng: random.Random) -> Optional[dict[str, Any]]:
+        total = len(self._offsets)
+        if total == 0:
+            return None
+
+        if self.strategy == "random":
+            return self._read(rng.randrange(0, total))
+
+        if self.strategy == "unique":
+            stride = max(vu_count, 1)
+            slot = (vu_index - 1) % stride
+            step = self._vu_cursors.get(vu_index, 0)
+            index = slot + (step * stride)
+            if index >= total:
+                # unique nunca reaproveita registro: sem fatia propria (ou com ela consumida) o VU para
+                self.exhausted_vus.add(vu_index)
+                raise FeederExhaustedError(
+                    self.name,
+                    f"Feeder '{self.name}' esgotado (strategy unique): {total} registros para {stride} VUs, VU {vu_index} ja usou {step}.",
+                )
+            self._vu_cursors[vu_index] = step + 1
+            return self._read(index)
+
+        index = self._cursor % total
+        self._cursor += 1
+        return self._read(index)
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "file": str(self.path),
+            "format": self.file_format,
+            "strategy": self.strategy,
+            "records": len(self._offsets),
+            "shard": f"{self.shard_index + 1}/{self.shard_count}",
+            "exhaustedVus": len(self.exhausted_vus),
+        }
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def open_feeders(global_cfg: dict[str, Any], *, shard_index: int, shard_count: int) -> dict[str, FeederSource]:
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise ValueError(f"Shard invalido: indice {shard_index} de {shard_count}.")
+
+    feeders: dict[str, FeederSource] = {}
+    for name, feeder_cfg in (global_cfg.get("feeders") or {}).items():
+        file_path = Path(str(feeder_cfg.get("file") or ""))
+        file_format = str(feeder_cfg.get("format") or "").lower()
+        if not file_format:
+            file_format = "csv" if file_path.suffix.lower() == ".csv" else "ndjson"
+        feeders[str(name)] = FeederSource(
+            name=str(name),
+            path=file_path,
+            file_format=file_format,
+            strategy=str(feeder_cfg.get("strategy") or "sequential").lower(),
+            shard_index=shard_index,
+            shard_count=shard_count,
+        )
+    return feeders
+
+
+class ThinkTimeModel:
+    def __init__(self, scenario_cfg: dict[str, Any]) -> None:
+        think_cfg = scenario_cfg.get("thinkTime") or {}
+        if not isinstance(think_cfg, dict):
+            raise ValueError("thinkTime do cenario precisa ser um objeto JSON.")
+
+        self.model = str(think_cfg.get("model") or "uniform").lower()
+        if self.model not in THINK_TIME_MODELS:
+            raise ValueError(f"thinkTime.model '{self.model}' invalido. Use: {', '.join(THINK_TIME_MODELS)}")
+
+        self.min_ms = max(to_float(think_cfg.get("minMs", scenario_cfg.get("thinkTimeMinMs")), 100.0), 0.0)
+        self.max_ms = max(to_float(think_cfg.get("maxMs", scenario_cfg.get("thinkTimeMaxMs")), 600.0), self.min_ms)
+        if self.model in ("exponential", "lognormal") and "minMs" not in think_cfg:
+            self.min_ms = 0.0
+        if self.model in ("exponential", "lognormal") and "maxMs" not in think_cfg:
+            self.max_ms = math.inf
+
+        self.mean_ms = max(to_float(think_cfg.get("meanMs"), 500.0), 0.001)
+        self.median_ms = max(to_float(think_cfg.get("medianMs"), 500.0), 0.001)
+        self.sigma = max(to_float(think_cfg.get("sigma"), 0.8), 0.0)
+        if think_cfg.get("p90Ms") is not None:
+            # p90 = mediana * e^(1.2816 * sigma)
+            self.sigma = max(math.log(max(to_float(think_cfg.get("p90Ms"), 0.0), self.median_ms) / self.median_ms) / 1.2816, 0.0)
+        self.interval_ms = max(to_float(think_cfg.get("intervalMs"), 1000.0), 0.0)
+
+        self.empirical_edges: list[float] = []
+        self.empirical_cumulative: list[float] = []
+        if self.model == "empirical":
+            self._load_empirical(Path(str(think_cfg.get("file") or "")))
+
+    def _load_empirical(self, path: Path) -> None:
+        if not path.is_file():
+            raise FileNotFoundError(f"Arquivo de think time empirico nao encontrado: {path}")
+
+        buckets: dict[float, float] = defaultdict(float)
+        with path.open("r", encoding="utf-8-sig") as handle:
+            for line in handle:
+                parts = [part.strip() for part in line.replace(";", ",").split(",")]
+                if not parts or not parts[0]:
+                    continue
+                try:
+                    value = float(parts[0])
+                    count = float(parts[1]) if len(parts) > 1 and parts[1] else 1.0
+                except ValueError:
+                    continue
+                if value >= 0 and count > 0:
+                    buckets[value] += count
+
+        if not buckets:
+            raise ValueError(f"Arquivo de think time empirico sem valores validos: {path}")
+
+        self.empirical_edges = sorted(buckets)
+        self.empirical_cumulative = list(itertools.accumulate(buckets[edge] for edge in self.empirical_edges))
+
+    def describe(self) -> dict[str, Any]:
+        description: dict[str, Any] = {"model": self.model}
+        if self.model == "uniform":
+            description.update(minMs=self.min_ms, maxMs=self.max_ms)
+        elif self.model == "exponential":
+            description.update(meanMs=self.mean_ms)
+        elif self.model == "lognormal":
+            description.update(medianMs=self.median_ms, sigma=round(self.sigma, 4))
+        elif self.model == "empirical":
+            description.update(buckets=len(self.empirical_edges))
+        else:
+            description.update(intervalMs=self.interval_ms)
+        return description
+
+    def generate(self, rng: random.Random, size: int) -> array.array:
+        if self.model == "pacing":
+            return array.array("d", [self.interval_ms]) * size
+        if self.model == "lognormal":
+            mu = math.log(self.median_ms)
+            gauss = rng.gauss
+            values = [math.exp(mu + self.sigma * gauss(0.0, 1.0)) for _ in range(size)]
+            return array.array("d", [min(max(value, self.min_ms), self.max_ms) for value in values])
+
+        uniforms = [rng.random() for _ in range(size)]
+        if self.model == "exponential":
+            values = [-self.mean_ms * math.log(1.0 - u) for u in uniforms]
+            return array.array("d", [min(max(value, self.min_ms), self.max_ms) for value in values])
+
+        if self.model == "empirical":
+            edges = self.empirical_edges
+            cumulative = self.empirical_cumulative
+            total = cumulative[-1]
+            values = []
+            for u in uniforms:
+                point = u * total
+                index = min(bisect.bisect_right(cumulative, point), len(edges) - 1)
+                lower_edge = edges[index - 1] if index else 0.0
+                lower_count = cumulative[index - 1] if index else 0.0
+                fraction = (point - lower_count) / max(cumulative[index] - lower_count, 1e-12)
+                values.append(lower_edge + (edges[index] - lower_edge) * min(fraction, 1.0))
+            return array.array("d", values)
+
+        span = self.max_ms - self.min_ms
+        return array.array("d", [self.min_ms + span * u for u in uniforms])
+
+
+class ThinkTimeStream:
+    def __init__(self, model: ThinkTimeModel, rng: random.Random) -> None:
+        self.model = model
+        self.rng = rng
+        self.pacing = model.model == "pacing"
+        self._values = array.array("d")
+        self._position = 0
+        self.samples = 0
+        self.total_ms = 0.0
+        self.pacing_overruns = 0
+
+    def next_seconds(self, iteration_elapsed_ms: float) -> float:
+        if self._position >= len(self._values):
+            self._values = self.model.generate(self.rng, THINK_TIME_BATCH_SIZE)
+            self._position = 0
+        value = self._values[self._position]
+        self._position += 1
+
+        if self.pacing:
+            if iteration_elapsed_ms >= value:
+                self.pacing_overruns += 1
+            value = max(value - iteration_elapsed_ms, 0.0)
+
+        self.samples += 1
+        self.total_ms += value
+        return value / 1000.0
+
+
+class UploadSizeModel:
+    def __init__(self, upload_cfg: dict[str, Any]) -> None:
+        size_cfg = upload_cfg.get("size") or {}
+        if not isinstance(size_cfg, dict):
+            size_cfg = {"bytes": size_cfg}
+
+        self.distribution = str(size_cfg.get("distribution") or ("weighted" if size_cfg.get("sizes") else "fixed")).lower()
+        if self.distribution not in UPLOAD_SIZE_DISTRIBUTIONS:
+            raise ValueError(
+                f"upload.size.distribution '{self.distribution}' invalida. Use: {', '.join(UPLOAD_SIZE_DISTRIBUTIONS)}"
+            )
+
+        self.max_bytes = max(to_int(size_cfg.get("maxBytes"), 20_000_000), 1)
+        self.min_bytes = min(max(to_int(size_cfg.get("minBytes"), 1), 1), self.max_bytes)
+        self.fixed_bytes = min(max(to_int(size_cfg.get("bytes"), 256 * 1024), 1), self.max_bytes)
+        self.median_bytes = max(to_float(size_cfg.get("medianBytes"), 256 * 1024), 1.0)
+        self.sigma = max(to_float(size_cfg.get("sigma"), 1.0), 0.0)
+        if size_cfg.get("p90Bytes") is not None:
+            # p90 = mediana * e^(1.2816 * sigma)
+            self.sigma = max(math.log(max(to_float(size_cfg.get("p90Bytes"), 0.0), self.median_bytes) / self.median_bytes) / 1.2816, 0.0)
+
+        self.sizes: list[int] = []
+        self.cumulative_weights: list[float] = []
+        if self.distribution == "weighted":
+            entries = [entry for entry in size_cfg.get("sizes") or [] if isinstance(entry, dict)]
+            if not entries:
+                raise ValueError("upload.size.sizes precisa listar objetos com bytes e weight.")
+            self.sizes = [min(max(to_int(entry.get("bytes"), 1), 1), self.max_bytes) for entry in entries]
+            self.cumulative_weights = list(itertools.accumulate(max(to_float(entry.get("weight"), 1.0), 0.0) for entry in entries))
+
+    def sample(self, rng: random.Random) -> int:
+        if self.distribution == "fixed":
+            return self.fixed_bytes
+        if self.distribution == "uniform":
+            return rng.randint(self.min_bytes, self.max_bytes)
+        if self.distribution == "lognormal":
+            value = math.exp(math.log(self.median_bytes) + self.sigma * rng.gauss(0.0, 1.0))
+            return int(min(max(value, self.min_bytes), self.max_bytes))
+        point = rng.random() * self.cumulative_weights[-1]
+        return self.sizes[min(bisect.bisect_right(self.cumulative_weights, point), len(self.sizes) - 1)]
+
+    def describe(self) -> dict[str, Any]:
+        description: dict[str, Any] = {"distribution": self.distribution}
+        if self.distribution == "fixed":
+            description.update(bytes=self.fixed_bytes)
+        elif self.distribution == "uniform":
+            description.update(minBytes=self.min_bytes, maxBytes=self.max_bytes)
+        elif self.distribution == "lognormal":
+            description.update(medianBytes=self.median_bytes, sigma=round(self.sigma, 4), maxBytes=self.max_bytes)
+        else:
+            description.update(sizes=self.sizes)
+        return description
+
+
+@functools.lru_cache(maxsize=1)
+def upload_payload_block() -> memoryview:
+    # bytes aleatorios nao comprimem, como jpeg/mp4 reais; o bloco e compartilhado por todos os uploads
+    return memoryview(random.Random(UPLOAD_PAYLOAD_SEED).randbytes(UPLOAD_PAYLOAD_BLOCK_BYTES))
+
+
+class MultipartUpload:
+    def __init__(
+        self,
+        *,
+        field_name: str,
+        file_name: str,
+        content_type: str,
+        size_bytes: int,
+        fields: dict[str, Any],
+        offset: int = 0,
+    ) -> None:
+        self.boundary = f"----loadtest{uuid.uuid4().hex}"
+        self.file_name = file_name
+        self.file_content_type = content_type
+        self.size_bytes = size_bytes
+        self.offset = offset % UPLOAD_PAYLOAD_BLOCK_BYTES
+
+        parts = [
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+            for name, value in fields.items()
+        ]
+        parts.append(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{field_name}"; filename="{file_name}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        )
+        self.preamble = "".join(parts).encode("utf-8")
+        self.epilogue = f"\r\n--{self.boundary}--\r\n".encode("ascii")
+        self.content_length = len(self.preamble) + size_bytes + len(self.epilogue)
+
+        self.body_sent_at: Optional[float] = None
+        self.headers_received_at: Optional[float] = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "Content-Type": f"multipart/form-data; boundary={self.boundary}",
+            "Content-Length": str(self.content_length),
+        }
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        yield self.preamble
+        magic = UPLOAD_MAGIC_BYTES.get(self.file_content_type, b"")[: self.size_bytes]
+        if magic:
+            yield magic
+        remaining = self.size_bytes - len(magic)
+        block = upload_payload_block()
+        offset = self.offset
+        while remaining > 0:
+            if offset >= UPLOAD_PAYLOAD_BLOCK_BYTES:
+                offset = 0
+            chunk = min(remaining, UPLOAD_CHUNK_BYTES, UPLOAD_PAYLOAD_BLOCK_BYTES - offset)
+            yield block[offset : offset + chunk]
+            offset += chunk
+            remaining -= chunk
+        yield self.epilogue
+
+    async def trace(self, event_name: str, info: dict[str, Any]) -> None:
+        if event_name.endswith("send_request_body.complete"):
+            self.body_sent_at = time.perf_counter()
+        elif event_name.endswith("receive_response_headers.complete"):
+            self.headers_received_at = time.perf_counter()
+
+    def describe(self) -> str:
+        return f"multipart/form-data {self.file_name} ({self.file_content_type}, {self.size_bytes} bytes)"
+
+
+def describe_request_body(body: Any) -> Optional[str]:
+    if body is None:
+        return None
+    if isinstance(body, MultipartUpload):
+        return body.describe()
+    return json.dumps(body, ensure_ascii=False)
+
+
+def trace_id_for(correlation_id: str) -> str:
+    try:
+        return uuid.UUID(correlation_id).hex
+    except ValueError:
+        return uuid.uuid5(uuid.NAMESPACE_OID, correlation_id).hex
+
+
+def traceparent_ids(correlation_id: str) -> tuple[str, str]:
+    # trace id = correlationId sem hifens; span id do cliente = metade aleatoria final do UUID
+    trace_id = trace_id_for(correlation_id)
+    return trace_id, trace_id[16:]
+
+
+def otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class OtlpSpanExporter:
+    def __init__(
+        self,
+        *,
+        path: Optional[Path],
+        endpoint: Optional[str],
+        service_name: str,
+        run_id: str,
+        scenario_name: str,
+        insecure_tls: bool,
+    ) -> None:
+        self.path = path
+        self.endpoint = endpoint
+        self.spans_exported = 0
+        self.export_errors = 0
+        self._batch: list[dict[str, Any]] = []
+        self._resource = {
+            "attributes": [
+                otlp_attribute("service.name", service_name),
+                otlp_attribute("loadtest.run_id", run_id),
+                otlp_attribute("loadtest.scenario", scenario_name),
+            ]
+        }
+
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._write_loop, name="otlp-span-writer", daemon=True)
+            self._writer.start()
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._uploads: set[asyncio.Task[None]] = set()
+        if endpoint:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(10.0), verify=not insecure_tls)
+
+    def add(
+        self,
+        *,
+        name: str,
+        correlation_id: str,
+        start_epoch: float,
+        duration_ms: float,
+        status_code: Optional[int],
+        error_type: Optional[str],
+        vu_index: int,
+    ) -> None:
+        trace_id, span_id = traceparent_ids(correlation_id)
+        start_ns = int(start_epoch * 1e9)
+        method, _, route = name.partition(" ")
+        attributes = [
+            otlp_attribute("loadtest.vu", vu_index),
+            otlp_attribute("loadtest.correlation_id", correlation_id),
+        ]
+        if route:
+            attributes.append(otlp_attribute("http.request.method", method))
+            attributes.append(otlp_attribute("http.route", route))
+        if status_code is not None:
+            attributes.append(otlp_attribute("http.response.status_code", status_code))
+        if error_type:
+            attributes.append(otlp_attribute("error.type", error_type))
+
+        failed = bool(error_type) or (status_code is not None and status_code >= 400)
+        self._batch.append(
+            {
+                "traceId": trace_id,
+                "spanId": span_id,
+                "name": name,
+                "kind": OTLP_SPAN_KIND_CLIENT,
+                "startTimeUnixNano": str(start_ns),
+                "endTimeUnixNano": str(start_ns + int(duration_ms * 1e6)),
+                "attributes": attributes,
+                "status": {"code": OTLP_STATUS_ERROR} if failed else {},
+            }
+        )
+        if len(self._batch) >= OTLP_BATCH_SPANS:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._batch:
+            return
+        envelope = {
+            "resourceSpans": [
+                {
+                    "resource": self._resource,
+                    "scopeSpans": [{"scope": {"name": "loadtest_runner"}, "spans": self._batch}],
+                }
+            ]
+        }
+        self.spans_exported += len(self._batch)
+        self._batch = []
+
+        if self._queue is not None:
+            self._queue.put(envelope)
+        if self._client is not None and self.endpoint:
+            task = asyncio.get_running_loop().create_task(self._upload(envelope))
+            self._uploads.add(task)
+            task.add_done_callback(self._uploads.discard)
+
+    async def _upload(self, envelope: dict[str, Any]) -> None:
+        assert self._client is not None and self.endpoint
+        try:
+            response = await self._client.post(self.endpoint, json=envelope)
+            if response.status_code >= 400:
+                self.export_errors += 1
+        except httpx.HTTPError:
+            self.export_errors += 1
+
+    def _write_loop(self) -> None:
+        assert self._queue is not None and self.path is not None
+        with self.path.open("w", encoding="utf-8") as handle:
+            while True:
+                envelope = self._queue.get()
+                if envelope is None:
+                    return
+                handle.write(json.dumps(envelope, separators=(",", ":")) + "\n")
+
+    async def close(self) -> None:
+        self.flush()
+        if self._uploads:
+            await asyncio.gather(*list(self._uploads), return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+        if self._queue is not None and self._writer is not None:
+            self._queue.put(None)
+            await asyncio.to_thread(self._writer.join)
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "spans": self.spans_exported + len(self._batch),
+            "otlpFile": str(self.path) if self.path is not None else None,
+            "otlpEndpoint": self.endpoint,
+            "exportErrors": self.export_errors,
+        }
+
+
+def jain_index(values: list[float]) -> Optional[float]:
+    values = [value for value in values if value > 0]
+    if not values:
+        return None
+    total = sum(values)
+    return round(total * total / (len(values) * sum(value * value for value in values)), 4)
+
+
+class FairnessTracker:
+    def __init__(self, max_keys: int = FAIRNESS_MAX_KEYS, min_samples: int = FAIRNESS_MIN_SAMPLES) -> None:
+        self.max_keys = max(max_keys, 1)
+        self.min_samples = max(min_samples, 1)
+        self.vu_keys: dict[int, tuple[str, str, str]] = {}
+        self.histograms: dict[str, dict[str, LatencyHistogram]] = {dimension: {} for dimension in FAIRNESS_DIMENSIONS}
+        self.errors: dict[str, Counter] = {dimension: Counter() for dimension in FAIRNESS_DIMENSIONS}
+
+    def _bounded_key(self, dimension: str, key: str) -> str:
+        histograms = self.histograms[dimension]
+        if key in histograms or len(histograms) < self.max_keys:
+            return key
+        return FAIRNESS_OVERFLOW_KEY
+
+    def register(self, vu_index: int, client_id: str, tenant_id: Optional[str], account: Optional[dict[str, Any]]) -> None:
+        account_key = None
+        if account:
+            account_key = account.get("email") or account.get("login") or account.get("username") or account.get("id")
+        keys = (client_id, str(tenant_id or "(sem tenant)"), str(account_key or "(sem conta)"))
+        self.vu_keys[vu_index] = tuple(
+            self._bounded_key(dimension, key) for dimension, key in zip(FAIRNESS_DIMENSIONS, keys)
+        )
+        for dimension, key in zip(FAIRNESS_DIMENSIONS, self.vu_keys[vu_index]):
+            self.histograms[dimension].setdefault(key, LatencyHistogram())
+
+    def record(self, vu_index: int, latency_index: int, duration_ms: float, failed: bool) -> None:
+        keys = self.vu_keys.get(vu_index)
+        if keys is None:
+            return
+        for dimension, key in zip(FAIRNESS_DIMENSIONS, keys):
+            self.histograms[dimension][key].add(latency_index, duration_ms)
+            if failed:
+                self.errors[dimension][key] += 1
+
+    def build_dimension(self, dimension: str, duration_seconds: float, rows: int) -> dict[str, Any]:
+        duration = max(duration_seconds, 0.001)
+        items = []
+        for key, histogram in self.histograms[dimension].items():
+            if not histogram.count:
+                continue
+            errors = self.errors[dimension].get(key, 0)
+            items.append(
+                {
+                    "key": key,
+                    "requests": histogram.count,
+                    "rps": round(histogram.count / duration, 2),
+                    "errors": errors,
+                    "errorRatePercent": round(errors / histogram.count * 100.0, 2),
+                    "p50LatencyMs": round(histogram.percentile(50), 2),
+                    "p95LatencyMs": round(histogram.percentile(95), 2),
+                    "p99LatencyMs": round(histogram.percentile(99), 2),
+                }
+            )
+
+        # chaves com poucas amostras distorcem o p95 e ficam fora dos indicadores de cauda
+        measured = [
+            item
+            for item in items
+            if item["requests"] >= self.min_samples and item["key"] != FAIRNESS_OVERFLOW_KEY
+        ]
+        p95_values = sorted(item["p95LatencyMs"] for item in measured)
+        p95_spread = None
+        if p95_values:
+            median = percentile(p95_values, 50)
+            mean = sum(p95_values) / len(p95_values)
+            deviation = math.sqrt(sum((value - mean) ** 2 for value in p95_values) / len(p95_values))
+            p95_spread = {
+                "min": round(p95_values[0], 2),
+                "p50": round(median, 2),
+                "p90": round(percentile(p95_values, 90), 2),
+                "max": round(p95_values[-1], 2),
+                "maxToMedianRatio": round(p95_values[-1] / median, 2) if median else None,
+                "coefficientOfVariation": round(deviation / mean, 4) if mean else None,
+            }
+
+        return {
+            "keys": len(items),
+            "overflow": any(item["key"] == FAIRNESS_OVERFLOW_KEY for item in items),
+            "jainThroughput": jain_index([float(item["requests"]) for item in measured]),
+            "jainLatency": jain_index([1000.0 / item["p95LatencyMs"] for item in measured if item["p95LatencyMs"] > 0]),
+            "p95Spread": p95_spread,
+            "worstByP95": sorted(measured, key=lambda item: item["p95LatencyMs"], reverse=True)[:rows],
+            "items": sorted(items, key=lambda item: item["requests"], reverse=True)[:rows] if dimension != "vu" else [],
+        }
+
+    def build(self, duration_seconds: float) -> dict[str, Any]:
+        report: dict[str, Any] = {
+            dimension: self.build_dimension(dimension, duration_seconds, FAIRNESS_REPORT_ROWS)
+            for dimension in FAIRNESS_DIMENSIONS
+        }
+        report["maxKeys"] = self.max_keys
+        report["minSamples"] = self.min_samples
+        return report
+
+
+def create_fairness_tracker(global_cfg: dict[str, Any]) -> Optional[FairnessTracker]:
+    fairness_cfg = global_cfg.get("fairness") or {}
+    if not fairness_cfg.get("enabled"):
+        return None
+    return FairnessTracker(
+        max_keys=to_int(fairness_cfg.get("maxKeys"), FAIRNESS_MAX_KEYS),
+        min_samples=to_int(fairness_cfg.get("minSamples"), FAIRNESS_MIN_SAMPLES),
+    )
+
+
+class RetryPolicy:
+    def __init__(self, retry_cfg: dict[str, Any]) -> None:
+        self.max_attempts = max(to_int(retry_cfg.get("maxAttempts"), RETRY_DEFAULT_MAX_ATTEMPTS), 1)
+        retry_on = retry_cfg.get("retryOn")
+        self.retry_on = {str(item).lower() for item in (retry_on if retry_on is not None else RETRY_DEFAULT_ON)}
+        for item in self.retry_on:
+            if item not in RETRY_CONDITIONS and not (item.isdigit() and 400 <= int(item) <= 599):
+                raise ValueError(
+                    f"retry.retryOn: condicao invalida '{item}'. Use {', '.join(RETRY_CONDITIONS)} ou um status HTTP (ex.: 429)."
+                )
+
+        self.base_delay_ms = max(to_float(retry_cfg.get("baseDelayMs"), RETRY_DEFAULT_BASE_DELAY_MS), 0.0)
+        self.max_delay_ms = max(to_float(retry_cfg.get("maxDelayMs"), RETRY_DEFAULT_MAX_DELAY_MS), self.base_delay_ms)
+        self.multiplier = max(to_float(retry_cfg.get("multiplier"), RETRY_DEFAULT_MULTIPLIER), 1.0)
+        self.jitter = str(retry_cfg.get("jitter") or "full").lower()
+        if self.jitter not in RETRY_JITTER_MODES:
+            raise ValueError(f"retry.jitter invalido '{self.jitter}'. Use: {', '.join(RETRY_JITTER_MODES)}")
+        self.respect_retry_after = bool(retry_cfg.get("respectRetryAfter", True))
+        self.deadline_seconds = max(to_float(retry_cfg.get("deadlineSeconds"), 0.0), 0.0)
+        self.retry_non_idempotent = bool(retry_cfg.get("retryNonIdempotent"))
+        budget_cfg = retry_cfg.get("budget")
+        self.budget_cfg = budget_cfg if isinstance(budget_cfg, dict) else None
+
+    def retry_reason(self, status_code: Optional[int], error_type: Optional[str]) -> Optional[str]:
+        if status_code is None:
+            condition = "timeout" if error_type == "timeout" else "network"
+            return condition if condition in self.retry_on else None
+        if status_code >= 400 and (str(status_code) in self.retry_on or f"{status_code // 100}xx" in self.retry_on):
+            return f"http_{status_code}"
+        return None
+
+    def delay_ms(self, retry_number: int, previous_delay_ms: float, rng: random.Random, retry_after_seconds: Optional[float]) -> float:
+        ceiling = min(self.base_delay_ms * self.multiplier ** (retry_number - 1), self.max_delay_ms)
+        if self.jitter == "full":
+            delay = rng.uniform(0.0, ceiling)
+        elif self.jitter == "equal":
+            delay = ceiling / 2.0 + rng.uniform(0.0, ceiling / 2.0)
+        elif self.jitter == "decorrelated":
+            delay = min(rng.uniform(self.base_delay_ms, max(previous_delay_ms * 3.0, self.base_delay_ms)), self.max_delay_ms)
+        else:
+            delay = ceiling
+        if retry_after_seconds is not None and self.respect_retry_after:
+            delay = max(delay, retry_after_seconds * 1000.0)
+        return delay
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "maxAttempts": self.max_attempts,
+            "retryOn": sorted(self.retry_on),
+            "baseDelayMs": self.base_delay_ms,
+            "maxDelayMs": self.max_delay_ms,
+            "multiplier": self.multiplier,
+            "jitter": self.jitter,
+            "deadlineSeconds": self.deadline_seconds or None,
+            "budget": self.budget_cfg,
+        }
+
+
+def layered_config(key: str, *sources: dict[str, Any]) -> dict[str, Any]:
+    # endpoint > cenario > global; "<key>": false desliga o nivel de cima
+    merged: dict[str, Any] = {}
+    for source in sources:
+        value = source.get(key)
+        if value is False:
+            merged = {}
+        elif isinstance(value, dict):
+            merged = {**merged, **value}
+    return merged
+
+
+def compile_retry_policy(
+    global_cfg: dict[str, Any],
+    scenario_cfg: dict[str, Any],
+    endpoint: dict[str, Any],
+    method: str,
+    enabled: bool = True,
+) -> Optional[RetryPolicy]:
+    # enabled=False ignora todas as camadas (o "retry" do endpoint reabriria um "retry": false do cenario)
+    if not enabled:
+        return None
+    retry_cfg = layered_config("retry", global_cfg, scenario_cfg, endpoint)
+    if not retry_cfg:
+        return None
+    policy = RetryPolicy(retry_cfg)
+    if policy.max_attempts <= 1 or (method.upper() not in RETRY_IDEMPOTENT_METHODS and not policy.retry_non_idempotent):
+        return None
+    return policy
+
+
+class RetryBudget:
+    # token bucket por VU (como o app): cada chamada nova deposita retryPercent/100 tokens e cada retry gasta 1
+    def __init__(self, budget_cfg: dict[str, Any]) -> None:
+        self.ratio = max(to_float(budget_cfg.get("retryPercent"), RETRY_DEFAULT_BUDGET_PERCENT), 0.0) / 100.0
+        self.max_tokens = max(to_float(budget_cfg.get("maxTokens"), RETRY_DEFAULT_BUDGET_MAX_TOKENS), 1.0)
+        self.tokens = self.max_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class CachePolicy:
+    def __init__(self, cache_cfg: dict[str, Any]) -> None:
+        self.revalidate = bool(cache_cfg.get("revalidate", True))
+        self.bust_percent = min(max(to_float(cache_cfg.get("bustPercent"), 0.0), 0.0), 100.0)
+        bust_query_param = cache_cfg.get("bustQueryParam", CACHE_DEFAULT_BUST_QUERY_PARAM)
+        self.bust_query_param = str(bust_query_param) if bust_query_param else None
+
+
+def compile_cache_policy(
+    global_cfg: dict[str, Any],
+    scenario_cfg: dict[str, Any],
+    endpoint: dict[str, Any],
+    method: str,
+) -> Optional[CachePolicy]:
+    cache_cfg = layered_config("cache", global_cfg, scenario_cfg, endpoint)
+    if not cache_cfg or not bool(cache_cfg.get("enabled", True)) or method.upper() not in CACHE_METHODS:
+        return None
+    policy = CachePolicy(cache_cfg)
+    return policy if policy.revalidate or policy.bust_percent > 0 else None
+
+
+@functools.lru_cache(maxsize=None)
+def content_decoder(coding: str) -> Callable[[bytes], bytes]:
+    if coding in ("gzip", "x-gzip"):
+        return gzip.decompress
+    if coding == "deflate":
+        def inflate(data: bytes) -> bytes:
+            # servidores mandam deflate com e sem o cabecalho zlib
+            try:
+                return zlib.decompress(data)
+            except zlib.error:
+                return zlib.decompress(data, -zlib.MAX_WBITS)
+
+        return inflate
+    if coding == "br":
+        try:
+            import brotli
+        except ImportError:
+            try:
+                import brotlicffi as brotli
+            except ImportError as exc:
+                raise RuntimeError("Accept-Encoding 'br' requer brotli (pip install brotli).") from exc
+        return brotli.decompress
+    if coding == "zstd":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise RuntimeError("Accept-Encoding 'zstd' requer zstandard (pip install zstandard).") from exc
+        decompressor = zstandard.ZstdDecompressor()
+        return lambda data: decompressor.decompressobj().decompress(data)
+    raise ValueError(f"Content-Encoding nao suportado: '{coding}'")
+
+
+def decode_content(raw: bytes, content_encoding: str) -> bytes:
+    data = raw
+    # codificacoes aplicadas em sequencia: desfaz da ultima para a primeira
+    for coding in reversed([item.strip().lower() for item in content_encoding.split(",") if item.strip()]):
+        if coding != "identity" and data:
+            data = content_decoder(coding)(data)
+    return data
+
+
+def compression_profiles(
+    global_cfg: dict[str, Any],
+    scenario_cfg: dict[str, Any],
+    endpoint: Optional[dict[str, Any]] = None,
+) -> list[tuple[str, float]]:
+    layers = (global_cfg, scenario_cfg, endpoint or {})
+    compression_cfg = layered_config("compression", *layers)
+    # profiles e acceptEncoding sao alternativas: vale a do nivel mais especifico que declarou alguma
+    use_shortcut = False
+    for source in reversed(layers):
+        value = source.get("compression")
+        if value is False:
+            break
+        if isinstance(value, dict) and ("profiles" in value or "acceptEncoding" in value):
+            use_shortcut = "profiles" not in value
+            break
+    profiles = None if use_shortcut else compression_cfg.get("profiles")
+    if profiles is None and compression_cfg.get("acceptEncoding"):
+        profiles = [compression_cfg.get("acceptEncoding")]
+    if not profiles:
+        return []
+    weighted = profiles.items() if isinstance(profiles, dict) else [(profile, 1.0) for profile in profiles]
+
+    result = []
+    for accept_encoding, weight in weighted:
+        for coding in str(accept_encoding).split(","):
+            coding = coding.split(";")[0].strip().lower()
+            if coding not in COMPRESSION_CODINGS:
+                raise ValueError(
+                    f"compression: codificacao invalida '{coding}' em '{accept_encoding}'. Use: {', '.join(COMPRESSION_CODINGS)}"
+                )
+            if coding != "identity":
+                # falha no inicio do run se faltar brotli/zstandard
+                content_decoder(coding)
+        if to_float(weight, 0.0) > 0:
+            result.append((str(accept_encoding), to_float(weight, 0.0)))
+    if not result:
+        raise ValueError("compression.profiles precisa de ao menos um perfil com peso > 0.")
+    return result
+
+
+def pick_compression_profile(profiles: list[tuple[str, float]], rng: random.Random) -> Optional[str]:
+    if not profiles:
+        return None
+    cumulative = list(itertools.accumulate(weight for _, weight in profiles))
+    return profiles[min(bisect.bisect_right(cumulative, rng.random() * cumulative[-1]), len(profiles) - 1)][0]
+
+
+@dataclass
+class TransferStats:
+    responses: int = 0
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+    decode_ms: LatencyHistogram = field(default_factory=LatencyHistogram)
+    body_ms: LatencyHistogram = field(default_factory=LatencyHistogram)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    encodings: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class RetryStats:
+    policy: dict[str, Any]
+    calls: int = 0
+    attempts: int = 0
+    successes: int = 0
+    recovered: int = 0
+    gave_up: Counter = field(default_factory=Counter)
+    reasons: Counter = field(default_factory=Counter)
+    call_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
 @dataclass
 class FailureSample:
     timestamp_utc: str
@@ -135,106 +1386,657 @@ class MetricsCollector:
     total_requests: int = 0
     successful_requests: int = 0
     failed_requests: int = 0
-    total_duration_ms: list[float] = field(default_factory=list)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
 
     status_counts: Counter = field(default_factory=Counter)
     exception_counts: Counter = field(default_factory=Counter)
     endpoint_hits: Counter = field(default_factory=Counter)
     endpoint_errors: Counter = field(default_factory=Counter)
-    endpoint_durations: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    endpoint_latency: dict[str, LatencyHistogram] = field(default_factory=lambda: defaultdict(LatencyHistogram))
 
     requests_per_second: Counter = field(default_factory=Counter)
+    errors_per_second: Counter = field(default_factory=Counter)
+    second_latency: dict[int, LatencyHistogram] = field(default_factory=lambda: defaultdict(LatencyHistogram))
+    endpoint_second_latency: dict[str, dict[int, LatencyHistogram]] = field(
+        default_factory=lambda: defaultdict(lambda: defaultdict(LatencyHistogram))
+    )
+    # resolucao da serie por endpoint: dobra conforme o run cresce (memoria limitada a ENDPOINT_SERIES_MAX_BUCKETS por endpoint)
+    endpoint_series_seconds: int = 1
+    endpoint_series_adaptive: bool = True
+    # traceId so faz sentido quando o traceparent foi enviado ao servidor
+    tracing_enabled: bool = False
 
     error_catalog_counts: Counter = field(default_factory=Counter)
     error_catalog_endpoints: dict[str, set[str]] = field(default_factory=lambda: defaultdict(set))
 
     failure_samples: list[FailureSample] = field(default_factory=list)
 
-    def record(
+    flow_latency: dict[str, LatencyHistogram] = field(default_factory=lambda: defaultdict(LatencyHistogram))
+    flow_failures: Counter = field(default_factory=Counter)
+
+    endpoint_status_counts: Counter = field(default_factory=Counter)
+    in_flight: int = 0
+    active_vus: int = 0
+    open_connections: int = 0
+
+    upload_bytes: Counter = field(default_factory=Counter)
+    upload_sizes: dict[str, LatencyHistogram] = field(default_factory=lambda: defaultdict(LatencyHistogram))
+    upload_send_ms: dict[str, LatencyHistogram] = field(default_factory=lambda: defaultdict(LatencyHistogram))
+    upload_ttfb_ms: dict[str, LatencyHistogram] = field(default_factory=lambda: defaultdict(LatencyHistogram))
+    upload_mbps: dict[str, LatencyHistogram] = field(default_factory=lambda: defaultdict(LatencyHistogram))
+    uploads_in_flight: int = 0
+    uploads_in_flight_peak: int = 0
+
+    retry_stats: dict[str, RetryStats] = field(default_factory=dict)
+    retries_per_second: Counter = field(default_factory=Counter)
+
+    cache_outcomes: Counter = field(default_factory=Counter)
+    cache_body_bytes: Counter = field(default_factory=Counter)
+    cache_latency: dict[tuple[str, str], LatencyHistogram] = field(default_factory=lambda: defaultdict(LatencyHistogram))
+    # endpoints que responderam ao menos uma vez com ETag ou Last-Modified
+    cache_validator_endpoints: set[str] = field(default_factory=set)
+
+    transfer_stats: dict[tuple[str, str], TransferStats] = field(default_factory=lambda: defaultdict(TransferStats))
+    compression_vus: Counter = field(default_factory=Counter)
+
+    # min-heap (duracao, timestamp, correlationId) com os requests mais lentos de cada endpoint
+    slowest_samples: dict[str, list[tuple[float, float, str]]] = field(default_factory=lambda: defaultdict(list))
+
+    vu_populations: dict[int, str] = field(default_factory=dict)
+    population_latency: dict[str, LatencyHistogram] = field(default_factory=lambda: defaultdict(LatencyHistogram))
+    population_errors: Counter = field(default_factory=Counter)
+    population_endpoint_latency: dict[tuple[str, str], LatencyHistogram] = field(
+        default_factory=lambda: defaultdict(LatencyHistogram)
+    )
+    population_endpoint_errors: Counter = field(default_factory=Counter)
+
+    raw_log: Optional[RawSampleLog] = None
+    span_exporter: Optional[OtlpSpanExporter] = None
+    fairness: Optional[FairnessTracker] = None
+
+    def record_upload(self, endpoint_key: str, upload: MultipartUpload, started_at: float) -> None:
+        if upload.body_sent_at is None:
+            return
+        send_ms = max((upload.body_sent_at - started_at) * 1000.0, 0.001)
+        self.upload_bytes[endpoint_key] += upload.size_bytes
+        self.upload_sizes[endpoint_key].record(float(upload.size_bytes))
+        self.upload_send_ms[endpoint_key].record(send_ms)
+        self.upload_mbps[endpoint_key].record(upload.content_length / 1_000_000.0 / (send_ms / 1000.0))
+        if upload.headers_received_at is not None:
+            self.upload_ttfb_ms[endpoint_key].record(max((upload.headers_received_at - upload.body_sent_at) * 1000.0, 0.0))
+
+    def record_retry(self, endpoint_key: str, reason: str) -> None:
+        self.retry_stats[endpoint_key].reasons[reason] += 1
+        self.retries_per_second[int(max(0, math.floor(time.time() - self.started_epoch)))] += 1
+
+    def record_retry_call(
         self,
-        *,
         endpoint_key: str,
-        status_code: Optional[int],
+        *,
+        attempts: int,
+        succeeded: bool,
+        gave_up: Optional[str],
         duration_ms: float,
-        timestamp_epoch: float,
-        error_type: Optional[str] = None,
-        error_message: Optional[str] = None,
-        failure_sample: Optional[FailureSample] = None,
     ) -> None:
-        self.total_requests += 1
-        self.endpoint_hits[endpoint_key] += 1
-        self.endpoint_durations[endpoint_key].append(duration_ms)
-        self.total_duration_ms.append(duration_ms)
-
-        second_bucket = int(max(0, math.floor(timestamp_epoch - self.started_epoch)))
-        self.requests_per_second[second_bucket] += 1
-
-        if status_code is not None:
-            self.status_counts[status_code] += 1
-
-        is_failure = False
-        if status_code is not None and status_code >= 400:
-            is_failure = True
-        if error_type:
-            is_failure = True
+        stats = self.retry_stats[endpoint_key]
+        stats.calls += 1
+        stats.attempts += attempts
+        stats.call_latency.record(duration_ms)
+        if succeeded:
+            stats.successes += 1
+            if attempts > 1:
+                stats.recovered += 1
+        if gave_up is not None:
+            stats.gave_up[gave_up] += 1
+
+    def build_retries(self, duration_seconds: float) -> Optional[dict[str, Any]]:
+        if not any(stats.calls for stats in self.retry_stats.values()):
+            return None
+        duration = max(duration_seconds, 0.001)
 
-        if is_failure:
-            self.failed_requests += 1
-            self.endpoint_errors[endpoint_key] += 1
-            normalized = normalize_error_message(error_message or error_type or "request_failed")
-            self.error_catalog_counts[normalized] += 1
-            self.error_catalog_endpoints[normalized].add(endpoint_key)
+        def summary(calls: int, attempts: int, successes: int) -> dict[str, Any]:
+            retries = attempts - calls
+            return {
+                "calls": calls,
+                "attempts": attempts,
+                "retries": retries,
+                # amplificacao: requests enviados ao servidor por chamada logica do app
+                "amplification": round(attempts / calls, 3) if calls else 0.0,
+                "successes": successes,
+                "retriesPerSuccess": round(retries / successes, 3) if successes else None,
+                "throughputRps": round(attempts / duration, 2),
+                "goodputRps": round(successes / duration, 2),
+                "goodputPercent": round(successes / attempts * 100.0, 2) if attempts else 0.0,
+            }
 
-            if error_type:
-                self.exception_counts[error_type] += 1
+        endpoints = []
+        for endpoint_key, stats in sorted(self.retry_stats.items(), key=lambda item: item[1].attempts, reverse=True):
+            if not stats.calls:
+                continue
+            attempt_latency = self.endpoint_latency.get(endpoint_key)
+            endpoints.append(
+                {
+                    "endpoint": endpoint_key,
+                    **summary(stats.calls, stats.attempts, stats.successes),
+                    "recoveredByRetry": stats.recovered,
+                    "gaveUp": dict(stats.gave_up),
+                    "reasons": dict(stats.reasons.most_common()),
+                    # latencia vista pelo usuario: todas as tentativas + backoff
+                    "callLatencyMs": {
+                        "p50": round(stats.call_latency.percentile(50), 2),
+                        "p95": round(stats.call_latency.percentile(95), 2),
+                        "p99": round(stats.call_latency.percentile(99), 2),
+                    },
+                    "attemptP95Ms": round(attempt_latency.percentile(95), 2) if attempt_latency is not None else None,
+                    "policy": stats.policy,
+                }
+            )
 
-            if failure_sample and len(self.failure_samples) < self.max_failure_samples:
-                self.failure_samples.append(failure_sample)
-        else:
-            self.successful_requests += 1
+        gave_up: Counter = Counter()
+        for stats in self.retry_stats.values():
+            gave_up.update(stats.gave_up)
+        peak_second, peak_retries = max(self.retries_per_second.items(), key=lambda item: item[1], default=(None, 0))
+        return {
+            **summary(
+                sum(stats.calls for stats in self.retry_stats.values()),
+                sum(stats.attempts for stats in self.retry_stats.values()),
+                sum(stats.successes for stats in self.retry_stats.values()),
+            ),
+            "recoveredByRetry": sum(stats.recovered for stats in self.retry_stats.values()),
+            "gaveUp": dict(gave_up),
+            "peakRetriesPerSecond": peak_retries,
+            "peakRetriesSecond": peak_second,
+            "endpoints": endpoints,
+        }
 
-    def build_report(
+    def record_transfer(
         self,
+        endpoint_key: str,
+        profile: str,
         *,
-        run_id: str,
-        scenario_name: str,
-        started_at_utc: str,
-        finished_at_utc: str,
-        duration_seconds: float,
-        base_url: str,
-        scenario_config: dict[str, Any],
-        resolved_endpoints: list[dict[str, Any]],
-    ) -> dict[str, Any]:
-        total = self.total_requests
+        content_encoding: str,
+        wire_bytes: int,
+        decoded_bytes: int,
+        decode_ms: float,
+        body_ms: float,
+        duration_ms: float,
+    ) -> None:
+        stats = self.transfer_stats[(endpoint_key, profile)]
+        stats.responses += 1
+        stats.wire_bytes += wire_bytes
+        stats.decoded_bytes += decoded_bytes
+        stats.decode_ms.record(decode_ms)
+        stats.body_ms.record(body_ms)
+        stats.latency.record(duration_ms)
+        stats.encodings[content_encoding or "identity"] += 1
+
+    def build_transfer(self, duration_seconds: float) -> Optional[dict[str, Any]]:
+        if not self.transfer_stats:
+            return None
         duration = max(duration_seconds, 0.001)
 
-        avg_rps = total / duration
-        peak_rps = max(self.requests_per_second.values(), default=0)
+        def summary(wire_bytes: int, decoded_bytes: int, decode_ms: float) -> dict[str, Any]:
+            return {
+                "wireMegabytes": round(wire_bytes / 1_000_000.0, 3),
+                "decodedMegabytes": round(decoded_bytes / 1_000_000.0, 3),
+                "wireMBps": round(wire_bytes / 1_000_000.0 / duration, 4),
+                # razao de compressao: bytes decodificados por byte na rede
+                "compressionRatio": round(decoded_bytes / wire_bytes, 2) if wire_bytes else None,
+                "savedPercent": round((1.0 - wire_bytes / decoded_bytes) * 100.0, 2) if decoded_bytes else None,
+                "decodeCpuMs": round(decode_ms, 2),
+            }
+
+        rows = []
+        profiles: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        profile_decode_ms: Counter = Counter()
+        for (endpoint_key, profile), stats in self.transfer_stats.items():
+            profiles[profile][0] += stats.wire_bytes
+            profiles[profile][1] += stats.decoded_bytes
+            profile_decode_ms[profile] += stats.decode_ms.total
+            rows.append(
+                {
+                    "endpoint": endpoint_key,
+                    "profile": profile,
+                    "responses": stats.responses,
+                    "encodings": dict(stats.encodings.most_common()),
+                    **summary(stats.wire_bytes, stats.decoded_bytes, stats.decode_ms.total),
+                    "averageWireBytes": int(stats.wire_bytes / stats.responses),
+                    "averageDecodedBytes": int(stats.decoded_bytes / stats.responses),
+                    "decodeMs": {"avg": round(stats.decode_ms.mean(), 4), "p95": round(stats.decode_ms.percentile(95), 4)},
+                    "decodeMicrosPerKB": (
+                        round(stats.decode_ms.total * 1000.0 / (stats.decoded_bytes / 1024.0), 3) if stats.decoded_bytes else None
+                    ),
+                    # quanto da latencia e download do corpo (apos os headers) e decodificacao no cliente
+                    "bodyTransferMs": {"p50": round(stats.body_ms.percentile(50), 3), "p95": round(stats.body_ms.percentile(95), 3)},
+                    "bodyTransferSharePercent": round(stats.body_ms.total / stats.latency.total * 100.0, 2) if stats.latency.total else 0.0,
+                    "decodeSharePercent": round(stats.decode_ms.total / stats.latency.total * 100.0, 3) if stats.latency.total else 0.0,
+                    "latencyMs": {"p50": round(stats.latency.percentile(50), 2), "p95": round(stats.latency.percentile(95), 2)},
+                }
+            )
+        rows.sort(key=lambda item: item["wireMegabytes"], reverse=True)
 
-        min_latency = min(self.total_duration_ms) if self.total_duration_ms else 0.0
-        avg_latency = (sum(self.total_duration_ms) / len(self.total_duration_ms)) if self.total_duration_ms else 0.0
-        max_latency = max(self.total_duration_ms) if self.total_duration_ms else 0.0
+        return {
+            **summary(
+                sum(item[0] for item in profiles.values()),
+                sum(item[1] for item in profiles.values()),
+                sum(profile_decode_ms.values()),
+            ),
+            "profiles": [
+                {"profile": profile, "vus": self.compression_vus.get(profile, 0), **summary(wire, decoded, profile_decode_ms[profile])}
+                for profile, (wire, decoded) in sorted(profiles.items())
+            ],
+            "endpoints": rows[:TRANSFER_REPORT_ROWS],
+        }
 
-        p50 = percentile(self.total_duration_ms, 50)
-        p95 = percentile(self.total_duration_ms, 95)
-        p99 = percentile(self.total_duration_ms, 99)
+    def record_cache(
+        self,
+        endpoint_key: str,
+        outcome: str,
+        duration_ms: float,
+        body_bytes: int,
+        has_validator: bool = False,
+    ) -> None:
+        if has_validator:
+            self.cache_validator_endpoints.add(endpoint_key)
+        self.cache_outcomes[(endpoint_key, outcome)] += 1
+        self.cache_body_bytes[(endpoint_key, outcome)] += body_bytes
+        self.cache_latency[(endpoint_key, outcome)].record(duration_ms)
+
+    def build_cache(self) -> Optional[dict[str, Any]]:
+        if not self.cache_outcomes:
+            return None
 
-        error_rate = (self.failed_requests / total * 100.0) if total else 0.0
+        def latency(histogram: LatencyHistogram) -> dict[str, Any]:
+            return {
+                "count": histogram.count,
+                "p50": round(histogram.percentile(50), 2),
+                "p95": round(histogram.percentile(95), 2),
+                "p99": round(histogram.percentile(99), 2),
+            }
 
-        status_breakdown = []
-        for status_code, count in self.status_counts.most_common():
-            pct = (count / total * 100.0) if total else 0.0
-            status_breakdown.append(
+        endpoints = []
+        totals: Counter = Counter()
+        for endpoint_key in sorted({key for key, _ in self.cache_outcomes}):
+            outcomes = {outcome: self.cache_outcomes.get((endpoint_key, outcome), 0) for outcome in CACHE_OUTCOMES}
+            totals.update(outcomes)
+            conditional = outcomes["revalidated"] + outcomes["changed"]
+            # resposta completa (200) = tudo que trouxe corpo: sem validador guardado, conteudo mudou ou cache-bust
+            full = LatencyHistogram()
+            full_bytes = 0
+            for outcome in ("cold", "changed", "busted", "noValidator"):
+                histogram = self.cache_latency.get((endpoint_key, outcome))
+                if histogram is not None:
+                    full.merge(histogram)
+                full_bytes += self.cache_body_bytes.get((endpoint_key, outcome), 0)
+            revalidated = self.cache_latency.get((endpoint_key, "revalidated")) or LatencyHistogram()
+            average_full_bytes = full_bytes / full.count if full.count else 0.0
+            endpoints.append(
                 {
-                    "statusCode": status_code,
-                    "count": count,
-                    "percentage": round(pct, 2),
+                    "endpoint": endpoint_key,
+                    "requests": sum(outcomes.values()),
+                    "outcomes": outcomes,
+                    "serverSentValidators": endpoint_key in self.cache_validator_endpoints,
+                    "conditionalRequests": conditional,
+                    # hit rate: 304 sobre os requests condicionais (If-None-Match/If-Modified-Since)
+                    "hitRatePercent": round(outcomes["revalidated"] / conditional * 100.0, 2) if conditional else None,
+                    "latencyMs": {
+                        outcome: latency(self.cache_latency[(endpoint_key, outcome)])
+                        for outcome in CACHE_OUTCOMES
+                        if (endpoint_key, outcome) in self.cache_latency
+                    },
+                    "fullResponseLatencyMs": latency(full),
+                    "p50SavingPercent": (
+                        round((1.0 - revalidated.percentile(50) / full.percentile(50)) * 100.0, 2)
+                        if revalidated.count and full.count and full.percentile(50) > 0
+                        else None
+                    ),
+                    "averageFullBodyBytes": int(average_full_bytes),
+                    "estimatedBytesSaved": int(outcomes["revalidated"] * average_full_bytes),
+                }
+            )
+
+        conditional = totals["revalidated"] + totals["changed"]
+        return {
+            "requests": sum(totals.values()),
+            "outcomes": dict(totals),
+            # sem ETag/Last-Modified nenhum request vira condicional: hit rate e economia nao dizem nada sobre o cache
+            "serverSentValidators": bool(self.cache_validator_endpoints),
+            "endpointsWithoutValidators": [
+                item["endpoint"] for item in endpoints if not item["serverSentValidators"]
+            ],
+            "conditionalRequests": conditional,
+            "hitRatePercent": round(totals["revalidated"] / conditional * 100.0, 2) if conditional else None,
+            "estimatedBytesSaved": sum(item["estimatedBytesSaved"] for item in endpoints),
+            "endpoints": endpoints,
+        }
+
+    def build_uploads(self, duration_seconds: float) -> Optional[dict[str, Any]]:
+        if not self.upload_bytes:
+            return None
+        duration = max(duration_seconds, 0.001)
+        endpoints = []
+        for endpoint_key, total_bytes in self.upload_bytes.most_common():
+            sizes = self.upload_sizes[endpoint_key]
+            send_ms = self.upload_send_ms[endpoint_key]
+            ttfb = self.upload_ttfb_ms[endpoint_key]
+            mbps = self.upload_mbps[endpoint_key]
+            endpoints.append(
+                {
+                    "endpoint": endpoint_key,
+                    "uploads": sizes.count,
+                    "megabytes": round(total_bytes / 1_000_000.0, 2),
+                    "aggregateMBps": round(total_bytes / 1_000_000.0 / duration, 3),
+                    "sizeBytes": {"p50": int(sizes.percentile(50)), "p95": int(sizes.percentile(95)), "max": int(sizes.max)},
+                    "sendMs": {"p50": round(send_ms.percentile(50), 2), "p95": round(send_ms.percentile(95), 2)},
+                    # MB/s por upload: a cauda ruim e o percentil baixo
+                    "perUploadMBps": {
+                        "p5": round(mbps.percentile(5), 3),
+                        "p50": round(mbps.percentile(50), 3),
+                        "p95": round(mbps.percentile(95), 3),
+                    },
+                    "ttfbAfterUploadMs": {
+                        "p50": round(ttfb.percentile(50), 2),
+                        "p95": round(ttfb.percentile(95), 2),
+                        "p99": round(ttfb.percentile(99), 2),
+                    },
+                }
+            )
+        return {
+            "megabytes": round(sum(self.upload_bytes.values()) / 1_000_000.0, 2),
+            "aggregateMBps": round(sum(self.upload_bytes.values()) / 1_000_000.0 / duration, 3),
+            "inFlightPeak": self.uploads_in_flight_peak,
+            "endpoints": endpoints,
+        }
+
+    def build_populations(self, populations: list[VuPopulation], duration_seconds: float) -> dict[str, Any]:
+        duration = max(duration_seconds, 0.001)
+
+        def stats(histogram: LatencyHistogram, errors: int) -> dict[str, Any]:
+            return {
+                "requests": histogram.count,
+                "rps": round(histogram.count / duration, 2),
+                "errorRatePercent": round(errors / histogram.count * 100.0, 2) if histogram.count else 0.0,
+                "p50LatencyMs": round(histogram.percentile(50), 2),
+                "p95LatencyMs": round(histogram.percentile(95), 2),
+                "p99LatencyMs": round(histogram.percentile(99), 2),
+            }
+
+        by_endpoint: dict[str, dict[str, dict[str, Any]]] = defaultdict(dict)
+        for (population, endpoint_key), histogram in self.population_endpoint_latency.items():
+            by_endpoint[endpoint_key][population] = stats(histogram, self.population_endpoint_errors.get((population, endpoint_key), 0))
+
+        items = []
+        for population in populations:
+            endpoints = sorted(
+                (
+                    {"endpoint": endpoint_key, **values[population.name]}
+                    for endpoint_key, values in by_endpoint.items()
+                    if population.name in values
+                ),
+                key=lambda item: item["p95LatencyMs"],
+                reverse=True,
+            )
+            items.append(
+                {
+                    **population.describe(),
+                    **stats(self.population_latency[population.name], self.population_errors.get(population.name, 0)),
+                    "topEndpointsByP95": endpoints[:POPULATION_REPORT_ENDPOINTS],
+                }
+            )
+
+        # endpoints chamados por mais de uma population: onde a contencao entre apps aparece lado a lado
+        shared = [
+            {"endpoint": endpoint_key, "populations": values}
+            for endpoint_key, values in sorted(by_endpoint.items())
+            if len(values) > 1
+        ]
+        return {"populations": items, "sharedEndpoints": shared}
+
+    def record_flow(self, flow_name: str, duration_ms: float, failed: bool) -> None:
+        self.flow_latency[flow_name].record(duration_ms)
+        if failed:
+            self.flow_failures[flow_name] += 1
+
+    def record(
+        self,
+        *,
+        endpoint_key: str,
+        status_code: Optional[int],
+        duration_ms: float,
+        timestamp_epoch: float,
+        error_type: Optional[str] = None,
+        error_message: Optional[str] = None,
+        failure_sample: Optional[FailureSample] = None,
+        vu_index: int = 0,
+        correlation_id: Optional[str] = None,
+    ) -> None:
+        if self.raw_log is not None:
+            self.raw_log.append(
+                endpoint_key=endpoint_key,
+                status_code=status_code,
+                duration_ms=duration_ms,
+                timestamp_epoch=timestamp_epoch,
+                vu_index=vu_index,
+                correlation_id=correlation_id,
+            )
+
+        if self.span_exporter is not None and correlation_id:
+            self.span_exporter.add(
+                name=endpoint_key,
+                correlation_id=correlation_id,
+                start_epoch=timestamp_epoch,
+                duration_ms=duration_ms,
+                status_code=status_code,
+                error_type=error_type,
+                vu_index=vu_index,
+            )
+
+        if correlation_id:
+            slowest = self.slowest_samples[endpoint_key]
+            if len(slowest) < EXEMPLARS_PER_ENDPOINT:
+                heapq.heappush(slowest, (duration_ms, timestamp_epoch, correlation_id))
+            elif duration_ms > slowest[0][0]:
+                heapq.heapreplace(slowest, (duration_ms, timestamp_epoch, correlation_id))
+
+        self.total_requests += 1
+        self.endpoint_hits[endpoint_key] += 1
+        latency_index = LatencyHistogram.index_for(duration_ms)
+        self.latency.add(latency_index, duration_ms)
+        self.endpoint_latency[endpoint_key].add(latency_index, duration_ms)
+
+        second_bucket = int(max(0, math.floor(timestamp_epoch - self.started_epoch)))
+        self.requests_per_second[second_bucket] += 1
+        self.second_latency[second_bucket].add(latency_index, duration_ms)
+        if self.endpoint_series_adaptive and second_bucket >= self.endpoint_series_seconds * ENDPOINT_SERIES_MAX_BUCKETS:
+            self._coarsen_endpoint_series(second_bucket)
+        self.endpoint_second_latency[endpoint_key][second_bucket - second_bucket % self.endpoint_series_seconds].add(
+            latency_index, duration_ms
+        )
+
+        if status_code is not None:
+            self.status_counts[status_code] += 1
+        self.endpoint_status_counts[(endpoint_key, str(status_code) if status_code is not None else (error_type or "error"))] += 1
+
+        is_failure = False
+        if status_code is not None and status_code >= 400:
+            is_failure = True
+        if error_type:
+            is_failure = True
+
+        if self.fairness is not None:
+            self.fairness.record(vu_index, latency_index, duration_ms, is_failure)
+
+        population = self.vu_populations.get(vu_index)
+        if population is not None:
+            self.population_latency[population].add(latency_index, duration_ms)
+            self.population_endpoint_latency[(population, endpoint_key)].add(latency_index, duration_ms)
+            if is_failure:
+                self.population_errors[population] += 1
+                self.population_endpoint_errors[(population, endpoint_key)] += 1
+
+        if is_failure:
+            self.failed_requests += 1
+            self.endpoint_errors[endpoint_key] += 1
+            self.errors_per_second[second_bucket] += 1
+            normalized = normalize_error_message(error_message or error_type or "request_failed")
+            self.error_catalog_counts[normalized] += 1
+            self.error_catalog_endpoints[normalized].add(endpoint_key)
+
+            if error_type:
+                self.exception_counts[error_type] += 1
+
+            if failure_sample and len(self.failure_samples) < self.max_failure_samples:
+                self.failure_samples.append(failure_sample)
+        else:
+            self.successful_requests += 1
+
+    def _coarsen_endpoint_series(self, second_bucket: int) -> None:
+        while second_bucket >= self.endpoint_series_seconds * ENDPOINT_SERIES_MAX_BUCKETS:
+            self.endpoint_series_seconds *= 2
+        for endpoint_key, series in self.endpoint_second_latency.items():
+            coarse: dict[int, LatencyHistogram] = defaultdict(LatencyHistogram)
+            for second, histogram in series.items():
+                coarse[second - second % self.endpoint_series_seconds].merge(histogram)
+            self.endpoint_second_latency[endpoint_key] = coarse
+
+    def build_charts(self, duration_seconds: float) -> dict[str, Any]:
+        last_second = max(self.requests_per_second.keys(), default=-1)
+        span = max(last_second + 1, int(math.ceil(duration_seconds)), 1)
+        bucket_seconds = max(1, math.ceil(span / CHART_MAX_TIME_BUCKETS))
+        # multiplo da resolucao da serie por endpoint, para cada bucket do grafico juntar blocos inteiros
+        bucket_seconds = math.ceil(bucket_seconds / self.endpoint_series_seconds) * self.endpoint_series_seconds
+        time_buckets = max(1, math.ceil(span / bucket_seconds))
+
+        def merge_by_bucket(series: dict[int, LatencyHistogram]) -> list[LatencyHistogram]:
+            buckets = [LatencyHistogram() for _ in range(time_buckets)]
+            for second, histogram in series.items():
+                buckets[min(second // bucket_seconds, time_buckets - 1)].merge(histogram)
+            return buckets
+
+        def sum_by_bucket(series: Counter) -> list[int]:
+            values = [0] * time_buckets
+            for second, count in series.items():
+                values[min(second // bucket_seconds, time_buckets - 1)] += count
+            return values
+
+        heatmap_counts = []
+        for histogram in merge_by_bucket(self.second_latency):
+            row = [0] * len(CHART_HEATMAP_EDGES_MS)
+            for index, count in histogram.counts.items():
+                row[bisect.bisect_right(CHART_HEATMAP_EDGES_MS, LatencyHistogram.bucket_mid_ms(index)) - 1] += count
+            heatmap_counts.append(row)
+
+        endpoint_series = []
+        for endpoint_key, _ in self.endpoint_hits.most_common(CHART_MAX_ENDPOINT_SERIES):
+            buckets = merge_by_bucket(self.endpoint_second_latency.get(endpoint_key, {}))
+            endpoint_series.append(
+                {
+                    "endpoint": endpoint_key,
+                    "rps": [round(bucket.count / bucket_seconds, 2) for bucket in buckets],
+                    "p95LatencyMs": [
+                        (round(bucket.percentile(95), 1) if bucket.count else None) for bucket in buckets
+                    ],
+                }
+            )
+
+        cdf_points = self.latency.cumulative_points()
+        if len(cdf_points) > CHART_MAX_CDF_POINTS:
+            step = len(cdf_points) / CHART_MAX_CDF_POINTS
+            sampled = [cdf_points[int(position * step)] for position in range(CHART_MAX_CDF_POINTS)]
+            sampled[-1] = cdf_points[-1]
+            cdf_points = sampled
+        total = max(self.latency.count, 1)
+
+        return {
+            "bucketSeconds": bucket_seconds,
+            "requests": sum_by_bucket(self.requests_per_second),
+            "errors": sum_by_bucket(self.errors_per_second),
+            "heatmap": {
+                "latencyEdgesMs": CHART_HEATMAP_EDGES_MS,
+                "counts": heatmap_counts,
+            },
+            "endpoints": endpoint_series,
+            "cdf": {
+                "latencyMs": [round(value, 2) for value, _ in cdf_points],
+                "fraction": [round(cumulative / total, 4) for _, cumulative in cdf_points],
+            },
+        }
+
+    def build_window(self, from_second: int, to_second: int) -> dict[str, Any]:
+        window_seconds = max(to_second - from_second, 1)
+        middle_second = from_second + window_seconds // 2
+        histogram = LatencyHistogram()
+        halves = (LatencyHistogram(), LatencyHistogram())
+        for second, bucket in self.second_latency.items():
+            if from_second <= second < to_second:
+                histogram.merge(bucket)
+                halves[0 if second < middle_second else 1].merge(bucket)
+        errors = sum(count for second, count in self.errors_per_second.items() if from_second <= second < to_second)
+
+        endpoints = []
+        for endpoint_key, series in self.endpoint_second_latency.items():
+            endpoint_histogram = LatencyHistogram()
+            for second, bucket in series.items():
+                if from_second <= second < to_second:
+                    endpoint_histogram.merge(bucket)
+            if endpoint_histogram.count:
+                endpoints.append(
+                    {
+                        "endpoint": endpoint_key,
+                        "hits": endpoint_histogram.count,
+                        "rps": round(endpoint_histogram.count / window_seconds, 2),
+                        "p95LatencyMs": round(endpoint_histogram.percentile(95), 2),
+                    }
+                )
+        endpoints.sort(key=lambda item: item["hits"], reverse=True)
+
+        first_p95 = halves[0].percentile(95)
+        second_p95 = halves[1].percentile(95)
+        return {
+            "fromSecond": from_second,
+            "toSecond": to_second,
+            "requests": histogram.count,
+            "rps": round(histogram.count / window_seconds, 2),
+            "errorRatePercent": round((errors / histogram.count * 100.0) if histogram.count else 0.0, 2),
+            "latencyMs": {
+                "p50": round(histogram.percentile(50), 2),
+                "p95": round(histogram.percentile(95), 2),
+                "p99": round(histogram.percentile(99), 2),
+            },
+            # variacao do p95 entre a primeira e a segunda metade da janela
+            "p95DriftPercent": round(((second_p95 - first_p95) / first_p95 * 100.0) if first_p95 else 0.0, 2),
+            "p95HalvesMs": [round(first_p95, 2), round(second_p95, 2)],
+            "endpoints": endpoints,
+        }
+
+    def build_report(
+        self,
+        *,
+        run_id: str,
+        scenario_name: str,
+        started_at_utc: str,
+        finished_at_utc: str,
+        duration_seconds: float,
+        base_url: str,
+        scenario_config: dict[str, Any],
+        resolved_endpoints: list[dict[str, Any]],
+    ) -> dict[str, Any]:
+        total = self.total_requests
+
+        status_breakdown = []
+        for status_code, count in self.status_counts.most_common():
+            pct = (count / total * 100.0) if total else 0.0
+            status_breakdown.append(
+                {
+                    "statusCode": status_code,
+                    "count": count,
+                    "percentage": round(pct, 2),
                 }
             )
 
         endpoint_stats = []
         for endpoint_key, hits in self.endpoint_hits.items():
-            durations = self.endpoint_durations.get(endpoint_key, [])
+            histogram = self.endpoint_latency.get(endpoint_key) or LatencyHistogram()
             errors = self.endpoint_errors.get(endpoint_key, 0)
             endpoint_stats.append(
                 {
@@ -242,8 +2044,8 @@ class MetricsCollector:
                     "hits": hits,
                     "errors": errors,
                     "errorRatePercent": round((errors / hits * 100.0) if hits else 0.0, 2),
-                    "avgLatencyMs": round(sum(durations) / len(durations), 2) if durations else 0.0,
-                    "p95LatencyMs": round(percentile(durations, 95), 2) if durations else 0.0,
+                    "avgLatencyMs": round(histogram.mean(), 2),
+                    "p95LatencyMs": round(histogram.percentile(95), 2),
                 }
             )
 
@@ -260,6 +2062,23 @@ class MetricsCollector:
                 }
             )
 
+        journeys = []
+        for flow_name, histogram in sorted(self.flow_latency.items()):
+            flow_failures = self.flow_failures.get(flow_name, 0)
+            journeys.append(
+                {
+                    "flow": flow_name,
+                    "runs": histogram.count,
+                    "failures": flow_failures,
+                    "failureRatePercent": round((flow_failures / histogram.count * 100.0) if histogram.count else 0.0, 2),
+                    "avgMs": round(histogram.mean(), 2),
+                    "p50Ms": round(histogram.percentile(50), 2),
+                    "p95Ms": round(histogram.percentile(95), 2),
+                    "p99Ms": round(histogram.percentile(99), 2),
+                    "maxMs": round(histogram.max, 2),
+                }
+            )
+
         failures = [
             {
                 "timestampUtc": sample.timestamp_utc,
@@ -285,33 +2104,498 @@ class MetricsCollector:
             "startedAtUtc": started_at_utc,
             "finishedAtUtc": finished_at_utc,
             "durationSeconds": round(duration_seconds, 2),
-            "summary": {
-                "totalRequests": total,
-                "successfulRequests": self.successful_requests,
-                "failedRequests": self.failed_requests,
-                "errorRatePercent": round(error_rate, 2),
-                "rpsAvg": round(avg_rps, 2),
-                "rpsPeak": peak_rps,
-            },
-            "latencyMs": {
-                "min": round(min_latency, 2),
-                "avg": round(avg_latency, 2),
-                "max": round(max_latency, 2),
-                "p50": round(p50, 2),
-                "p95": round(p95, 2),
-                "p99": round(p99, 2),
-            },
+            "summary": self.build_summary(duration_seconds),
+            "latencyMs": self.build_latency_summary(),
             "statusCodes": status_breakdown,
             "exceptions": [{"type": key, "count": value} for key, value in self.exception_counts.most_common()],
             "topEndpointsByHits": top_by_hits,
             "topEndpointsByP95": top_by_p95,
             "topErrors": top_errors,
+            "journeys": journeys,
             "failureSamples": failures,
+            "slowestRequests": self.build_slowest_requests(),
+            "charts": self.build_charts(duration_seconds),
             "scenarioConfig": scenario_config,
             "resolvedEndpoints": resolved_endpoints,
+            "rawLog": (
+                {
+                    "path": str(self.raw_log.path),
+                    "records": self.raw_log.records_written - self.raw_log.records_dropped,
+                    "droppedRecords": self.raw_log.records_dropped,
+                }
+                if self.raw_log is not None
+                else None
+            ),
+            "tracing": self.span_exporter.describe() if self.span_exporter is not None else None,
+            "fairness": self.fairness.build(duration_seconds) if self.fairness is not None else None,
+            "uploads": self.build_uploads(duration_seconds),
+            "retries": self.build_retries(duration_seconds),
+            "cache": self.build_cache(),
+            "transfer": self.build_transfer(duration_seconds),
+        }
+
+    def build_summary(self, duration_seconds: float) -> dict[str, Any]:
+        total = self.total_requests
+        return {
+            "totalRequests": total,
+            "successfulRequests": self.successful_requests,
+            "failedRequests": self.failed_requests,
+            "errorRatePercent": round((self.failed_requests / total * 100.0) if total else 0.0, 2),
+            "rpsAvg": round(total / max(duration_seconds, 0.001), 2),
+            "rpsPeak": max(self.requests_per_second.values(), default=0),
+        }
+
+    def build_latency_summary(self) -> dict[str, Any]:
+        return {
+            "min": round(self.latency.min if self.latency.count else 0.0, 2),
+            "avg": round(self.latency.mean(), 2),
+            "max": round(self.latency.max, 2),
+            "p50": round(self.latency.percentile(50), 2),
+            "p95": round(self.latency.percentile(95), 2),
+            "p99": round(self.latency.percentile(99), 2),
+        }
+
+    def build_progress(
+        self,
+        *,
+        run_id: str,
+        scenario_name: str,
+        started_at_utc: str,
+        duration_seconds: float,
+        base_url: str,
+    ) -> dict[str, Any]:
+        # parcial ao vivo roda no event loop junto dos VUs: so contadores e o histograma global, nada por endpoint/segundo
+        elapsed_second = int(duration_seconds)
+        recent_from = max(elapsed_second - PROGRESS_RECENT_SECONDS, 0)
+        recent_seconds = max(elapsed_second - recent_from, 1)
+        recent_requests = sum(self.requests_per_second.get(second, 0) for second in range(recent_from, elapsed_second))
+        recent_errors = sum(self.errors_per_second.get(second, 0) for second in range(recent_from, elapsed_second))
+        return {
+            "runId": run_id,
+            "scenario": scenario_name,
+            "baseUrl": base_url,
+            "startedAtUtc": started_at_utc,
+            "finishedAtUtc": utc_now_iso(),
+            "durationSeconds": round(duration_seconds, 2),
+            "summary": self.build_summary(duration_seconds),
+            "latencyMs": self.build_latency_summary(),
+            "recent": {
+                "seconds": recent_seconds,
+                "rps": round(recent_requests / recent_seconds, 2),
+                "errorRatePercent": round((recent_errors / recent_requests * 100.0) if recent_requests else 0.0, 2),
+            },
+            "activeVus": self.active_vus,
+            "inFlight": self.in_flight,
+        }
+
+    def build_slowest_requests(self, limit: int = 10) -> list[dict[str, Any]]:
+        samples = [
+            (duration_ms, timestamp_epoch, correlation_id, endpoint_key)
+            for endpoint_key, slowest in self.slowest_samples.items()
+            for duration_ms, timestamp_epoch, correlation_id in slowest
+        ]
+        samples.sort(reverse=True)
+        return [
+            {
+                "endpoint": endpoint_key,
+                "durationMs": round(duration_ms, 2),
+                "timestampUtc": datetime.fromtimestamp(timestamp_epoch, tz=timezone.utc).isoformat(),
+                "correlationId": correlation_id,
+                "traceId": trace_id_for(correlation_id) if self.tracing_enabled else None,
+            }
+            for duration_ms, timestamp_epoch, correlation_id, endpoint_key in samples[:limit]
+        ]
+
+
+FLOW_TEMPLATE_PATTERN = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+FLOW_EXTRACT_TOKEN_PATTERN = re.compile(r"\[(\*|-?\d+)\]")
+FLOW_CONDITION_PATTERN = re.compile(r"^\s*(!?)\s*([A-Za-z_][A-Za-z0-9_]*)\s*(?:(==|!=|<=|>=|<|>)\s*(.+?))?\s*$")
+FLOW_CONDITION_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+FLOW_MAX_STEPS_PER_RUN = 100
+
+
+class CompiledTemplate:
+    __slots__ = ("parts", "names", "literal")
+
+    def __init__(self, text: str) -> None:
+        parts: list[tuple[bool, str]] = []
+        position = 0
+        for match in FLOW_TEMPLATE_PATTERN.finditer(text):
+            if match.start() > position:
+                parts.append((False, text[position : match.start()]))
+            parts.append((True, match.group(1)))
+            position = match.end()
+        if position < len(text):
+            parts.append((False, text[position:]))
+
+        self.parts = tuple(parts)
+        self.names = frozenset(value for is_variable, value in parts if is_variable)
+        self.literal = text if not self.names else None
+
+    def render(self, variables: dict[str, Any]) -> Optional[str]:
+        if self.literal is not None:
+            return self.literal
+
+        rendered = []
+        for is_variable, value in self.parts:
+            if not is_variable:
+                rendered.append(value)
+                continue
+            resolved = variables.get(value)
+            if resolved is None:
+                return None
+            rendered.append(str(resolved))
+        return "".join(rendered)
+
+
+def compile_body_template(template: Any) -> Callable[[dict[str, Any]], Any]:
+    if isinstance(template, dict):
+        compiled_items = [(key, compile_body_template(value)) for key, value in template.items()]
+        return lambda variables: {key: render(variables) for key, render in compiled_items}
+    if isinstance(template, list):
+        compiled_values = [compile_body_template(value) for value in template]
+        return lambda variables: [render(variables) for render in compiled_values]
+    if isinstance(template, str):
+        whole = FLOW_TEMPLATE_PATTERN.fullmatch(template)
+        if whole:
+            name = whole.group(1)
+            return lambda variables: variables.get(name)
+        compiled = CompiledTemplate(template)
+        return lambda variables: compiled.render(variables)
+    return lambda variables: template
+
+
+def compile_extractor(expression: str) -> Callable[[Any], list[Any]]:
+    tokens: list[tuple[str, Any]] = []
+    for part in expression.strip().split("."):
+        name, _, indexes = part.partition("[")
+        if name:
+            tokens.append(("key", name))
+        for index in FLOW_EXTRACT_TOKEN_PATTERN.findall("[" + indexes if indexes else ""):
+            tokens.append(("all", None) if index == "*" else ("index", int(index)))
+
+    def extract(data: Any) -> list[Any]:
+        current = [data]
+        for kind, argument in tokens:
+            matches = []
+            for item in current:
+                if kind == "key" and isinstance(item, dict) and argument in item:
+                    matches.append(item[argument])
+                elif kind == "index" and isinstance(item, list) and -len(item) <= argument < len(item):
+                    matches.append(item[argument])
+                elif kind == "all" and isinstance(item, list):
+                    matches.extend(item)
+            current = matches
+        return [value for value in current if value is not None]
+
+    return extract
+
+
+def compile_status_expectation(value: Any, where: str) -> Callable[[int], bool]:
+    items = value if isinstance(value, list) else [value]
+    if not items:
+        raise ValueError(f"{where}: expectStatus vazio.")
+    classes: set[int] = set()
+    codes: set[int] = set()
+    for item in items:
+        text = str(item).strip().lower()
+        if len(text) == 3 and text.endswith("xx") and text[0] in "12345":
+            classes.add(int(text[0]))
+        elif text.isdigit() and 100 <= int(text) <= 599:
+            codes.add(int(text))
+        else:
+            raise ValueError(f"{where}: expectStatus invalido '{item}'. Use uma classe (ex.: 2xx) ou um status HTTP (ex.: 201).")
+    return lambda status_code: status_code in codes or status_code // 100 in classes
+
+
+def compile_condition(expression: str) -> Callable[[dict[str, Any]], bool]:
+    match = FLOW_CONDITION_PATTERN.match(expression or "")
+    if not match:
+        raise ValueError(f"Condicao invalida no flow: '{expression}'")
+
+    negate, name, operator_text, literal = match.groups()
+    if operator_text is None:
+        if negate:
+            return lambda variables: not variables.get(name)
+        return lambda variables: bool(variables.get(name))
+
+    expected = parse_scalar(literal.strip().strip("'\""))
+    compare = FLOW_CONDITION_OPERATORS[operator_text]
+
+    def check(variables: dict[str, Any]) -> bool:
+        actual = variables.get(name)
+        if actual is None:
+            return False
+        try:
+            result = bool(compare(actual, expected))
+        except TypeError:
+            result = bool(compare(str(actual), str(expected)))
+        return not result if negate else result
+
+    return check
+
+
+def fallback_paths(endpoint: dict[str, Any]) -> list[str]:
+    value = endpoint.get("fallbackPath")
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value if item]
+    return [str(value)] if value else []
+
+
+@dataclass
+class CompiledFlowStep:
+    name: str
+    action: str
+    endpoint: dict[str, Any]
+    endpoint_key: str
+    method: str
+    path: Optional[CompiledTemplate]
+    fallback_paths: tuple[CompiledTemplate, ...]
+    body: Optional[Callable[[dict[str, Any]], Any]]
+    headers: tuple[tuple[str, CompiledTemplate], ...]
+    extractors: tuple[tuple[str, Callable[[Any], list[Any]], str], ...]
+    condition: Optional[Callable[[dict[str, Any]], bool]]
+    goto: Optional[int]
+    think_seconds: float
+    abort_on_failure: bool
+    feeder: Optional[str] = None
+    expect_status: Optional[Callable[[int], bool]] = None
+
+
+@dataclass
+class CompiledFlow:
+    name: str
+    weight: float
+    variables: dict[str, Any]
+    steps: list[CompiledFlowStep]
+
+
+def compile_flow(flow_cfg: dict[str, Any], endpoints_by_name: dict[str, dict[str, Any]]) -> CompiledFlow:
+    flow_name = str(flow_cfg.get("name") or "").strip()
+    if not flow_name:
+        raise ValueError("Configuracao invalida: todo flow precisa de 'name'.")
+
+    steps_cfg = flow_cfg.get("steps")
+    if not isinstance(steps_cfg, list) or not steps_cfg:
+        raise ValueError(f"Flow '{flow_name}' precisa de uma lista 'steps' nao vazia.")
+
+    step_names = {}
+    for index, step_cfg in enumerate(steps_cfg):
+        step_names[str(step_cfg.get("name") or step_cfg.get("endpoint") or f"step{index + 1}")] = index
+
+    steps = []
+    for index, step_cfg in enumerate(steps_cfg):
+        step_name = str(step_cfg.get("name") or step_cfg.get("endpoint") or f"step{index + 1}")
+        action = str(step_cfg.get("action") or "request").lower()
+
+        endpoint: dict[str, Any] = {}
+        if step_cfg.get("endpoint"):
+            endpoint_name = str(step_cfg.get("endpoint"))
+            if endpoint_name not in endpoints_by_name:
+                raise ValueError(f"Flow '{flow_name}': endpoint '{endpoint_name}' nao existe em 'endpoints'.")
+            endpoint = dict(endpoints_by_name[endpoint_name])
+        for key in ("method", "path", "fallbackPath", "auth", "headers", "bodyTemplate", "capture"):
+            if key in step_cfg:
+                endpoint[key] = step_cfg[key]
+
+        method = str(endpoint.get("method") or "GET").upper()
+        path_text = endpoint.get("path") if action == "request" else None
+        fallback_texts = fallback_paths(endpoint)
+
+        extractors = []
+        for variable, spec in (step_cfg.get("extract") or {}).items():
+            if isinstance(spec, str):
+                spec = {"from": spec}
+            sources = spec.get("from")
+            sources = [sources] if isinstance(sources, str) else list(sources or [])
+            compiled_sources = [compile_extractor(source) for source in sources]
+            pick = str(spec.get("pick") or ("random" if any("[*]" in source for source in sources) else "first"))
+
+            def extract_all(data: Any, compiled_sources: list[Callable[[Any], list[Any]]] = compiled_sources) -> list[Any]:
+                values: list[Any] = []
+                for compiled_source in compiled_sources:
+                    values.extend(compiled_source(data))
+                return values
+
+            extractors.append((str(variable), extract_all, pick.lower()))
+
+        goto = None
+        if step_cfg.get("goto") is not None:
+            target = str(step_cfg.get("goto"))
+            if target not in step_names:
+                raise ValueError(f"Flow '{flow_name}': goto '{target}' nao corresponde a nenhum step.")
+            goto = step_names[target]
+
+        body_template = endpoint.get("bodyTemplate")
+        steps.append(
+            CompiledFlowStep(
+                name=step_name,
+                action=action,
+                endpoint=endpoint,
+                endpoint_key=f"{method} {path_text}" if path_text else "auth.login",
+                method=method,
+                path=CompiledTemplate(str(path_text)) if path_text else None,
+                fallback_paths=tuple(CompiledTemplate(text) for text in fallback_texts),
+                body=compile_body_template(body_template) if body_template is not None else None,
+                headers=tuple(
+                    (str(key), CompiledTemplate(str(value))) for key, value in (step_cfg.get("headers") or {}).items()
+                ),
+                extractors=tuple(extractors),
+                condition=compile_condition(str(step_cfg["when"])) if step_cfg.get("when") else None,
+                goto=goto,
+                think_seconds=max(to_float(step_cfg.get("thinkTimeMs"), 0.0), 0.0) / 1000.0,
+                abort_on_failure=bool(step_cfg.get("abortOnFailure", False)),
+                feeder=(str(step_cfg["feed"]) if step_cfg.get("feed") else None),
+                expect_status=(
+                    compile_status_expectation(step_cfg["expectStatus"], f"Flow '{flow_name}', step '{step_name}'")
+                    if step_cfg.get("expectStatus") is not None
+                    else None
+                ),
+            )
+        )
+
+    return CompiledFlow(
+        name=flow_name,
+        weight=max(to_float(flow_cfg.get("weight"), 1.0), 0.0),
+        variables=dict(flow_cfg.get("variables") or {}),
+        steps=steps,
+    )
+
+
+def compile_flows(
+    global_cfg: dict[str, Any],
+    endpoints: list[dict[str, Any]],
+    scenario_cfg: dict[str, Any],
+) -> list[CompiledFlow]:
+    selection = scenario_cfg.get("flows")
+    if not selection:
+        return []
+
+    flows_cfg = global_cfg.get("flows") or []
+    if isinstance(selection, list):
+        wanted = {str(name) for name in selection}
+        flows_cfg = [flow for flow in flows_cfg if str(flow.get("name")) in wanted]
+    if not flows_cfg:
+        raise ValueError("Cenario habilita 'flows', mas nenhum flow correspondente foi encontrado no config.")
+
+    endpoints_by_name = {str(endpoint.get("name")): endpoint for endpoint in endpoints if endpoint.get("name")}
+    return [compile_flow(flow_cfg, endpoints_by_name) for flow_cfg in flows_cfg]
+
+
+def pick_flow(flows: list[CompiledFlow], cumulative_weights: list[float], rng: random.Random) -> CompiledFlow:
+    total = cumulative_weights[-1]
+    if total <= 0:
+        return rng.choice(flows)
+    return flows[min(bisect.bisect_left(cumulative_weights, rng.uniform(0, total)), len(flows) - 1)]
+
+
+@dataclass
+class VuPopulation:
+    name: str
+    share_percent: float
+    first_vu: int
+    vus: int
+    endpoints: list[dict[str, Any]]
+    flows: list[CompiledFlow]
+    flow_weights: list[float]
+    auth_cfg: dict[str, Any]
+
+    def describe(self) -> dict[str, Any]:
+        accounts = self.auth_cfg.get("accounts") or []
+        return {
+            "name": self.name,
+            "vus": self.vus,
+            "sharePercent": round(self.share_percent, 2),
+            "accounts": (f"feeder:{self.auth_cfg.get('accountsFeeder')}" if self.auth_cfg.get("accountsFeeder") else len(accounts)),
+            "flows": [flow.name for flow in self.flows],
+            "endpoints": [
+                str(endpoint.get("name") or endpoint.get("path"))
+                for endpoint in self.endpoints
+                if to_float(endpoint.get("weight"), 0.0) > 0
+            ],
         }
 
 
+def select_endpoints(endpoints: list[dict[str, Any]], selection: Any, owner: str) -> list[dict[str, Any]]:
+    if selection is None:
+        return list(endpoints)
+    endpoints_by_name = {str(endpoint.get("name")): endpoint for endpoint in endpoints if endpoint.get("name")}
+    weights = selection if isinstance(selection, dict) else {str(endpoint_name): None for endpoint_name in selection}
+    selected = []
+    for endpoint_name, weight in weights.items():
+        if endpoint_name not in endpoints_by_name:
+            raise ValueError(f"{owner}: endpoint '{endpoint_name}' nao existe em 'endpoints'.")
+        endpoint = endpoints_by_name[endpoint_name]
+        selected.append(endpoint if weight is None else {**endpoint, "weight": weight})
+    return selected
+
+
+def resolve_populations(
+    global_cfg: dict[str, Any],
+    endpoints: list[dict[str, Any]],
+    scenario_cfg: dict[str, Any],
+    vus: int,
+) -> list[VuPopulation]:
+    raw = scenario_cfg.get("populations")
+    if not raw:
+        return []
+    if not isinstance(raw, list):
+        raise ValueError("Configuracao invalida: 'populations' precisa ser uma lista.")
+
+    shares = [max(to_float(item.get("share"), 1.0), 0.0) for item in raw]
+    total_share = sum(shares)
+    if total_share <= 0:
+        raise ValueError("Configuracao invalida: a soma de 'share' das populations precisa ser maior que zero.")
+
+    # maior resto: a soma dos VUs por population bate com 'vus' (e com --vus/matrix/autotune)
+    exact = [vus * share / total_share for share in shares]
+    counts = [int(value) for value in exact]
+    by_remainder = sorted(range(len(raw)), key=lambda position: exact[position] - counts[position], reverse=True)
+    for position in by_remainder[: vus - sum(counts)]:
+        counts[position] += 1
+
+    global_auth = global_cfg.get("auth") or {}
+    populations = []
+    first_vu = 1
+    for item, share, count in zip(raw, shares, counts):
+        name = str(item.get("name") or "").strip()
+        if not name:
+            raise ValueError("Configuracao invalida: toda population precisa de 'name'.")
+
+        population_endpoints = select_endpoints(endpoints, item.get("endpoints"), f"Population '{name}'")
+        flows = compile_flows(global_cfg, endpoints, {"flows": item.get("flows")})
+        if not flows and not any(to_float(endpoint.get("weight"), 0.0) > 0 for endpoint in population_endpoints):
+            raise ValueError(f"Population '{name}' nao tem flows nem endpoints com weight > 0.")
+
+        auth_cfg = {**global_auth, **(item.get("auth") or {})}
+        if (item.get("auth") or {}).get("accounts") and global_auth.get("passwordOverride"):
+            auth_cfg["accounts"] = [
+                {**account, "password": global_auth.get("passwordOverride")} for account in auth_cfg["accounts"]
+            ]
+
+        populations.append(
+            VuPopulation(
+                name=name,
+                share_percent=share / total_share * 100.0,
+                first_vu=first_vu,
+                vus=count,
+                endpoints=population_endpoints,
+                flows=flows,
+                flow_weights=list(itertools.accumulate(flow.weight for flow in flows)),
+                auth_cfg=auth_cfg,
+            )
+        )
+        first_vu += count
+    return populations
+
+
 class VuSession:
     def __init__(
         self,
@@ -326,49 +2610,118 @@ class VuSession:
         timeout_seconds: float,
         insecure_tls: bool,
         random_seed: int,
+        vu_count: int = 1,
+        feeders: Optional[dict[str, FeederSource]] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        population: Optional[VuPopulation] = None,
+        stop_event: Optional[asyncio.Event] = None,
+        stop_at: Optional[float] = None,
+        retry_enabled: bool = True,
+        login_metrics: Optional[MetricsCollector] = None,
     ) -> None:
         self.vu_index = vu_index
+        self.vu_count = vu_count
         self.scenario_name = scenario_name
         self.base_url = base_url.rstrip("/")
         self.scenario_cfg = scenario_cfg
         self.global_cfg = global_cfg
         self.endpoints = endpoints
         self.metrics = metrics
+        self.feeders = feeders or {}
         self.rng = random.Random((random_seed * 10000) + vu_index)
 
-        self.client_id = f"LT-{scenario_name.upper()}-{vu_index:04d}"
+        self.population = population
+        # indice dentro da population: cada app percorre o proprio pool de contas desde a primeira
+        self.population_index = vu_index - population.first_vu + 1 if population is not None else vu_index
+        if population is not None:
+            self.endpoints = population.endpoints
+            self.client_id = f"LT-{scenario_name.upper()}-{population.name.upper()}-{self.population_index:04d}"
+        else:
+            self.client_id = f"LT-{scenario_name.upper()}-{vu_index:04d}"
         self.tenant_id = self._pick_tenant_id()
 
-        self.auth_cfg = global_cfg.get("auth", {}) or {}
+        # traceparent e opt-in: muda o perfil de carga e o custo de tracing do backend
+        tracing_cfg = global_cfg.get("tracing") or {}
+        self.tracing_enabled = bool(tracing_cfg.get("enabled", False))
+        self.trace_flags = "01" if tracing_cfg.get("sampled", True) else "00"
+
+        # perfil de Accept-Encoding do app (sorteado por VU); sem perfil vale o header padrao do httpx
+        self.accept_encoding = pick_compression_profile(compression_profiles(global_cfg, scenario_cfg), self.rng)
+        # endpoints com bloco "compression" proprio sorteiam o perfil uma vez por VU (false volta ao padrao do httpx)
+        self.endpoint_accept_encodings: dict[int, Optional[str]] = {}
+        self.compression_profile = self.accept_encoding or COMPRESSION_DEFAULT_PROFILE
+        metrics.compression_vus[self.compression_profile] += 1
+
+        self.auth_cfg = (population.auth_cfg if population is not None else global_cfg.get("auth", {})) or {}
         self.auth_enabled = bool(self.auth_cfg.get("enabled"))
         self.account = self._pick_account()
         self.access_token: Optional[str] = None
+        self.login_lock = asyncio.Lock()
+        self.logins_completed = 0
+        # replay conta os logins gerados pelo runner fora do trafego reproduzido
+        self.login_metrics = login_metrics or metrics
+        if metrics.fairness is not None:
+            metrics.fairness.register(vu_index, self.client_id, self.tenant_id, self.account)
+        if population is not None:
+            metrics.vu_populations[vu_index] = population.name
 
         self.state: dict[str, Any] = {
             "orderIds": [],
         }
-
-        self.http_client = httpx.AsyncClient(
+        self.uploads_sent = 0
+        self.upload_size_models: dict[int, UploadSizeModel] = {}
+        self.capture_extractors: dict[int, list[tuple[str, list[Callable[[Any], list[Any]]]]]] = {}
+        self.retry_enabled = retry_enabled
+        self.stop_event = stop_event or asyncio.Event()
+        self.stop_at = stop_at
+        self.retry_policies: dict[tuple[int, str], Optional[RetryPolicy]] = {}
+        self.retry_budgets: dict[int, RetryBudget] = {}
+        self.cache_policies: dict[tuple[int, str], Optional[CachePolicy]] = {}
+        # cache HTTP do app: path -> (ETag, Last-Modified, corpo), LRU
+        self.cache_entries: OrderedDict[str, tuple[Optional[str], Optional[str], Optional[bytes]]] = OrderedDict()
+
+        self.owns_http_client = http_client is None
+        self.http_client = http_client or httpx.AsyncClient(
             timeout=httpx.Timeout(timeout_seconds),
             verify=not insecure_tls,
             limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
         )
 
+    def next_feeder_record(self, feeder_name: str) -> Optional[dict[str, Any]]:
+        feeder = self.feeders.get(feeder_name)
+        if feeder is None:
+            raise ValueError(f"Feeder '{feeder_name}' nao configurado em 'feeders'.")
+        return feeder.next_record(vu_index=self.vu_index, vu_count=self.vu_count, rng=self.rng)
+
     def _pick_account(self) -> Optional[dict[str, Any]]:
+        accounts_feeder = self.auth_cfg.get("accountsFeeder")
+        if accounts_feeder:
+            record = self.next_feeder_record(str(accounts_feeder))
+            if record and self.auth_cfg.get("passwordOverride"):
+                record["password"] = self.auth_cfg.get("passwordOverride")
+            return record
+
         accounts = self.auth_cfg.get("accounts") or []
         if not accounts:
             return None
-        index = (self.vu_index - 1) % len(accounts)
+        index = (self.population_index - 1) % len(accounts)
         return accounts[index]
 
     def _pick_tenant_id(self) -> Optional[str]:
+        tenant_feeder = self.global_cfg.get("tenantFeeder")
+        if tenant_feeder:
+            record = self.next_feeder_record(str(tenant_feeder)) or {}
+            tenant_id = record.get("tenantId") or record.get("id")
+            return str(tenant_id) if tenant_id else None
+
         tenant_ids = self.global_cfg.get("tenantIds") or []
         if not tenant_ids:
             return None
         return tenant_ids[(self.vu_index - 1) % len(tenant_ids)]
 
     async def close(self) -> None:
-        await self.http_client.aclose()
+        if self.owns_http_client:
+            await self.http_client.aclose()
 
     async def ensure_login(self, force: bool = False) -> bool:
         if not self.auth_enabled:
@@ -378,6 +2731,17 @@ class VuSession:
         if not self.account:
             return False
 
+        # single-flight: requests concorrentes do mesmo VU (replay) esperam o login em andamento em vez de logar de novo
+        logins_seen = self.logins_completed
+        async with self.login_lock:
+            if self.logins_completed != logins_seen:
+                return self.access_token is not None
+            try:
+                return await self._login()
+            finally:
+                self.logins_completed += 1
+
+    async def _login(self) -> bool:
         login_path = self.auth_cfg.get("loginPath") or "/api/auth/login"
         login_url = self.base_url + login_path
         payload = {
@@ -391,6 +2755,9 @@ class VuSession:
             "X-Client-Id": self.client_id,
             "X-Correlation-Id": correlation_id,
         }
+        if self.tracing_enabled:
+            trace_id, span_id = traceparent_ids(correlation_id)
+            headers["traceparent"] = f"00-{trace_id}-{span_id}-{self.trace_flags}"
         if self.tenant_id:
             headers["X-Tenant-Id"] = self.tenant_id
 
@@ -428,7 +2795,7 @@ class VuSession:
                     request_body=json.dumps(payload, ensure_ascii=False),
                     response_snippet=truncate_text(response.text or "", 260),
                 )
-                self.metrics.record(
+                self.login_metrics.record(
                     endpoint_key="auth.login",
                     status_code=response.status_code,
                     duration_ms=duration_ms,
@@ -436,15 +2803,19 @@ class VuSession:
                     error_type="login_error",
                     error_message=error_message,
                     failure_sample=sample,
+                    vu_index=self.vu_index,
+                    correlation_id=correlation_id,
                 )
                 return False
 
             self.access_token = str(token_value)
-            self.metrics.record(
+            self.login_metrics.record(
                 endpoint_key="auth.login",
                 status_code=response.status_code,
                 duration_ms=duration_ms,
                 timestamp_epoch=timestamp,
+                vu_index=self.vu_index,
+                correlation_id=correlation_id,
             )
             return True
         except httpx.TimeoutException as exc:
@@ -464,7 +2835,7 @@ class VuSession:
                 request_body=json.dumps(payload, ensure_ascii=False),
                 response_snippet="",
             )
-            self.metrics.record(
+            self.login_metrics.record(
                 endpoint_key="auth.login",
                 status_code=None,
                 duration_ms=duration_ms,
@@ -472,6 +2843,8 @@ class VuSession:
                 error_type="timeout",
                 error_message=message,
                 failure_sample=sample,
+                vu_index=self.vu_index,
+                correlation_id=correlation_id,
             )
             return False
         except Exception as exc:
@@ -491,7 +2864,7 @@ class VuSession:
                 request_body=json.dumps(payload, ensure_ascii=False),
                 response_snippet="",
             )
-            self.metrics.record(
+            self.login_metrics.record(
                 endpoint_key="auth.login",
                 status_code=None,
                 duration_ms=duration_ms,
@@ -499,6 +2872,8 @@ class VuSession:
                 error_type=type(exc).__name__,
                 error_message=message,
                 failure_sample=sample,
+                vu_index=self.vu_index,
+                correlation_id=correlation_id,
             )
             return False
 
@@ -508,6 +2883,9 @@ class VuSession:
             "X-Client-Id": self.client_id,
             "X-Correlation-Id": correlation_id,
         }
+        if self.tracing_enabled:
+            trace_id, span_id = traceparent_ids(correlation_id)
+            headers["traceparent"] = f"00-{trace_id}-{span_id}-{self.trace_flags}"
         if has_body:
             headers["Content-Type"] = "application/json"
 
@@ -515,6 +2893,10 @@ class VuSession:
         for key, value in default_headers.items():
             headers[str(key)] = str(value)
 
+        accept_encoding = self._accept_encoding(endpoint)
+        if accept_encoding:
+            headers["Accept-Encoding"] = accept_encoding
+
         if self.tenant_id:
             headers["X-Tenant-Id"] = self.tenant_id
 
@@ -528,6 +2910,11 @@ class VuSession:
 
         return headers
 
+    def _pick_fallback_path(self, endpoint: dict[str, Any]) -> Optional[str]:
+        # varios paths reais da captura: sem valor capturado o trafego se espalha em vez de bater sempre no mesmo id
+        paths = fallback_paths(endpoint)
+        return paths[self.rng.randrange(0, len(paths))] if paths else None
+
     def _resolve_path(self, endpoint: dict[str, Any], inject_invalid: bool) -> tuple[str, str]:
         template_path = str(endpoint.get("path") or "/")
         path_to_use = template_path
@@ -535,24 +2922,63 @@ class VuSession:
         if inject_invalid and endpoint.get("invalidPath"):
             path_to_use = str(endpoint.get("invalidPath"))
 
+        if endpoint.get("feeder") and "{" in path_to_use:
+            record = self.next_feeder_record(str(endpoint.get("feeder"))) or {}
+            for key, value in record.items():
+                path_to_use = path_to_use.replace("{" + str(key) + "}", str(value))
+
         if "{orderId}" in path_to_use:
             order_ids = self.state.get("orderIds") or []
             if order_ids:
                 selected_order_id = order_ids[self.rng.randrange(0, len(order_ids))]
                 path_to_use = path_to_use.replace("{orderId}", str(selected_order_id))
             else:
-                fallback_path = endpoint.get("fallbackPath")
+                fallback_path = self._pick_fallback_path(endpoint)
                 if fallback_path:
-                    path_to_use = str(fallback_path)
+                    path_to_use = fallback_path
                 else:
                     path_to_use = path_to_use.replace("{orderId}", "00000000-0000-0000-0000-000000000000")
 
+        for variable in FLOW_TEMPLATE_PATTERN.findall(path_to_use):
+            captured = self.state.get(variable)
+            if captured:
+                path_to_use = path_to_use.replace("{" + variable + "}", str(captured[self.rng.randrange(0, len(captured))]))
+
+        if "{" in path_to_use:
+            path_to_use = self._pick_fallback_path(endpoint) or path_to_use
+
         if not path_to_use.startswith("/"):
             path_to_use = "/" + path_to_use
 
         return template_path, path_to_use
 
-    def _resolve_body(self, endpoint: dict[str, Any], inject_invalid: bool) -> Optional[dict[str, Any]]:
+    def _build_upload(self, endpoint: dict[str, Any], variables: dict[str, Any]) -> MultipartUpload:
+        upload_cfg = endpoint["upload"]
+        size_model = self.upload_size_models.get(id(upload_cfg))
+        if size_model is None:
+            size_model = self.upload_size_models[id(upload_cfg)] = UploadSizeModel(upload_cfg)
+
+        self.uploads_sent += 1
+        values = {"clientId": self.client_id, "n": self.uploads_sent, **variables}
+        if upload_cfg.get("feeder"):
+            values.update(self.next_feeder_record(str(upload_cfg.get("feeder"))) or {})
+
+        def render(value: Any) -> str:
+            return FLOW_TEMPLATE_PATTERN.sub(lambda match: str(values.get(match.group(1), match.group(0))), str(value))
+
+        return MultipartUpload(
+            field_name=str(upload_cfg.get("field") or "file"),
+            file_name=render(upload_cfg.get("fileName") or "loadtest-{clientId}-{n}.jpg"),
+            content_type=str(upload_cfg.get("contentType") or "image/jpeg"),
+            size_bytes=size_model.sample(self.rng),
+            fields={str(name): render(value) for name, value in (upload_cfg.get("fields") or {}).items()},
+            offset=self.rng.randrange(UPLOAD_PAYLOAD_BLOCK_BYTES),
+        )
+
+    def _resolve_body(self, endpoint: dict[str, Any], inject_invalid: bool) -> Optional[Any]:
+        if endpoint.get("upload") and not (inject_invalid and endpoint.get("invalidBodyTemplate") is not None):
+            return self._build_upload(endpoint, {})
+
         body = endpoint.get("bodyTemplate")
         invalid_body = endpoint.get("invalidBodyTemplate")
 
@@ -580,6 +3006,22 @@ class VuSession:
             if order_ids:
                 unique_ids = sorted(set(order_ids))
                 self.state["orderIds"] = unique_ids
+        elif isinstance(capture_mode, dict):
+            extractors = self.capture_extractors.get(id(capture_mode))
+            if extractors is None:
+                extractors = self.capture_extractors[id(capture_mode)] = [
+                    (str(variable), [compile_extractor(source) for source in ([sources] if isinstance(sources, str) else sources)])
+                    for variable, sources in capture_mode.items()
+                ]
+            for variable, compiled_sources in extractors:
+                values = {
+                    str(value)
+                    for compiled_source in compiled_sources
+                    for value in compiled_source(response_json)
+                    if not isinstance(value, (dict, list))
+                }
+                if values:
+                    self.state[variable] = sorted(values)
 
     async def execute_request(self, endpoint: dict[str, Any]) -> None:
         inject_error_rate = to_float(self.scenario_cfg.get("errorInjectionRatePercent"), 0.0)
@@ -589,22 +3031,365 @@ class VuSession:
         template_path, resolved_path = self._resolve_path(endpoint, inject_invalid=should_inject_invalid)
         body = self._resolve_body(endpoint, inject_invalid=should_inject_invalid)
 
+        await self.send_request(
+            endpoint=endpoint,
+            endpoint_key=f"{method} {template_path}",
+            method=method,
+            resolved_path=resolved_path,
+            body=body,
+        )
+
+    async def execute_flow(self, flow: CompiledFlow) -> None:
+        variables = dict(flow.variables)
+        variables["clientId"] = self.client_id
+        variables["tenantId"] = self.tenant_id
+        variables["vuIndex"] = self.vu_index
+
+        started = time.perf_counter()
+        think_seconds = 0.0
+        failed = False
+        executed = 0
+        index = 0
+
+        while index < len(flow.steps) and executed < FLOW_MAX_STEPS_PER_RUN:
+            step = flow.steps[index]
+            executed += 1
+            index += 1
+
+            if step.feeder is not None:
+                variables.update(self.next_feeder_record(step.feeder) or {})
+
+            if step.condition is not None and not step.condition(variables):
+                continue
+
+            step_failed = False
+            if step.action == "login":
+                step_failed = not await self.ensure_login(force=True)
+                variables["status"] = None if step_failed else 200
+            elif step.path is not None:
+                path = step.path.render(variables)
+                if path is None and step.fallback_paths:
+                    path = step.fallback_paths[self.rng.randrange(0, len(step.fallback_paths))].render(variables)
+                if path is None:
+                    continue
+                if not path.startswith("/"):
+                    path = "/" + path
+
+                headers = {}
+                for name, template in step.headers:
+                    value = template.render(variables)
+                    if value is not None:
+                        headers[name] = value
+
+                response = await self.send_request(
+                    endpoint=step.endpoint,
+                    endpoint_key=step.endpoint_key,
+                    method=step.method,
+                    resolved_path=path,
+                    body=(
+                        step.body(variables)
+                        if step.body is not None
+                        else (self._build_upload(step.endpoint, variables) if step.endpoint.get("upload") else None)
+                    ),
+                    extra_headers=headers or None,
+                )
+                status_code = response.status_code if response is not None else None
+                variables["status"] = status_code
+                if status_code is None:
+                    step_failed = True
+                elif step.expect_status is not None:
+                    step_failed = not step.expect_status(status_code)
+                else:
+                    step_failed = status_code >= 400
+
+                if not step_failed and step.extractors:
+                    try:
+                        data = response.json()
+                    except ValueError:
+                        data = None
+                    if data is not None:
+                        for variable, extract, pick in step.extractors:
+                            values = extract(data)
+                            if not values:
+                                continue
+                            if pick == "all":
+                                variables[variable] = values
+                            elif pick == "random":
+                                variables[variable] = values[self.rng.randrange(0, len(values))]
+                            else:
+                                variables[variable] = values[0]
+
+            if step_failed:
+                failed = True
+                if step.abort_on_failure:
+                    break
+
+            if step.goto is not None:
+                index = step.goto
+
+            if step.think_seconds > 0:
+                think_seconds += step.think_seconds
+                await asyncio.sleep(step.think_seconds)
+
+        elapsed_ms = max((time.perf_counter() - started - think_seconds) * 1000.0, 0.0)
+        self.metrics.record_flow(flow.name, elapsed_ms, failed)
+
+    async def send_request(
+        self,
+        *,
+        endpoint: dict[str, Any],
+        endpoint_key: str,
+        method: str,
+        resolved_path: str,
+        body: Optional[Any],
+        extra_headers: Optional[dict[str, str]] = None,
+    ) -> Optional[httpx.Response]:
         auth_mode = str(endpoint.get("auth") or "none").lower()
         if auth_mode == "bearer" and self.auth_enabled:
             await self.ensure_login(force=False)
 
-        correlation_id = str(uuid.uuid4())
-        headers = self._build_headers(correlation_id, endpoint, has_body=(body is not None))
+        attempt_kwargs: dict[str, Any] = {
+            "endpoint": endpoint,
+            "endpoint_key": endpoint_key,
+            "method": method,
+            "resolved_path": resolved_path,
+            "body": body,
+            "extra_headers": extra_headers,
+            "auth_mode": auth_mode,
+        }
+        policy = self._retry_policy(endpoint, method)
+        if policy is None:
+            response, _ = await self._send_attempt(**attempt_kwargs)
+            return response
+
+        if endpoint_key not in self.metrics.retry_stats:
+            self.metrics.retry_stats[endpoint_key] = RetryStats(policy=policy.describe())
+        budget = None
+        if policy.budget_cfg is not None:
+            budget = self.retry_budgets.get(id(policy.budget_cfg))
+            if budget is None:
+                budget = self.retry_budgets[id(policy.budget_cfg)] = RetryBudget(policy.budget_cfg)
+            budget.deposit()
+
+        started = time.perf_counter()
+        attempts = 0
+        delay_ms = 0.0
+        gave_up = None
+        while True:
+            attempts += 1
+            response, error_type = await self._send_attempt(**attempt_kwargs)
+            reason = policy.retry_reason(response.status_code if response is not None else None, error_type)
+            if reason is None:
+                break
+            if attempts >= policy.max_attempts:
+                gave_up = "exhausted"
+                break
+            retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+            delay_ms = policy.delay_ms(attempts, delay_ms, self.rng, retry_after)
+            if policy.deadline_seconds and time.perf_counter() - started + delay_ms / 1000.0 >= policy.deadline_seconds:
+                gave_up = "deadline"
+                break
+            # o app nao repete depois do fim do run (duracao ou Ctrl+C)
+            if self.stop_event.is_set() or (
+                self.stop_at is not None and time.perf_counter() + delay_ms / 1000.0 >= self.stop_at
+            ):
+                gave_up = "stopped"
+                break
+            if budget is not None and not budget.withdraw():
+                gave_up = "budget"
+                break
+            self.metrics.record_retry(endpoint_key, reason)
+            await sleep_until_stopped(delay_ms / 1000.0, self.stop_event)
+            if self.stop_event.is_set():
+                gave_up = "stopped"
+                break
+
+        self.metrics.record_retry_call(
+            endpoint_key,
+            attempts=attempts,
+            succeeded=response is not None and response.status_code < 400,
+            gave_up=gave_up,
+            duration_ms=(time.perf_counter() - started) * 1000.0,
+        )
+        return response
+
+    def _cache_policy(self, endpoint: dict[str, Any], method: str) -> Optional[CachePolicy]:
+        key = (id(endpoint), method)
+        if key not in self.cache_policies:
+            self.cache_policies[key] = compile_cache_policy(self.global_cfg, self.scenario_cfg, endpoint, method)
+        return self.cache_policies[key]
+
+    def _prepare_cache(self, policy: CachePolicy, resolved_path: str, url: str, headers: dict[str, str]) -> tuple[str, str]:
+        if policy.bust_percent > 0 and self.rng.uniform(0, 100) < policy.bust_percent:
+            headers["Cache-Control"] = "no-cache"
+            if policy.bust_query_param:
+                url += ("&" if "?" in url else "?") + f"{policy.bust_query_param}={uuid.uuid4().hex[:12]}"
+            return url, "busted"
+        entry = self.cache_entries.get(resolved_path) if policy.revalidate else None
+        if entry is None:
+            return url, "cold"
+        self.cache_entries.move_to_end(resolved_path)
+        etag, last_modified, _ = entry
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return url, "conditional"
+
+    def _complete_cache(
+        self,
+        policy: CachePolicy,
+        endpoint_key: str,
+        resolved_path: str,
+        outcome: str,
+        response: httpx.Response,
+        duration_ms: float,
+    ) -> tuple[httpx.Response, str]:
+        entry = self.cache_entries.get(resolved_path)
+        if response.status_code == 304:
+            outcome = "revalidated"
+            if entry is not None:
+                etag, last_modified, body = entry
+                self.cache_entries[resolved_path] = (
+                    response.headers.get("ETag") or etag,
+                    response.headers.get("Last-Modified") or last_modified,
+                    body,
+                )
+                if body is not None:
+                    # como o app: o corpo guardado alimenta captures e extractors da jornada
+                    headers = [
+                        (name, value)
+                        for name, value in response.headers.items()
+                        if name.lower() not in ("content-length", "content-encoding", "transfer-encoding")
+                    ]
+                    response = httpx.Response(304, headers=headers, content=body, request=response.request)
+        elif response.status_code >= 400:
+            outcome = "error"
+        else:
+            if outcome == "conditional":
+                outcome = "changed"
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if not etag and not last_modified:
+                if outcome == "cold":
+                    outcome = "noValidator"
+                self.cache_entries.pop(resolved_path, None)
+            elif policy.revalidate:
+                content = response.content
+                self.cache_entries[resolved_path] = (etag, last_modified, content if len(content) <= CACHE_MAX_BODY_BYTES else None)
+                self.cache_entries.move_to_end(resolved_path)
+                if len(self.cache_entries) > CACHE_MAX_ENTRIES_PER_VU:
+                    self.cache_entries.popitem(last=False)
+        self.metrics.record_cache(
+            endpoint_key,
+            outcome,
+            duration_ms,
+            len(response.content) if outcome != "revalidated" else 0,
+            has_validator=bool(response.headers.get("ETag") or response.headers.get("Last-Modified") or outcome == "revalidated"),
+        )
+        return response, outcome
+
+    def _accept_encoding(self, endpoint: dict[str, Any]) -> Optional[str]:
+        if "compression" not in endpoint:
+            return self.accept_encoding
+        key = id(endpoint)
+        if key not in self.endpoint_accept_encodings:
+            self.endpoint_accept_encodings[key] = pick_compression_profile(
+                compression_profiles(self.global_cfg, self.scenario_cfg, endpoint), self.rng
+            )
+        return self.endpoint_accept_encodings[key]
 
-        url = self.base_url + resolved_path
-        endpoint_key = f"{method} {template_path}"
+    def _retry_policy(self, endpoint: dict[str, Any], method: str) -> Optional[RetryPolicy]:
+        key = (id(endpoint), method)
+        if key not in self.retry_policies:
+            self.retry_policies[key] = compile_retry_policy(
+                self.global_cfg, self.scenario_cfg, endpoint, method, enabled=self.retry_enabled
+            )
+        return self.retry_policies[key]
 
-        start = time.perf_counter()
+    async def _send_attempt(
+        self,
+        *,
+        endpoint: dict[str, Any],
+        endpoint_key: str,
+        method: str,
+        resolved_path: str,
+        body: Optional[Any],
+        extra_headers: Optional[dict[str, str]],
+        auth_mode: str,
+    ) -> tuple[Optional[httpx.Response], Optional[str]]:
+        correlation_id = str(uuid.uuid4())
+        upload = body if isinstance(body, MultipartUpload) else None
+        headers = self._build_headers(correlation_id, endpoint, has_body=(body is not None and upload is None))
+        if upload is not None:
+            headers.update(upload.headers)
+        if extra_headers:
+            headers.update(extra_headers)
+
+        url = self.base_url + resolved_path
+        cache_policy = self._cache_policy(endpoint, method)
+        cache_outcome = None
+        if cache_policy is not None:
+            url, cache_outcome = self._prepare_cache(cache_policy, resolved_path, url, headers)
+        request_kwargs: dict[str, Any] = (
+            {"content": upload.stream(), "extensions": {"trace": upload.trace}} if upload is not None else {"json": body}
+        )
+        if endpoint.get("timeoutSeconds") is not None:
+            request_kwargs["timeout"] = httpx.Timeout(max(to_float(endpoint.get("timeoutSeconds"), 0.0), 0.001))
+        if upload is not None:
+            # o mesmo upload pode ser reenviado por um retry
+            upload.body_sent_at = None
+            upload.headers_received_at = None
+
+        start = time.perf_counter()
         timestamp = time.time()
 
+        self.metrics.in_flight += 1
+        if upload is not None:
+            self.metrics.uploads_in_flight += 1
+            self.metrics.uploads_in_flight_peak = max(self.metrics.uploads_in_flight_peak, self.metrics.uploads_in_flight)
         try:
-            response = await self.http_client.request(method, url, headers=headers, json=body)
+            request = self.http_client.build_request(method, url, headers=headers, **request_kwargs)
+            response = await self.http_client.send(request, stream=True)
+            headers_at = time.perf_counter()
+            try:
+                raw = b"".join([chunk async for chunk in response.aiter_raw()])
+            finally:
+                await response.aclose()
+            body_ms = (time.perf_counter() - headers_at) * 1000.0
+            # decodifica aqui (e nao no httpx) para separar bytes na rede, bytes decodificados e CPU de decode
+            content_encoding = response.headers.get("Content-Encoding", "")
+            decode_started = time.perf_counter()
+            content = decode_content(raw, content_encoding)
+            decode_ms = (time.perf_counter() - decode_started) * 1000.0
+            response = httpx.Response(
+                response.status_code,
+                headers=[
+                    (name, value)
+                    for name, value in response.headers.items()
+                    if name.lower() not in ("content-length", "content-encoding", "transfer-encoding")
+                ],
+                content=content,
+                request=request,
+                extensions=response.extensions,
+            )
             duration_ms = (time.perf_counter() - start) * 1000.0
+            self.metrics.record_transfer(
+                endpoint_key,
+                self._accept_encoding(endpoint) or COMPRESSION_DEFAULT_PROFILE,
+                content_encoding=content_encoding,
+                wire_bytes=len(raw),
+                decoded_bytes=len(content),
+                decode_ms=decode_ms,
+                body_ms=body_ms,
+                duration_ms=duration_ms,
+            )
+            if upload is not None:
+                self.metrics.record_upload(endpoint_key, upload, start)
+            if cache_outcome is not None:
+                response, cache_outcome = self._complete_cache(
+                    cache_policy, endpoint_key, resolved_path, cache_outcome, response, duration_ms
+                )
 
             response_text = response.text or ""
             normalized_message = normalize_error_message(response_text)
@@ -622,7 +3407,7 @@ class VuSession:
                     duration_ms=duration_ms,
                     error_type=f"http_{response.status_code}",
                     error_message=normalized_message,
-                    request_body=(json.dumps(body, ensure_ascii=False) if body is not None else None),
+                    request_body=describe_request_body(body),
                     response_snippet=truncate_text(response_text, 300),
                 )
 
@@ -634,6 +3419,8 @@ class VuSession:
                 error_type=(f"http_{response.status_code}" if response.status_code >= 400 else None),
                 error_message=(response_text if response.status_code >= 400 else None),
                 failure_sample=failure_sample,
+                vu_index=self.vu_index,
+                correlation_id=correlation_id,
             )
 
             if response.status_code == 401 and auth_mode == "bearer" and self.auth_enabled:
@@ -646,6 +3433,8 @@ class VuSession:
                 except ValueError:
                     pass
 
+            return response, None
+
         except httpx.TimeoutException as exc:
             duration_ms = (time.perf_counter() - start) * 1000.0
             message = f"timeout: {exc}"
@@ -660,7 +3449,7 @@ class VuSession:
                 duration_ms=duration_ms,
                 error_type="timeout",
                 error_message=normalize_error_message(message),
-                request_body=(json.dumps(body, ensure_ascii=False) if body is not None else None),
+                request_body=describe_request_body(body),
                 response_snippet="",
             )
             self.metrics.record(
@@ -671,7 +3460,10 @@ class VuSession:
                 error_type="timeout",
                 error_message=message,
                 failure_sample=sample,
+                vu_index=self.vu_index,
+                correlation_id=correlation_id,
             )
+            return None, "timeout"
         except Exception as exc:
             duration_ms = (time.perf_counter() - start) * 1000.0
             message = f"exception: {type(exc).__name__}: {exc}"
@@ -686,7 +3478,7 @@ class VuSession:
                 duration_ms=duration_ms,
                 error_type=type(exc).__name__,
                 error_message=normalize_error_message(message),
-                request_body=(json.dumps(body, ensure_ascii=False) if body is not None else None),
+                request_body=describe_request_body(body),
                 response_snippet="",
             )
             self.metrics.record(
@@ -697,461 +3489,5705 @@ class VuSession:
                 error_type=type(exc).__name__,
                 error_message=message,
                 failure_sample=sample,
+                vu_index=self.vu_index,
+                correlation_id=correlation_id,
             )
+            return None, type(exc).__name__
+        finally:
+            self.metrics.in_flight -= 1
+            if upload is not None:
+                self.metrics.uploads_in_flight -= 1
+
+
+def openmetrics_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def openmetrics_histogram_lines(
+    name: str,
+    labels: str,
+    histogram: LatencyHistogram,
+    edges_seconds: list[float],
+    exemplars: Optional[list[tuple[float, float, str]]] = None,
+) -> list[str]:
+    bucket_counts = [0] * (len(edges_seconds) + 1)
+    for index, count in histogram.counts.items():
+        upper_seconds = LatencyHistogram.bucket_mid_ms(index) / 1000.0
+        bucket_counts[bisect.bisect_left(edges_seconds, upper_seconds)] += count
+
+    bucket_exemplars: dict[int, str] = {}
+    for duration_ms, timestamp_epoch, correlation_id in sorted(exemplars or []):
+        bucket_exemplars[bisect.bisect_left(edges_seconds, duration_ms / 1000.0)] = (
+            f' # {{trace_id="{trace_id_for(correlation_id)}"}} {duration_ms / 1000.0:.6f} {timestamp_epoch:.3f}'
+        )
 
+    separator = "," if labels else ""
+    lines = []
+    cumulative = 0
+    for position, (edge, count) in enumerate(zip(edges_seconds, bucket_counts)):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels}{separator}le="{float(edge)!r}"}} {cumulative}{bucket_exemplars.get(position, "")}')
+    lines.append(
+        f'{name}_bucket{{{labels}{separator}le="+Inf"}} {histogram.count}{bucket_exemplars.get(len(edges_seconds), "")}'
+    )
+    label_block = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_count{label_block} {histogram.count}")
+    lines.append(f"{name}_sum{label_block} {histogram.total / 1000.0:.6f}")
+    return lines
+
+
+class MetricsExporter:
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.metrics: Optional[MetricsCollector] = None
+        self.scenario_name = ""
+        self.run_id = ""
+        self.loop_lag = LatencyHistogram()
+        self.last_loop_lag_seconds = 0.0
+        self.scrapes = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._lag_task: Optional[asyncio.Task[None]] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        sockets = self._server.sockets or []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+        self._lag_task = asyncio.create_task(self._monitor_loop_lag())
+
+    def attach(self, metrics: MetricsCollector, *, scenario_name: str, run_id: str) -> None:
+        self.metrics = metrics
+        self.scenario_name = scenario_name
+        self.run_id = run_id
 
-async def run_scenario(
-    *,
-    scenario_name: str,
-    base_url: str,
-    scenario_cfg: dict[str, Any],
-    global_cfg: dict[str, Any],
-    endpoints: list[dict[str, Any]],
-    timeout_seconds: float,
-    insecure_tls: bool,
-    random_seed: int,
-) -> dict[str, Any]:
-    vus = to_int(scenario_cfg.get("vus"), 10)
-    duration_seconds = max(to_int(scenario_cfg.get("durationSeconds"), 30), 1)
-    ramp_up_seconds = max(to_float(scenario_cfg.get("rampUpSeconds"), 0.0), 0.0)
+    async def close(self) -> None:
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _monitor_loop_lag(self) -> None:
+        while True:
+            expected = time.perf_counter() + METRICS_LOOP_LAG_INTERVAL_SECONDS
+            await asyncio.sleep(METRICS_LOOP_LAG_INTERVAL_SECONDS)
+            lag_seconds = max(time.perf_counter() - expected, 0.0)
+            self.last_loop_lag_seconds = lag_seconds
+            self.loop_lag.record(lag_seconds * 1000.0)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+            while True:
+                header = await asyncio.wait_for(reader.readline(), timeout=5.0)
+                if header in (b"\r\n", b"\n", b""):
+                    break
+
+            parts = request_line.decode("latin-1").split()
+            path = urllib.parse.urlsplit(parts[1]).path if len(parts) >= 2 else ""
+            if len(parts) >= 2 and parts[0] == "GET" and path in ("/metrics", "/"):
+                self.scrapes += 1
+                body = self.render().encode("utf-8")
+                status = "200 OK"
+                content_type = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+            else:
+                body = b"not found\n"
+                status = "404 Not Found"
+                content_type = "text/plain; charset=utf-8"
 
-    think_min_ms = max(to_int(scenario_cfg.get("thinkTimeMinMs"), 100), 0)
-    think_max_ms = max(to_int(scenario_cfg.get("thinkTimeMaxMs"), 600), think_min_ms)
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def render(self) -> str:
+        scenario = openmetrics_label(self.scenario_name)
+        lines = [
+            "# TYPE loadtest_run_info gauge",
+            "# HELP loadtest_run_info Run em execucao no gerador de carga.",
+            f'loadtest_run_info{{scenario="{scenario}",run_id="{openmetrics_label(self.run_id)}"}} 1',
+        ]
 
-    started_epoch = time.time()
-    started_utc = utc_now_iso()
+        metrics = self.metrics
+        if metrics is not None:
+            lines.extend(
+                [
+                    "# TYPE loadtest_requests counter",
+                    "# HELP loadtest_requests Requests concluidos por endpoint e status (ou tipo de erro).",
+                ]
+            )
+            for (endpoint_key, status), count in list(metrics.endpoint_status_counts.items()):
+                lines.append(
+                    f'loadtest_requests_total{{scenario="{scenario}",endpoint="{openmetrics_label(endpoint_key)}",status="{openmetrics_label(status)}"}} {count}'
+                )
 
-    metrics = MetricsCollector(started_epoch=started_epoch)
+            lines.extend(
+                [
+                    "# TYPE loadtest_request_duration_seconds histogram",
+                    "# HELP loadtest_request_duration_seconds Latencia dos requests vista pelo gerador.",
+                    "# UNIT loadtest_request_duration_seconds seconds",
+                ]
+            )
+            for endpoint_key, histogram in list(metrics.endpoint_latency.items()):
+                lines.extend(
+                    openmetrics_histogram_lines(
+                        "loadtest_request_duration_seconds",
+                        f'scenario="{scenario}",endpoint="{openmetrics_label(endpoint_key)}"',
+                        histogram,
+                        METRICS_LATENCY_EDGES_SECONDS,
+                        metrics.slowest_samples.get(endpoint_key) if metrics.tracing_enabled else None,
+                    )
+                )
 
-    stop_at = time.perf_counter() + duration_seconds
+            lines.extend(
+                [
+                    "# TYPE loadtest_requests_in_flight gauge",
+                    "# HELP loadtest_requests_in_flight Requests HTTP aguardando resposta.",
+                    f'loadtest_requests_in_flight{{scenario="{scenario}"}} {metrics.in_flight}',
+                    "# TYPE loadtest_virtual_users gauge",
+                    "# HELP loadtest_virtual_users VUs ativos (apos o ramp-up individual).",
+                    f'loadtest_virtual_users{{scenario="{scenario}"}} {metrics.active_vus}',
+                    "# TYPE loadtest_hub_connections gauge",
+                    "# HELP loadtest_hub_connections Conexoes SignalR/WebSocket abertas.",
+                    f'loadtest_hub_connections{{scenario="{scenario}"}} {metrics.open_connections}',
+                ]
+            )
 
-    async def vu_worker(vu_index: int) -> None:
-        session = VuSession(
-            vu_index=vu_index,
-            scenario_name=scenario_name,
-            base_url=base_url,
-            scenario_cfg=scenario_cfg,
-            global_cfg=global_cfg,
-            endpoints=endpoints,
-            metrics=metrics,
-            timeout_seconds=timeout_seconds,
-            insecure_tls=insecure_tls,
-            random_seed=random_seed,
+        lines.extend(
+            [
+                "# TYPE loadtest_event_loop_lag_seconds gauge",
+                "# HELP loadtest_event_loop_lag_seconds Atraso da ultima medicao do event loop do gerador.",
+                "# UNIT loadtest_event_loop_lag_seconds seconds",
+                f"loadtest_event_loop_lag_seconds {self.last_loop_lag_seconds:.6f}",
+                "# TYPE loadtest_event_loop_lag_distribution_seconds histogram",
+                "# HELP loadtest_event_loop_lag_distribution_seconds Distribuicao do atraso do event loop desde o inicio.",
+                "# UNIT loadtest_event_loop_lag_distribution_seconds seconds",
+            ]
         )
+        lines.extend(
+            openmetrics_histogram_lines("loadtest_event_loop_lag_distribution_seconds", "", self.loop_lag, METRICS_LOOP_LAG_EDGES_SECONDS)
+        )
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
 
+async def sleep_until_stopped(seconds: float, stop_event: asyncio.Event) -> None:
+    if seconds <= 0 or stop_event.is_set():
+        return
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+class RunStopEvent(asyncio.Event):
+    def __init__(self) -> None:
+        super().__init__()
+        self.reason: Optional[str] = None
+
+
+def install_stop_handlers(stop_event: RunStopEvent) -> Callable[[], None]:
+    loop = asyncio.get_running_loop()
+    signals = [signal.SIGINT] + ([signal.SIGTERM] if hasattr(signal, "SIGTERM") else [])
+    previous_handlers: dict[int, Any] = {}
+
+    def request_stop(signum: int) -> None:
+        if stop_event.is_set():
+            return
+        stop_event.reason = signal.Signals(signum).name
+        stop_event.set()
+        print(f"\n{signal.Signals(signum).name} recebido: encerrando o agendamento e gerando relatorio parcial (repita para abortar).")
+        restore()
+
+    def restore() -> None:
+        for signum, handler in previous_handlers.items():
+            try:
+                loop.remove_signal_handler(signum)
+            except (NotImplementedError, RuntimeError):
+                signal.signal(signum, handler)
+        previous_handlers.clear()
+
+    for signum in signals:
+        previous_handlers[signum] = signal.getsignal(signum)
         try:
-            if ramp_up_seconds > 0 and vus > 1:
-                delay = (ramp_up_seconds / max(vus - 1, 1)) * (vu_index - 1)
-                await asyncio.sleep(delay)
+            loop.add_signal_handler(signum, request_stop, signum)
+        except (NotImplementedError, RuntimeError):
+            signal.signal(signum, lambda received, _frame: loop.call_soon_threadsafe(request_stop, received))
 
-            while time.perf_counter() < stop_at:
-                endpoint = weighted_choice(endpoints, session.rng)
-                await session.execute_request(endpoint)
+    return restore
 
-                think_ms = session.rng.randint(think_min_ms, think_max_ms)
-                await asyncio.sleep(think_ms / 1000.0)
-        finally:
-            await session.close()
 
-    workers = [asyncio.create_task(vu_worker(index)) for index in range(1, vus + 1)]
-    await asyncio.gather(*workers)
+def flatten_numeric(data: Any, prefix: str = "") -> dict[str, float]:
+    values: dict[str, float] = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            values.update(flatten_numeric(value, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(data, bool):
+        values[prefix] = 1.0 if data else 0.0
+    elif isinstance(data, (int, float)):
+        values[prefix] = float(data)
+    return values
 
-    finished_utc = utc_now_iso()
-    elapsed_seconds = max(time.time() - started_epoch, 0.0)
 
-    return metrics.build_report(
-        run_id=str(uuid.uuid4()),
-        scenario_name=scenario_name,
-        started_at_utc=started_utc,
-        finished_at_utc=finished_utc,
-        duration_seconds=elapsed_seconds,
-        base_url=base_url,
-        scenario_config=scenario_cfg,
-        resolved_endpoints=endpoints,
-    )
+def parse_counters_json(text: str) -> dict[str, float]:
+    data = json.loads(text)
+    # formato do `dotnet-counters collect --format json`: lista de eventos, o ultimo valor de cada contador vale
+    if isinstance(data, dict) and isinstance(data.get("Events") or data.get("events"), list):
+        values = {}
+        for event in data.get("Events") or data.get("events"):
+            if isinstance(event, dict) and isinstance(event.get("value"), (int, float)):
+                values[str(event.get("name"))] = float(event["value"])
+                if event.get("provider"):
+                    values[f"{event.get('provider')}/{event.get('name')}"] = float(event["value"])
+        return values
+    return flatten_numeric(data)
+
+
+def parse_prometheus_text(text: str) -> dict[str, float]:
+    values: dict[str, float] = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        match = PROMETHEUS_SAMPLE_PATTERN.match(line)
+        if not match:
+            continue
+        name, labels, raw_value = match.groups()
+        try:
+            value = float(raw_value)
+        except ValueError:
+            continue
+        if labels:
+            values[f"{name}{labels}"] = value
+        # sem seletor de labels, o nome da metrica soma todas as series
+        values[name] = values.get(name, 0.0) + value if labels else value
+    return values
+
+
+def parse_docker_stats(text: str) -> dict[str, float]:
+    def size_mb(raw: str) -> float:
+        match = DOCKER_SIZE_PATTERN.match(raw.strip())
+        if not match:
+            return 0.0
+        return float(match.group(1)) * DOCKER_SIZE_UNITS.get(match.group(2).lower(), 1.0) / (1024.0 * 1024.0)
+
+    values = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        name = str(row.get("Name") or row.get("Container") or "container")
+        values[f"{name}.cpuPercent"] = to_float(str(row.get("CPUPerc") or "0").rstrip("%"), 0.0)
+        values[f"{name}.memoryPercent"] = to_float(str(row.get("MemPerc") or "0").rstrip("%"), 0.0)
+        values[f"{name}.memoryMb"] = size_mb(str(row.get("MemUsage") or "0B").split("/")[0])
+    return values
+
+
+class ServerMetricsSampler:
+    def __init__(
+        self,
+        metrics_cfg: dict[str, Any],
+        *,
+        base_url: str,
+        started_epoch: float,
+        timeout_seconds: float,
+        insecure_tls: bool,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.started_epoch = started_epoch
+        self.interval_seconds = max(to_float(metrics_cfg.get("intervalSeconds"), SERVER_METRICS_DEFAULT_INTERVAL_SECONDS), 0.5)
+        self.timeout_seconds = min(timeout_seconds, self.interval_seconds * 2)
+        self.insecure_tls = insecure_tls
+        self.saturation = {**SERVER_METRICS_DEFAULT_SATURATION, **(metrics_cfg.get("saturation") or {})}
+
+        self.sources = []
+        for index, source in enumerate(metrics_cfg.get("sources") or []):
+            source_type = str(source.get("type") or "").lower()
+            if source_type not in SERVER_METRICS_SOURCE_TYPES:
+                raise ValueError(
+                    f"serverMetrics: tipo de fonte invalido '{source_type}'. Use: {', '.join(SERVER_METRICS_SOURCE_TYPES)}"
+                )
+            if source_type != "docker" and not source.get("url"):
+                raise ValueError(f"serverMetrics: a fonte '{source.get('name') or index}' precisa de 'url'.")
+            self.sources.append({**source, "type": source_type, "name": str(source.get("name") or f"{source_type}{index + 1}")})
+
+        self.series: dict[str, dict[int, float]] = defaultdict(dict)
+        self.previous: dict[str, tuple[float, float]] = {}
+        self.source_stats = {source["name"]: {"samples": 0, "errors": 0, "lastError": None} for source in self.sources}
+
+    def _url(self, source: dict[str, Any]) -> str:
+        url = str(source.get("url"))
+        return url if url.lower().startswith(("http://", "https://")) else self.base_url + "/" + url.lstrip("/")
+
+    def _select(self, source: dict[str, Any], raw: dict[str, float], sampled_at: float) -> dict[str, float]:
+        selection = source.get("metrics")
+        if selection is None and source["type"] == "prometheus":
+            selection = SERVER_METRICS_PROMETHEUS_DEFAULTS
+        if selection is None:
+            return dict(itertools.islice(raw.items(), SERVER_METRICS_MAX_SERIES_PER_SOURCE))
+
+        values = {}
+        for alias, spec in selection.items():
+            spec = {"name": spec} if isinstance(spec, str) else dict(spec)
+            value = raw.get(str(spec.get("name") or alias))
+            if value is None:
+                continue
+            if spec.get("rate"):
+                # contadores cumulativos viram taxa por segundo entre duas amostras
+                key = f"{source['name']}.{alias}"
+                previous = self.previous.get(key)
+                self.previous[key] = (sampled_at, value)
+                if previous is None or sampled_at <= previous[0] or value < previous[1]:
+                    continue
+                value = (value - previous[1]) / (sampled_at - previous[0])
+            values[str(alias)] = value * to_float(spec.get("scale"), 1.0)
+        return values
+
+    async def _read(self, source: dict[str, Any], http_client: httpx.AsyncClient) -> dict[str, float]:
+        if source["type"] == "docker":
+            command = ["docker", "stats", "--no-stream", "--format", "{{json .}}", *[str(name) for name in source.get("containers") or []]]
+            process = await asyncio.create_subprocess_exec(
+                *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await process.communicate()
+            if process.returncode != 0:
+                raise RuntimeError(truncate_text(stderr.decode("utf-8", "replace").strip() or f"docker stats saiu com {process.returncode}"))
+            return await asyncio.to_thread(parse_docker_stats, stdout.decode("utf-8", "replace"))
+
+        started = time.perf_counter()
+        response = await http_client.get(self._url(source), headers=source.get("headers") or None)
+        latency_ms = (time.perf_counter() - started) * 1000.0
+        if source["type"] == "health":
+            values = {"latencyMs": latency_ms}
+            try:
+                data = response.json()
+            except ValueError:
+                data = {"status": response.text.strip()}
+            status = str((data.get("status") if isinstance(data, dict) else None) or "").lower()
+            values["status"] = 0.0 if response.status_code >= 500 else HEALTH_STATUS_VALUES.get(status, 0.0)
+            entries = (data.get("entries") or data.get("results") or {}) if isinstance(data, dict) else {}
+            for entry_name, entry in entries.items():
+                if isinstance(entry, dict):
+                    values[f"{entry_name}.status"] = HEALTH_STATUS_VALUES.get(str(entry.get("status") or "").lower(), 0.0)
+            return values
 
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        parser = parse_prometheus_text if source["type"] == "prometheus" else parse_counters_json
+        return await asyncio.to_thread(parser, response.text)
 
-def print_report(report: dict[str, Any]) -> None:
-    summary = report.get("summary", {})
-    latency = report.get("latencyMs", {})
+    async def _sample(self, source: dict[str, Any], http_client: httpx.AsyncClient) -> None:
+        stats = self.source_stats[source["name"]]
+        try:
+            raw = await self._read(source, http_client)
+        except Exception as exc:
+            stats["errors"] += 1
+            stats["lastError"] = f"{type(exc).__name__}: {truncate_text(str(exc), 160)}"
+            if source["type"] == "health":
+                self.series[f"{source['name']}.status"][self._second(time.time())] = 0.0
+            return
+
+        sampled_at = time.time()
+        stats["samples"] += 1
+        second = self._second(sampled_at)
+        for name, value in self._select(source, raw, sampled_at).items():
+            self.series[f"{source['name']}.{name}"][second] = value
+
+    def _second(self, epoch: float) -> int:
+        return int(max(0, math.floor(epoch - self.started_epoch)))
+
+    async def run(self, stop_at: float, stop_event: asyncio.Event) -> None:
+        async with httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout_seconds),
+            verify=not self.insecure_tls,
+            limits=httpx.Limits(max_keepalive_connections=len(self.sources), max_connections=len(self.sources) + 1),
+        ) as http_client:
+            while time.perf_counter() < stop_at and not stop_event.is_set():
+                tick_started = time.perf_counter()
+                await asyncio.gather(*(self._sample(source, http_client) for source in self.sources))
+                wait_seconds = self.interval_seconds - (time.perf_counter() - tick_started)
+                await sleep_until_stopped(min(wait_seconds, max(stop_at - time.perf_counter(), 0.0)), stop_event)
+
+    def _threshold(self, name: str) -> Optional[float]:
+        for key in (name, name.rsplit(".", 1)[-1]):
+            if key in self.saturation:
+                return to_float(self.saturation[key], 0.0)
+        return None
 
-    print("\n=== Load Test Summary ===")
-    print(f"Run ID: {report.get('runId')}")
-    print(f"Scenario: {report.get('scenario')} | Base URL: {report.get('baseUrl')}")
-    print(f"Started: {report.get('startedAtUtc')} | Finished: {report.get('finishedAtUtc')}")
-    print(f"Duration: {report.get('durationSeconds')} s")
+    def build(self, metrics: "MetricsCollector", charts: Optional[dict[str, Any]]) -> dict[str, Any]:
+        series_report = {}
+        saturation = []
+        for name, points in sorted(self.series.items()):
+            ordered = sorted(points.items())
+            values = [value for _, value in ordered]
+            series_report[name] = {
+                "min": round(min(values), 3),
+                "avg": round(sum(values) / len(values), 3),
+                "max": round(max(values), 3),
+                "points": [[second, round(value, 3)] for second, value in ordered],
+            }
 
-    print("\n-- Requests --")
-    print(f"Total: {summary.get('totalRequests', 0)}")
-    print(f"Success: {summary.get('successfulRequests', 0)}")
-    print(f"Failed: {summary.get('failedRequests', 0)} ({summary.get('errorRatePercent', 0)}%)")
-    print(f"RPS avg: {summary.get('rpsAvg', 0)} | RPS peak: {summary.get('rpsPeak', 0)}")
+            # saturacao: primeiro segundo em que a serie cruza o limite (health: primeiro status != Healthy)
+            is_health = name.endswith(".status") and any(
+                source["type"] == "health" and name.startswith(source["name"] + ".") for source in self.sources
+            )
+            threshold = 1.0 if is_health else self._threshold(name)
+            if threshold is None:
+                continue
+            crossed = next(
+                ((second, value) for second, value in ordered if (value < threshold if is_health else value >= threshold)),
+                None,
+            )
+            if crossed is None:
+                continue
+            second, value = crossed
+            second_latency = metrics.second_latency.get(second)
+            requests = metrics.requests_per_second.get(second, 0)
+            saturation.append(
+                {
+                    "metric": name,
+                    "second": second,
+                    "value": round(value, 3),
+                    "threshold": threshold,
+                    "kind": "unhealthy" if is_health else "threshold",
+                    "clientRps": requests,
+                    "clientP95Ms": round(second_latency.percentile(95), 2) if second_latency is not None else None,
+                    "clientErrorRatePercent": round(metrics.errors_per_second.get(second, 0) / requests * 100.0, 2) if requests else 0.0,
+                }
+            )
+        saturation.sort(key=lambda item: item["second"])
+
+        if charts is not None and series_report:
+            # mesma grade de tempo dos graficos do cliente (bucketSeconds)
+            bucket_seconds = max(to_int(charts.get("bucketSeconds"), 1), 1)
+            time_buckets = max(len(charts.get("requests") or []), 1)
+            saturated = {item["metric"]: item["second"] for item in saturation}
+            chart_series = []
+            for name in sorted(series_report, key=lambda key: (key not in saturated, key))[:SERVER_METRICS_CHART_SERIES]:
+                sums = [0.0] * time_buckets
+                counts = [0] * time_buckets
+                for second, value in self.series[name].items():
+                    bucket = min(second // bucket_seconds, time_buckets - 1)
+                    sums[bucket] += value
+                    counts[bucket] += 1
+                chart_series.append(
+                    {
+                        "endpoint": name,
+                        "values": [round(total / count, 3) if count else None for total, count in zip(sums, counts)],
+                        "saturatedAt": (min(saturated[name] // bucket_seconds, time_buckets - 1) if name in saturated else None),
+                    }
+                )
+            charts["server"] = chart_series
 
-    print("\n-- Latency --")
-    print(
-        f"min/avg/max: {latency.get('min', 0)} / {latency.get('avg', 0)} / {latency.get('max', 0)} ms"
-    )
-    print(
-        f"p50/p95/p99: {latency.get('p50', 0)} / {latency.get('p95', 0)} / {latency.get('p99', 0)} ms"
-    )
+        return {
+            "intervalSeconds": self.interval_seconds,
+            "sources": [
+                {"name": source["name"], "type": source["type"], **self.source_stats[source["name"]]} for source in self.sources
+            ],
+            "series": series_report,
+            "saturation": saturation,
+        }
 
-    print("\n-- Errors by Status --")
-    status_codes = report.get("statusCodes", [])
-    if not status_codes:
-        print("(none)")
-    else:
-        for item in status_codes:
-            print(f"{item.get('statusCode')}: {item.get('count')} ({item.get('percentage')}%)")
 
-    exceptions = report.get("exceptions", [])
-    if exceptions:
-        print("\n-- Exceptions/Timeouts --")
-        for item in exceptions:
-            print(f"{item.get('type')}: {item.get('count')}")
+def create_server_metrics_sampler(
+    global_cfg: dict[str, Any],
+    *,
+    base_url: str,
+    started_epoch: float,
+    timeout_seconds: float,
+    insecure_tls: bool,
+) -> Optional[ServerMetricsSampler]:
+    metrics_cfg = global_cfg.get("serverMetrics") or {}
+    if not metrics_cfg.get("enabled"):
+        return None
+    if not metrics_cfg.get("sources"):
+        metrics_cfg = {**metrics_cfg, "sources": [{"name": "health", "type": "health", "url": "/health"}]}
+    return ServerMetricsSampler(
+        metrics_cfg,
+        base_url=base_url,
+        started_epoch=started_epoch,
+        timeout_seconds=timeout_seconds,
+        insecure_tls=insecure_tls,
+    )
 
-    print("\n-- Top Endpoints by Hits --")
-    top_hits = report.get("topEndpointsByHits", [])
-    if not top_hits:
-        print("(none)")
-    else:
-        for item in top_hits[:10]:
-            print(
-                f"{item.get('endpoint')}: hits={item.get('hits')} "
-                f"p95={item.get('p95LatencyMs')}ms errorRate={item.get('errorRatePercent')}%"
-            )
 
-    print("\n-- Top Endpoints by p95 --")
-    top_p95 = report.get("topEndpointsByP95", [])
-    if not top_p95:
-        print("(none)")
-    else:
-        for item in top_p95[:10]:
-            print(
-                f"{item.get('endpoint')}: p95={item.get('p95LatencyMs')}ms "
-                f"hits={item.get('hits')} errorRate={item.get('errorRatePercent')}%"
-            )
+def trend_test(points: list[tuple[float, float]]) -> Optional[dict[str, Any]]:
+    n = len(points)
+    if n < SOAK_MIN_TREND_WINDOWS:
+        return None
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+
+    # Mann-Kendall (sinal de todos os pares) + inclinacao de Theil-Sen: robustos a outliers de p95
+    s = 0
+    slopes = []
+    for i in range(n - 1):
+        for j in range(i + 1, n):
+            delta = ys[j] - ys[i]
+            s += (delta > 0) - (delta < 0)
+            if xs[j] > xs[i]:
+                slopes.append(delta / (xs[j] - xs[i]))
+    ties = sum(count * (count - 1) * (2 * count + 5) for count in Counter(ys).values() if count > 1)
+    variance = (n * (n - 1) * (2 * n + 5) - ties) / 18.0
+    z = ((s - 1) if s > 0 else (s + 1) if s < 0 else 0) / math.sqrt(variance) if variance > 0 else 0.0
+    slope = percentile(slopes, 50) if slopes else 0.0
+    return {
+        "windows": n,
+        "first": round(ys[0], 3),
+        "last": round(ys[-1], 3),
+        "median": round(percentile(ys, 50), 3),
+        "slopePerHour": round(slope * 3600.0, 4),
+        "change": round(slope * (xs[-1] - xs[0]), 3),
+        "kendallTau": round(s / (n * (n - 1) / 2.0), 4),
+        "z": round(z, 3),
+        "pValue": float(f"{math.erfc(abs(z) / math.sqrt(2.0)):.3g}"),
+    }
 
-    print("\n-- Top Errors --")
-    top_errors = report.get("topErrors", [])
-    if not top_errors:
-        print("(none)")
-    else:
-        for item in top_errors:
-            endpoints = ", ".join(item.get("endpoints", []))
-            print(f"{item.get('count')}x {item.get('message')} | endpoints: {endpoints}")
 
-    print("\n-- Failure Samples (up to 10) --")
-    samples = report.get("failureSamples", [])
-    if not samples:
-        print("(none)")
-    else:
-        for sample in samples[:10]:
-            print(
-                f"[{sample.get('timestampUtc')}] {sample.get('method')} {sample.get('path')} "
-                f"status={sample.get('statusCode')} corr={sample.get('correlationId')} "
-                f"error={sample.get('errorMessage')}"
+class SoakMonitor:
+    def __init__(
+        self,
+        soak_cfg: dict[str, Any],
+        *,
+        metrics: MetricsCollector,
+        run_id: str,
+        planned_seconds: int,
+        skip_seconds: float,
+        grace_seconds: float,
+        snapshot_path: Optional[Path],
+    ) -> None:
+        self.metrics = metrics
+        self.run_id = run_id
+        self.window_seconds = max(to_int(soak_cfg.get("windowSeconds"), SOAK_DEFAULT_WINDOW_SECONDS), 5)
+        self.snapshot_seconds = max(to_float(soak_cfg.get("snapshotSeconds"), SOAK_DEFAULT_SNAPSHOT_SECONDS), float(self.window_seconds))
+        self.max_windows = max(to_int(soak_cfg.get("maxWindows"), SOAK_DEFAULT_MAX_WINDOWS), SOAK_MIN_TREND_WINDOWS * 2)
+        self.alpha = to_float(soak_cfg.get("alpha"), SOAK_DEFAULT_ALPHA)
+        self.min_drift_percent = to_float(soak_cfg.get("minDriftPercent"), SOAK_DEFAULT_MIN_DRIFT_PERCENT)
+        self.min_error_drift_points = to_float(soak_cfg.get("minErrorRateDriftPoints"), SOAK_DEFAULT_MIN_ERROR_DRIFT_POINTS)
+        self.min_requests = max(to_int(soak_cfg.get("minRequestsPerWindow"), SOAK_DEFAULT_MIN_REQUESTS), 1)
+        self.skip_seconds = skip_seconds
+        self.grace_seconds = grace_seconds
+        # resolucao que os graficos usariam para a duracao planejada: abaixo dela o detalhe por segundo e descartado
+        self.compact_seconds = max(1, math.ceil(planned_seconds / CHART_MAX_TIME_BUCKETS))
+        # o soak le a serie por endpoint segundo a segundo ao fechar janelas e compacta ela mesma depois
+        metrics.endpoint_series_adaptive = False
+
+        self.windows: list[dict[str, Any]] = []
+        self.next_window = 0
+        self.compacted_through = 0
+        self.previous_hits: Counter = Counter()
+        self.previous_errors: Counter = Counter()
+        self.snapshot_path = snapshot_path
+        self.pending_lines: list[str] = []
+        self.snapshots = 0
+
+    def _compact(self, series: dict[int, LatencyHistogram], until_second: int) -> None:
+        for second in [second for second in series if self.compacted_through <= second < until_second]:
+            block = second - second % self.compact_seconds
+            if block != second:
+                target = series.get(block)
+                if target is None:
+                    series[block] = series.pop(second)
+                else:
+                    target.merge(series.pop(second))
+
+    def close_windows(self, closed_second: int) -> None:
+        metrics = self.metrics
+        while self.next_window + self.window_seconds <= closed_second:
+            start = self.next_window
+            end = start + self.window_seconds
+            histogram = LatencyHistogram()
+            for second in range(start, end):
+                bucket = metrics.second_latency.get(second)
+                if bucket is not None:
+                    histogram.merge(bucket)
+
+            # requests/erros por endpoint via diferenca dos contadores acumulados (sem serie por segundo por endpoint)
+            endpoints = {}
+            for endpoint_key, series in metrics.endpoint_second_latency.items():
+                endpoint_histogram = LatencyHistogram()
+                for second in range(start, end):
+                    bucket = series.get(second)
+                    if bucket is not None:
+                        endpoint_histogram.merge(bucket)
+                hits = metrics.endpoint_hits[endpoint_key] - self.previous_hits[endpoint_key]
+                errors = metrics.endpoint_errors[endpoint_key] - self.previous_errors[endpoint_key]
+                if hits or endpoint_histogram.count:
+                    endpoints[endpoint_key] = [
+                        hits,
+                        errors,
+                        round(endpoint_histogram.percentile(95), 2) if endpoint_histogram.count >= self.min_requests else None,
+                    ]
+            self.previous_hits = Counter(metrics.endpoint_hits)
+            self.previous_errors = Counter(metrics.endpoint_errors)
+
+            requests = sum(metrics.requests_per_second.get(second, 0) for second in range(start, end))
+            errors = sum(metrics.errors_per_second.get(second, 0) for second in range(start, end))
+            window = {
+                "second": start,
+                "seconds": self.window_seconds,
+                "requests": requests,
+                "errors": errors,
+                "rps": round(requests / self.window_seconds, 2),
+                "p95Ms": round(histogram.percentile(95), 2) if histogram.count >= self.min_requests else None,
+                "errorRatePercent": round(errors / requests * 100.0, 3) if requests else 0.0,
+                "endpoints": endpoints,
+            }
+            self.windows.append(window)
+            self.pending_lines.append(json.dumps({"type": "window", "runId": self.run_id, **window}, separators=(",", ":")))
+            self.next_window = end
+
+        if self.compact_seconds > 1:
+            until_second = self.next_window - self.next_window % self.compact_seconds
+            if until_second > self.compacted_through:
+                self._compact(metrics.second_latency, until_second)
+                for series in metrics.endpoint_second_latency.values():
+                    self._compact(series, until_second)
+                self.compacted_through = until_second
+
+        if len(self.windows) > self.max_windows:
+            self._halve_windows()
+
+    def _halve_windows(self) -> None:
+        # mantem a memoria constante em runs muito longos: janelas vizinhas viram uma so com o dobro da duracao
+        merged = []
+        for index in range(0, len(self.windows) - 1, 2):
+            first, second = self.windows[index], self.windows[index + 1]
+            requests = first["requests"] + second["requests"]
+            errors = first["errors"] + second["errors"]
+            endpoints = {}
+            for endpoint_key in set(first["endpoints"]) | set(second["endpoints"]):
+                a = first["endpoints"].get(endpoint_key) or [0, 0, None]
+                b = second["endpoints"].get(endpoint_key) or [0, 0, None]
+                p95_values = [(value, weight) for value, weight in ((a[2], a[0]), (b[2], b[0])) if value is not None]
+                endpoints[endpoint_key] = [
+                    a[0] + b[0],
+                    a[1] + b[1],
+                    round(sum(value * weight for value, weight in p95_values) / max(sum(weight for _, weight in p95_values), 1), 2)
+                    if p95_values
+                    else None,
+                ]
+            p95_values = [(window["p95Ms"], window["requests"]) for window in (first, second) if window["p95Ms"] is not None]
+            merged.append(
+                {
+                    "second": first["second"],
+                    "seconds": first["seconds"] + second["seconds"],
+                    "requests": requests,
+                    "errors": errors,
+                    "rps": round(requests / (first["seconds"] + second["seconds"]), 2),
+                    "p95Ms": round(sum(value * weight for value, weight in p95_values) / max(sum(weight for _, weight in p95_values), 1), 2)
+                    if p95_values
+                    else None,
+                    "errorRatePercent": round(errors / requests * 100.0, 3) if requests else 0.0,
+                    "endpoints": endpoints,
+                }
             )
+        if len(self.windows) % 2:
+            merged.append(self.windows[-1])
+        self.windows = merged
+        self.window_seconds *= 2
+
+    def flush(self, trend: Optional[dict[str, Any]] = None) -> None:
+        if trend is not None:
+            self.pending_lines.append(
+                json.dumps({"type": "trend", "runId": self.run_id, "atUtc": utc_now_iso(), **trend}, separators=(",", ":"))
+            )
+        if self.snapshot_path is None or not self.pending_lines:
+            self.pending_lines.clear()
+            return
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.snapshot_path.open("a", encoding="utf-8") as handle:
+            handle.write("\n".join(self.pending_lines) + "\n")
+        self.pending_lines.clear()
+        self.snapshots += 1
+
+    async def run(self, stop_at: float, stop_event: asyncio.Event) -> None:
+        check_seconds = min(self.window_seconds / 2.0, 10.0)
+        next_snapshot = time.perf_counter() + self.snapshot_seconds
+        while time.perf_counter() < stop_at and not stop_event.is_set():
+            await sleep_until_stopped(min(check_seconds, max(stop_at - time.perf_counter(), 0.0)), stop_event)
+            # requests sao agrupados pelo segundo de inicio: espera o timeout antes de fechar uma janela
+            elapsed = time.time() - self.metrics.started_epoch
+            self.close_windows(int(elapsed - self.grace_seconds))
+            if time.perf_counter() >= next_snapshot:
+                next_snapshot += self.snapshot_seconds
+                trends = await asyncio.to_thread(self.build_trends)
+                self.flush({"overall": trends["overall"], "drifts": trends["drifts"]})
+
+    def _classify(self, scope: str, metric: str, trend: Optional[dict[str, Any]], *, absolute: bool) -> Optional[dict[str, Any]]:
+        if trend is None or trend["pValue"] >= self.alpha or trend["change"] <= 0:
+            return None
+        if absolute:
+            if trend["change"] < self.min_error_drift_points:
+                return None
+            change_label = {"changePoints": trend["change"]}
+        else:
+            baseline = abs(trend["median"]) or abs(trend["first"])
+            change_percent = trend["change"] / baseline * 100.0 if baseline else 0.0
+            if change_percent < self.min_drift_percent:
+                return None
+            change_label = {"changePercent": round(change_percent, 2)}
+        return {
+            "scope": scope,
+            "metric": metric,
+            "slopePerHour": trend["slopePerHour"],
+            "pValue": trend["pValue"],
+            "from": trend["first"],
+            "to": trend["last"],
+            **change_label,
+        }
 
+    def build_trends(self, server_series: Optional[dict[str, dict[int, float]]] = None) -> dict[str, Any]:
+        windows = [window for window in self.windows if window["second"] >= self.skip_seconds]
 
-def save_reports(report: dict[str, Any], output_dir: Path) -> tuple[Path, Path]:
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    run_id = report.get("runId") or str(uuid.uuid4())
-    json_path = output_dir / f"loadtest-report-{run_id}.json"
-    txt_path = output_dir / f"loadtest-summary-{run_id}.txt"
+        def points(values: Iterator[tuple[dict[str, Any], Optional[float]]]) -> list[tuple[float, float]]:
+            return [(window["second"] + window["seconds"] / 2.0, value) for window, value in values if value is not None]
 
-    json_text = json.dumps(report, indent=2, ensure_ascii=False)
-    json_path.write_text(json_text, encoding="utf-8")
+        drifts = []
+        overall = {
+            "p95Ms": trend_test(points((window, window["p95Ms"]) for window in windows)),
+            "errorRatePercent": trend_test(
+                points((window, window["errorRatePercent"] if window["requests"] else None) for window in windows)
+            ),
+        }
+        drifts.extend(
+            item
+            for item in (
+                self._classify("total", "p95Ms", overall["p95Ms"], absolute=False),
+                self._classify("total", "errorRatePercent", overall["errorRatePercent"], absolute=True),
+            )
+            if item is not None
+        )
 
-    lines = [
-        f"Run ID: {report.get('runId')}",
-        f"Scenario: {report.get('scenario')}",
-        f"Base URL: {report.get('baseUrl')}",
-        f"Started: {report.get('startedAtUtc')}",
-        f"Finished: {report.get('finishedAtUtc')}",
-        f"Duration(s): {report.get('durationSeconds')}",
-        "",
-        f"Total requests: {report.get('summary', {}).get('totalRequests', 0)}",
-        f"RPS avg: {report.get('summary', {}).get('rpsAvg', 0)}",
-        f"RPS peak: {report.get('summary', {}).get('rpsPeak', 0)}",
-        f"Error rate: {report.get('summary', {}).get('errorRatePercent', 0)}%",
-        "",
-        "Top endpoints by hits:",
-    ]
+        endpoints = []
+        endpoint_keys = sorted({key for window in windows for key in window["endpoints"]})
+        for endpoint_key in endpoint_keys:
+            values = [(window, window["endpoints"].get(endpoint_key)) for window in windows]
+            p95 = trend_test(points((window, item[2] if item else None) for window, item in values))
+            error_rate = trend_test(
+                points(
+                    (window, (item[1] / item[0] * 100.0) if item and item[0] >= self.min_requests else None)
+                    for window, item in values
+                )
+            )
+            endpoint_drifts = [
+                item
+                for item in (
+                    self._classify(endpoint_key, "p95Ms", p95, absolute=False),
+                    self._classify(endpoint_key, "errorRatePercent", error_rate, absolute=True),
+                )
+                if item is not None
+            ]
+            drifts.extend(endpoint_drifts)
+            endpoints.append({"endpoint": endpoint_key, "p95Ms": p95, "errorRatePercent": error_rate, "drift": bool(endpoint_drifts)})
+
+        # series do servidor (serverMetrics) na mesma grade de janelas: memoria crescente aparece aqui
+        server = []
+        for name, series in sorted((server_series or {}).items()):
+            per_window: dict[int, list[float]] = defaultdict(list)
+            for second, value in series.items():
+                if second >= self.skip_seconds:
+                    per_window[second - second % self.window_seconds].append(value)
+            trend = trend_test(
+                [(start + self.window_seconds / 2.0, sum(values) / len(values)) for start, values in sorted(per_window.items())]
+            )
+            drift = self._classify(f"servidor {name}", name.rsplit(".", 1)[-1], trend, absolute=False)
+            if drift is not None and not name.endswith("status"):
+                drifts.append(drift)
+            server.append({"metric": name, "trend": trend, "drift": drift is not None and not name.endswith("status")})
+
+        drifts.sort(key=lambda item: item["pValue"])
+        return {"overall": overall, "endpoints": endpoints, "server": server, "drifts": drifts}
+
+    def build(self, elapsed_seconds: float, server_series: Optional[dict[str, dict[int, float]]] = None) -> dict[str, Any]:
+        # fim do run: todos os requests ja terminaram, nao precisa da folga do timeout
+        self.close_windows(int(elapsed_seconds))
+        trends = self.build_trends(server_series)
+        self.flush({"overall": trends["overall"], "drifts": trends["drifts"], "final": True})
+        return {
+            "windowSeconds": self.window_seconds,
+            "windows": len(self.windows),
+            "skippedSeconds": self.skip_seconds,
+            "compactSeconds": self.compact_seconds,
+            "alpha": self.alpha,
+            "minDriftPercent": self.min_drift_percent,
+            "minErrorRateDriftPoints": self.min_error_drift_points,
+            "snapshotPath": str(self.snapshot_path) if self.snapshot_path is not None else None,
+            "snapshots": self.snapshots,
+            "series": {
+                "second": [window["second"] for window in self.windows],
+                "rps": [window["rps"] for window in self.windows],
+                "p95Ms": [window["p95Ms"] for window in self.windows],
+                "errorRatePercent": [window["errorRatePercent"] for window in self.windows],
+            },
+            **trends,
+        }
 
-    for item in report.get("topEndpointsByHits", []):
-        lines.append(
-            f"- {item.get('endpoint')} | hits={item.get('hits')} "
-            f"p95={item.get('p95LatencyMs')}ms err={item.get('errorRatePercent')}%"
-        )
 
-    lines.append("\nTop errors:")
-    for item in report.get("topErrors", []):
-        lines.append(f"- {item.get('count')}x {item.get('message')}")
+@dataclass
+class SpikeBurst:
+    index: int
+    planned_offset_seconds: float
+    gate: asyncio.Event = field(default_factory=asyncio.Event)
+    opened_at: float = 0.0
+    ends_at: float = 0.0
+    start_second: Optional[int] = None
+    end_second: Optional[int] = None
+    activation_ms: list[float] = field(default_factory=list)
+
+
+class SpikePlan:
+    def __init__(
+        self,
+        spike_cfg: dict[str, Any],
+        *,
+        vus: int,
+        scenario_cfg: dict[str, Any],
+        global_cfg: dict[str, Any],
+        endpoints: list[dict[str, Any]],
+    ) -> None:
+        self.baseline_vus = vus
+        self.multiplier = max(to_float(spike_cfg.get("multiplier"), SPIKE_DEFAULT_MULTIPLIER), 1.0)
+        self.spike_vus = max(to_int(spike_cfg.get("vus"), round(vus * (self.multiplier - 1.0))), 0)
+        if self.spike_vus <= 0:
+            raise ValueError("Executor spike: use 'spike.multiplier' > 1 ou 'spike.vus' > 0.")
+        self.baseline_seconds = max(to_float(spike_cfg.get("baselineSeconds"), SPIKE_DEFAULT_BASELINE_SECONDS), 2.0)
+        self.spike_seconds = max(to_float(spike_cfg.get("spikeSeconds"), SPIKE_DEFAULT_SPIKE_SECONDS), 1.0)
+        self.recovery_seconds = max(to_float(spike_cfg.get("recoverySeconds"), SPIKE_DEFAULT_RECOVERY_SECONDS), 1.0)
+        self.count = max(to_int(spike_cfg.get("count"), 1), 1)
+        self.window_seconds = max(to_int(spike_cfg.get("windowSeconds"), SPIKE_DEFAULT_WINDOW_SECONDS), 1)
+        self.stable_seconds = max(to_int(spike_cfg.get("stableSeconds"), SPIKE_DEFAULT_STABLE_SECONDS), 0)
+        self.p95_tolerance_percent = to_float(spike_cfg.get("p95TolerancePercent"), SPIKE_DEFAULT_P95_TOLERANCE_PERCENT)
+        self.error_tolerance_points = to_float(spike_cfg.get("errorRateTolerancePoints"), SPIKE_DEFAULT_ERROR_TOLERANCE_POINTS)
+
+        # sem endpoints/flows proprios, os VUs do pico usam o mesmo mix do cenario
+        selection = spike_cfg.get("endpoints")
+        self.endpoints = select_endpoints(endpoints, selection, "Executor spike") if selection is not None else []
+        self.flows = compile_flows(global_cfg, endpoints, {"flows": spike_cfg.get("flows")})
+        if self.endpoints and not self.flows and not any(to_float(endpoint.get("weight"), 0.0) > 0 for endpoint in self.endpoints):
+            raise ValueError("Executor spike: 'spike.endpoints' precisa de ao menos um endpoint com weight > 0.")
+        self.flow_weights = list(itertools.accumulate(flow.weight for flow in self.flows))
+        has_think = any(key in spike_cfg for key in ("thinkTime", "thinkTimeMinMs", "thinkTimeMaxMs"))
+        self.think_model = ThinkTimeModel(spike_cfg if has_think else scenario_cfg)
+
+        # baseline medido na segunda metade da fase inicial (a primeira metade faz ramp-up e o login dos VUs do pico)
+        ramp_up_seconds = max(to_float(scenario_cfg.get("rampUpSeconds"), 0.0), 0.0)
+        warmup_seconds = max(to_float(scenario_cfg.get("warmupSeconds"), 0.0), 0.0)
+        self.baseline_from = int(min(max(self.baseline_seconds / 2.0, ramp_up_seconds + warmup_seconds), self.baseline_seconds - 1))
+        self.baseline_to = int(self.baseline_seconds)
+        self.bursts = [
+            SpikeBurst(index=index, planned_offset_seconds=self.baseline_seconds + index * (self.spike_seconds + self.recovery_seconds))
+            for index in range(self.count)
+        ]
 
-    txt_path.write_text("\n".join(lines), encoding="utf-8")
+    @property
+    def duration_seconds(self) -> int:
+        return int(math.ceil(self.baseline_seconds + self.count * (self.spike_seconds + self.recovery_seconds)))
 
-    latest_json = output_dir / "loadtest-report-latest.json"
-    latest_txt = output_dir / "loadtest-summary-latest.txt"
-    latest_json.write_text(json_text, encoding="utf-8")
-    latest_txt.write_text("\n".join(lines), encoding="utf-8")
+    def prewarm_delay(self, spike_index: int) -> float:
+        return (self.baseline_seconds / 2.0) * spike_index / max(self.spike_vus, 1)
 
-    html_text = render_html_report(report)
-    html_path = output_dir / f"loadtest-report-{run_id}.html"
-    html_path.write_text(html_text, encoding="utf-8")
-    (output_dir / "loadtest-report-latest.html").write_text(html_text, encoding="utf-8")
+    async def control(self, run_started: float, started_epoch: float, stop_event: asyncio.Event) -> None:
+        try:
+            for burst in self.bursts:
+                await sleep_until_stopped(run_started + burst.planned_offset_seconds - time.perf_counter(), stop_event)
+                if stop_event.is_set():
+                    return
+                burst.opened_at = time.perf_counter()
+                burst.ends_at = burst.opened_at + self.spike_seconds
+                burst.start_second = int(time.time() - started_epoch)
+                burst.gate.set()
+                await sleep_until_stopped(self.spike_seconds, stop_event)
+                burst.end_second = int(math.ceil(time.time() - started_epoch))
+        finally:
+            # libera VUs ainda esperando (parada antecipada): eles checam o stop_event e saem
+            for burst in self.bursts:
+                burst.gate.set()
 
-    return json_path, txt_path
+    def _window(self, metrics: MetricsCollector, from_second: int, to_second: int) -> dict[str, Any]:
+        window = metrics.build_window(from_second, max(to_second, from_second + 1))
+        return {
+            "fromSecond": window["fromSecond"],
+            "toSecond": window["toSecond"],
+            "requests": window["requests"],
+            "rps": window["rps"],
+            "errorRatePercent": window["errorRatePercent"],
+            "latencyMs": window["latencyMs"],
+        }
 
+    def _recovery(
+        self,
+        metrics: MetricsCollector,
+        end_second: int,
+        until_second: int,
+        p95_limit: float,
+        error_limit: float,
+    ) -> tuple[Optional[int], Optional[int]]:
+        p95_ok = []
+        error_ok = []
+        for second in range(end_second, max(until_second - self.window_seconds + 1, end_second)):
+            histogram = LatencyHistogram()
+            errors = 0
+            for offset in range(self.window_seconds):
+                bucket = metrics.second_latency.get(second + offset)
+                if bucket is not None:
+                    histogram.merge(bucket)
+                errors += metrics.errors_per_second.get(second + offset, 0)
+            p95_ok.append(histogram.count > 0 and histogram.percentile(95) <= p95_limit)
+            error_ok.append(histogram.count > 0 and errors / histogram.count * 100.0 <= error_limit)
+
+        def first_stable(flags: list[bool]) -> Optional[int]:
+            # recuperado = dentro do limite e assim permanece por stableSeconds
+            for index in range(len(flags)):
+                if all(flags[index : index + self.stable_seconds + 1]) and index + self.stable_seconds < len(flags):
+                    return index
+            return None
 
-async def authenticate_publish_token(
-    *,
-    login_url: str,
-    email: str,
-    password: str,
-    token_field: str,
+        return first_stable(p95_ok), first_stable(error_ok)
+
+    def build(self, metrics: MetricsCollector, elapsed_seconds: float) -> dict[str, Any]:
+        baseline = self._window(metrics, self.baseline_from, self.baseline_to)
+        p95_limit = baseline["latencyMs"]["p95"] * (1.0 + self.p95_tolerance_percent / 100.0)
+        error_limit = baseline["errorRatePercent"] + self.error_tolerance_points
+        end_of_run = int(elapsed_seconds)
+
+        bursts = []
+        for position, burst in enumerate(self.bursts):
+            if burst.start_second is None:
+                continue
+            end_second = burst.end_second if burst.end_second is not None else end_of_run
+            next_start = next((item.start_second for item in self.bursts[position + 1 :] if item.start_second is not None), None)
+            until_second = next_start if next_start is not None else end_of_run
+            during = self._window(metrics, burst.start_second, end_second)
+            p95_recovery, error_recovery = self._recovery(metrics, end_second, until_second, p95_limit, error_limit)
+            activation = sorted(burst.activation_ms)
+            bursts.append(
+                {
+                    "index": burst.index + 1,
+                    "startSecond": burst.start_second,
+                    "endSecond": end_second,
+                    "activation": {
+                        "vus": len(activation),
+                        "p50Ms": round(percentile(activation, 50), 2) if activation else None,
+                        "p95Ms": round(percentile(activation, 95), 2) if activation else None,
+                        "maxMs": round(activation[-1], 2) if activation else None,
+                    },
+                    "during": during,
+                    "rpsRatio": round(during["rps"] / baseline["rps"], 2) if baseline["rps"] else None,
+                    "p95Ratio": round(during["latencyMs"]["p95"] / baseline["latencyMs"]["p95"], 2) if baseline["latencyMs"]["p95"] else None,
+                    "after": self._window(metrics, end_second, until_second),
+                    "p95RecoverySeconds": p95_recovery,
+                    "errorRateRecoverySeconds": error_recovery,
+                    "recoverySeconds": (
+                        max(p95_recovery, error_recovery) if p95_recovery is not None and error_recovery is not None else None
+                    ),
+                }
+            )
+
+        return {
+            "baselineVus": self.baseline_vus,
+            "spikeVus": self.spike_vus,
+            "multiplier": round((self.baseline_vus + self.spike_vus) / max(self.baseline_vus, 1), 2),
+            "spikeSeconds": self.spike_seconds,
+            "recoverySeconds": self.recovery_seconds,
+            "baseline": baseline,
+            "recoveryCriteria": {
+                "p95LimitMs": round(p95_limit, 2),
+                "errorRateLimitPercent": round(error_limit, 3),
+                "windowSeconds": self.window_seconds,
+                "stableSeconds": self.stable_seconds,
+            },
+            "bursts": bursts,
+        }
+
+
+class HubConnectionError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def mask_websocket_payload(payload: bytes, mask: bytes) -> bytes:
+    if not payload:
+        return payload
+    length = len(payload)
+    key = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+
+
+def encode_websocket_frame(opcode: int, payload: bytes, masked: bool) -> bytes:
+    length = len(payload)
+    mask_bit = 0x80 if masked else 0
+    header = bytearray([0x80 | opcode])
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 65536:
+        header.append(mask_bit | 126)
+        header += struct.pack("!H", length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack("!Q", length)
+    if not masked:
+        return bytes(header) + payload
+    mask = os.urandom(4)
+    return bytes(header) + mask + mask_websocket_payload(payload, mask)
+
+
+async def read_websocket_frame(reader: asyncio.StreamReader) -> tuple[bool, int, bytes]:
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    if length > WEBSOCKET_MAX_MESSAGE_BYTES:
+        raise HubConnectionError(f"frame WebSocket de {length} bytes excede o limite")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length) if length else b""
+    if mask is not None:
+        payload = mask_websocket_payload(payload, mask)
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+def websocket_accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode("ascii")).digest()).decode("ascii")
+
+
+class WebSocketConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, *, client: bool) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.masked = client
+        self.closed = False
+        self.close_code: Optional[int] = None
+
+    async def send_text(self, text: str) -> None:
+        self.writer.write(encode_websocket_frame(WEBSOCKET_OP_TEXT, text.encode("utf-8"), self.masked))
+        await self.writer.drain()
+
+    async def receive_text(self) -> Optional[str]:
+        fragments: list[bytes] = []
+        while True:
+            fin, opcode, payload = await read_websocket_frame(self.reader)
+            if opcode == WEBSOCKET_OP_PING:
+                self.writer.write(encode_websocket_frame(WEBSOCKET_OP_PONG, payload, self.masked))
+                continue
+            if opcode == WEBSOCKET_OP_PONG:
+                continue
+            if opcode == WEBSOCKET_OP_CLOSE:
+                self.close_code = struct.unpack("!H", payload[:2])[0] if len(payload) >= 2 else 1005
+                await self.close(self.close_code)
+                return None
+            fragments.append(payload)
+            if fin:
+                return b"".join(fragments).decode("utf-8")
+
+    async def close(self, code: int = 1000) -> None:
+        if not self.closed:
+            self.closed = True
+            try:
+                self.writer.write(encode_websocket_frame(WEBSOCKET_OP_CLOSE, struct.pack("!H", code), self.masked))
+                await self.writer.drain()
+            except (ConnectionError, RuntimeError):
+                pass
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+async def open_websocket(
+    url: str,
+    headers: dict[str, str],
+    ssl_context: Optional[ssl.SSLContext],
     timeout_seconds: float,
-    insecure_tls: bool,
-) -> Optional[str]:
-    payload = {
-        "email": email,
-        "password": password,
-    }
-    headers = {
-        "Content-Type": "application/json",
-        "X-Client-Id": "LT-PUBLISHER",
-        "X-Correlation-Id": str(uuid.uuid4()),
-    }
+) -> WebSocketConnection:
+    parts = urllib.parse.urlsplit(url)
+    secure = parts.scheme in ("wss", "https")
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parts.hostname, parts.port or (443 if secure else 80), ssl=(ssl_context if secure else None)),
+        timeout=timeout_seconds,
+    )
 
-    async with httpx.AsyncClient(
-        timeout=httpx.Timeout(timeout_seconds),
-        verify=not insecure_tls,
-    ) as client:
-        response = await client.post(login_url, json=payload, headers=headers)
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    request_lines = [
+        f"GET {target} HTTP/1.1",
+        f"Host: {parts.netloc}",
+        "Upgrade: websocket",
+        "Connection: Upgrade",
+        f"Sec-WebSocket-Key: {key}",
+        "Sec-WebSocket-Version: 13",
+        *(f"{name}: {value}" for name, value in headers.items()),
+    ]
+    try:
+        writer.write(("\r\n".join(request_lines) + "\r\n\r\n").encode("latin-1"))
+        raw = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=timeout_seconds)
+        status_line, *header_lines = raw.decode("latin-1").rstrip("\r\n").split("\r\n")
+        status_parts = status_line.split(" ", 2)
+        status_code = int(status_parts[1]) if len(status_parts) > 1 and status_parts[1].isdigit() else None
+        if status_code != 101:
+            raise HubConnectionError(f"upgrade WebSocket recusado: {status_line}", status_code)
+        response_headers = {
+            name.strip().lower(): value.strip()
+            for name, _, value in (line.partition(":") for line in header_lines)
+        }
+        if response_headers.get("sec-websocket-accept") != websocket_accept_key(key):
+            raise HubConnectionError("Sec-WebSocket-Accept invalido", status_code)
+    except BaseException:
+        writer.close()
+        raise
+    return WebSocketConnection(reader, writer, client=True)
+
+
+def hub_websocket_url(hub_url: str, connection_token: str, access_token: Optional[str]) -> str:
+    parts = urllib.parse.urlsplit(hub_url)
+    query = urllib.parse.parse_qsl(parts.query)
+    query.append(("id", connection_token))
+    if access_token:
+        query.append(("access_token", access_token))
+    scheme = "wss" if parts.scheme == "https" else "ws"
+    return urllib.parse.urlunsplit((scheme, parts.netloc, parts.path, urllib.parse.urlencode(query), ""))
+
+
+class SignalRConnection:
+    def __init__(self, websocket: WebSocketConnection, on_invocation: Callable[[str, list[Any]], None]) -> None:
+        self.websocket = websocket
+        self.on_invocation = on_invocation
+        self.pending: dict[str, asyncio.Future[Any]] = {}
+        self.invocation_counter = 0
+        self.close_reason: Optional[str] = None
+        self.closing = False
+        self.reader_task: Optional[asyncio.Task[None]] = None
+        self.keepalive_task: Optional[asyncio.Task[None]] = None
+
+    @classmethod
+    async def open(
+        cls,
+        *,
+        http_client: httpx.AsyncClient,
+        hub_url: str,
+        headers: dict[str, str],
+        access_token: Optional[str],
+        ssl_context: Optional[ssl.SSLContext],
+        timeout_seconds: float,
+        on_invocation: Callable[[str, list[Any]], None],
+    ) -> "SignalRConnection":
+        response = await http_client.post(f"{hub_url}/negotiate?negotiateVersion=1", headers=headers)
         if response.status_code >= 400:
-            print(
-                f"[publish] Falha no login admin ({response.status_code}) em {login_url}: "
-                f"{truncate_text(response.text or '', 220)}"
+            raise HubConnectionError(f"negotiate HTTP {response.status_code}", response.status_code)
+        negotiate = response.json()
+        if negotiate.get("error"):
+            raise HubConnectionError(f"negotiate: {negotiate.get('error')}", response.status_code)
+        if negotiate.get("url"):
+            raise HubConnectionError("negotiate redirecionou para outro servico (nao suportado)", response.status_code)
+        transports = [item.get("transport") for item in negotiate.get("availableTransports") or []]
+        if "WebSockets" not in transports:
+            raise HubConnectionError(f"hub sem transporte WebSockets ({', '.join(map(str, transports))})", response.status_code)
+
+        connection_token = str(negotiate.get("connectionToken") or negotiate.get("connectionId") or "")
+        websocket_headers = {
+            name: value
+            for name, value in headers.items()
+            if name.lower() not in ("accept", "content-type")
+        }
+        websocket = await open_websocket(
+            hub_websocket_url(hub_url, connection_token, access_token),
+            websocket_headers,
+            ssl_context,
+            timeout_seconds,
+        )
+        try:
+            await websocket.send_text(json.dumps({"protocol": "json", "version": 1}) + SIGNALR_RECORD_SEPARATOR)
+            handshake = await asyncio.wait_for(websocket.receive_text(), timeout=timeout_seconds)
+            if handshake is None:
+                raise HubConnectionError(f"hub fechou a conexao no handshake (close {websocket.close_code})", 101)
+            first, _, remaining = handshake.partition(SIGNALR_RECORD_SEPARATOR)
+            if json.loads(first or "{}").get("error"):
+                raise HubConnectionError(f"handshake: {json.loads(first).get('error')}", 101)
+            connection = cls(websocket, on_invocation)
+            # close (type 7) ou JSON invalido colado no handshake tambem fecham o websocket
+            if remaining:
+                connection.dispatch(remaining)
+        except BaseException:
+            await websocket.close()
+            raise
+
+        connection.reader_task = asyncio.create_task(connection.read_loop())
+        connection.keepalive_task = asyncio.create_task(connection.keepalive())
+        return connection
+
+    def dispatch(self, text: str) -> None:
+        for record in text.split(SIGNALR_RECORD_SEPARATOR):
+            if not record:
+                continue
+            message = json.loads(record)
+            message_type = message.get("type")
+            if message_type == 1:
+                self.on_invocation(str(message.get("target")), message.get("arguments") or [])
+            elif message_type == 3:
+                future = self.pending.pop(str(message.get("invocationId")), None)
+                if future is not None and not future.done():
+                    if message.get("error"):
+                        future.set_exception(HubConnectionError(str(message.get("error"))))
+                    else:
+                        future.set_result(message.get("result"))
+            elif message_type == 7:
+                self.close_reason = str(message.get("error") or "close do servidor")
+                raise ConnectionResetError(self.close_reason)
+
+    async def read_loop(self) -> None:
+        try:
+            while True:
+                text = await self.websocket.receive_text()
+                if text is None:
+                    self.close_reason = self.close_reason or f"close {self.websocket.close_code}"
+                    return
+                self.dispatch(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self.close_reason = self.close_reason or f"{type(exc).__name__}: {exc}"
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionResetError(self.close_reason or "conexao encerrada"))
+            self.pending.clear()
+
+    async def keepalive(self) -> None:
+        ping = json.dumps({"type": 6}) + SIGNALR_RECORD_SEPARATOR
+        try:
+            while True:
+                await asyncio.sleep(SIGNALR_KEEPALIVE_SECONDS)
+                await self.websocket.send_text(ping)
+        except (ConnectionError, RuntimeError):
+            return
+
+    async def invoke(self, target: str, arguments: list[Any], timeout_seconds: float) -> Any:
+        self.invocation_counter += 1
+        invocation_id = str(self.invocation_counter)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[invocation_id] = future
+        message = {"type": 1, "invocationId": invocation_id, "target": target, "arguments": arguments}
+        try:
+            await self.websocket.send_text(json.dumps(message, ensure_ascii=False) + SIGNALR_RECORD_SEPARATOR)
+            return await asyncio.wait_for(future, timeout=timeout_seconds)
+        finally:
+            self.pending.pop(invocation_id, None)
+
+    @property
+    def dropped(self) -> bool:
+        return self.reader_task is not None and self.reader_task.done() and not self.closing
+
+    async def close(self) -> None:
+        self.closing = True
+        for task in (self.keepalive_task, self.reader_task):
+            if task is not None:
+                task.cancel()
+        await self.websocket.close()
+
+
+def resolve_hub_argument(value: Any, variables: dict[str, Any]) -> Any:
+    if isinstance(value, str):
+        whole = FLOW_TEMPLATE_PATTERN.fullmatch(value)
+        if whole:
+            return variables.get(whole.group(1), value)
+        return FLOW_TEMPLATE_PATTERN.sub(lambda match: str(variables.get(match.group(1), match.group(0))), value)
+    if isinstance(value, list):
+        return [resolve_hub_argument(item, variables) for item in value]
+    if isinstance(value, dict):
+        return {key: resolve_hub_argument(item, variables) for key, item in value.items()}
+    return value
+
+
+def create_ssl_context(insecure_tls: bool) -> ssl.SSLContext:
+    context = ssl.create_default_context()
+    if insecure_tls:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class HubClient:
+    def __init__(
+        self,
+        hub_cfg: dict[str, Any],
+        *,
+        base_url: str,
+        metrics: MetricsCollector,
+        timeout_seconds: float,
+        ssl_context: ssl.SSLContext,
+        http_client: httpx.AsyncClient,
+    ) -> None:
+        self.path = "/" + str(hub_cfg.get("hub") or "/chatHub").strip("/")
+        self.hub_url = str(hub_cfg.get("baseUrl") or base_url).rstrip("/") + self.path
+        self.connections = max(to_int(hub_cfg.get("connections"), 0), 0)
+        self.auth = bool(hub_cfg.get("auth", True))
+        self.join = hub_cfg.get("join") or None
+        self.send = hub_cfg.get("send") or None
+        self.receive = str(hub_cfg.get("receive") or "ReceiveChatMessage")
+        self.messages_per_minute = max(to_float(hub_cfg.get("messagesPerMinute"), 0.0), 0.0)
+        self.message_bytes = max(to_int(hub_cfg.get("messageBytes"), 64), 0)
+        self.rooms = max(to_int(hub_cfg.get("rooms"), 1), 1)
+        self.feeder = hub_cfg.get("feeder")
+        self.reconnect = bool(hub_cfg.get("reconnect", True))
+        self.metrics = metrics
+        self.timeout_seconds = timeout_seconds
+        self.ssl_context = ssl_context
+        self.http_client = http_client
+
+        self.attempts = 0
+        self.established = 0
+        self.reconnects = 0
+        self.open = 0
+        self.peak_open = 0
+        self.drops = 0
+        self.drop_reasons: Counter = Counter()
+        self.messages_sent = 0
+        self.messages_received = 0
+        self.fanout = LatencyHistogram()
+
+    def on_invocation(self, target: str, arguments: list[Any]) -> None:
+        if target != self.receive:
+            return
+        self.messages_received += 1
+        match = SIGNALR_MARKER_PATTERN.search(json.dumps(arguments, ensure_ascii=False))
+        if match:
+            self.fanout.record(max(time.time() * 1000.0 - float(match.group(1)), 0.0))
+
+    def build_message(self, session: VuSession) -> str:
+        text = f"[lt:{time.time() * 1000.0:.3f}] {session.client_id} #{self.messages_sent + 1}"
+        return text.ljust(self.message_bytes, ".")
+
+    async def connect(self, session: VuSession) -> Optional[SignalRConnection]:
+        self.attempts += 1
+        correlation_id = str(uuid.uuid4())
+        headers = session._build_headers(correlation_id, {"auth": "bearer" if self.auth else "none"}, False)
+        timestamp = time.time()
+        start = time.perf_counter()
+        try:
+            connection = await SignalRConnection.open(
+                http_client=self.http_client,
+                hub_url=self.hub_url,
+                headers=headers,
+                access_token=(session.access_token if self.auth else None),
+                ssl_context=self.ssl_context,
+                timeout_seconds=self.timeout_seconds,
+                on_invocation=self.on_invocation,
+            )
+        except Exception as exc:
+            self.metrics.record(
+                endpoint_key=f"WS {self.path} connect",
+                status_code=getattr(exc, "status_code", None),
+                duration_ms=(time.perf_counter() - start) * 1000.0,
+                timestamp_epoch=timestamp,
+                error_type=("hub_connect" if isinstance(exc, HubConnectionError) else type(exc).__name__),
+                error_message=f"{self.path}: {exc}",
+                vu_index=session.vu_index,
+                correlation_id=correlation_id,
             )
             return None
 
+        self.metrics.record(
+            endpoint_key=f"WS {self.path} connect",
+            status_code=101,
+            duration_ms=(time.perf_counter() - start) * 1000.0,
+            timestamp_epoch=timestamp,
+            vu_index=session.vu_index,
+            correlation_id=correlation_id,
+        )
+        self.established += 1
+        return connection
+
+    async def invoke(
+        self,
+        session: VuSession,
+        connection: SignalRConnection,
+        invocation: dict[str, Any],
+        variables: dict[str, Any],
+    ) -> None:
+        target = str(invocation.get("target") or "")
+        arguments = resolve_hub_argument(list(invocation.get("arguments") or []), variables)
+        timestamp = time.time()
+        start = time.perf_counter()
+        error: Optional[Exception] = None
         try:
-            response_json = response.json()
-        except ValueError:
-            print(f"[publish] Resposta de login invalida em {login_url}.")
-            return None
+            await connection.invoke(target, arguments, self.timeout_seconds)
+        except asyncio.TimeoutError:
+            error = TimeoutError(f"sem completion em {self.timeout_seconds:g}s")
+        except (HubConnectionError, ConnectionError) as exc:
+            error = exc
+        self.metrics.record(
+            endpoint_key=f"WS {self.path} {target}",
+            status_code=(None if error else 200),
+            duration_ms=(time.perf_counter() - start) * 1000.0,
+            timestamp_epoch=timestamp,
+            error_type=(("timeout" if isinstance(error, TimeoutError) else "hub_error") if error else None),
+            error_message=(f"{target}: {error}" if error else None),
+            vu_index=session.vu_index,
+        )
 
-        token_value = response_json.get(token_field)
-        if not token_value:
-            print(f"[publish] Campo de token '{token_field}' nao encontrado na resposta de login.")
-            return None
+    async def run(self, session: VuSession, connection_index: int, stop_at: float, stop_waiter: asyncio.Future[Any]) -> None:
+        variables: dict[str, Any] = {
+            "clientId": session.client_id,
+            "tenantId": session.tenant_id,
+            "vu": connection_index,
+            "room": connection_index % self.rooms,
+        }
+        if self.feeder:
+            variables.update(session.next_feeder_record(str(self.feeder)) or {})
+        interval = (60.0 / self.messages_per_minute) if self.send and self.messages_per_minute > 0 else None
+        connected_before = False
+
+        while time.perf_counter() < stop_at and not stop_waiter.done():
+            if self.auth and session.auth_enabled and not await session.ensure_login():
+                await asyncio.wait({stop_waiter}, timeout=max(min(1.0, stop_at - time.perf_counter()), 0.0))
+                continue
+
+            connection = await self.connect(session)
+            if connection is None:
+                if not self.reconnect:
+                    return
+                await asyncio.wait({stop_waiter}, timeout=max(min(1.0, stop_at - time.perf_counter()), 0.0))
+                continue
+
+            if connected_before:
+                self.reconnects += 1
+            connected_before = True
+            self.open += 1
+            self.metrics.open_connections += 1
+            self.peak_open = max(self.peak_open, self.open)
+            opened_at = time.perf_counter()
+            try:
+                if self.join:
+                    await self.invoke(session, connection, self.join, variables)
+                next_send = time.perf_counter() + (session.rng.uniform(0, interval) if interval else 0.0)
+                while not stop_waiter.done() and not connection.dropped:
+                    now = time.perf_counter()
+                    if now >= stop_at:
+                        break
+                    wait_seconds = min(next_send, stop_at) - now if interval else stop_at - now
+                    if wait_seconds > 0:
+                        await asyncio.wait({connection.reader_task, stop_waiter}, timeout=wait_seconds)
+                        continue
+                    self.messages_sent += 1
+                    await self.invoke(session, connection, self.send, {**variables, "message": self.build_message(session)})
+                    next_send = max(next_send + interval, time.perf_counter())
+                dropped = connection.dropped
+            finally:
+                self.open -= 1
+                self.metrics.open_connections -= 1
+                await connection.close()
+
+            if not dropped:
+                return
+            reason = connection.close_reason or "desconhecido"
+            self.drops += 1
+            self.drop_reasons[normalize_error_message(reason)] += 1
+            self.metrics.record(
+                endpoint_key=f"WS {self.path} drop",
+                status_code=None,
+                duration_ms=(time.perf_counter() - opened_at) * 1000.0,
+                timestamp_epoch=time.time(),
+                error_type="ws_drop",
+                error_message=f"{self.path}: conexao encerrada pelo servidor ({reason})",
+                vu_index=session.vu_index,
+            )
+            if not self.reconnect:
+                return
+            await asyncio.wait({stop_waiter}, timeout=max(min(1.0, stop_at - time.perf_counter()), 0.0))
 
-        return str(token_value)
+    def describe(self) -> dict[str, Any]:
+        return {
+            "hub": self.path,
+            "url": self.hub_url,
+            "connections": self.connections,
+            "attempts": self.attempts,
+            "established": self.established,
+            "reconnects": self.reconnects,
+            "peakOpen": self.peak_open,
+            "drops": self.drops,
+            "dropReasons": [{"reason": reason, "count": count} for reason, count in self.drop_reasons.most_common(10)],
+            "messagesPerMinute": self.messages_per_minute,
+            "messagesSent": self.messages_sent,
+            "messagesReceived": self.messages_received,
+            "fanoutLatencyMs": {
+                "samples": self.fanout.count,
+                "p50": round(self.fanout.percentile(50), 2),
+                "p95": round(self.fanout.percentile(95), 2),
+                "p99": round(self.fanout.percentile(99), 2),
+                "max": round(self.fanout.max if self.fanout.count else 0.0, 2),
+            },
+        }
 
 
-async def publish_report_to_admin(
-    report: dict[str, Any],
-    config: dict[str, Any],
-    args: argparse.Namespace,
-) -> bool:
-    publish_cfg = config.get("adminPublish") or {}
-    enabled = bool(publish_cfg.get("enabled")) or bool(args.publish_admin)
-    if not enabled:
-        return False
+def hub_configs(scenario_cfg: dict[str, Any]) -> list[dict[str, Any]]:
+    raw = scenario_cfg.get("signalr")
+    if not raw:
+        return []
+    items = raw if isinstance(raw, list) else [raw]
+    if not all(isinstance(item, dict) for item in items):
+        raise ValueError("signalr do cenario precisa ser um objeto ou uma lista de objetos.")
+    return items
+
+
+class EchoHubServer:
+    def __init__(self, host: str, port: int, drop_after_seconds: float = 0.0) -> None:
+        self.host = host
+        self.port = port
+        self.drop_after_seconds = drop_after_seconds
+        self.groups: dict[str, set[WebSocketConnection]] = defaultdict(set)
+        self.connections = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                raw = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = raw.decode("latin-1").rstrip("\r\n").split("\r\n")
+                method, target = request_line.split(" ")[:2]
+                headers = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(":") for line in header_lines)
+                }
+                content_length = to_int(headers.get("content-length"), 0)
+                if content_length:
+                    await reader.readexactly(content_length)
+
+                path = urllib.parse.urlsplit(target).path
+                if method == "POST" and path.endswith("/negotiate"):
+                    token = uuid.uuid4().hex
+                    body = json.dumps(
+                        {
+                            "negotiateVersion": 1,
+                            "connectionId": token,
+                            "connectionToken": token,
+                            "availableTransports": [{"transport": "WebSockets", "transferFormats": ["Text", "Binary"]}],
+                        }
+                    ).encode("utf-8")
+                    writer.write(
+                        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                        + f"Content-Length: {len(body)}\r\n\r\n".encode("ascii")
+                        + body
+                    )
+                    await writer.drain()
+                    continue
+
+                if headers.get("upgrade", "").lower() == "websocket" and headers.get("sec-websocket-key"):
+                    writer.write(
+                        (
+                            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                            f"Sec-WebSocket-Accept: {websocket_accept_key(headers['sec-websocket-key'])}\r\n\r\n"
+                        ).encode("ascii")
+                    )
+                    await writer.drain()
+                    await self.serve_hub(WebSocketConnection(reader, writer, client=False))
+                    return
+
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve_hub(self, websocket: WebSocketConnection) -> None:
+        self.connections += 1
+        joined: set[str] = set()
+        own_group = f"connection:{id(websocket)}"
+        self.groups[own_group].add(websocket)
+        joined.add(own_group)
+        ping = json.dumps({"type": 6}) + SIGNALR_RECORD_SEPARATOR
+
+        async def keepalive() -> None:
+            try:
+                while True:
+                    await asyncio.sleep(SIGNALR_KEEPALIVE_SECONDS)
+                    await websocket.send_text(ping)
+            except (ConnectionError, RuntimeError):
+                return
+
+        async def drop_later() -> None:
+            await asyncio.sleep(self.drop_after_seconds)
+            await websocket.close(1011)
+
+        tasks = [asyncio.create_task(keepalive())]
+        if self.drop_after_seconds > 0:
+            tasks.append(asyncio.create_task(drop_later()))
+        try:
+            handshake = await websocket.receive_text()
+            if handshake is None:
+                return
+            await websocket.send_text("{}" + SIGNALR_RECORD_SEPARATOR)
+            while True:
+                text = await websocket.receive_text()
+                if text is None:
+                    return
+                for record in text.split(SIGNALR_RECORD_SEPARATOR):
+                    if not record:
+                        continue
+                    message = json.loads(record)
+                    if message.get("type") == 7:
+                        return
+                    if message.get("type") == 1:
+                        result = await self.invoke(websocket, joined, own_group, message)
+                        if message.get("invocationId") is not None:
+                            completion = {"type": 3, "invocationId": message["invocationId"], "result": result}
+                            await websocket.send_text(json.dumps(completion) + SIGNALR_RECORD_SEPARATOR)
+        except (asyncio.IncompleteReadError, ConnectionError, HubConnectionError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            for group in joined:
+                members = self.groups.get(group)
+                if members is not None:
+                    members.discard(websocket)
+                    if not members:
+                        del self.groups[group]
+            self.connections -= 1
+            await websocket.close()
+
+    async def invoke(
+        self,
+        websocket: WebSocketConnection,
+        joined: set[str],
+        own_group: str,
+        message: dict[str, Any],
+    ) -> Any:
+        target = str(message.get("target") or "")
+        arguments = message.get("arguments") or []
+        # conversas sao identificadas pelos dois primeiros argumentos (requestId, providerId)
+        group = "|".join(str(value) for value in arguments[:2]) if arguments else own_group
+        if target.startswith("Join"):
+            self.groups[group].add(websocket)
+            joined.add(group)
+            return True
+        if target.startswith("Send"):
+            event = {
+                "type": 1,
+                "target": "ReceiveChatMessage",
+                "arguments": [
+                    {
+                        "requestId": arguments[0] if len(arguments) > 0 else None,
+                        "providerId": arguments[1] if len(arguments) > 1 else None,
+                        "text": arguments[2] if len(arguments) > 2 else None,
+                        "createdAt": utc_now_iso(),
+                    }
+                ],
+            }
+            frame = json.dumps(event, ensure_ascii=False) + SIGNALR_RECORD_SEPARATOR
+            members = list(self.groups.get(group) or ())
+            results = await asyncio.gather(*(member.send_text(frame) for member in members), return_exceptions=True)
+            return sum(1 for result in results if not isinstance(result, BaseException))
+        return None
 
-    base_url = str(config.get("baseUrl") or "").rstrip("/")
-    import_url = args.publish_url or publish_cfg.get("importUrl")
-    if not import_url and base_url:
-        import_url = f"{base_url}/api/admin/loadtests/import"
 
-    if not import_url:
-        print("[publish] adminPublish habilitado, mas importUrl nao foi informado.")
-        return False
+async def run_echo_hub(args: argparse.Namespace) -> int:
+    server = EchoHubServer(args.host, args.port, drop_after_seconds=max(args.drop_after, 0.0))
+    await server.start()
+    print("=== ConsertaPraMim Echo Hub (SignalR JSON/WebSockets) ===")
+    print(f"Escutando em http://{args.host}:{server.port} (qualquer path de hub, ex.: /chatHub, /notificationHub)")
+    print("Join* entra no grupo dos 2 primeiros argumentos; Send* reenvia ReceiveChatMessage para o grupo. Ctrl+C encerra.")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"[echo-hub] conexoes abertas: {server.connections} | grupos: {len(server.groups)}")
+    finally:
+        server.server.close()
 
-    source = (
-        args.publish_source
-        or publish_cfg.get("source")
-        or "python_loadtest_runner"
+
+async def run_scenario(
+    *,
+    scenario_name: str,
+    base_url: str,
+    scenario_cfg: dict[str, Any],
+    global_cfg: dict[str, Any],
+    endpoints: list[dict[str, Any]],
+    timeout_seconds: float,
+    insecure_tls: bool,
+    random_seed: int,
+    raw_log_dir: Optional[Path] = None,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    stop_event: Optional[asyncio.Event] = None,
+    drain_timeout_seconds: Optional[float] = None,
+    progress_callback: Optional[Callable[[dict[str, Any]], Any]] = None,
+    progress_interval_seconds: float = 0.0,
+    metrics_exporter: Optional[MetricsExporter] = None,
+    otlp_dir: Optional[Path] = None,
+    otlp_endpoint: Optional[str] = None,
+    snapshot_dir: Optional[Path] = None,
+) -> dict[str, Any]:
+    vus = to_int(scenario_cfg.get("vus"), 10)
+    duration_seconds = max(to_int(scenario_cfg.get("durationSeconds"), 30), 1)
+    ramp_up_seconds = max(to_float(scenario_cfg.get("rampUpSeconds"), 0.0), 0.0)
+    warmup_seconds = max(to_float(scenario_cfg.get("warmupSeconds"), 0.0), 0.0)
+    executor = str(scenario_cfg.get("executor") or "constant").lower()
+    if executor not in SCENARIO_EXECUTORS:
+        raise ValueError(f"Executor invalido '{executor}'. Use: {', '.join(SCENARIO_EXECUTORS)}")
+    spike_plan = (
+        SpikePlan(scenario_cfg.get("spike") or {}, vus=vus, scenario_cfg=scenario_cfg, global_cfg=global_cfg, endpoints=endpoints)
+        if executor == "spike"
+        else None
     )
+    if spike_plan is not None:
+        duration_seconds = spike_plan.duration_seconds
+    # valida as politicas de retry e os perfis de compressao antes de subir os VUs (cada VU compila os seus)
+    for endpoint in endpoints:
+        compile_retry_policy(global_cfg, scenario_cfg, endpoint, str(endpoint.get("method") or "GET"))
+        compression_profiles(global_cfg, scenario_cfg, endpoint)
+    compression_profiles(global_cfg, scenario_cfg)
+    spike_vus = spike_plan.spike_vus if spike_plan is not None else 0
+    # um SSLContext para todos os VUs do pico: criar centenas de clientes com verify=True travaria o event loop no baseline
+    spike_ssl_context = create_ssl_context(insecure_tls) if spike_plan is not None else None
+
+    think_model = ThinkTimeModel(scenario_cfg)
+    think_streams: list[ThinkTimeStream] = []
+
+    run_id = str(uuid.uuid4())
+    started_epoch = time.time()
+    started_utc = utc_now_iso()
 
-    token = args.publish_token or publish_cfg.get("bearerToken")
-    if not token:
-        login_url = args.publish_login_url or publish_cfg.get("loginUrl")
-        if login_url and not str(login_url).lower().startswith(("http://", "https://")) and base_url:
-            login_url = f"{base_url}{login_url}"
-        if not login_url and base_url:
-            login_url = f"{base_url}/api/auth/login"
+    metrics = MetricsCollector(started_epoch=started_epoch, fairness=create_fairness_tracker(global_cfg))
+    metrics.tracing_enabled = bool((global_cfg.get("tracing") or {}).get("enabled", False))
+    if metrics_exporter is not None:
+        metrics_exporter.attach(metrics, scenario_name=scenario_name, run_id=run_id)
 
-        email = args.publish_email or publish_cfg.get("email")
-        password = args.publish_password or publish_cfg.get("password")
-        token_field = str(publish_cfg.get("tokenField") or "token")
+    populations = resolve_populations(global_cfg, endpoints, scenario_cfg, vus)
+    flows = compile_flows(global_cfg, endpoints, scenario_cfg) if not populations else []
+    feeders = open_feeders(global_cfg, shard_index=shard_index, shard_count=shard_count)
+    flow_weights = list(itertools.accumulate(flow.weight for flow in flows))
 
-        if login_url and email and password:
-            token = await authenticate_publish_token(
-                login_url=str(login_url),
-                email=str(email),
-                password=str(password),
-                token_field=token_field,
-                timeout_seconds=max(float(args.timeout), 1.0),
-                insecure_tls=bool(args.insecure),
+    stop_at = time.perf_counter() + duration_seconds
+    stop_event = stop_event or asyncio.Event()
+    # so o shard 0 amostra o servidor, para nao multiplicar o scrape
+    server_sampler = (
+        create_server_metrics_sampler(
+            global_cfg,
+            base_url=base_url,
+            started_epoch=started_epoch,
+            timeout_seconds=timeout_seconds,
+            insecure_tls=insecure_tls,
+        )
+        if shard_index == 0
+        else None
+    )
+    soak = (
+        SoakMonitor(
+            scenario_cfg.get("soak") or {},
+            metrics=metrics,
+            run_id=run_id,
+            planned_seconds=duration_seconds,
+            skip_seconds=ramp_up_seconds + warmup_seconds,
+            grace_seconds=timeout_seconds + 2.0,
+            snapshot_path=(snapshot_dir / f"loadtest-soak-{run_id}.ndjson" if snapshot_dir is not None else None),
+        )
+        if executor == "soak"
+        else None
+    )
+    if drain_timeout_seconds is None:
+        drain_timeout_seconds = to_float(scenario_cfg.get("drainTimeoutSeconds"), DEFAULT_DRAIN_TIMEOUT_SECONDS)
+    drain_timeout_seconds = max(drain_timeout_seconds, 0.0)
+
+    exhausted_feeders: set[str] = set()
+
+    async def until_feeder_exhausted(worker: Awaitable[None]) -> None:
+        try:
+            await worker
+        except FeederExhaustedError as exc:
+            # so este VU sai do run; os demais seguem com os proprios registros
+            if exc.feeder_name not in exhausted_feeders:
+                exhausted_feeders.add(exc.feeder_name)
+                print(f"[feeder] {exc}")
+
+    async def vu_worker(vu_index: int) -> None:
+        population = next(
+            (item for item in populations if item.first_vu <= vu_index < item.first_vu + item.vus),
+            None,
+        )
+        session = VuSession(
+            vu_index=vu_index,
+            scenario_name=scenario_name,
+            base_url=base_url,
+            scenario_cfg=scenario_cfg,
+            global_cfg=global_cfg,
+            endpoints=endpoints,
+            metrics=metrics,
+            timeout_seconds=timeout_seconds,
+            insecure_tls=insecure_tls,
+            random_seed=random_seed,
+            vu_count=vus,
+            feeders=feeders,
+            population=population,
+            stop_event=stop_event,
+            stop_at=stop_at,
+        )
+        vu_flows = population.flows if population is not None else flows
+        vu_flow_weights = population.flow_weights if population is not None else flow_weights
+
+        think_stream = ThinkTimeStream(think_model, random.Random(f"think-{random_seed}-{vu_index}"))
+        think_streams.append(think_stream)
+        active = False
+
+        try:
+            if ramp_up_seconds > 0 and vus > 1:
+                delay = (ramp_up_seconds / max(vus - 1, 1)) * (vu_index - 1)
+                await sleep_until_stopped(delay, stop_event)
+
+            metrics.active_vus += 1
+            active = True
+            while time.perf_counter() < stop_at and not stop_event.is_set():
+                iteration_started = time.perf_counter()
+                if vu_flows:
+                    await session.execute_flow(pick_flow(vu_flows, vu_flow_weights, session.rng))
+                else:
+                    endpoint = weighted_choice(session.endpoints, session.rng)
+                    await session.execute_request(endpoint)
+
+                think_seconds = think_stream.next_seconds((time.perf_counter() - iteration_started) * 1000.0)
+                await sleep_until_stopped(min(think_seconds, max(stop_at - time.perf_counter(), 0.0)), stop_event)
+        finally:
+            if active:
+                metrics.active_vus -= 1
+            await session.close()
+
+    async def spike_worker(vu_index: int, spike_index: int) -> None:
+        http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout_seconds),
+            verify=spike_ssl_context,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+        )
+        try:
+            session = VuSession(
+                vu_index=vu_index,
+                scenario_name=scenario_name,
+                base_url=base_url,
+                scenario_cfg=scenario_cfg,
+                global_cfg=global_cfg,
+                endpoints=endpoints,
+                metrics=metrics,
+                timeout_seconds=timeout_seconds,
+                insecure_tls=insecure_tls,
+                random_seed=random_seed,
+                vu_count=vus + spike_vus,
+                feeders=feeders,
+                http_client=http_client,
+                stop_event=stop_event,
+                stop_at=stop_at,
             )
+        except FeederExhaustedError:
+            await http_client.aclose()
+            raise
+        if spike_plan.flows or spike_plan.endpoints:
+            spike_flows, spike_flow_weights = spike_plan.flows, spike_plan.flow_weights
+            if spike_plan.endpoints:
+                session.endpoints = spike_plan.endpoints
+        else:
+            spike_flows, spike_flow_weights = flows, flow_weights
 
-    if not token:
-        print("[publish] Nao foi possivel obter token admin para publicar o run.")
-        return False
+        think_stream = ThinkTimeStream(spike_plan.think_model, random.Random(f"think-{random_seed}-{vu_index}"))
+        think_streams.append(think_stream)
+        try:
+            # VU pre-criado: faz login durante a fase de baseline e fica parado ate o pico abrir
+            await sleep_until_stopped(spike_plan.prewarm_delay(spike_index), stop_event)
+            if not stop_event.is_set():
+                await session.ensure_login()
+            for burst in spike_plan.bursts:
+                await burst.gate.wait()
+                if stop_event.is_set():
+                    return
+                burst.activation_ms.append((time.perf_counter() - burst.opened_at) * 1000.0)
+                metrics.active_vus += 1
+                try:
+                    while time.perf_counter() < min(burst.ends_at, stop_at) and not stop_event.is_set():
+                        iteration_started = time.perf_counter()
+                        if spike_flows:
+                            await session.execute_flow(pick_flow(spike_flows, spike_flow_weights, session.rng))
+                        else:
+                            await session.execute_request(weighted_choice(session.endpoints, session.rng))
+                        think_seconds = think_stream.next_seconds((time.perf_counter() - iteration_started) * 1000.0)
+                        await sleep_until_stopped(min(think_seconds, max(burst.ends_at - time.perf_counter(), 0.0)), stop_event)
+                finally:
+                    metrics.active_vus -= 1
+        finally:
+            await http_client.aclose()
+
+    # arquivos e threads de saida antes de criar as tasks: se um construtor falhar nenhum VU fica rodando;
+    # dai em diante quem fecha os dois e o finally do loop de espera
+    tracing_cfg = global_cfg.get("tracing") or {}
+    otlp_endpoint = otlp_endpoint or tracing_cfg.get("otlpEndpoint")
+    if bool(tracing_cfg.get("enabled", False)) and (otlp_dir is not None or otlp_endpoint):
+        metrics.span_exporter = OtlpSpanExporter(
+            path=(otlp_dir / f"loadtest-spans-{run_id}.otlp.jsonl" if otlp_dir is not None else None),
+            endpoint=(str(otlp_endpoint) if otlp_endpoint else None),
+            service_name=str(tracing_cfg.get("serviceName") or "consertapramim-loadtest"),
+            run_id=run_id,
+            scenario_name=scenario_name,
+            insecure_tls=insecure_tls,
+        )
+    if raw_log_dir is not None:
+        try:
+            metrics.raw_log = RawSampleLog(
+                raw_log_dir / f"loadtest-raw-{run_id}.bin",
+                run_id=run_id,
+                started_epoch=started_epoch,
+            )
+        except BaseException:
+            if metrics.span_exporter is not None:
+                await metrics.span_exporter.close()
+            raise
+
+    workers = [asyncio.create_task(until_feeder_exhausted(vu_worker(index))) for index in range(1, vus + 1)]
+    spike_task = None
+    if spike_plan is not None:
+        workers.extend(
+            asyncio.create_task(until_feeder_exhausted(spike_worker(vus + index, index - 1))) for index in range(1, spike_vus + 1)
+        )
+        spike_task = asyncio.create_task(spike_plan.control(stop_at - duration_seconds, started_epoch, stop_event))
+    async def publish_progress() -> None:
+        while True:
+            await sleep_until_stopped(min(progress_interval_seconds, max(stop_at - time.perf_counter(), 0.0)), stop_event)
+            if stop_event.is_set() or time.perf_counter() >= stop_at:
+                return
+            snapshot = metrics.build_progress(
+                run_id=run_id,
+                scenario_name=scenario_name,
+                started_at_utc=started_utc,
+                duration_seconds=max(time.time() - started_epoch, 0.0),
+                base_url=base_url,
+            )
+            snapshot["inProgress"] = True
+            snapshot["plannedDurationSeconds"] = duration_seconds
+            try:
+                await progress_callback(snapshot)
+            except Exception as exc:
+                print(f"[publish] Falha ao publicar parcial: {type(exc).__name__}: {exc}")
+
+    progress_task = (
+        asyncio.create_task(publish_progress())
+        if progress_callback is not None and progress_interval_seconds > 0
+        else None
+    )
+    stop_waiter = asyncio.create_task(stop_event.wait())
+    sampler_task = asyncio.create_task(server_sampler.run(stop_at, stop_event)) if server_sampler is not None else None
+    soak_task = asyncio.create_task(soak.run(stop_at, stop_event)) if soak is not None else None
+
+    hub_clients: list[HubClient] = []
+    hub_http_client: Optional[httpx.AsyncClient] = None
+    hub_cfgs = hub_configs(scenario_cfg)
+    if hub_cfgs:
+        hub_connections = sum(max(to_int(hub_cfg.get("connections"), 0), 0) for hub_cfg in hub_cfgs)
+        hub_http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout_seconds),
+            verify=not insecure_tls,
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+        )
+        ssl_context = create_ssl_context(insecure_tls)
+
+        async def hub_worker(hub: HubClient, vu_index: int, connection_index: int) -> None:
+            session = VuSession(
+                vu_index=vu_index,
+                scenario_name=scenario_name,
+                base_url=base_url,
+                scenario_cfg=scenario_cfg,
+                global_cfg=global_cfg,
+                endpoints=endpoints,
+                metrics=metrics,
+                timeout_seconds=timeout_seconds,
+                insecure_tls=insecure_tls,
+                random_seed=random_seed,
+                vu_count=vus + spike_vus + hub_connections,
+                feeders=feeders,
+                http_client=hub_http_client,
+                stop_event=stop_event,
+                stop_at=stop_at,
+            )
+            try:
+                if ramp_up_seconds > 0 and hub.connections > 1:
+                    await sleep_until_stopped((ramp_up_seconds / (hub.connections - 1)) * connection_index, stop_event)
+                await hub.run(session, connection_index, stop_at, stop_waiter)
+            finally:
+                await session.close()
+
+        vu_offset = vus + spike_vus
+        for hub_cfg in hub_cfgs:
+            hub = HubClient(
+                hub_cfg,
+                base_url=base_url,
+                metrics=metrics,
+                timeout_seconds=timeout_seconds,
+                ssl_context=ssl_context,
+                http_client=hub_http_client,
+            )
+            hub_clients.append(hub)
+            workers.extend(
+                asyncio.create_task(until_feeder_exhausted(hub_worker(hub, vu_offset + connection_index + 1, connection_index)))
+                for connection_index in range(hub.connections)
+            )
+            vu_offset += hub.connections
 
-    payload = {
-        "source": source,
-        "report": report,
-    }
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-        "X-Client-Id": "LT-PUBLISHER",
-        "X-Correlation-Id": str(uuid.uuid4()),
+    cancelled_workers = 0
+    try:
+        pending: set[asyncio.Task[None]] = set(workers)
+        while pending and not stop_event.is_set():
+            _, pending = await asyncio.wait(pending | {stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            pending.discard(stop_waiter)
+
+        if pending:
+            print(f"\nParada solicitada: aguardando ate {drain_timeout_seconds:g}s pelos requests em andamento...")
+            _, pending = await asyncio.wait(pending, timeout=drain_timeout_seconds)
+            for worker in pending:
+                worker.cancel()
+            cancelled_workers = len(pending)
+        await asyncio.gather(*workers, return_exceptions=bool(pending))
+    finally:
+        stop_waiter.cancel()
+        if progress_task is not None:
+            progress_task.cancel()
+        if sampler_task is not None:
+            sampler_task.cancel()
+        if soak_task is not None:
+            soak_task.cancel()
+        if spike_task is not None:
+            spike_task.cancel()
+        if metrics.raw_log is not None:
+            metrics.raw_log.close()
+        if metrics.span_exporter is not None:
+            await metrics.span_exporter.close()
+        if hub_http_client is not None:
+            await hub_http_client.aclose()
+        for feeder in feeders.values():
+            feeder.close()
+
+    finished_utc = utc_now_iso()
+    elapsed_seconds = max(time.time() - started_epoch, 0.0)
+
+    report = metrics.build_report(
+        run_id=run_id,
+        scenario_name=scenario_name,
+        started_at_utc=started_utc,
+        finished_at_utc=finished_utc,
+        duration_seconds=elapsed_seconds,
+        base_url=base_url,
+        scenario_config=scenario_cfg,
+        resolved_endpoints=endpoints,
+    )
+    if feeders:
+        report["feeders"] = [feeder.describe() for feeder in feeders.values()]
+    if hub_clients:
+        report["signalr"] = [hub.describe() for hub in hub_clients]
+    if populations:
+        report["populations"] = metrics.build_populations(populations, elapsed_seconds)
+    if server_sampler is not None:
+        report["serverMetrics"] = server_sampler.build(metrics, report.get("charts"))
+    if spike_plan is not None:
+        report["spike"] = spike_plan.build(metrics, elapsed_seconds)
+    if soak is not None:
+        report["soak"] = soak.build(elapsed_seconds, server_sampler.series if server_sampler is not None else None)
+
+    if warmup_seconds > 0:
+        window_start = int(math.ceil(ramp_up_seconds + warmup_seconds))
+        window_end = int(elapsed_seconds)
+        if window_end > window_start:
+            report["steadyState"] = metrics.build_window(window_start, window_end)
+
+    if stop_event.is_set():
+        report["partial"] = True
+        report["stopReason"] = getattr(stop_event, "reason", None) or "stop"
+        report["plannedDurationSeconds"] = duration_seconds
+        report["cancelledInFlight"] = cancelled_workers
+
+    think_samples = sum(stream.samples for stream in think_streams)
+    report["thinkTime"] = {
+        **think_model.describe(),
+        "samples": think_samples,
+        "meanMs": round(sum(stream.total_ms for stream in think_streams) / think_samples, 2) if think_samples else 0.0,
     }
+    if think_model.model == "pacing":
+        report["thinkTime"]["pacingOverruns"] = sum(stream.pacing_overruns for stream in think_streams)
+    return report
 
-    async with httpx.AsyncClient(
-        timeout=httpx.Timeout(max(float(args.timeout), 1.0)),
-        verify=not bool(args.insecure),
-    ) as client:
-        response = await client.post(str(import_url), json=payload, headers=headers)
-        if response.status_code >= 400:
-            print(
-                f"[publish] Falha ao publicar run ({response.status_code}) em {import_url}: "
-                f"{truncate_text(response.text or '', 260)}"
-            )
-            return False
 
-        try:
-            response_json = response.json()
-        except ValueError:
-            print(f"[publish] Run publicado em {import_url}, mas resposta nao veio em JSON.")
-            return True
+def print_report(report: dict[str, Any]) -> None:
+    summary = report.get("summary", {})
+    latency = report.get("latencyMs", {})
+
+    print("\n=== Load Test Summary ===")
+    print(f"Run ID: {report.get('runId')}")
+    print(f"Scenario: {report.get('scenario')} | Base URL: {report.get('baseUrl')}")
+    print(f"Started: {report.get('startedAtUtc')} | Finished: {report.get('finishedAtUtc')}")
+    print(f"Duration: {report.get('durationSeconds')} s")
+    if report.get("partial"):
+        print(
+            f"PARCIAL: interrompido por {report.get('stopReason')} "
+            f"({report.get('durationSeconds')}s de {report.get('plannedDurationSeconds')}s planejados, "
+            f"{report.get('cancelledInFlight', 0)} VUs cancelados no drain)"
+        )
+
+    print("\n-- Requests --")
+    print(f"Total: {summary.get('totalRequests', 0)}")
+    print(f"Success: {summary.get('successfulRequests', 0)}")
+    print(f"Failed: {summary.get('failedRequests', 0)} ({summary.get('errorRatePercent', 0)}%)")
+    print(f"RPS avg: {summary.get('rpsAvg', 0)} | RPS peak: {summary.get('rpsPeak', 0)}")
+
+    print("\n-- Latency --")
+    print(
+        f"min/avg/max: {latency.get('min', 0)} / {latency.get('avg', 0)} / {latency.get('max', 0)} ms"
+    )
+    print(
+        f"p50/p95/p99: {latency.get('p50', 0)} / {latency.get('p95', 0)} / {latency.get('p99', 0)} ms"
+    )
+
+    print("\n-- Errors by Status --")
+    status_codes = report.get("statusCodes", [])
+    if not status_codes:
+        print("(none)")
+    else:
+        for item in status_codes:
+            print(f"{item.get('statusCode')}: {item.get('count')} ({item.get('percentage')}%)")
+
+    exceptions = report.get("exceptions", [])
+    if exceptions:
+        print("\n-- Exceptions/Timeouts --")
+        for item in exceptions:
+            print(f"{item.get('type')}: {item.get('count')}")
+
+    print("\n-- Top Endpoints by Hits --")
+    top_hits = report.get("topEndpointsByHits", [])
+    if not top_hits:
+        print("(none)")
+    else:
+        for item in top_hits[:10]:
+            print(
+                f"{item.get('endpoint')}: hits={item.get('hits')} "
+                f"p95={item.get('p95LatencyMs')}ms errorRate={item.get('errorRatePercent')}%"
+            )
+
+    print("\n-- Top Endpoints by p95 --")
+    top_p95 = report.get("topEndpointsByP95", [])
+    if not top_p95:
+        print("(none)")
+    else:
+        for item in top_p95[:10]:
+            print(
+                f"{item.get('endpoint')}: p95={item.get('p95LatencyMs')}ms "
+                f"hits={item.get('hits')} errorRate={item.get('errorRatePercent')}%"
+            )
+
+    print("\n-- Top Errors --")
+    top_errors = report.get("topErrors", [])
+    if not top_errors:
+        print("(none)")
+    else:
+        for item in top_errors:
+            endpoints = ", ".join(item.get("endpoints", []))
+            print(f"{item.get('count')}x {item.get('message')} | endpoints: {endpoints}")
+
+    journeys = report.get("journeys", [])
+    if journeys:
+        print("\n-- Journeys --")
+        for item in journeys:
+            print(
+                f"{item.get('flow')}: runs={item.get('runs')} failures={item.get('failures')} "
+                f"p50/p95/p99={item.get('p50Ms')}/{item.get('p95Ms')}/{item.get('p99Ms')}ms"
+            )
+
+    replay = report.get("replay")
+    if replay:
+        lag = replay.get("scheduleLagMs", {})
+        print("\n-- Replay --")
+        print(
+            f"Source: {replay.get('source')} ({replay.get('format')}) | speed={replay.get('speed')} | "
+            f"entries={replay.get('entriesDispatched')} skipped={replay.get('entriesSkipped')} clients={replay.get('clients')}"
+        )
+        print(f"Schedule lag p50/p95/max: {lag.get('p50')}/{lag.get('p95')}/{lag.get('max')}ms")
+        logins = replay.get("logins") or {}
+        print(
+            f"Logins do runner (fora do trafego reproduzido): {logins.get('totalRequests')} "
+            f"falhas={logins.get('failedRequests')} p95={(logins.get('latencyMs') or {}).get('p95')}ms"
+        )
+
+    print("\n-- Failure Samples (up to 10) --")
+    samples = report.get("failureSamples", [])
+    if not samples:
+        print("(none)")
+    else:
+        for sample in samples[:10]:
+            print(
+                f"[{sample.get('timestampUtc')}] {sample.get('method')} {sample.get('path')} "
+                f"status={sample.get('statusCode')} corr={sample.get('correlationId')} "
+                f"error={sample.get('errorMessage')}"
+            )
+
+    slowest = report.get("slowestRequests", [])
+    if slowest:
+        print("\n-- Slowest Requests (exemplars) --")
+        for item in slowest[:5]:
+            print(f"{item.get('durationMs')}ms {item.get('endpoint')} corr={item.get('correlationId')} trace={item.get('traceId') or '-'}")
+
+    hubs = report.get("signalr") or []
+    if hubs:
+        print("\n-- SignalR/WebSocket --")
+        for line in build_hub_lines(hubs):
+            print(line)
+
+    populations = report.get("populations")
+    if populations:
+        print("\n-- Populacoes (apps) --")
+        for line in build_population_lines(populations):
+            print(line)
+
+    uploads = report.get("uploads")
+    if uploads:
+        print("\n-- Uploads multipart --")
+        for line in build_upload_lines(uploads):
+            print(line)
+
+    retries = report.get("retries")
+    if retries:
+        print("\n-- Retries (politica do cliente) --")
+        for line in build_retry_lines(retries):
+            print(line)
+
+    cache = report.get("cache")
+    if cache:
+        print("\n-- Cache HTTP (revalidacao condicional) --")
+        for line in build_cache_lines(cache):
+            print(line)
+
+    transfer = report.get("transfer")
+    if transfer:
+        print("\n-- Transferencia/compressao --")
+        for line in build_transfer_lines(transfer):
+            print(line)
+
+    soak = report.get("soak")
+    if soak:
+        print("\n-- Soak (tendencia por janela) --")
+        for line in build_soak_lines(soak):
+            print(line)
+
+    spike = report.get("spike")
+    if spike:
+        print("\n-- Pico (spike) --")
+        for line in build_spike_lines(spike):
+            print(line)
+
+    server_metrics = report.get("serverMetrics")
+    if server_metrics:
+        print("\n-- Metricas do servidor --")
+        for line in build_server_metrics_lines(server_metrics):
+            print(line)
+
+    fairness = report.get("fairness")
+    if fairness:
+        print("\n-- Fairness (VU/tenant/conta) --")
+        for line in build_fairness_lines(fairness):
+            print(line)
+
+    tracing = report.get("tracing")
+    if tracing:
+        print(f"\nSpans OTLP: {tracing.get('spans')} (falhas de envio: {tracing.get('exportErrors')})")
+
+
+def build_hub_lines(hubs: list[dict[str, Any]]) -> list[str]:
+    lines = []
+    for hub in hubs:
+        fanout = hub.get("fanoutLatencyMs") or {}
+        lines.append(
+            f"{hub.get('hub')} | conexoes={hub.get('connections')} estabelecidas={hub.get('established')} "
+            f"pico={hub.get('peakOpen')} quedas={hub.get('drops')} reconexoes={hub.get('reconnects')} "
+            f"msgs enviadas={hub.get('messagesSent')} recebidas={hub.get('messagesReceived')} "
+            f"fan-out p50={fanout.get('p50')}ms p95={fanout.get('p95')}ms p99={fanout.get('p99')}ms"
+        )
+        for item in hub.get("dropReasons", [])[:3]:
+            lines.append(f"- queda {item.get('count')}x {item.get('reason')}")
+    return lines
+
+
+def build_population_lines(populations: dict[str, Any]) -> list[str]:
+    lines = []
+    for item in populations.get("populations", []):
+        lines.append(
+            f"{item.get('name')} | vus={item.get('vus')} contas={item.get('accounts')} requests={item.get('requests')} "
+            f"rps={item.get('rps')} erro={item.get('errorRatePercent')}% "
+            f"p50/p95/p99={item.get('p50LatencyMs')}/{item.get('p95LatencyMs')}/{item.get('p99LatencyMs')}ms"
+        )
+        for endpoint in item.get("topEndpointsByP95", [])[:5]:
+            lines.append(
+                f"- {endpoint.get('endpoint')}: hits={endpoint.get('requests')} p95={endpoint.get('p95LatencyMs')}ms "
+                f"erro={endpoint.get('errorRatePercent')}%"
+            )
+    for shared in populations.get("sharedEndpoints", []):
+        values = " | ".join(
+            f"{name} p95={stats.get('p95LatencyMs')}ms ({stats.get('requests')} req)"
+            for name, stats in shared.get("populations", {}).items()
+        )
+        lines.append(f"compartilhado {shared.get('endpoint')}: {values}")
+    return lines
+
+
+def build_upload_lines(uploads: dict[str, Any]) -> list[str]:
+    lines = [f"total={uploads.get('megabytes')}MB agregado={uploads.get('aggregateMBps')}MB/s pico em voo={uploads.get('inFlightPeak')}"]
+    for item in uploads.get("endpoints", []):
+        size = item.get("sizeBytes") or {}
+        per_upload = item.get("perUploadMBps") or {}
+        send = item.get("sendMs") or {}
+        ttfb = item.get("ttfbAfterUploadMs") or {}
+        lines.append(
+            f"{item.get('endpoint')} | uploads={item.get('uploads')} {item.get('megabytes')}MB ({item.get('aggregateMBps')}MB/s) "
+            f"tamanho p50/p95={size.get('p50')}/{size.get('p95')}B "
+            f"MB/s por upload p5/p50={per_upload.get('p5')}/{per_upload.get('p50')} "
+            f"envio p50/p95={send.get('p50')}/{send.get('p95')}ms "
+            f"ttfb apos upload p50/p95/p99={ttfb.get('p50')}/{ttfb.get('p95')}/{ttfb.get('p99')}ms"
+        )
+    return lines
+
+
+def build_retry_lines(retries: dict[str, Any]) -> list[str]:
+    gave_up = ", ".join(f"{reason}={count}" for reason, count in (retries.get("gaveUp") or {}).items()) or "nenhuma"
+    lines = [
+        f"chamadas={retries.get('calls')} tentativas={retries.get('attempts')} retries={retries.get('retries')} "
+        f"amplificacao={retries.get('amplification')}x retries/sucesso={retries.get('retriesPerSuccess')}",
+        f"throughput={retries.get('throughputRps')} req/s goodput={retries.get('goodputRps')} req/s "
+        f"({retries.get('goodputPercent')}% das tentativas) recuperadas por retry={retries.get('recoveredByRetry')} "
+        f"desistencias: {gave_up} pico={retries.get('peakRetriesPerSecond')} retries/s no segundo {retries.get('peakRetriesSecond')}",
+    ]
+    for item in retries.get("endpoints", []):
+        if not item.get("retries") and not item.get("gaveUp"):
+            continue
+        reasons = ", ".join(f"{reason}={count}" for reason, count in (item.get("reasons") or {}).items())
+        call_latency = item.get("callLatencyMs") or {}
+        lines.append(
+            f"- {item.get('endpoint')} | amplificacao={item.get('amplification')}x retries/sucesso={item.get('retriesPerSuccess')} "
+            f"goodput={item.get('goodputRps')}/{item.get('throughputRps')} req/s motivos: {reasons} "
+            f"p95 chamada={call_latency.get('p95')}ms (tentativa {item.get('attemptP95Ms')}ms)"
+        )
+    return lines
+
+
+def build_cache_lines(cache: dict[str, Any]) -> list[str]:
+    outcomes = cache.get("outcomes") or {}
+    lines = [
+        f"requests={cache.get('requests')} condicionais={cache.get('conditionalRequests')} hit rate (304)={cache.get('hitRatePercent')}% "
+        f"bytes economizados~{cache.get('estimatedBytesSaved')} "
+        + " ".join(f"{outcome}={count}" for outcome, count in outcomes.items() if count)
+    ]
+    if not cache.get("serverSentValidators", True):
+        lines.append("AVISO: o servidor nao enviou ETag nem Last-Modified em nenhuma resposta; sem validadores nao ha revalidacao e o hit rate nao mede o cache.")
+    for item in cache.get("endpoints", []):
+        latency = item.get("latencyMs") or {}
+        full = item.get("fullResponseLatencyMs") or {}
+        if not item.get("conditionalRequests"):
+            outcomes = item.get("outcomes") or {}
+            lines.append(
+                f"- {item.get('endpoint')} | "
+                + ("" if item.get("serverSentValidators", True) else "servidor nao enviou validadores, ")
+                + "sem requests condicionais ("
+                + " ".join(f"{outcome}={count}" for outcome, count in outcomes.items() if count)
+                + f") 200 p50/p95={full.get('p50')}/{full.get('p95')}ms"
+            )
+            continue
+        lines.append(
+            f"- {item.get('endpoint')} | hit rate={item.get('hitRatePercent')}% ({(item.get('outcomes') or {}).get('revalidated')}/{item.get('conditionalRequests')}) "
+            f"p50/p95 304={(latency.get('revalidated') or {}).get('p50')}/{(latency.get('revalidated') or {}).get('p95')}ms "
+            f"200={full.get('p50')}/{full.get('p95')}ms economia p50={item.get('p50SavingPercent')}% "
+            f"corpo medio={item.get('averageFullBodyBytes')}B"
+        )
+    return lines
+
+
+def build_transfer_lines(transfer: dict[str, Any]) -> list[str]:
+    lines = [
+        f"rede={transfer.get('wireMegabytes')}MB ({transfer.get('wireMBps')}MB/s) decodificado={transfer.get('decodedMegabytes')}MB "
+        f"razao={transfer.get('compressionRatio')}x economia={transfer.get('savedPercent')}% cpu decodificacao={transfer.get('decodeCpuMs')}ms"
+    ]
+    for item in transfer.get("profiles", []):
+        lines.append(
+            f"perfil {item.get('profile')} (vus={item.get('vus')}): rede={item.get('wireMegabytes')}MB "
+            f"decodificado={item.get('decodedMegabytes')}MB razao={item.get('compressionRatio')}x cpu={item.get('decodeCpuMs')}ms"
+        )
+    for item in transfer.get("endpoints", []):
+        encodings = " ".join(f"{encoding}={count}" for encoding, count in (item.get("encodings") or {}).items())
+        lines.append(
+            f"- {item.get('endpoint')} [{item.get('profile')}] | respostas={item.get('responses')} ({encodings}) "
+            f"medio rede/decodificado={item.get('averageWireBytes')}/{item.get('averageDecodedBytes')}B razao={item.get('compressionRatio')}x "
+            f"decode avg/p95={(item.get('decodeMs') or {}).get('avg')}/{(item.get('decodeMs') or {}).get('p95')}ms ({item.get('decodeMicrosPerKB')}us/KB) "
+            f"corpo p50/p95={(item.get('bodyTransferMs') or {}).get('p50')}/{(item.get('bodyTransferMs') or {}).get('p95')}ms "
+            f"(corpo {item.get('bodyTransferSharePercent')}% / decode {item.get('decodeSharePercent')}% da latencia)"
+        )
+    return lines
+
+
+def build_server_metrics_lines(server_metrics: dict[str, Any]) -> list[str]:
+    lines = []
+    for source in server_metrics.get("sources", []):
+        line = f"fonte {source.get('name')} ({source.get('type')}): amostras={source.get('samples')} erros={source.get('errors')}"
+        if source.get("lastError"):
+            line += f" ultimo erro: {source.get('lastError')}"
+        lines.append(line)
+    for name, item in (server_metrics.get("series") or {}).items():
+        lines.append(f"{name}: min/avg/max={item.get('min')}/{item.get('avg')}/{item.get('max')}")
+    for item in server_metrics.get("saturation", []):
+        lines.append(
+            f"SATURACAO t={item.get('second')}s {item.get('metric')}={item.get('value')} (limite {item.get('threshold')}) | "
+            f"cliente rps={item.get('clientRps')} p95={item.get('clientP95Ms')}ms erros={item.get('clientErrorRatePercent')}%"
+        )
+    return lines
+
+
+def build_soak_lines(soak: dict[str, Any]) -> list[str]:
+    lines = [
+        f"janelas={soak.get('windows')} x {soak.get('windowSeconds')}s (ignorados {soak.get('skippedSeconds')}s iniciais) "
+        f"alpha={soak.get('alpha')} snapshots={soak.get('snapshots')}"
+        + (f" em {soak.get('snapshotPath')}" if soak.get("snapshotPath") else "")
+    ]
+    for metric, unit in (("p95Ms", "ms"), ("errorRatePercent", "%")):
+        trend = (soak.get("overall") or {}).get(metric)
+        if trend:
+            lines.append(
+                f"total {metric}: {trend.get('first')}{unit} -> {trend.get('last')}{unit} "
+                f"inclinacao={trend.get('slopePerHour')}{unit}/h tau={trend.get('kendallTau')} p={trend.get('pValue')}"
+            )
+        else:
+            lines.append(f"total {metric}: janelas insuficientes para teste de tendencia")
+    drifts = soak.get("drifts") or []
+    if not drifts:
+        lines.append("Sem drift estatisticamente significativo.")
+    for item in drifts:
+        change = f"+{item['changePercent']}%" if "changePercent" in item else f"+{item.get('changePoints')} p.p."
+        lines.append(
+            f"DRIFT {item.get('scope')} {item.get('metric')}: {item.get('from')} -> {item.get('to')} ({change}) "
+            f"inclinacao={item.get('slopePerHour')}/h p={item.get('pValue')}"
+        )
+    return lines
+
+
+def build_spike_lines(spike: dict[str, Any]) -> list[str]:
+    baseline = spike.get("baseline") or {}
+    criteria = spike.get("recoveryCriteria") or {}
+    lines = [
+        f"VUs {spike.get('baselineVus')} -> {spike.get('baselineVus', 0) + spike.get('spikeVus', 0)} (x{spike.get('multiplier')}) "
+        f"pico={spike.get('spikeSeconds')}s recuperacao={spike.get('recoverySeconds')}s",
+        f"baseline {baseline.get('fromSecond')}-{baseline.get('toSecond')}s: rps={baseline.get('rps')} "
+        f"p95={(baseline.get('latencyMs') or {}).get('p95')}ms err={baseline.get('errorRatePercent')}%",
+        f"recuperado quando p95 <= {criteria.get('p95LimitMs')}ms e erro <= {criteria.get('errorRateLimitPercent')}% "
+        f"(janela {criteria.get('windowSeconds')}s, estavel por {criteria.get('stableSeconds')}s)",
+    ]
+    for burst in spike.get("bursts", []):
+        activation = burst.get("activation") or {}
+        during = burst.get("during") or {}
+        recovery = burst.get("recoverySeconds")
+        p95_recovery = burst.get("p95RecoverySeconds")
+        error_recovery = burst.get("errorRateRecoverySeconds")
+        lines.append(
+            f"- pico {burst.get('index')} ({burst.get('startSecond')}-{burst.get('endSecond')}s): "
+            f"ativacao p50/p95/max={activation.get('p50Ms')}/{activation.get('p95Ms')}/{activation.get('maxMs')}ms "
+            f"rps={during.get('rps')} (x{burst.get('rpsRatio')}) p95={(during.get('latencyMs') or {}).get('p95')}ms "
+            f"(x{burst.get('p95Ratio')}) err={during.get('errorRatePercent')}% "
+            + (f"recuperou em {recovery}s" if recovery is not None else "NAO recuperou")
+            + f" (p95 {f'{p95_recovery}s' if p95_recovery is not None else 'nao'}, "
+            + f"erro {f'{error_recovery}s' if error_recovery is not None else 'nao'})"
+        )
+    return lines
+
+
+def build_fairness_lines(fairness: dict[str, Any]) -> list[str]:
+    lines = []
+    for dimension, label in (("vu", "VU"), ("tenant", "Tenant"), ("account", "Conta")):
+        data = fairness.get(dimension) or {}
+        spread = data.get("p95Spread")
+        line = f"{label}: keys={data.get('keys')}"
+        if spread:
+            line += (
+                f" jain(req)={data.get('jainThroughput')} jain(1/p95)={data.get('jainLatency')}"
+                f" p95 min/p50/p90/max={spread.get('min')}/{spread.get('p50')}/{spread.get('p90')}/{spread.get('max')}ms"
+                f" max/p50={spread.get('maxToMedianRatio')}"
+            )
+        else:
+            line += f" (menos de {fairness.get('minSamples')} requests por chave)"
+        if data.get("overflow"):
+            line += " (limite de chaves atingido)"
+        lines.append(line)
+        for item in data.get("items", [])[:5]:
+            lines.append(
+                f"- {item.get('key')} | req={item.get('requests')} p95={item.get('p95LatencyMs')}ms "
+                f"err={item.get('errorRatePercent')}%"
+            )
+    return lines
+
+
+def build_summary_lines(report: dict[str, Any]) -> list[str]:
+    lines = [
+        f"Run ID: {report.get('runId')}",
+        f"Scenario: {report.get('scenario')}",
+        f"Base URL: {report.get('baseUrl')}",
+        f"Started: {report.get('startedAtUtc')}",
+        f"Finished: {report.get('finishedAtUtc')}",
+        f"Duration(s): {report.get('durationSeconds')}",
+        f"Partial: yes ({report.get('stopReason')}, planned {report.get('plannedDurationSeconds')}s)" if report.get("partial") else "Partial: no",
+        "",
+        f"Total requests: {report.get('summary', {}).get('totalRequests', 0)}",
+        f"RPS avg: {report.get('summary', {}).get('rpsAvg', 0)}",
+        f"RPS peak: {report.get('summary', {}).get('rpsPeak', 0)}",
+        f"Error rate: {report.get('summary', {}).get('errorRatePercent', 0)}%",
+        "",
+        "Top endpoints by hits:",
+    ]
+
+    for item in report.get("topEndpointsByHits", []):
+        lines.append(
+            f"- {item.get('endpoint')} | hits={item.get('hits')} "
+            f"p95={item.get('p95LatencyMs')}ms err={item.get('errorRatePercent')}%"
+        )
+
+    if report.get("journeys"):
+        lines.append("\nJourneys:")
+        for item in report.get("journeys", []):
+            lines.append(
+                f"- {item.get('flow')} | runs={item.get('runs')} fail={item.get('failureRatePercent')}% "
+                f"p50={item.get('p50Ms')}ms p95={item.get('p95Ms')}ms p99={item.get('p99Ms')}ms"
+            )
+
+    if report.get("replay"):
+        replay = report["replay"]
+        lines.append("\nReplay:")
+        lines.append(
+            f"- {replay.get('source')} ({replay.get('format')}) speed={replay.get('speed')} "
+            f"entries={replay.get('entriesDispatched')} clients={replay.get('clients')} "
+            f"lagP95={replay.get('scheduleLagMs', {}).get('p95')}ms "
+            f"logins={(replay.get('logins') or {}).get('totalRequests')} (falhas={(replay.get('logins') or {}).get('failedRequests')})"
+        )
+
+    if report.get("signalr"):
+        lines.append("\nSignalR/WebSocket:")
+        lines.extend(build_hub_lines(report["signalr"]))
+
+    if report.get("populations"):
+        lines.append("\nPopulacoes:")
+        lines.extend(build_population_lines(report["populations"]))
+
+    if report.get("uploads"):
+        lines.append("\nUploads multipart:")
+        lines.extend(build_upload_lines(report["uploads"]))
+
+    if report.get("retries"):
+        lines.append("\nRetries:")
+        lines.extend(build_retry_lines(report["retries"]))
+
+    if report.get("cache"):
+        lines.append("\nCache HTTP:")
+        lines.extend(build_cache_lines(report["cache"]))
+
+    if report.get("transfer"):
+        lines.append("\nTransferencia/compressao:")
+        lines.extend(build_transfer_lines(report["transfer"]))
+
+    if report.get("soak"):
+        lines.append("\nSoak:")
+        lines.extend(build_soak_lines(report["soak"]))
+
+    if report.get("spike"):
+        lines.append("\nPico (spike):")
+        lines.extend(build_spike_lines(report["spike"]))
+
+    if report.get("serverMetrics"):
+        lines.append("\nMetricas do servidor:")
+        lines.extend(build_server_metrics_lines(report["serverMetrics"]))
+
+    if report.get("fairness"):
+        lines.append("\nFairness:")
+        lines.extend(build_fairness_lines(report["fairness"]))
+
+    lines.append("\nTop errors:")
+    for item in report.get("topErrors", []):
+        lines.append(f"- {item.get('count')}x {item.get('message')}")
+
+    return lines
+
+
+def link_latest(target: Path, latest: Path) -> None:
+    temp_path = latest.with_name(f".{latest.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        os.link(target, temp_path)
+    except OSError:
+        try:
+            os.symlink(target.name, temp_path)
+        except OSError:
+            shutil.copyfile(target, temp_path)
+    os.replace(temp_path, latest)
+
+
+def write_report_artifact(path: Path, render: Callable[[], str], latest: Path) -> Path:
+    path.write_text(render(), encoding="utf-8")
+    link_latest(path, latest)
+    return path
+
+
+async def save_reports(report: dict[str, Any], output_dir: Path) -> tuple[Path, Path, Path]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    run_id = report.get("runId") or str(uuid.uuid4())
+    json_path, txt_path, html_path = await asyncio.gather(
+        asyncio.to_thread(
+            write_report_artifact,
+            output_dir / f"loadtest-report-{run_id}.json",
+            lambda: json.dumps(report, indent=2, ensure_ascii=False),
+            output_dir / "loadtest-report-latest.json",
+        ),
+        asyncio.to_thread(
+            write_report_artifact,
+            output_dir / f"loadtest-summary-{run_id}.txt",
+            lambda: "\n".join(build_summary_lines(report)),
+            output_dir / "loadtest-summary-latest.txt",
+        ),
+        asyncio.to_thread(
+            write_report_artifact,
+            output_dir / f"loadtest-report-{run_id}.html",
+            lambda: render_html_report(report),
+            output_dir / "loadtest-report-latest.html",
+        ),
+    )
+    return json_path, txt_path, html_path
+
+
+def encode_publish_payload(payload: dict[str, Any], compress: bool) -> bytes:
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return gzip.compress(data, compresslevel=6) if compress else data
+
+
+async def iter_payload_chunks(data: bytes) -> AsyncIterator[bytes]:
+    view = memoryview(data)
+    for offset in range(0, len(view), PUBLISH_CHUNK_BYTES):
+        yield bytes(view[offset : offset + PUBLISH_CHUNK_BYTES])
+
+
+async def authenticate_publish_token(
+    *,
+    login_url: str,
+    email: str,
+    password: str,
+    token_field: str,
+    timeout_seconds: float,
+    insecure_tls: bool,
+) -> Optional[str]:
+    payload = {
+        "email": email,
+        "password": password,
+    }
+    headers = {
+        "Content-Type": "application/json",
+        "X-Client-Id": "LT-PUBLISHER",
+        "X-Correlation-Id": str(uuid.uuid4()),
+    }
+
+    async with httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout_seconds),
+        verify=not insecure_tls,
+    ) as client:
+        response = await client.post(login_url, json=payload, headers=headers)
+        if response.status_code >= 400:
+            print(
+                f"[publish] Falha no login admin ({response.status_code}) em {login_url}: "
+                f"{truncate_text(response.text or '', 220)}"
+            )
+            return None
+
+        try:
+            response_json = response.json()
+        except ValueError:
+            print(f"[publish] Resposta de login invalida em {login_url}.")
+            return None
+
+        token_value = response_json.get(token_field)
+        if not token_value:
+            print(f"[publish] Campo de token '{token_field}' nao encontrado na resposta de login.")
+            return None
+
+        return str(token_value)
+
+
+class AdminPublisher:
+    def __init__(
+        self,
+        *,
+        import_url: str,
+        source: str,
+        token: Optional[str],
+        login: Optional[Callable[[], Any]],
+        compress: bool,
+        timeout_seconds: float,
+        insecure_tls: bool,
+        max_attempts: int,
+    ) -> None:
+        self.import_url = import_url
+        self.source = source
+        self.token = token
+        self.login = login
+        self.compress = compress
+        self.max_attempts = max(max_attempts, 1)
+        self.published = 0
+        self.progress_sequences: Counter = Counter()
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout_seconds, write=None),
+            verify=not insecure_tls,
+        )
+
+    async def ensure_token(self, force: bool = False) -> bool:
+        if self.token and not force:
+            return True
+        if self.login is None:
+            return bool(self.token)
+        self.token = await self.login()
+        return bool(self.token)
+
+    async def publish(self, report: dict[str, Any], *, body: Optional[bytes] = None, quiet: bool = False) -> bool:
+        if not await self.ensure_token():
+            print("[publish] Nao foi possivel obter token admin para publicar o run.")
+            return False
+
+        payload = {
+            "source": self.source,
+            "report": report,
+        }
+        compress = self.compress
+        if body is None:
+            body = await asyncio.to_thread(encode_publish_payload, payload, compress)
+
+        # cada corpo diferente tem a propria chave (os retries do mesmo envio repetem a chave):
+        # um servidor/proxy que respeite Idempotency-Key nao devolve o primeiro parcial para o relatorio final
+        run_id = str(report.get("runId") or "")
+        if report.get("inProgress"):
+            self.progress_sequences[run_id] += 1
+            idempotency_key = f"{run_id}:progress:{self.progress_sequences[run_id]}"
+        else:
+            idempotency_key = f"{run_id}:final"
+
+        response: Optional[httpx.Response] = None
+        refreshed_token = False
+        attempt = 0
+        while attempt < self.max_attempts:
+            attempt += 1
+            headers = {
+                "Authorization": f"Bearer {self.token}",
+                "Content-Type": "application/json",
+                "X-Client-Id": "LT-PUBLISHER",
+                "X-Correlation-Id": str(uuid.uuid4()),
+                "Idempotency-Key": idempotency_key,
+            }
+            if compress:
+                headers["Content-Encoding"] = "gzip"
+
+            try:
+                response = await self.client.post(self.import_url, content=iter_payload_chunks(body), headers=headers)
+            except httpx.HTTPError as exc:
+                response = None
+                error = f"{type(exc).__name__}: {truncate_text(str(exc), 160)}"
+            else:
+                if compress and response.status_code in (400, 415):
+                    print(f"[publish] Servidor recusou payload gzip ({response.status_code}); reenviando sem compressao.")
+                    self.compress = compress = False
+                    body = await asyncio.to_thread(encode_publish_payload, payload, False)
+                    attempt -= 1
+                    continue
+                if response.status_code == 401 and not refreshed_token and self.login is not None:
+                    refreshed_token = True
+                    if await self.ensure_token(force=True):
+                        attempt -= 1
+                        continue
+                if response.status_code < 400:
+                    break
+                error = f"HTTP {response.status_code}: {truncate_text(response.text or '', 200)}"
+                if response.status_code < 500 and response.status_code not in (408, 429):
+                    print(f"[publish] Falha ao publicar run em {self.import_url}: {error}")
+                    return False
+
+            if attempt >= self.max_attempts:
+                print(f"[publish] Falha ao publicar run em {self.import_url} apos {attempt} tentativas: {error}")
+                return False
+            backoff = min(2 ** (attempt - 1), 30) * (0.5 + random.random())
+            if not quiet:
+                print(f"[publish] Tentativa {attempt} falhou ({error}); nova tentativa em {backoff:.1f}s.")
+            await asyncio.sleep(backoff)
+
+        self.published += 1
+        if quiet or response is None:
+            return True
+
+        try:
+            response_json = response.json()
+        except ValueError:
+            print(f"[publish] Run publicado em {self.import_url}, mas resposta nao veio em JSON.")
+            return True
+
+        print(
+            f"[publish] Run publicado com sucesso em {self.import_url}. "
+            f"id={response_json.get('id')} runId={response_json.get('externalRunId')} "
+            f"created={response_json.get('created')}"
+        )
+        return True
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+async def create_admin_publisher(config: dict[str, Any], args: argparse.Namespace) -> Optional[AdminPublisher]:
+    publish_cfg = config.get("adminPublish") or {}
+    enabled = bool(publish_cfg.get("enabled")) or bool(args.publish_admin)
+    if not enabled:
+        return None
+
+    base_url = str(config.get("baseUrl") or "").rstrip("/")
+    import_url = args.publish_url or publish_cfg.get("importUrl")
+    if not import_url and base_url:
+        import_url = f"{base_url}/api/admin/loadtests/import"
+
+    if not import_url:
+        print("[publish] adminPublish habilitado, mas importUrl nao foi informado.")
+        return None
+
+    source = (
+        args.publish_source
+        or publish_cfg.get("source")
+        or "python_loadtest_runner"
+    )
+
+    login = None
+    token = args.publish_token or publish_cfg.get("bearerToken")
+    if not token:
+        login_url = args.publish_login_url or publish_cfg.get("loginUrl")
+        if login_url and not str(login_url).lower().startswith(("http://", "https://")) and base_url:
+            login_url = f"{base_url}{login_url}"
+        if not login_url and base_url:
+            login_url = f"{base_url}/api/auth/login"
+
+        email = args.publish_email or publish_cfg.get("email")
+        password = args.publish_password or publish_cfg.get("password")
+        token_field = str(publish_cfg.get("tokenField") or "token")
+
+        if login_url and email and password:
+            login = functools.partial(
+                authenticate_publish_token,
+                login_url=str(login_url),
+                email=str(email),
+                password=str(password),
+                token_field=token_field,
+                timeout_seconds=max(float(args.timeout), 1.0),
+                insecure_tls=bool(args.insecure),
+            )
+
+    if not token and login is None:
+        print("[publish] Nao foi possivel obter token admin para publicar o run.")
+        return None
+
+    return AdminPublisher(
+        import_url=str(import_url),
+        source=str(source),
+        token=token,
+        login=login,
+        compress=bool(publish_cfg.get("compress", True)) and not bool(args.publish_no_compress),
+        timeout_seconds=max(to_float(args.publish_timeout or publish_cfg.get("timeoutSeconds"), float(args.timeout)), 1.0),
+        insecure_tls=bool(args.insecure),
+        max_attempts=to_int(publish_cfg.get("maxAttempts"), 4),
+    )
+
+
+async def publish_report_to_admin(
+    report: dict[str, Any],
+    config: dict[str, Any],
+    args: argparse.Namespace,
+    publisher: Optional[AdminPublisher] = None,
+) -> bool:
+    owns_publisher = publisher is None
+    if publisher is None:
+        publisher = await create_admin_publisher(config, args)
+    if publisher is None:
+        return False
+
+    try:
+        encoded_task = asyncio.create_task(
+            asyncio.to_thread(encode_publish_payload, {"source": publisher.source, "report": report}, publisher.compress)
+        )
+        if not await publisher.ensure_token():
+            encoded_task.cancel()
+            print("[publish] Nao foi possivel obter token admin para publicar o run.")
+            return False
+        return await publisher.publish(report, body=await encoded_task)
+    finally:
+        if owns_publisher:
+            await publisher.close()
+
+
+HTML_CHARTS_SCRIPT = """
+(function () {
+  var charts = JSON.parse(document.getElementById('chart-data').textContent);
+  if (!charts || !charts.requests) { return; }
+  var palette = ['#2563eb', '#dc2626', '#16a34a', '#d97706', '#7c3aed', '#0891b2', '#db2777', '#4b5563'];
+  var pad = { left: 56, right: 12, top: 12, bottom: 28 };
+
+  function setup(id) {
+    var canvas = document.getElementById(id);
+    var ctx = canvas.getContext('2d');
+    ctx.font = '11px Arial';
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    return { ctx: ctx, w: canvas.width - pad.left - pad.right, h: canvas.height - pad.top - pad.bottom };
+  }
+
+  function axes(c, maxY, xLabel, yFormat) {
+    var ctx = c.ctx;
+    ctx.strokeStyle = '#9ca3af';
+    ctx.fillStyle = '#374151';
+    ctx.beginPath();
+    ctx.moveTo(pad.left, pad.top);
+    ctx.lineTo(pad.left, pad.top + c.h);
+    ctx.lineTo(pad.left + c.w, pad.top + c.h);
+    ctx.stroke();
+    for (var i = 0; i <= 4; i++) {
+      var y = pad.top + c.h - (c.h * i / 4);
+      ctx.fillText(yFormat(maxY * i / 4), 4, y + 4);
+    }
+    ctx.fillText(xLabel, pad.left + c.w - ctx.measureText(xLabel).width, pad.top + c.h + 20);
+  }
+
+  function lines(id, series, valueKey, yLabel) {
+    var c = setup(id);
+    var maxY = 0;
+    var points = 0;
+    series.forEach(function (s) {
+      s[valueKey].forEach(function (v) { if (v !== null && v > maxY) { maxY = v; } });
+      points = Math.max(points, s[valueKey].length);
+    });
+    maxY = maxY || 1;
+    axes(c, maxY, 't (x' + charts.bucketSeconds + 's)', function (v) { return v.toFixed(v < 10 ? 1 : 0) + yLabel; });
+    series.forEach(function (s, index) {
+      var ctx = c.ctx;
+      ctx.strokeStyle = palette[index % palette.length];
+      ctx.beginPath();
+      var started = false;
+      s[valueKey].forEach(function (v, i) {
+        if (v === null) { started = false; return; }
+        var x = pad.left + (points > 1 ? c.w * i / (points - 1) : 0);
+        var y = pad.top + c.h - (c.h * v / maxY);
+        if (started) { ctx.lineTo(x, y); } else { ctx.moveTo(x, y); started = true; }
+      });
+      ctx.stroke();
+      ctx.fillStyle = ctx.strokeStyle;
+      ctx.fillText(s.endpoint, pad.left + 8, pad.top + 12 + (index * 13));
+    });
+  }
+
+  function heatmap(id) {
+    var c = setup(id);
+    var data = charts.heatmap;
+    var rows = data.latencyEdgesMs.length;
+    var cols = data.counts.length;
+    var maxCount = 1;
+    data.counts.forEach(function (row) { row.forEach(function (v) { if (v > maxCount) { maxCount = v; } }); });
+    var cw = c.w / Math.max(cols, 1);
+    var ch = c.h / rows;
+    data.counts.forEach(function (row, t) {
+      row.forEach(function (v, r) {
+        if (!v) { return; }
+        var k = Math.log(v + 1) / Math.log(maxCount + 1);
+        c.ctx.fillStyle = 'rgb(' + Math.round(255 - 40 * k) + ',' + Math.round(237 - 200 * k) + ',' + Math.round(213 - 190 * k) + ')';
+        c.ctx.fillRect(pad.left + t * cw, pad.top + c.h - (r + 1) * ch, Math.ceil(cw), Math.ceil(ch));
+      });
+    });
+    c.ctx.fillStyle = '#374151';
+    data.latencyEdgesMs.forEach(function (edge, r) {
+      if (r % 2 === 0) { c.ctx.fillText(edge + 'ms', 4, pad.top + c.h - r * ch - 2); }
+    });
+    c.ctx.fillText('t (x' + charts.bucketSeconds + 's)', pad.left + c.w - 60, pad.top + c.h + 20);
+  }
+
+  function cdf(id) {
+    var c = setup(id);
+    var xs = charts.cdf.latencyMs;
+    var ys = charts.cdf.fraction;
+    if (!xs.length) { return; }
+    var minX = Math.log10(Math.max(xs[0], 0.1));
+    var maxX = Math.log10(Math.max(xs[xs.length - 1], 1));
+    var span = Math.max(maxX - minX, 0.001);
+    axes(c, 1, 'latencia (ms, log)', function (v) { return (v * 100).toFixed(0) + '%'; });
+    c.ctx.strokeStyle = palette[0];
+    c.ctx.beginPath();
+    xs.forEach(function (v, i) {
+      var x = pad.left + c.w * (Math.log10(Math.max(v, 0.1)) - minX) / span;
+      var y = pad.top + c.h - c.h * ys[i];
+      if (i === 0) { c.ctx.moveTo(x, y); } else { c.ctx.lineTo(x, y); }
+    });
+    c.ctx.stroke();
+    c.ctx.fillStyle = '#374151';
+    [minX, (minX + maxX) / 2, maxX].forEach(function (lx, i) {
+      c.ctx.fillText(Math.pow(10, lx).toFixed(1) + 'ms', pad.left + (c.w * i / 2) - (i ? 30 : 0), pad.top + c.h + 12);
+    });
+  }
+
+  function mark(id, index, points, label) {
+    var canvas = document.getElementById(id);
+    var ctx = canvas.getContext('2d');
+    var w = canvas.width - pad.left - pad.right;
+    var x = pad.left + (points > 1 ? w * index / (points - 1) : 0);
+    ctx.strokeStyle = '#dc2626';
+    ctx.setLineDash([4, 3]);
+    ctx.beginPath();
+    ctx.moveTo(x, pad.top);
+    ctx.lineTo(x, canvas.height - pad.bottom);
+    ctx.stroke();
+    ctx.setLineDash([]);
+    ctx.fillStyle = '#dc2626';
+    ctx.fillText(label, x + 4, pad.top + 28);
+  }
+
+  heatmap('chart-heatmap');
+  lines('chart-rps', charts.endpoints, 'rps', '');
+  lines('chart-p95', charts.endpoints, 'p95LatencyMs', 'ms');
+  cdf('chart-cdf');
+  (charts.server || []).forEach(function (s, i) {
+    lines('chart-server-' + i, [s], 'values', '');
+    if (s.saturatedAt !== null) { mark('chart-server-' + i, s.saturatedAt, s.values.length, 'saturacao'); }
+  });
+})();
+"""
+
+
+def render_html_report(report: dict[str, Any]) -> str:
+    summary = report.get("summary", {})
+    latency = report.get("latencyMs", {})
+    statuses = report.get("statusCodes", [])
+    top_hits = report.get("topEndpointsByHits", [])
+    top_errors = report.get("topErrors", [])
+    failures = report.get("failureSamples", [])
+    journeys = report.get("journeys", [])
+    slowest = report.get("slowestRequests", [])
+    fairness = report.get("fairness") or {}
+    hubs = report.get("signalr") or []
+    uploads = report.get("uploads") or {}
+    server_metrics = report.get("serverMetrics") or {}
+    retries = report.get("retries") or {}
+    cache = report.get("cache") or {}
+    transfer = report.get("transfer") or {}
+    soak = report.get("soak") or {}
+    spike = report.get("spike") or {}
+    populations = report.get("populations") or {}
+    chart_data = json.dumps(report.get("charts") or {}, separators=(",", ":")).replace("</", "<\\/")
+    partial_banner = (
+        f"<p><strong>Relatorio parcial:</strong> interrompido por {report.get('stopReason')} "
+        f"apos {report.get('durationSeconds')}s de {report.get('plannedDurationSeconds')}s planejados.</p>"
+        if report.get("partial")
+        else ""
+    )
+
+    def rows_for_status() -> str:
+        if not statuses:
+            return "<tr><td colspan='3'>(none)</td></tr>"
+        return "".join(
+            f"<tr><td>{item.get('statusCode')}</td><td>{item.get('count')}</td><td>{item.get('percentage')}%</td></tr>"
+            for item in statuses
+        )
+
+    def rows_for_top_hits() -> str:
+        if not top_hits:
+            return "<tr><td colspan='5'>(none)</td></tr>"
+        return "".join(
+            "<tr>"
+            f"<td>{item.get('endpoint')}</td>"
+            f"<td>{item.get('hits')}</td>"
+            f"<td>{item.get('p95LatencyMs')} ms</td>"
+            f"<td>{item.get('errorRatePercent')}%</td>"
+            f"<td>{item.get('avgLatencyMs')} ms</td>"
+            "</tr>"
+            for item in top_hits
+        )
+
+    def rows_for_errors() -> str:
+        if not top_errors:
+            return "<tr><td colspan='3'>(none)</td></tr>"
+        return "".join(
+            "<tr>"
+            f"<td>{item.get('message')}</td>"
+            f"<td>{item.get('count')}</td>"
+            f"<td>{', '.join(item.get('endpoints', []))}</td>"
+            "</tr>"
+            for item in top_errors
+        )
+
+    def rows_for_journeys() -> str:
+        if not journeys:
+            return "<tr><td colspan='6'>(none)</td></tr>"
+        return "".join(
+            "<tr>"
+            f"<td>{item.get('flow')}</td>"
+            f"<td>{item.get('runs')}</td>"
+            f"<td>{item.get('failureRatePercent')}%</td>"
+            f"<td>{item.get('p50Ms')} ms</td>"
+            f"<td>{item.get('p95Ms')} ms</td>"
+            f"<td>{item.get('p99Ms')} ms</td>"
+            "</tr>"
+            for item in journeys
+        )
+
+    def rows_for_slowest() -> str:
+        if not slowest:
+            return "<tr><td colspan='5'>(none)</td></tr>"
+        return "".join(
+            "<tr>"
+            f"<td>{item.get('durationMs')} ms</td>"
+            f"<td>{item.get('endpoint')}</td>"
+            f"<td>{item.get('timestampUtc')}</td>"
+            f"<td><code>{item.get('traceId') or '-'}</code></td>"
+            f"<td>{item.get('correlationId')}</td>"
+            "</tr>"
+            for item in slowest
+        )
+
+    def rows_for_hubs() -> str:
+        return "".join(
+            "<tr>"
+            f"<td>{hub.get('hub')}</td>"
+            f"<td>{hub.get('connections')}</td>"
+            f"<td>{hub.get('established')}</td>"
+            f"<td>{hub.get('peakOpen')}</td>"
+            f"<td>{hub.get('drops')}</td>"
+            f"<td>{hub.get('reconnects')}</td>"
+            f"<td>{hub.get('messagesSent')} / {hub.get('messagesReceived')}</td>"
+            f"<td>{(hub.get('fanoutLatencyMs') or {}).get('p50')} / {(hub.get('fanoutLatencyMs') or {}).get('p95')} / {(hub.get('fanoutLatencyMs') or {}).get('p99')} ms</td>"
+            "</tr>"
+            for hub in hubs
+        )
+
+    hubs_section = (
+        f"""
+  <h2>Conexoes SignalR/WebSocket</h2>
+  <table>
+    <thead><tr><th>Hub</th><th>Conexoes</th><th>Estabelecidas</th><th>Pico abertas</th><th>Quedas</th><th>Reconexoes</th><th>Msgs enviadas / recebidas</th><th>Fan-out p50 / p95 / p99</th></tr></thead>
+    <tbody>{rows_for_hubs()}</tbody>
+  </table>
+"""
+        if hubs
+        else ""
+    )
+
+    def rows_for_populations() -> str:
+        rows = []
+        for item in populations.get("populations", []):
+            worst = ", ".join(
+                f"{endpoint.get('endpoint')} ({endpoint.get('p95LatencyMs')} ms)"
+                for endpoint in item.get("topEndpointsByP95", [])[:3]
+            )
+            rows.append(
+                "<tr>"
+                f"<td>{item.get('name')}</td>"
+                f"<td>{item.get('vus')}</td>"
+                f"<td>{item.get('accounts')}</td>"
+                f"<td>{item.get('requests')}</td>"
+                f"<td>{item.get('rps')}</td>"
+                f"<td>{item.get('errorRatePercent')}%</td>"
+                f"<td>{item.get('p50LatencyMs')} / {item.get('p95LatencyMs')} / {item.get('p99LatencyMs')} ms</td>"
+                f"<td>{worst}</td>"
+                "</tr>"
+            )
+        for shared in populations.get("sharedEndpoints", []):
+            values = " | ".join(
+                f"{name}: p95 {stats.get('p95LatencyMs')} ms, {stats.get('requests')} req"
+                for name, stats in shared.get("populations", {}).items()
+            )
+            rows.append(f"<tr><td colspan=\"2\">compartilhado</td><td colspan=\"6\">{shared.get('endpoint')}: {values}</td></tr>")
+        return "".join(rows)
+
+    populations_section = (
+        f"""
+  <h2>Populacoes (apps)</h2>
+  <table>
+    <thead><tr><th>Population</th><th>VUs</th><th>Contas</th><th>Requests</th><th>RPS</th><th>Erro</th><th>p50 / p95 / p99</th><th>Piores endpoints (p95)</th></tr></thead>
+    <tbody>{rows_for_populations()}</tbody>
+  </table>
+"""
+        if populations
+        else ""
+    )
+
+    def rows_for_uploads() -> str:
+        return "".join(
+            "<tr>"
+            f"<td>{item.get('endpoint')}</td>"
+            f"<td>{item.get('uploads')}</td>"
+            f"<td>{item.get('megabytes')} MB</td>"
+            f"<td>{item.get('aggregateMBps')}</td>"
+            f"<td>{(item.get('sizeBytes') or {}).get('p50')} / {(item.get('sizeBytes') or {}).get('p95')} B</td>"
+            f"<td>{(item.get('perUploadMBps') or {}).get('p5')} / {(item.get('perUploadMBps') or {}).get('p50')}</td>"
+            f"<td>{(item.get('sendMs') or {}).get('p50')} / {(item.get('sendMs') or {}).get('p95')} ms</td>"
+            f"<td>{(item.get('ttfbAfterUploadMs') or {}).get('p50')} / {(item.get('ttfbAfterUploadMs') or {}).get('p95')} / {(item.get('ttfbAfterUploadMs') or {}).get('p99')} ms</td>"
+            "</tr>"
+            for item in uploads.get("endpoints", [])
+        )
+
+    uploads_section = (
+        f"""
+  <h2>Uploads multipart</h2>
+  <p>Total {uploads.get('megabytes')} MB, {uploads.get('aggregateMBps')} MB/s agregado, pico de {uploads.get('inFlightPeak')} uploads em voo.</p>
+  <table>
+    <thead><tr><th>Endpoint</th><th>Uploads</th><th>Volume</th><th>MB/s agregado</th><th>Tamanho p50 / p95</th><th>MB/s por upload p5 / p50</th><th>Envio p50 / p95</th><th>TTFB apos upload p50 / p95 / p99</th></tr></thead>
+    <tbody>{rows_for_uploads()}</tbody>
+  </table>
+"""
+        if uploads
+        else ""
+    )
+
+    def rows_for_retries() -> str:
+        return "".join(
+            "<tr>"
+            f"<td>{item.get('endpoint')}</td>"
+            f"<td>{item.get('calls')}</td>"
+            f"<td>{item.get('attempts')}</td>"
+            f"<td>{item.get('amplification')}x</td>"
+            f"<td>{item.get('retriesPerSuccess')}</td>"
+            f"<td>{item.get('goodputRps')} / {item.get('throughputRps')}</td>"
+            f"<td>{item.get('recoveredByRetry')}</td>"
+            f"<td>{', '.join(f'{reason}={count}' for reason, count in (item.get('gaveUp') or {}).items())}</td>"
+            f"<td>{', '.join(f'{reason}={count}' for reason, count in (item.get('reasons') or {}).items())}</td>"
+            f"<td>{(item.get('callLatencyMs') or {}).get('p95')} ms ({item.get('attemptP95Ms')} ms)</td>"
+            "</tr>"
+            for item in retries.get("endpoints", [])
+        )
+
+    retries_gave_up = ", ".join(f"{reason}={count}" for reason, count in (retries.get("gaveUp") or {}).items()) or "nenhuma"
+    retries_section = (
+        f"""
+  <h2>Retries (politica do cliente)</h2>
+  <p>{retries.get('calls')} chamadas geraram {retries.get('attempts')} requests (amplificacao {retries.get('amplification')}x, {retries.get('retriesPerSuccess')} retries por sucesso). Goodput {retries.get('goodputRps')} req/s de {retries.get('throughputRps')} req/s enviados ({retries.get('goodputPercent')}%). Recuperadas por retry: {retries.get('recoveredByRetry')}; desistencias: {retries_gave_up}; pico de {retries.get('peakRetriesPerSecond')} retries/s no segundo {retries.get('peakRetriesSecond')}.</p>
+  <table>
+    <thead><tr><th>Endpoint</th><th>Chamadas</th><th>Tentativas</th><th>Amplificacao</th><th>Retries/sucesso</th><th>Goodput / throughput (req/s)</th><th>Recuperadas</th><th>Desistencias</th><th>Motivos</th><th>P95 chamada (tentativa)</th></tr></thead>
+    <tbody>{rows_for_retries()}</tbody>
+  </table>
+"""
+        if retries
+        else ""
+    )
+
+    def rows_for_cache() -> str:
+        rows = []
+        for item in cache.get("endpoints", []):
+            outcomes = item.get("outcomes") or {}
+            latency = item.get("latencyMs") or {}
+            hit_rate = f"{item.get('hitRatePercent')}%" if item.get("serverSentValidators", True) else "sem validadores"
+            rows.append(
+                "<tr>"
+                f"<td>{item.get('endpoint')}</td>"
+                f"<td>{item.get('requests')}</td>"
+                f"<td>{' '.join(f'{outcome}={count}' for outcome, count in outcomes.items() if count)}</td>"
+                f"<td>{hit_rate}</td>"
+                f"<td>{(latency.get('revalidated') or {}).get('p50')} / {(latency.get('revalidated') or {}).get('p95')} ms</td>"
+                f"<td>{(item.get('fullResponseLatencyMs') or {}).get('p50')} / {(item.get('fullResponseLatencyMs') or {}).get('p95')} ms</td>"
+                f"<td>{item.get('p50SavingPercent')}%</td>"
+                f"<td>{item.get('averageFullBodyBytes')} B</td>"
+                f"<td>{item.get('estimatedBytesSaved')} B</td>"
+                "</tr>"
+            )
+        return "".join(rows)
+
+    cache_validator_warning = (
+        "<p><strong>O servidor nao enviou ETag nem Last-Modified em nenhuma resposta:</strong> sem validadores nao ha revalidacao e o hit rate nao mede o cache.</p>"
+        if cache and not cache.get("serverSentValidators", True)
+        else (
+            f"<p>Sem validadores do servidor: {', '.join(cache.get('endpointsWithoutValidators') or [])}</p>"
+            if cache.get("endpointsWithoutValidators")
+            else ""
+        )
+    )
+    cache_section = (
+        f"""
+  <h2>Cache HTTP (revalidacao condicional)</h2>
+  {cache_validator_warning}
+  <p>{cache.get('conditionalRequests')} de {cache.get('requests')} requests foram condicionais (If-None-Match/If-Modified-Since); hit rate (304) de {cache.get('hitRatePercent')}%, ~{cache.get('estimatedBytesSaved')} bytes de corpo economizados.</p>
+  <table>
+    <thead><tr><th>Endpoint</th><th>Requests</th><th>Resultados</th><th>Hit rate (304)</th><th>304 p50 / p95</th><th>200 p50 / p95</th><th>Economia p50</th><th>Corpo medio (200)</th><th>Bytes economizados</th></tr></thead>
+    <tbody>{rows_for_cache()}</tbody>
+  </table>
+"""
+        if cache
+        else ""
+    )
+
+    def rows_for_transfer() -> str:
+        rows = []
+        for item in transfer.get("endpoints", []):
+            decode = item.get("decodeMs") or {}
+            body = item.get("bodyTransferMs") or {}
+            rows.append(
+                "<tr>"
+                f"<td>{item.get('endpoint')}</td>"
+                f"<td>{item.get('profile')}</td>"
+                f"<td>{item.get('responses')}</td>"
+                f"<td>{' '.join(f'{encoding}={count}' for encoding, count in (item.get('encodings') or {}).items())}</td>"
+                f"<td>{item.get('averageWireBytes')} / {item.get('averageDecodedBytes')} B</td>"
+                f"<td>{item.get('compressionRatio')}x</td>"
+                f"<td>{decode.get('avg')} / {decode.get('p95')} ms ({item.get('decodeMicrosPerKB')} us/KB)</td>"
+                f"<td>{body.get('p50')} / {body.get('p95')} ms</td>"
+                f"<td>{item.get('bodyTransferSharePercent')}% / {item.get('decodeSharePercent')}%</td>"
+                "</tr>"
+            )
+        return "".join(rows)
+
+    transfer_profiles = " ".join(
+        f"{item.get('profile')} ({item.get('vus')} VUs): {item.get('wireMegabytes')} MB na rede, razao {item.get('compressionRatio')}x;"
+        for item in transfer.get("profiles", [])
+    )
+    transfer_section = (
+        f"""
+  <h2>Transferencia e compressao</h2>
+  <p>{transfer.get('wireMegabytes')} MB na rede ({transfer.get('wireMBps')} MB/s) para {transfer.get('decodedMegabytes')} MB decodificados (razao {transfer.get('compressionRatio')}x, {transfer.get('savedPercent')}% economizados); {transfer.get('decodeCpuMs')} ms de CPU decodificando. {transfer_profiles}</p>
+  <table>
+    <thead><tr><th>Endpoint</th><th>Perfil</th><th>Respostas</th><th>Content-Encoding</th><th>Medio rede / decodificado</th><th>Razao</th><th>Decode avg / p95</th><th>Corpo p50 / p95</th><th>% latencia corpo / decode</th></tr></thead>
+    <tbody>{rows_for_transfer()}</tbody>
+  </table>
+"""
+        if transfer
+        else ""
+    )
+
+    def rows_for_soak() -> str:
+        rows = []
+        for item in soak.get("endpoints", []):
+            p95 = item.get("p95Ms") or {}
+            error_rate = item.get("errorRatePercent") or {}
+            rows.append(
+                "<tr>"
+                f"<td>{item.get('endpoint')}</td>"
+                f"<td>{p95.get('first')} -> {p95.get('last')} ms</td>"
+                f"<td>{p95.get('slopePerHour')} ms/h</td>"
+                f"<td>{p95.get('pValue')}</td>"
+                f"<td>{error_rate.get('first')} -> {error_rate.get('last')}%</td>"
+                f"<td>{error_rate.get('pValue')}</td>"
+                f"<td>{'DRIFT' if item.get('drift') else '-'}</td>"
+                "</tr>"
+            )
+        return "".join(rows)
+
+    soak_drifts = "".join(
+        f"<li><strong>{item.get('scope')}</strong> {item.get('metric')}: {item.get('from')} -> {item.get('to')} "
+        f"({item.get('changePercent', item.get('changePoints'))}{'%' if 'changePercent' in item else ' p.p.'}, p={item.get('pValue')})</li>"
+        for item in soak.get("drifts", [])
+    )
+    soak_section = (
+        f"""
+  <h2>Soak: tendencia por janela</h2>
+  <p>{soak.get('windows')} janelas de {soak.get('windowSeconds')}s (ignorados {soak.get('skippedSeconds')}s iniciais). Mann-Kendall com alpha={soak.get('alpha')}, drift minimo de {soak.get('minDriftPercent')}% no p95 ou {soak.get('minErrorRateDriftPoints')} p.p. na taxa de erro.</p>
+  <ul>{soak_drifts or '<li>Sem drift estatisticamente significativo.</li>'}</ul>
+  <table>
+    <thead><tr><th>Endpoint</th><th>P95 inicio -> fim</th><th>Inclinacao p95</th><th>p (p95)</th><th>Erro inicio -> fim</th><th>p (erro)</th><th>Drift</th></tr></thead>
+    <tbody>{rows_for_soak()}</tbody>
+  </table>
+"""
+        if soak
+        else ""
+    )
+
+    def rows_for_spike() -> str:
+        return "".join(
+            "<tr>"
+            f"<td>{burst.get('index')} ({burst.get('startSecond')}-{burst.get('endSecond')}s)</td>"
+            f"<td>{(burst.get('activation') or {}).get('p50Ms')} / {(burst.get('activation') or {}).get('p95Ms')} / {(burst.get('activation') or {}).get('maxMs')} ms</td>"
+            f"<td>{(burst.get('during') or {}).get('rps')} (x{burst.get('rpsRatio')})</td>"
+            f"<td>{((burst.get('during') or {}).get('latencyMs') or {}).get('p95')} ms (x{burst.get('p95Ratio')})</td>"
+            f"<td>{(burst.get('during') or {}).get('errorRatePercent')}%</td>"
+            f"<td>{burst.get('p95RecoverySeconds') if burst.get('p95RecoverySeconds') is not None else 'nao'}</td>"
+            f"<td>{burst.get('errorRateRecoverySeconds') if burst.get('errorRateRecoverySeconds') is not None else 'nao'}</td>"
+            f"<td>{burst.get('recoverySeconds') if burst.get('recoverySeconds') is not None else 'NAO recuperou'}</td>"
+            "</tr>"
+            for burst in spike.get("bursts", [])
+        )
+
+    spike_baseline = spike.get("baseline") or {}
+    spike_criteria = spike.get("recoveryCriteria") or {}
+    spike_section = (
+        f"""
+  <h2>Pico (spike)</h2>
+  <p>VUs {spike.get('baselineVus')} -> {spike.get('baselineVus', 0) + spike.get('spikeVus', 0)} (x{spike.get('multiplier')}) por {spike.get('spikeSeconds')}s. Baseline ({spike_baseline.get('fromSecond')}-{spike_baseline.get('toSecond')}s): {spike_baseline.get('rps')} rps, p95 {(spike_baseline.get('latencyMs') or {}).get('p95')} ms, erro {spike_baseline.get('errorRatePercent')}%. Recuperado quando p95 <= {spike_criteria.get('p95LimitMs')} ms e erro <= {spike_criteria.get('errorRateLimitPercent')}% (janela {spike_criteria.get('windowSeconds')}s, estavel por {spike_criteria.get('stableSeconds')}s).</p>
+  <table>
+    <thead><tr><th>Pico</th><th>Ativacao p50/p95/max</th><th>RPS</th><th>P95</th><th>Erros</th><th>Recuperacao p95 (s)</th><th>Recuperacao erro (s)</th><th>Recuperacao (s)</th></tr></thead>
+    <tbody>{rows_for_spike()}</tbody>
+  </table>
+"""
+        if spike
+        else ""
+    )
+
+    def rows_for_server_metrics() -> str:
+        return "".join(
+            "<tr>"
+            f"<td>{name}</td>"
+            f"<td>{item.get('min')}</td>"
+            f"<td>{item.get('avg')}</td>"
+            f"<td>{item.get('max')}</td>"
+            f"<td>{len(item.get('points') or [])}</td>"
+            "</tr>"
+            for name, item in (server_metrics.get("series") or {}).items()
+        )
+
+    def rows_for_saturation() -> str:
+        if not server_metrics.get("saturation"):
+            return "<tr><td colspan='6'>(nenhum limite cruzado)</td></tr>"
+        return "".join(
+            "<tr>"
+            f"<td>{item.get('second')}s</td>"
+            f"<td>{item.get('metric')}</td>"
+            f"<td>{item.get('value')} (limite {item.get('threshold')})</td>"
+            f"<td>{item.get('clientRps')}</td>"
+            f"<td>{item.get('clientP95Ms')} ms</td>"
+            f"<td>{item.get('clientErrorRatePercent')}%</td>"
+            "</tr>"
+            for item in server_metrics.get("saturation", [])
+        )
+
+    server_canvases = "".join(
+        f'<div><strong>{item.get("endpoint")}</strong><canvas id="chart-server-{index}" width="560" height="200"></canvas></div>'
+        for index, item in enumerate((report.get("charts") or {}).get("server") or [])
+    )
+    server_sources = ", ".join(
+        f"{item.get('name')} ({item.get('type')}, {item.get('samples')} amostras, {item.get('errors')} erros)"
+        for item in server_metrics.get("sources", [])
+    )
+    server_metrics_section = (
+        f"""
+  <h2>Metricas do servidor</h2>
+  <p>Amostragem a cada {server_metrics.get('intervalSeconds')}s; fontes: {server_sources}.</p>
+  <div class="charts">{server_canvases}</div>
+  <table>
+    <thead><tr><th>Saturacao em</th><th>Metrica</th><th>Valor</th><th>RPS cliente</th><th>P95 cliente</th><th>Erros cliente</th></tr></thead>
+    <tbody>{rows_for_saturation()}</tbody>
+  </table>
+  <table>
+    <thead><tr><th>Serie</th><th>Min</th><th>Media</th><th>Max</th><th>Amostras</th></tr></thead>
+    <tbody>{rows_for_server_metrics()}</tbody>
+  </table>
+"""
+        if server_metrics
+        else ""
+    )
+
+    def rows_for_fairness() -> str:
+        rows = []
+        for dimension, label in (("vu", "VU"), ("tenant", "Tenant"), ("account", "Conta")):
+            data = fairness.get(dimension) or {}
+            spread = data.get("p95Spread") or {}
+            rows.append(
+                "<tr>"
+                f"<td>{label}</td>"
+                f"<td>{data.get('keys')}</td>"
+                f"<td>{data.get('jainThroughput')}</td>"
+                f"<td>{data.get('jainLatency')}</td>"
+                f"<td>{spread.get('min')} / {spread.get('p50')} / {spread.get('p90')} / {spread.get('max')} ms</td>"
+                f"<td>{spread.get('maxToMedianRatio')}</td>"
+                f"<td>{', '.join(str(item.get('key')) + ' (' + str(item.get('p95LatencyMs')) + ' ms)' for item in data.get('worstByP95', [])[:3])}</td>"
+                "</tr>"
+            )
+        return "".join(rows)
+
+    fairness_section = (
+        f"""
+  <h2>Fairness por VU, tenant e conta</h2>
+  <table>
+    <thead><tr><th>Dimensao</th><th>Chaves</th><th>Jain (requests)</th><th>Jain (1/p95)</th><th>p95 min / p50 / p90 / max</th><th>max/p50</th><th>Piores p95</th></tr></thead>
+    <tbody>{rows_for_fairness()}</tbody>
+  </table>
+"""
+        if fairness
+        else ""
+    )
+
+    def rows_for_failures() -> str:
+        if not failures:
+            return "<tr><td colspan='7'>(none)</td></tr>"
+        return "".join(
+            "<tr>"
+            f"<td>{item.get('timestampUtc')}</td>"
+            f"<td>{item.get('method')}</td>"
+            f"<td>{item.get('path')}</td>"
+            f"<td>{item.get('statusCode')}</td>"
+            f"<td>{item.get('correlationId')}</td>"
+            f"<td>{item.get('errorType')}</td>"
+            f"<td>{truncate_text(str(item.get('errorMessage') or ''), 140)}</td>"
+            "</tr>"
+            for item in failures
+        )
+
+    return f"""<!doctype html>
+<html lang="pt-BR">
+<head>
+  <meta charset="utf-8"/>
+  <meta name="viewport" content="width=device-width, initial-scale=1"/>
+  <title>Load Test Report - {report.get('runId')}</title>
+  <style>
+    body {{ font-family: Arial, sans-serif; margin: 20px; color: #1f2937; }}
+    h1, h2 {{ margin: 0 0 12px; }}
+    .grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(240px, 1fr)); gap: 10px; margin-bottom: 16px; }}
+    .card {{ border: 1px solid #d1d5db; border-radius: 8px; padding: 10px; background: #f9fafb; }}
+    table {{ width: 100%; border-collapse: collapse; margin: 12px 0 20px; font-size: 13px; }}
+    th, td {{ border: 1px solid #d1d5db; padding: 6px 8px; text-align: left; vertical-align: top; }}
+    th {{ background: #f3f4f6; }}
+    code {{ background: #f3f4f6; padding: 2px 4px; border-radius: 4px; }}
+    .charts {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(460px, 1fr)); gap: 12px; margin-bottom: 16px; }}
+    .charts canvas {{ width: 100%; border: 1px solid #d1d5db; border-radius: 8px; background: #fff; }}
+  </style>
+</head>
+<body>
+  <h1>Load Test Report</h1>
+  <p><strong>RunId:</strong> <code>{report.get('runId')}</code></p>
+  <p><strong>Scenario:</strong> {report.get('scenario')} | <strong>BaseUrl:</strong> {report.get('baseUrl')}</p>
+  {partial_banner}
+  <p><strong>Inicio:</strong> {report.get('startedAtUtc')} | <strong>Fim:</strong> {report.get('finishedAtUtc')} | <strong>DuraÃ§Ã£o:</strong> {report.get('durationSeconds')}s</p>
+
+  <div class="grid">
+    <div class="card"><strong>Total requests</strong><br/>{summary.get('totalRequests', 0)}</div>
+    <div class="card"><strong>Sucesso</strong><br/>{summary.get('successfulRequests', 0)}</div>
+    <div class="card"><strong>Falhas</strong><br/>{summary.get('failedRequests', 0)} ({summary.get('errorRatePercent', 0)}%)</div>
+    <div class="card"><strong>RPS mÃ©dio/pico</strong><br/>{summary.get('rpsAvg', 0)} / {summary.get('rpsPeak', 0)}</div>
+    <div class="card"><strong>LatÃªncia p50</strong><br/>{latency.get('p50', 0)} ms</div>
+    <div class="card"><strong>LatÃªncia p95/p99</strong><br/>{latency.get('p95', 0)} / {latency.get('p99', 0)} ms</div>
+  </div>
+
+  <h2>Graficos</h2>
+  <div class="charts">
+    <div><strong>Heatmap tempo x latencia</strong><canvas id="chart-heatmap" width="560" height="260"></canvas></div>
+    <div><strong>CDF de latencia</strong><canvas id="chart-cdf" width="560" height="260"></canvas></div>
+    <div><strong>RPS por endpoint</strong><canvas id="chart-rps" width="560" height="260"></canvas></div>
+    <div><strong>P95 por endpoint</strong><canvas id="chart-p95" width="560" height="260"></canvas></div>
+  </div>
+
+  <h2>Status codes</h2>
+  <table>
+    <thead><tr><th>Status</th><th>Contagem</th><th>%</th></tr></thead>
+    <tbody>{rows_for_status()}</tbody>
+  </table>
+
+  <h2>Top endpoints por hits</h2>
+  <table>
+    <thead><tr><th>Endpoint</th><th>Hits</th><th>P95</th><th>Error rate</th><th>MÃ©dia</th></tr></thead>
+    <tbody>{rows_for_top_hits()}</tbody>
+  </table>
+
+  <h2>Top erros</h2>
+  <table>
+    <thead><tr><th>Mensagem normalizada</th><th>Contagem</th><th>Endpoints</th></tr></thead>
+    <tbody>{rows_for_errors()}</tbody>
+  </table>
+
+  <h2>Jornadas (flows)</h2>
+  <table>
+    <thead><tr><th>Flow</th><th>Execucoes</th><th>Falhas</th><th>P50</th><th>P95</th><th>P99</th></tr></thead>
+    <tbody>{rows_for_journeys()}</tbody>
+  </table>
+
+  <h2>Amostras de falha</h2>
+  <table>
+    <thead><tr><th>Timestamp</th><th>MÃ©todo</th><th>Path</th><th>Status</th><th>CorrelationId</th><th>Tipo</th><th>Erro</th></tr></thead>
+    <tbody>{rows_for_failures()}</tbody>
+  </table>
+
+  <h2>Requests mais lentos (exemplars)</h2>
+  <table>
+    <thead><tr><th>Duracao</th><th>Endpoint</th><th>Timestamp</th><th>TraceId</th><th>CorrelationId</th></tr></thead>
+    <tbody>{rows_for_slowest()}</tbody>
+  </table>
+{populations_section}{hubs_section}{uploads_section}{retries_section}{cache_section}{transfer_section}{soak_section}{spike_section}{server_metrics_section}{fairness_section}
+  <script type="application/json" id="chart-data">{chart_data}</script>
+  <script>{HTML_CHARTS_SCRIPT}</script>
+</body>
+</html>"""
+
+
+def load_raw_samples(raw_path: Path) -> tuple[Any, Any, dict[str, Any]]:
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise RuntimeError("Os comandos analyze e correlate requerem numpy (pip install numpy).") from exc
+
+    if not raw_path.exists():
+        raise FileNotFoundError(f"Arquivo de amostras nao encontrado: {raw_path}")
+
+    with raw_path.open("rb") as handle:
+        header = handle.read(RAW_LOG_HEADER.size)
+    if len(header) < RAW_LOG_HEADER.size:
+        raise ValueError(f"Arquivo de amostras invalido: {raw_path}")
+
+    magic, _version, record_size = RAW_LOG_HEADER.unpack(header)
+    if magic != RAW_LOG_MAGIC or record_size != RAW_LOG_RECORD.size:
+        raise ValueError(f"Formato de amostras nao suportado: {raw_path}")
+
+    dtype = np.dtype(
+        [
+            ("timestamp", "<f8"),
+            ("duration_ms", "<f4"),
+            ("vu", "<u4"),
+            ("endpoint", "<u4"),
+            ("status", "<u2"),
+            ("correlation_hi", "<u8"),
+            ("correlation_lo", "<u8"),
+        ]
+    )
+    count = (raw_path.stat().st_size - RAW_LOG_HEADER.size) // record_size
+    if count > 0:
+        records = np.memmap(raw_path, dtype=dtype, mode="r", offset=RAW_LOG_HEADER.size, shape=(count,))
+    else:
+        records = np.zeros(0, dtype=dtype)
+
+    meta_path = raw_path.with_name(raw_path.name + ".json")
+    meta: dict[str, Any] = {}
+    if meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+
+    return np, records, meta
+
+
+RAW_LOG_LATENCY_EDGES_MS = [0, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# janelas aceitas por /api/admin/monitoring/requests/export
+CORRELATE_RANGES = (
+    ("1h", 3600),
+    ("2h", 7200),
+    ("4h", 14400),
+    ("6h", 21600),
+    ("8h", 28800),
+    ("12h", 43200),
+    ("24h", 86400),
+    ("7d", 604800),
+    ("30d", 2592000),
+)
+
+
+def analyze_raw_log(
+    raw_path: Path,
+    *,
+    correlation_ids: list[str],
+    bucket_seconds: Optional[float],
+) -> dict[str, Any]:
+    np, records, meta = load_raw_samples(raw_path)
+    endpoint_names = meta.get("endpoints") or []
+
+    def endpoint_name(endpoint_id: int) -> str:
+        if 0 <= endpoint_id < len(endpoint_names):
+            return str(endpoint_names[endpoint_id])
+        return f"endpoint#{endpoint_id}"
+
+    total = int(records.shape[0])
+    analysis: dict[str, Any] = {
+        "rawLog": str(raw_path),
+        "runId": meta.get("runId"),
+        "records": total,
+        "latencyMs": {},
+        "endpoints": [],
+        "heatmap": None,
+        "lookups": [],
+    }
+    if total == 0:
+        return analysis
+
+    durations = np.asarray(records["duration_ms"], dtype=np.float64)
+    statuses = np.asarray(records["status"])
+    timestamps = np.asarray(records["timestamp"])
+    failures = (statuses == 0) | (statuses >= 400)
+
+    p50, p95, p99 = np.percentile(durations, [50, 95, 99])
+    analysis["latencyMs"] = {
+        "min": round(float(durations.min()), 2),
+        "avg": round(float(durations.mean()), 2),
+        "max": round(float(durations.max()), 2),
+        "p50": round(float(p50), 2),
+        "p95": round(float(p95), 2),
+        "p99": round(float(p99), 2),
+    }
+    analysis["errorRatePercent"] = round(float(failures.mean()) * 100.0, 2)
+
+    endpoint_ids = np.asarray(records["endpoint"])
+    for endpoint_id in np.unique(endpoint_ids):
+        mask = endpoint_ids == endpoint_id
+        endpoint_durations = durations[mask]
+        ep50, ep95, ep99 = np.percentile(endpoint_durations, [50, 95, 99])
+        analysis["endpoints"].append(
+            {
+                "endpoint": endpoint_name(int(endpoint_id)),
+                "hits": int(mask.sum()),
+                "errors": int(failures[mask].sum()),
+                "p50LatencyMs": round(float(ep50), 2),
+                "p95LatencyMs": round(float(ep95), 2),
+                "p99LatencyMs": round(float(ep99), 2),
+            }
+        )
+    analysis["endpoints"].sort(key=lambda item: item["hits"], reverse=True)
+
+    started = float(meta.get("startedEpoch") or timestamps.min())
+    elapsed = np.maximum(timestamps - started, 0.0)
+    span = float(elapsed.max()) + 1.0
+    if not bucket_seconds or bucket_seconds <= 0:
+        bucket_seconds = max(1.0, math.ceil(span / 60.0))
+    time_index = (elapsed // bucket_seconds).astype(np.int64)
+    time_buckets = int(time_index.max()) + 1
+
+    latency_edges = np.asarray(RAW_LOG_LATENCY_EDGES_MS, dtype=np.float64)
+    latency_index = np.searchsorted(latency_edges, durations, side="right") - 1
+    latency_buckets = len(RAW_LOG_LATENCY_EDGES_MS)
+
+    counts = np.bincount(
+        (time_index * latency_buckets) + latency_index,
+        minlength=time_buckets * latency_buckets,
+    ).reshape(time_buckets, latency_buckets)
+
+    analysis["heatmap"] = {
+        "bucketSeconds": bucket_seconds,
+        "latencyEdgesMs": RAW_LOG_LATENCY_EDGES_MS,
+        "counts": counts.tolist(),
+    }
+
+    correlation_hi = np.asarray(records["correlation_hi"])
+    correlation_lo = np.asarray(records["correlation_lo"])
+    for correlation_id in correlation_ids:
+        try:
+            value = uuid.UUID(correlation_id).int
+        except ValueError:
+            analysis["lookups"].append({"correlationId": correlation_id, "matches": []})
+            continue
+
+        mask = (correlation_hi == (value >> 64)) & (correlation_lo == (value & 0xFFFFFFFFFFFFFFFF))
+        matches = []
+        for index in np.nonzero(mask)[0]:
+            record = records[int(index)]
+            matches.append(
+                {
+                    "timestampUtc": datetime.fromtimestamp(float(record["timestamp"]), timezone.utc).isoformat(),
+                    "endpoint": endpoint_name(int(record["endpoint"])),
+                    "statusCode": int(record["status"]) or None,
+                    "durationMs": round(float(record["duration_ms"]), 2),
+                    "vu": int(record["vu"]),
+                }
+            )
+        analysis["lookups"].append({"correlationId": correlation_id, "matches": matches})
+
+    return analysis
+
+
+def print_analysis(analysis: dict[str, Any]) -> None:
+    latency = analysis.get("latencyMs", {})
+
+    print("\n=== Raw Sample Analysis ===")
+    print(f"Raw log: {analysis.get('rawLog')}")
+    print(f"Run ID: {analysis.get('runId')} | Records: {analysis.get('records', 0)}")
+    if not analysis.get("records"):
+        return
+
+    print(f"Error rate: {analysis.get('errorRatePercent', 0)}%")
+    print(
+        f"p50/p95/p99: {latency.get('p50', 0)} / {latency.get('p95', 0)} / {latency.get('p99', 0)} ms "
+        f"(min {latency.get('min', 0)} / max {latency.get('max', 0)})"
+    )
+
+    print("\n-- Endpoints --")
+    for item in analysis.get("endpoints", []):
+        print(
+            f"{item.get('endpoint')}: hits={item.get('hits')} errors={item.get('errors')} "
+            f"p50={item.get('p50LatencyMs')}ms p95={item.get('p95LatencyMs')}ms p99={item.get('p99LatencyMs')}ms"
+        )
+
+    heatmap = analysis.get("heatmap")
+    if heatmap:
+        edges = heatmap.get("latencyEdgesMs", [])
+        print(f"\n-- Heatmap (linhas: {heatmap.get('bucketSeconds')}s | colunas: latencia >= ms) --")
+        print("t(s)".rjust(8) + "".join(str(edge).rjust(8) for edge in edges))
+        for row_index, row in enumerate(heatmap.get("counts", [])):
+            start = row_index * heatmap.get("bucketSeconds", 1)
+            print(f"{start:>8g}" + "".join(str(value).rjust(8) for value in row))
+
+    lookups = analysis.get("lookups", [])
+    if lookups:
+        print("\n-- Correlation lookup --")
+        for lookup in lookups:
+            matches = lookup.get("matches", [])
+            if not matches:
+                print(f"{lookup.get('correlationId')}: (nao encontrado)")
+                continue
+            for match in matches:
+                print(
+                    f"{lookup.get('correlationId')}: [{match.get('timestampUtc')}] {match.get('endpoint')} "
+                    f"status={match.get('statusCode')} duration={match.get('durationMs')}ms vu={match.get('vu')}"
+                )
+
+
+def run_analyze(args: argparse.Namespace) -> int:
+    analysis = analyze_raw_log(
+        Path(args.raw_log).resolve(),
+        correlation_ids=args.correlation_id or [],
+        bucket_seconds=args.bucket_seconds,
+    )
+    print_analysis(analysis)
+
+    if args.output:
+        output_path = Path(args.output).resolve()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(analysis, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nAnalise salva em: {output_path}")
+
+    return 0
+
+
+def parse_server_samples(text: str) -> list[tuple[str, float, int, str]]:
+    text = text.lstrip("\ufeff").strip()
+    if not text:
+        return []
+
+    rows: list[dict[str, Any]] = []
+    if text[0] in "[{":
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        if data is None:
+            # NDJSON: um request por linha
+            rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+        elif isinstance(data, dict) and data.get("base64Content"):
+            # resposta de /api/admin/monitoring/requests/export
+            return parse_server_samples(base64.b64decode(str(data["base64Content"])).decode("utf-8-sig"))
+        elif isinstance(data, dict):
+            rows = list(data.get("items") or [])
+        else:
+            rows = list(data)
+    else:
+        rows = list(csv.DictReader(text.splitlines(), delimiter=";" if ";" in text.splitlines()[0] else ","))
+
+    samples = []
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        correlation_id = str(row.get("correlationId") or row.get("CorrelationId") or "").strip()
+        duration = row.get("durationMs", row.get("DurationMs"))
+        if not correlation_id or duration in (None, ""):
+            continue
+        samples.append(
+            (
+                correlation_id,
+                to_float(duration, 0.0),
+                to_int(row.get("statusCode", row.get("StatusCode")), 0),
+                str(row.get("endpointTemplate") or row.get("EndpointTemplate") or ""),
+            )
+        )
+    return samples
+
+
+def monitoring_range_for(started_epoch: Optional[float]) -> str:
+    if not started_epoch:
+        return CORRELATE_RANGES[0][0]
+    age_seconds = max(time.time() - started_epoch, 0.0)
+    for name, seconds in CORRELATE_RANGES:
+        if age_seconds <= seconds:
+            return name
+    return CORRELATE_RANGES[-1][0]
+
+
+async def fetch_server_samples(
+    *,
+    export_url: str,
+    monitoring_range: str,
+    token: str,
+    timeout_seconds: float,
+    insecure_tls: bool,
+) -> list[tuple[str, float, int, str]]:
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "X-Client-Id": "LT-CORRELATE",
+        "X-Correlation-Id": str(uuid.uuid4()),
+    }
+    async with httpx.AsyncClient(timeout=httpx.Timeout(timeout_seconds), verify=not insecure_tls) as client:
+        response = await client.get(export_url, params={"range": monitoring_range}, headers=headers)
+    if response.status_code >= 400:
+        raise ValueError(
+            f"Falha ao exportar requests do monitoramento ({response.status_code}) em {export_url}: "
+            f"{truncate_text(response.text or '', 220)}"
+        )
+    return parse_server_samples(response.text)
+
+
+def correlate_raw_log(raw_path: Path, server_samples: list[tuple[str, float, int, str]]) -> dict[str, Any]:
+    np, records, meta = load_raw_samples(raw_path)
+    endpoint_names = meta.get("endpoints") or []
+
+    analysis: dict[str, Any] = {
+        "rawLog": str(raw_path),
+        "runId": meta.get("runId"),
+        "clientRequests": int(records.shape[0]),
+        "serverRows": len(server_samples),
+        "matched": 0,
+        "matchRatePercent": 0.0,
+        "overall": None,
+        "endpoints": [],
+        "clientTimeoutsCompletedOnServer": None,
+    }
+
+    server_hi, server_lo, server_ms, server_status = [], [], [], []
+    for correlation_id, duration_ms, status_code, _endpoint in server_samples:
+        try:
+            value = uuid.UUID(correlation_id).int
+        except ValueError:
+            continue
+        server_hi.append(value >> 64)
+        server_lo.append(value & 0xFFFFFFFFFFFFFFFF)
+        server_ms.append(duration_ms)
+        server_status.append(status_code)
+    if not server_hi or not records.shape[0]:
+        return analysis
+
+    # ordena o lado do servidor pelos 64 bits altos do UUID e busca cada correlationId do cliente por searchsorted
+    # (uuid4 aleatorio: colisao nos 64 bits altos e desprezivel; os 64 baixos confirmam o match)
+    server_hi_array = np.asarray(server_hi, dtype=np.uint64)
+    server_lo_array = np.asarray(server_lo, dtype=np.uint64)
+    order = np.argsort(server_hi_array, kind="stable")
+    server_hi_array = server_hi_array[order]
+    server_lo_array = server_lo_array[order]
+    server_ms_array = np.asarray(server_ms, dtype=np.float64)[order]
+    server_status_array = np.asarray(server_status, dtype=np.int64)[order]
+
+    client_hi = np.asarray(records["correlation_hi"])
+    client_lo = np.asarray(records["correlation_lo"])
+    position = np.minimum(np.searchsorted(server_hi_array, client_hi, side="left"), len(server_hi_array) - 1)
+    matched = (server_hi_array[position] == client_hi) & (server_lo_array[position] == client_lo) & (client_hi != 0)
+
+    client_ms = np.asarray(records["duration_ms"], dtype=np.float64)
+    client_status = np.asarray(records["status"], dtype=np.int64)
+    joined_server_ms = server_ms_array[position]
+    overhead_ms = client_ms - joined_server_ms
+
+    def summarize(mask: Any) -> Optional[dict[str, Any]]:
+        count = int(mask.sum())
+        if not count:
+            return None
+        client = client_ms[mask]
+        server = joined_server_ms[mask]
+        overhead = overhead_ms[mask]
+        client_percentiles = np.percentile(client, [50, 95, 99])
+        server_percentiles = np.percentile(server, [50, 95, 99])
+        overhead_percentiles = np.percentile(overhead, [50, 95, 99])
+        tail = client >= client_percentiles[2]
+        server_share = float(server[tail].sum() / max(client[tail].sum(), 0.001) * 100.0)
+        return {
+            "matched": count,
+            "clientMs": {name: round(float(value), 2) for name, value in zip(("p50", "p95", "p99"), client_percentiles)},
+            "serverMs": {name: round(float(value), 2) for name, value in zip(("p50", "p95", "p99"), server_percentiles)},
+            # percentis da diferenca por request (rede + proxy + fila antes do middleware de telemetria)
+            "overheadMs": {name: round(float(value), 2) for name, value in zip(("p50", "p95", "p99"), overhead_percentiles)},
+            "percentileGapMs": {
+                name: round(float(client_value - server_value), 2)
+                for name, client_value, server_value in zip(("p50", "p95", "p99"), client_percentiles, server_percentiles)
+            },
+            "tailServerSharePercent": round(min(server_share, 100.0), 2),
+            "tailSource": "app" if server_share >= 50.0 else "rede/proxy",
+        }
+
+    analysis["matched"] = int(matched.sum())
+    analysis["matchRatePercent"] = round(analysis["matched"] / int(records.shape[0]) * 100.0, 2)
+    analysis["overall"] = summarize(matched)
+
+    endpoint_ids = np.asarray(records["endpoint"])
+    for endpoint_id in np.unique(endpoint_ids):
+        endpoint_mask = endpoint_ids == endpoint_id
+        summary = summarize(matched & endpoint_mask)
+        if summary is None:
+            continue
+        name = str(endpoint_names[int(endpoint_id)]) if 0 <= int(endpoint_id) < len(endpoint_names) else f"endpoint#{endpoint_id}"
+        analysis["endpoints"].append(
+            {"endpoint": name, "clientRequests": int(endpoint_mask.sum()), **summary}
+        )
+    analysis["endpoints"].sort(key=lambda item: item["overheadMs"]["p99"], reverse=True)
+
+    # status 0 no cliente = timeout/erro de transporte; se o servidor registrou, a resposta se perdeu no caminho
+    timeouts = matched & (client_status == 0)
+    if timeouts.any():
+        analysis["clientTimeoutsCompletedOnServer"] = {
+            "count": int(timeouts.sum()),
+            "serverStatus": {str(status): int(count) for status, count in zip(*np.unique(server_status_array[position[timeouts]], return_counts=True))},
+            "serverMsP95": round(float(np.percentile(joined_server_ms[timeouts], 95)), 2),
+        }
+    return analysis
+
+
+def print_correlation(analysis: dict[str, Any]) -> None:
+    print("\n=== Client/Server Correlation ===")
+    print(f"Raw log: {analysis.get('rawLog')}")
+    print(
+        f"Run ID: {analysis.get('runId')} | Requests cliente: {analysis.get('clientRequests')} | "
+        f"Linhas servidor: {analysis.get('serverRows')} | Casados: {analysis.get('matched')} ({analysis.get('matchRatePercent')}%)"
+    )
+    overall = analysis.get("overall")
+    if not overall:
+        print("Nenhum correlationId do run encontrado no monitoramento (telemetria desligada ou janela errada?).")
+        return
+
+    def line(label: str, item: dict[str, Any]) -> str:
+        client, server, overhead = item["clientMs"], item["serverMs"], item["overheadMs"]
+        return (
+            f"{label}: n={item['matched']} cliente p50/p95/p99={client['p50']}/{client['p95']}/{client['p99']}ms "
+            f"servidor={server['p50']}/{server['p95']}/{server['p99']}ms "
+            f"overhead={overhead['p50']}/{overhead['p95']}/{overhead['p99']}ms "
+            f"cauda: {item['tailServerSharePercent']}% no servidor ({item['tailSource']})"
+        )
+
+    print(line("Total", overall))
+    print("\n-- Endpoints (maior overhead p99 primeiro) --")
+    for item in analysis.get("endpoints", []):
+        print(line(str(item.get("endpoint")), item))
+
+    timeouts = analysis.get("clientTimeoutsCompletedOnServer")
+    if timeouts:
+        print(
+            f"\nTimeouts no cliente com request registrado no servidor: {timeouts.get('count')} "
+            f"(status servidor {timeouts.get('serverStatus')}, p95 servidor {timeouts.get('serverMsP95')}ms)"
+        )
+
+
+async def run_correlate(args: argparse.Namespace) -> int:
+    raw_path = Path(args.raw_log).resolve()
+    if args.server_file:
+        server_path = Path(args.server_file).resolve()
+        if not server_path.exists():
+            raise FileNotFoundError(f"Arquivo do servidor nao encontrado: {server_path}")
+        server_samples = parse_server_samples(server_path.read_text(encoding="utf-8-sig"))
+    else:
+        config = load_config(Path(args.config).resolve())
+        publish_cfg = config.get("adminPublish") or {}
+        base_url = str(args.base_url or config.get("baseUrl") or "").rstrip("/")
+        export_url = args.export_url or f"{base_url}/api/admin/monitoring/requests/export"
+
+        token = args.admin_token or publish_cfg.get("bearerToken")
+        if not token:
+            login_url = str(args.admin_login_url or publish_cfg.get("loginUrl") or "/api/auth/login")
+            if not login_url.lower().startswith(("http://", "https://")):
+                login_url = f"{base_url}{login_url}"
+            email = args.admin_email or publish_cfg.get("email")
+            password = args.admin_password or publish_cfg.get("password")
+            if not email or not password:
+                raise ValueError("Informe --server-file, --admin-token ou --admin-email/--admin-password para ler o monitoramento.")
+            token = await authenticate_publish_token(
+                login_url=login_url,
+                email=str(email),
+                password=str(password),
+                token_field=str(publish_cfg.get("tokenField") or "token"),
+                timeout_seconds=max(float(args.timeout), 1.0),
+                insecure_tls=bool(args.insecure),
+            )
+            if not token:
+                raise ValueError("Nao foi possivel obter token admin para ler o monitoramento.")
+
+        meta_path = raw_path.with_name(raw_path.name + ".json")
+        meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+        monitoring_range = args.range or monitoring_range_for(meta.get("startedEpoch"))
+        print(f"Exportando requests do monitoramento (range={monitoring_range}) de {export_url}...")
+        server_samples = await fetch_server_samples(
+            export_url=export_url,
+            monitoring_range=monitoring_range,
+            token=str(token),
+            timeout_seconds=max(float(args.timeout), 1.0),
+            insecure_tls=bool(args.insecure),
+        )
+
+    analysis = correlate_raw_log(raw_path, server_samples)
+    print_correlation(analysis)
+
+    output_path = Path(args.output).resolve() if args.output else raw_path.with_name(f"loadtest-correlation-{analysis.get('runId') or 'run'}.json")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(analysis, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nCorrelacao salva em: {output_path}")
+    return 0
+
+
+def parse_scalar(raw: str) -> Any:
+    text = raw.strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return int(number) if number.is_integer() else number
+
+
+def parse_sweeps(raw_sweeps: list[str]) -> dict[str, list[Any]]:
+    sweeps: dict[str, list[Any]] = {}
+    for raw in raw_sweeps:
+        key, separator, values = raw.partition("=")
+        if not separator or not key.strip() or not values.strip():
+            raise ValueError(f"Sweep invalido '{raw}'. Formato esperado: chave=v1,v2,v3")
+        sweeps[key.strip()] = [parse_scalar(value) for value in values.split(",") if value.strip()]
+    return sweeps
+
+
+def expand_matrix_cells(
+    config: dict[str, Any],
+    scenario_names: list[str],
+    sweeps: dict[str, list[Any]],
+    duration_override: Optional[int],
+) -> list[dict[str, Any]]:
+    # valor escalar no config ("vus": 50) vira uma varredura de um valor so
+    sweeps = {key: (list(values) if isinstance(values, (list, tuple)) else [values]) for key, values in sweeps.items()}
+    for key, values in sweeps.items():
+        if not values:
+            raise ValueError(f"Sweep '{key}' sem valores.")
+        if any(isinstance(value, (dict, list)) for value in values):
+            raise ValueError(f"Sweep '{key}' aceita apenas valores escalares (numero, texto ou booleano).")
+    keys = list(sweeps.keys())
+    combinations = list(itertools.product(*(sweeps[key] for key in keys)))
+
+    cells = []
+    for scenario_name in scenario_names:
+        base_cfg = resolve_scenario(config, scenario_name)
+        for combination in combinations:
+            scenario_cfg = copy.deepcopy(base_cfg)
+            parameters = dict(zip(keys, combination))
+            for key, value in parameters.items():
+                if key == "thinkTimeMs":
+                    scenario_cfg.pop("thinkTime", None)
+                    scenario_cfg["thinkTimeMinMs"] = value
+                    scenario_cfg["thinkTimeMaxMs"] = value
+                else:
+                    scenario_cfg[key] = value
+            if duration_override is not None:
+                scenario_cfg["durationSeconds"] = duration_override
+
+            label = scenario_name
+            if parameters:
+                label += " " + " ".join(f"{key}={value}" for key, value in parameters.items())
+            cells.append(
+                {
+                    "label": label,
+                    "scenario": scenario_name,
+                    "parameters": parameters,
+                    "scenarioConfig": scenario_cfg,
+                }
+            )
+    return cells
+
+
+def run_matrix_cell_isolated(run_kwargs: dict[str, Any]) -> dict[str, Any]:
+    return asyncio.run(run_scenario(**run_kwargs))
+
+
+def summarize_matrix_cell(cell: dict[str, Any], report: dict[str, Any]) -> dict[str, Any]:
+    duration = max(to_float(report.get("durationSeconds"), 0.0), 0.001)
+    endpoints = [
+        {
+            "endpoint": item.get("endpoint"),
+            "hits": item.get("hits"),
+            "rps": round(to_float(item.get("hits"), 0.0) / duration, 2),
+            "p95LatencyMs": item.get("p95LatencyMs"),
+            "errorRatePercent": item.get("errorRatePercent"),
+        }
+        for item in report.get("topEndpointsByHits", [])
+    ]
+    return {
+        "label": cell["label"],
+        "scenario": cell["scenario"],
+        "parameters": cell["parameters"],
+        "runId": report.get("runId"),
+        "durationSeconds": report.get("durationSeconds"),
+        "summary": report.get("summary", {}),
+        "latencyMs": report.get("latencyMs", {}),
+        "endpoints": endpoints,
+    }
+
+
+def build_matrix_curves(cells: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    points_by_endpoint: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for cell in cells:
+        points_by_endpoint["(total)"].append(
+            {
+                "label": cell["label"],
+                "rps": cell["summary"].get("rpsAvg", 0),
+                "p95LatencyMs": cell["latencyMs"].get("p95", 0),
+                "errorRatePercent": cell["summary"].get("errorRatePercent", 0),
+            }
+        )
+        for item in cell["endpoints"]:
+            points_by_endpoint[str(item.get("endpoint"))].append(
+                {
+                    "label": cell["label"],
+                    "rps": item.get("rps", 0),
+                    "p95LatencyMs": item.get("p95LatencyMs", 0),
+                    "errorRatePercent": item.get("errorRatePercent", 0),
+                }
+            )
+
+    return [
+        {"endpoint": endpoint, "points": sorted(points, key=lambda point: point["rps"])}
+        for endpoint, points in points_by_endpoint.items()
+    ]
+
+
+async def run_matrix(args: argparse.Namespace) -> int:
+    config_path = Path(args.config).resolve()
+    config = load_config(config_path)
+    base_url, endpoints = apply_global_overrides(config, args)
+
+    matrix_cfg = config.get("matrix") or {}
+    scenario_names = (
+        [name.strip() for name in args.scenarios.split(",") if name.strip()]
+        if args.scenarios
+        else list(matrix_cfg.get("scenarios") or ["smoke"])
+    )
+    sweeps = parse_sweeps(args.sweep) if args.sweep else dict(matrix_cfg.get("sweep") or {})
+    isolated = args.isolated if args.isolated is not None else bool(matrix_cfg.get("isolated"))
+    parallel = max(args.parallel or to_int(matrix_cfg.get("parallel"), 1), 1)
+
+    cells = expand_matrix_cells(config, scenario_names, sweeps, args.duration)
+
+    print("=== ConsertaPraMim Load Test Matrix ===")
+    print(f"Config: {config_path}")
+    print(f"Base URL: {base_url}")
+    print(f"Cells: {len(cells)} | Isolated: {isolated} | Parallel: {parallel}")
+
+    started_utc = utc_now_iso()
+    semaphore = asyncio.Semaphore(parallel)
+    loop = asyncio.get_running_loop()
+    spawn_context = multiprocessing.get_context("spawn")
+
+    async def run_cell(position: int, cell: dict[str, Any]) -> dict[str, Any]:
+        run_kwargs = {
+            "scenario_name": cell["scenario"],
+            "base_url": base_url,
+            "scenario_cfg": cell["scenarioConfig"],
+            "global_cfg": config,
+            "endpoints": endpoints,
+            "timeout_seconds": max(args.timeout, 1.0),
+            "insecure_tls": args.insecure,
+            "random_seed": args.seed,
+        }
+        async with semaphore:
+            print(f"[matrix] ({position}/{len(cells)}) {cell['label']}")
+            if isolated:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=spawn_context) as pool:
+                    report = await loop.run_in_executor(pool, run_matrix_cell_isolated, run_kwargs)
+            else:
+                report = await run_scenario(**run_kwargs)
+
+        summary = summarize_matrix_cell(cell, report)
+        print(
+            f"[matrix] {cell['label']}: rps={summary['summary'].get('rpsAvg')} "
+            f"p95={summary['latencyMs'].get('p95')}ms errorRate={summary['summary'].get('errorRatePercent')}%"
+        )
+        return summary
+
+    cell_summaries = await asyncio.gather(
+        *(run_cell(position, cell) for position, cell in enumerate(cells, start=1))
+    )
+
+    matrix_report = {
+        "matrixId": str(uuid.uuid4()),
+        "baseUrl": base_url,
+        "startedAtUtc": started_utc,
+        "finishedAtUtc": utc_now_iso(),
+        "isolated": isolated,
+        "parallel": parallel,
+        "sweep": sweeps,
+        "cells": list(cell_summaries),
+        "curves": build_matrix_curves(list(cell_summaries)),
+    }
+
+    output_dir = Path(args.output_dir).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    json_path = output_dir / f"loadtest-matrix-{matrix_report['matrixId']}.json"
+    html_path = output_dir / f"loadtest-matrix-{matrix_report['matrixId']}.html"
+    json_text = json.dumps(matrix_report, indent=2, ensure_ascii=False)
+    html_text = render_matrix_html_report(matrix_report)
+    json_path.write_text(json_text, encoding="utf-8")
+    html_path.write_text(html_text, encoding="utf-8")
+    link_latest(json_path, output_dir / "loadtest-matrix-latest.json")
+    link_latest(html_path, output_dir / "loadtest-matrix-latest.html")
+
+    print("\nRelatorios gerados:")
+    print(f"- JSON: {json_path}")
+    print(f"- HTML: {html_path}")
+    return 0
+
+
+HTML_MATRIX_SCRIPT = """
+(function () {
+  var curves = JSON.parse(document.getElementById('matrix-data').textContent);
+  var pad = { left: 56, right: 12, top: 12, bottom: 28 };
+  curves.forEach(function (curve, index) {
+    var canvas = document.getElementById('curve-' + index);
+    var ctx = canvas.getContext('2d');
+    var w = canvas.width - pad.left - pad.right;
+    var h = canvas.height - pad.top - pad.bottom;
+    var maxX = 1;
+    var maxY = 1;
+    curve.points.forEach(function (p) { maxX = Math.max(maxX, p.rps); maxY = Math.max(maxY, p.p95LatencyMs); });
+    ctx.font = '11px Arial';
+    ctx.strokeStyle = '#9ca3af';
+    ctx.fillStyle = '#374151';
+    ctx.beginPath();
+    ctx.moveTo(pad.left, pad.top);
+    ctx.lineTo(pad.left, pad.top + h);
+    ctx.lineTo(pad.left + w, pad.top + h);
+    ctx.stroke();
+    ctx.fillText(maxY.toFixed(0) + 'ms', 4, pad.top + 10);
+    ctx.fillText('0', pad.left - 12, pad.top + h);
+    ctx.fillText(maxX.toFixed(1) + ' rps', pad.left + w - 50, pad.top + h + 20);
+    ctx.strokeStyle = '#2563eb';
+    ctx.beginPath();
+    curve.points.forEach(function (p, i) {
+      var x = pad.left + w * p.rps / maxX;
+      var y = pad.top + h - h * p.p95LatencyMs / maxY;
+      if (i === 0) { ctx.moveTo(x, y); } else { ctx.lineTo(x, y); }
+    });
+    ctx.stroke();
+    curve.points.forEach(function (p) {
+      var x = pad.left + w * p.rps / maxX;
+      var y = pad.top + h - h * p.p95LatencyMs / maxY;
+      ctx.fillStyle = p.errorRatePercent > 5 ? '#dc2626' : '#2563eb';
+      ctx.fillRect(x - 3, y - 3, 6, 6);
+      ctx.fillStyle = '#374151';
+      ctx.fillText(p.label, Math.min(x + 5, pad.left + w - 80), Math.max(y - 5, pad.top + 10));
+    });
+  });
+})();
+"""
+
+
+def render_matrix_html_report(matrix_report: dict[str, Any]) -> str:
+    cells = matrix_report.get("cells", [])
+    curves = matrix_report.get("curves", [])
+    curve_data = json.dumps(curves, separators=(",", ":")).replace("</", "<\\/")
+
+    def rows_for_cells() -> str:
+        if not cells:
+            return "<tr><td colspan='7'>(none)</td></tr>"
+        return "".join(
+            "<tr>"
+            f"<td>{cell.get('label')}</td>"
+            f"<td>{cell.get('summary', {}).get('totalRequests', 0)}</td>"
+            f"<td>{cell.get('summary', {}).get('rpsAvg', 0)}</td>"
+            f"<td>{cell.get('latencyMs', {}).get('p50', 0)} ms</td>"
+            f"<td>{cell.get('latencyMs', {}).get('p95', 0)} ms</td>"
+            f"<td>{cell.get('latencyMs', {}).get('p99', 0)} ms</td>"
+            f"<td>{cell.get('summary', {}).get('errorRatePercent', 0)}%</td>"
+            "</tr>"
+            for cell in cells
+        )
+
+    canvases = "".join(
+        f"<div><strong>{curve.get('endpoint')}</strong><canvas id=\"curve-{index}\" width=\"560\" height=\"260\"></canvas></div>"
+        for index, curve in enumerate(curves)
+    )
+
+    return f"""<!doctype html>
+<html lang="pt-BR">
+<head>
+  <meta charset="utf-8"/>
+  <meta name="viewport" content="width=device-width, initial-scale=1"/>
+  <title>Load Test Matrix - {matrix_report.get('matrixId')}</title>
+  <style>
+    body {{ font-family: Arial, sans-serif; margin: 20px; color: #1f2937; }}
+    h1, h2 {{ margin: 0 0 12px; }}
+    table {{ width: 100%; border-collapse: collapse; margin: 12px 0 20px; font-size: 13px; }}
+    th, td {{ border: 1px solid #d1d5db; padding: 6px 8px; text-align: left; vertical-align: top; }}
+    th {{ background: #f3f4f6; }}
+    code {{ background: #f3f4f6; padding: 2px 4px; border-radius: 4px; }}
+    .charts {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(460px, 1fr)); gap: 12px; margin-bottom: 16px; }}
+    .charts canvas {{ width: 100%; border: 1px solid #d1d5db; border-radius: 8px; background: #fff; }}
+  </style>
+</head>
+<body>
+  <h1>Load Test Matrix</h1>
+  <p><strong>MatrixId:</strong> <code>{matrix_report.get('matrixId')}</code></p>
+  <p><strong>BaseUrl:</strong> {matrix_report.get('baseUrl')} | <strong>Inicio:</strong> {matrix_report.get('startedAtUtc')} | <strong>Fim:</strong> {matrix_report.get('finishedAtUtc')}</p>
+
+  <h2>Execucoes</h2>
+  <table>
+    <thead><tr><th>Cenario</th><th>Requests</th><th>RPS</th><th>P50</th><th>P95</th><th>P99</th><th>Error rate</th></tr></thead>
+    <tbody>{rows_for_cells()}</tbody>
+  </table>
+
+  <h2>Throughput x latencia (p95) por endpoint</h2>
+  <div class="charts">{canvases}</div>
+
+  <script type="application/json" id="matrix-data">{curve_data}</script>
+  <script>{HTML_MATRIX_SCRIPT}</script>
+</body>
+</html>"""
+
+
+def resolve_autotune_settings(config: dict[str, Any], args: argparse.Namespace) -> dict[str, Any]:
+    autotune_cfg = config.get("autotune") or {}
+    slo_cfg = autotune_cfg.get("slo") or {}
+
+    strategy = str(args.strategy or autotune_cfg.get("strategy") or "binary").lower()
+    if strategy not in AUTOTUNE_STRATEGIES:
+        raise ValueError(f"autotune.strategy invalida: {strategy}. Use: {', '.join(AUTOTUNE_STRATEGIES)}")
+
+    start_vus = max(args.start_vus or to_int(autotune_cfg.get("startVus"), 5), 1)
+    settings = {
+        "strategy": strategy,
+        "startVus": start_vus,
+        "maxVus": max(args.max_vus or to_int(autotune_cfg.get("maxVus"), 500), start_vus),
+        "stepSeconds": max(args.step_seconds or to_int(autotune_cfg.get("stepSeconds"), 60), 5),
+        "warmupSeconds": max(
+            args.warmup if args.warmup is not None else to_float(autotune_cfg.get("warmupSeconds"), 10.0), 1.0
+        ),
+        "rampUpSeconds": max(to_float(autotune_cfg.get("rampUpSeconds"), 5.0), 0.0),
+        "maxSteps": max(args.max_steps or to_int(autotune_cfg.get("maxSteps"), 12), 1),
+        "tolerancePercent": max(to_float(autotune_cfg.get("tolerancePercent"), 10.0), 0.0),
+        "minGainPercent": max(to_float(autotune_cfg.get("minGainPercent"), 5.0), 0.0),
+        "maxDriftPercent": max(to_float(autotune_cfg.get("maxDriftPercent"), 50.0), 0.0),
+        "minDriftMs": max(to_float(autotune_cfg.get("minDriftMs"), 20.0), 0.0),
+        "driftSloFraction": min(max(to_float(autotune_cfg.get("driftSloFraction"), 0.5), 0.0), 1.0),
+        "aimdIncreaseVus": max(to_int(autotune_cfg.get("aimdIncreaseVus"), start_vus), 1),
+        "aimdDecreaseFactor": min(max(to_float(autotune_cfg.get("aimdDecreaseFactor"), 0.5), 0.1), 0.95),
+        "slo": {
+            "p95Ms": args.slo_p95 if args.slo_p95 is not None else to_float(slo_cfg.get("p95Ms"), 800.0),
+            "errorRatePercent": (
+                args.slo_error_rate
+                if args.slo_error_rate is not None
+                else to_float(slo_cfg.get("errorRatePercent"), 1.0)
+            ),
+        },
+    }
+    return settings
+
+
+def evaluate_autotune_step(window: dict[str, Any], settings: dict[str, Any]) -> list[str]:
+    slo = settings["slo"]
+    violations = []
+    p95 = to_float(window.get("latencyMs", {}).get("p95"), 0.0)
+    error_rate = to_float(window.get("errorRatePercent"), 0.0)
+    drift = to_float(window.get("p95DriftPercent"), 0.0)
+    if not window.get("requests"):
+        violations.append("nenhum request concluido na janela")
+    if p95 > slo["p95Ms"]:
+        violations.append(f"p95 {p95:.0f}ms > {slo['p95Ms']:g}ms")
+    if error_rate > slo["errorRatePercent"]:
+        violations.append(f"erro {error_rate:.2f}% > {slo['errorRatePercent']:g}%")
+    # latencia subindo dentro da janela indica fila crescendo, mas so reprova se ameacar o SLO:
+    # em endpoints de poucos ms o jitter normal passa de maxDriftPercent sem significar saturacao
+    first_p95, second_p95 = (to_float(value, 0.0) for value in (window.get("p95HalvesMs") or [0.0, 0.0]))
+    delta_ms = second_p95 - first_p95
+    # mais uma janela no mesmo ritmo: a segunda metade esta meia janela a frente da primeira
+    extrapolated_p95 = second_p95 + 2.0 * delta_ms
+    if (
+        settings["maxDriftPercent"]
+        and drift > settings["maxDriftPercent"]
+        and delta_ms >= settings["minDriftMs"]
+        and (second_p95 >= slo["p95Ms"] * settings["driftSloFraction"] or extrapolated_p95 > slo["p95Ms"])
+    ):
+        violations.append(
+            f"p95 subiu {drift:.0f}% durante a janela ({first_p95:.0f}->{second_p95:.0f}ms, "
+            f"projecao {extrapolated_p95:.0f}ms vs SLO {slo['p95Ms']:g}ms)"
+        )
+    return violations
+
+
+class AutotuneController:
+    def __init__(self, settings: dict[str, Any]) -> None:
+        self.settings = settings
+        self.strategy = settings["strategy"]
+        self.steps = 0
+        self.current = settings["startVus"]
+        self.best_vus = 0
+        self.failed_vus: Optional[int] = None
+        self.last_passing: Optional[tuple[int, float]] = None
+        self.stop_reason: Optional[str] = None
+
+    def next_vus(self) -> Optional[int]:
+        if self.stop_reason is None and self.steps >= self.settings["maxSteps"]:
+            self.stop_reason = "maxSteps"
+        if self.stop_reason is not None:
+            return None
+        return self.current
+
+    def observe(self, vus: int, rps: float, passed: bool) -> Optional[str]:
+        self.steps += 1
+        max_vus = self.settings["maxVus"]
+        saturation = None
+        if passed and self.last_passing is not None and vus > self.last_passing[0]:
+            previous_vus, previous_rps = self.last_passing
+            gain = ((rps - previous_rps) / previous_rps * 100.0) if previous_rps else 100.0
+            if gain < self.settings["minGainPercent"]:
+                saturation = f"rps +{gain:.1f}% com VUs {previous_vus}->{vus} (saturado)"
+        if passed and saturation is None:
+            self.last_passing = (vus, rps)
+
+        if self.strategy == "aimd":
+            if passed and saturation is None:
+                if vus >= max_vus:
+                    self.stop_reason = "maxVus"
+                self.current = min(vus + self.settings["aimdIncreaseVus"], max_vus)
+            else:
+                self.current = max(int(vus * self.settings["aimdDecreaseFactor"]), 1)
+            return saturation
+
+        if passed and saturation is None:
+            self.best_vus = max(self.best_vus, vus)
+        elif self.failed_vus is None or vus < self.failed_vus:
+            self.failed_vus = vus
+
+        if self.failed_vus is None:
+            if vus >= max_vus:
+                self.stop_reason = "maxVus"
+            self.current = min(vus * 2, max_vus)
+            return saturation
+
+        if self.best_vus == 0:
+            if vus <= 1:
+                self.stop_reason = "slo"
+            self.current = max(vus // 2, 1)
+            return saturation
+
+        resolution = max(1, int(math.ceil(self.best_vus * self.settings["tolerancePercent"] / 100.0)))
+        if self.failed_vus - self.best_vus <= resolution:
+            self.stop_reason = "converged"
+        self.current = (self.best_vus + self.failed_vus) // 2
+        return saturation
+
+
+async def run_autotune_scenario(
+    scenario_name: str,
+    settings: dict[str, Any],
+    config: dict[str, Any],
+    base_url: str,
+    endpoints: list[dict[str, Any]],
+    args: argparse.Namespace,
+    stop_event: asyncio.Event,
+) -> dict[str, Any]:
+    base_cfg = resolve_scenario(config, scenario_name)
+    controller = AutotuneController(settings)
+    steps: list[dict[str, Any]] = []
+
+    while not stop_event.is_set():
+        vus = controller.next_vus()
+        if vus is None:
+            break
+
+        scenario_cfg = copy.deepcopy(base_cfg)
+        scenario_cfg["vus"] = vus
+        scenario_cfg["rampUpSeconds"] = settings["rampUpSeconds"]
+        scenario_cfg["warmupSeconds"] = settings["warmupSeconds"]
+        scenario_cfg["durationSeconds"] = int(
+            math.ceil(settings["rampUpSeconds"] + settings["warmupSeconds"] + settings["stepSeconds"])
+        )
+
+        print(f"[autotune] {scenario_name} passo {len(steps) + 1}: {vus} VUs por {scenario_cfg['durationSeconds']}s")
+        report = await run_scenario(
+            scenario_name=scenario_name,
+            base_url=base_url,
+            scenario_cfg=scenario_cfg,
+            global_cfg=config,
+            endpoints=endpoints,
+            timeout_seconds=max(args.timeout, 1.0),
+            insecure_tls=args.insecure,
+            random_seed=args.seed,
+            stop_event=stop_event,
+        )
+        window = report.get("steadyState")
+        if report.get("partial") or window is None:
+            print(f"[autotune] {scenario_name} passo {len(steps) + 1} descartado (interrompido antes da janela medida)")
+            break
+
+        violations = evaluate_autotune_step(window, settings)
+        passed = not violations
+        saturation = controller.observe(vus, window["rps"], passed)
+        step = {
+            "step": len(steps) + 1,
+            "vus": vus,
+            "runId": report.get("runId"),
+            "rps": window["rps"],
+            "errorRatePercent": window["errorRatePercent"],
+            "latencyMs": window["latencyMs"],
+            "p95DriftPercent": window["p95DriftPercent"],
+            "p95HalvesMs": window["p95HalvesMs"],
+            "passed": passed,
+            "violations": violations,
+            "saturation": saturation,
+            "endpoints": window["endpoints"],
+        }
+        steps.append(step)
+
+        verdict = "OK" if passed else "FALHOU: " + "; ".join(violations)
+        if saturation:
+            verdict += f" | {saturation}"
+        print(
+            f"[autotune] {scenario_name} {vus} VUs: rps={window['rps']} p95={window['latencyMs']['p95']}ms "
+            f"erro={window['errorRatePercent']}% -> {verdict}"
+        )
+
+    passing = [step for step in steps if step["passed"]]
+    best = max(passing, key=lambda step: (step["rps"], -step["vus"])) if passing else None
+    capacity = None
+    if best is not None:
+        total_rps = max(best["rps"], 0.001)
+        capacity = {
+            "vus": best["vus"],
+            "rps": best["rps"],
+            "p95LatencyMs": best["latencyMs"]["p95"],
+            "errorRatePercent": best["errorRatePercent"],
+            "endpoints": [
+                {
+                    **item,
+                    "sharePercent": round(item["rps"] / total_rps * 100.0, 2),
+                }
+                for item in best["endpoints"]
+            ],
+        }
+
+    limits = [
+        violation
+        for step in steps
+        if best is None or step["vus"] > best["vus"]
+        for violation in (step["violations"] or ([step["saturation"]] if step["saturation"] else []))
+    ]
+    return {
+        "scenario": scenario_name,
+        "stopReason": ("stop" if stop_event.is_set() else controller.stop_reason),
+        "capacity": capacity,
+        "limitedBy": sorted(set(limits)),
+        "steps": steps,
+    }
+
+
+async def run_autotune(args: argparse.Namespace) -> int:
+    config_path = Path(args.config).resolve()
+    config = load_config(config_path)
+    base_url, endpoints = apply_global_overrides(config, args)
+    settings = resolve_autotune_settings(config, args)
+
+    autotune_cfg = config.get("autotune") or {}
+    scenario_names = (
+        [name.strip() for name in args.scenarios.split(",") if name.strip()]
+        if args.scenarios
+        else list(autotune_cfg.get("scenarios") or ["baseline"])
+    )
+    for scenario_name in scenario_names:
+        resolve_scenario(config, scenario_name)
+
+    print("=== ConsertaPraMim Load Test Autotune ===")
+    print(f"Config: {config_path}")
+    print(f"Base URL: {base_url}")
+    print(
+        f"Cenarios: {', '.join(scenario_names)} | Estrategia: {settings['strategy']} | "
+        f"VUs: {settings['startVus']}..{settings['maxVus']} | Passo: {settings['stepSeconds']}s "
+        f"(+{settings['warmupSeconds']:g}s warmup)"
+    )
+    print(f"SLO: p95 <= {settings['slo']['p95Ms']:g}ms | erro <= {settings['slo']['errorRatePercent']:g}%")
+
+    started_utc = utc_now_iso()
+    stop_event = RunStopEvent()
+    restore_signals = install_stop_handlers(stop_event)
+    results = []
+    try:
+        for scenario_name in scenario_names:
+            if stop_event.is_set():
+                break
+            results.append(
+                await run_autotune_scenario(scenario_name, settings, config, base_url, endpoints, args, stop_event)
+            )
+    finally:
+        restore_signals()
+
+    autotune_report = {
+        "autotuneId": str(uuid.uuid4()),
+        "baseUrl": base_url,
+        "startedAtUtc": started_utc,
+        "finishedAtUtc": utc_now_iso(),
+        "partial": stop_event.is_set(),
+        "settings": settings,
+        "scenarios": results,
+    }
+
+    print("\n=== Capacidade sustentavel ===")
+    for result in results:
+        capacity = result["capacity"]
+        if capacity is None:
+            print(f"- {result['scenario']}: nenhum passo atendeu os SLOs")
+            continue
+        print(
+            f"- {result['scenario']}: {capacity['rps']} rps com {capacity['vus']} VUs "
+            f"(p95={capacity['p95LatencyMs']}ms, erro={capacity['errorRatePercent']}%)"
+        )
+        if result["limitedBy"]:
+            print(f"  limitado por: {'; '.join(result['limitedBy'])}")
+        for item in capacity["endpoints"][:10]:
+            print(f"  {item['endpoint']}: {item['rps']} rps ({item['sharePercent']}%) p95={item['p95LatencyMs']}ms")
+
+    output_dir = Path(args.output_dir).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    json_path = output_dir / f"loadtest-autotune-{autotune_report['autotuneId']}.json"
+    json_path.write_text(json.dumps(autotune_report, indent=2, ensure_ascii=False), encoding="utf-8")
+    link_latest(json_path, output_dir / "loadtest-autotune-latest.json")
+
+    print("\nRelatorios gerados:")
+    print(f"- JSON: {json_path}")
+    return 0
+
+
+NGINX_LOG_PATTERN = re.compile(
+    r'^(?P<addr>\S+) \S+ (?P<user>\S+) \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<target>\S+)[^"]*" '
+    r'(?P<status>\d{3}) \S+(?: "[^"]*" "(?P<agent>[^"]*)")?(?P<rest>.*)$'
+)
+NGINX_REQUEST_TIME_PATTERN = re.compile(r"(?:^|\s)(?:rt=)?(\d+\.\d+)(?:\s|$)")
+PATH_NUMBER_SEGMENT_PATTERN = re.compile(r"^\d+$")
+TRAFFIC_FORMATS = ("nginx", "w3c", "ndjson", "har")
+
+
+@dataclass
+class TrafficEntry:
+    timestamp: float
+    method: str
+    path: str
+    status_code: Optional[int] = None
+    duration_ms: Optional[float] = None
+    user: Optional[str] = None
+    remote_addr: Optional[str] = None
+    tenant_id: Optional[str] = None
+    client_id: Optional[str] = None
+    body: Optional[str] = None
+
+
+@functools.lru_cache(maxsize=1024)
+def path_parameter_name(previous_segment: str) -> str:
+    base = previous_segment.strip().lower()
+    if not base or base.startswith("{") or base == "api":
+        return "id"
+
+    words = [word for word in re.split(r"[-_.]+", base) if word]
+    last = words[-1]
+    if last.endswith("ies"):
+        last = last[:-3] + "y"
+    elif last.endswith("s") and not last.endswith("ss"):
+        last = last[:-1]
+    words[-1] = last
+    return words[0] + "".join(word.capitalize() for word in words[1:]) + "Id"
+
+
+def normalize_path_template(path: str) -> str:
+    path_only = urllib.parse.urlsplit(path).path or "/"
+    normalized: list[str] = []
+    for segment in path_only.split("/"):
+        if GUID_PATTERN.fullmatch(segment) or PATH_NUMBER_SEGMENT_PATTERN.match(segment):
+            normalized.append("{" + path_parameter_name(normalized[-1] if normalized else "") + "}")
+        else:
+            normalized.append(segment)
+    return "/".join(normalized)
+
+
+def parse_traffic_timestamp(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) / 1000.0 if value > 1e12 else float(value)
+
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        number = float(text)
+        return number / 1000.0 if number > 1e12 else number
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def split_request_target(target: str) -> str:
+    parts = urllib.parse.urlsplit(target)
+    path = parts.path or "/"
+    return f"{path}?{parts.query}" if parts.query else path
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_nginx_timestamp(text: str) -> Optional[float]:
+    try:
+        return datetime.strptime(text, "%d/%b/%Y:%H:%M:%S %z").timestamp()
+    except ValueError:
+        return None
+
+
+def parse_nginx_line(line: str) -> Optional[TrafficEntry]:
+    match = NGINX_LOG_PATTERN.match(line)
+    if not match:
+        return None
+    timestamp = parse_nginx_timestamp(match.group("time"))
+    if timestamp is None:
+        return None
+
+    duration_ms = None
+    request_time = NGINX_REQUEST_TIME_PATTERN.search(match.group("rest") or "")
+    if request_time:
+        duration_ms = float(request_time.group(1)) * 1000.0
+
+    user = match.group("user")
+    return TrafficEntry(
+        timestamp=timestamp,
+        method=match.group("method"),
+        path=split_request_target(match.group("target")),
+        status_code=int(match.group("status")),
+        duration_ms=duration_ms,
+        user=(None if user == "-" else user),
+        remote_addr=match.group("addr"),
+    )
+
+
+def parse_w3c_line(line: str, fields: list[str]) -> Optional[TrafficEntry]:
+    values = dict(zip(fields, line.split(" ")))
+    method = values.get("cs-method")
+    stem = values.get("cs-uri-stem")
+    if not method or not stem:
+        return None
+
+    timestamp = parse_traffic_timestamp(f"{values.get('date', '')}T{values.get('time', '')}")
+    if timestamp is None:
+        return None
+
+    query = values.get("cs-uri-query")
+    status = values.get("sc-status")
+    time_taken = values.get("time-taken")
+
+    def optional(name: str) -> Optional[str]:
+        value = values.get(name)
+        return None if value in (None, "-", "") else value
+
+    return TrafficEntry(
+        timestamp=timestamp,
+        method=method.upper(),
+        path=stem + (f"?{query}" if query and query != "-" else ""),
+        status_code=(int(status) if status and status.isdigit() else None),
+        duration_ms=(to_float(time_taken, 0.0) if time_taken and time_taken != "-" else None),
+        user=optional("cs-username"),
+        remote_addr=optional("c-ip"),
+        tenant_id=optional("cs(X-Tenant-Id)"),
+        client_id=optional("cs(X-Client-Id)"),
+    )
+
+
+def traffic_entry_from_mapping(item: dict[str, Any]) -> Optional[TrafficEntry]:
+    def first(*keys: str) -> Any:
+        for key in keys:
+            if item.get(key) not in (None, ""):
+                return item.get(key)
+        return None
+
+    method = first("method", "httpMethod", "verb")
+    target = first("path", "url", "uri", "target")
+    timestamp = parse_traffic_timestamp(first("timestamp", "time", "startedAt", "startedDateTime", "@t"))
+    if not method or not target or timestamp is None:
+        return None
+
+    status = first("statusCode", "status")
+    duration = first("durationMs", "elapsedMs", "duration")
+    body = first("body", "requestBody")
+    return TrafficEntry(
+        timestamp=timestamp,
+        method=str(method).upper(),
+        path=split_request_target(str(target)),
+        status_code=to_int(status, 0) or None,
+        duration_ms=(to_float(duration, 0.0) if duration is not None else None),
+        user=(str(first("userId", "user", "email")) if first("userId", "user", "email") else None),
+        remote_addr=(str(first("remoteAddr", "clientIp", "ip")) if first("remoteAddr", "clientIp", "ip") else None),
+        tenant_id=(str(first("tenantId")) if first("tenantId") else None),
+        client_id=(str(first("clientId")) if first("clientId") else None),
+        body=(body if isinstance(body, str) or body is None else json.dumps(body, ensure_ascii=False)),
+    )
+
+
+def traffic_entry_from_har(entry: dict[str, Any]) -> Optional[TrafficEntry]:
+    request = entry.get("request") or {}
+    headers = {str(header.get("name", "")).lower(): header.get("value") for header in request.get("headers") or []}
+    authorization = headers.get("authorization")
+    user = None
+    if authorization:
+        user = "token-" + str(uuid.uuid5(uuid.NAMESPACE_URL, str(authorization)))[:8]
+
+    return traffic_entry_from_mapping(
+        {
+            "method": request.get("method"),
+            "url": request.get("url"),
+            "startedDateTime": entry.get("startedDateTime"),
+            "status": (entry.get("response") or {}).get("status"),
+            "durationMs": entry.get("time"),
+            "user": user,
+            "remoteAddr": entry.get("serverIPAddress"),
+            "tenantId": headers.get("x-tenant-id"),
+            "clientId": headers.get("x-client-id"),
+            "body": (request.get("postData") or {}).get("text"),
+        }
+    )
+
+
+class TrafficFormatError(ValueError):
+    def __init__(self, message: str, parsed: int = 0, dropped: int = 0) -> None:
+        super().__init__(message)
+        self.parsed = parsed
+        self.dropped = dropped
+
+
+def iter_har_entries(path: Path, chunk_size: int = 1 << 16) -> Iterator[dict[str, Any]]:
+    decoder = json.JSONDecoder()
+    parsed = 0
+    with path.open("r", encoding="utf-8-sig") as handle:
+        buffer = ""
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                raise TrafficFormatError(f"HAR sem 'log.entries': {path}")
+            buffer += chunk
+            marker = buffer.find('"entries"')
+            if marker < 0:
+                buffer = buffer[-16:]
+                continue
+            bracket = buffer.find("[", marker)
+            if bracket < 0:
+                buffer = buffer[marker:]
+                continue
+            buffer = buffer[bracket + 1 :]
+            break
+
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                if position >= len(buffer):
+                    raise json.JSONDecodeError("incomplete", buffer, position)
+                entry, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    # fim do arquivo sem fechar 'entries': HAR truncado ou entrada malformada
+                    dropped = buffer[position:].count('"startedDateTime"')
+                    raise TrafficFormatError(
+                        f"HAR invalido ou truncado: {path}: {parsed} entradas lidas, ~{dropped} descartadas a partir da entrada {parsed + 1}.",
+                        parsed=parsed,
+                        dropped=dropped,
+                    )
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            parsed += 1
+            if isinstance(entry, dict):
+                yield entry
+            if position > chunk_size:
+                buffer = buffer[position:]
+                position = 0
+
+
+def detect_traffic_format(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix == ".har":
+        return "har"
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+
+    with path.open("r", encoding="utf-8-sig", errors="replace") as handle:
+        for line in handle:
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if stripped.startswith("#"):
+                return "w3c"
+            if stripped.startswith("{"):
+                return "ndjson"
+            return "nginx"
+    return "nginx"
+
+
+def iter_traffic_entries(
+    path: Path,
+    file_format: str,
+    stats: Optional[Counter] = None,
+    byte_range: Optional[tuple[int, int]] = None,
+    w3c_fields: Optional[list[str]] = None,
+) -> Iterator[TrafficEntry]:
+    stats = stats if stats is not None else Counter()
+
+    if file_format == "har":
+        for item in iter_har_entries(path):
+            entry = traffic_entry_from_har(item)
+            if entry is None:
+                stats["skipped"] += 1
+                continue
+            stats["parsed"] += 1
+            yield entry
+        return
+
+    w3c_fields = list(w3c_fields or [])
+    with path.open("rb") as handle:
+        end = None
+        if byte_range is not None:
+            start, end = byte_range
+            if start > 0:
+                handle.seek(start - 1)
+                if handle.read(1) != b"\n":
+                    handle.readline()
+
+        while True:
+            if end is not None and handle.tell() >= end:
+                break
+            raw_line = handle.readline()
+            if not raw_line:
+                break
+
+            line = raw_line.decode("utf-8-sig", errors="replace").strip()
+            if not line:
+                continue
+
+            entry = None
+            if file_format == "w3c":
+                if line.startswith("#"):
+                    if line.startswith("#Fields:"):
+                        w3c_fields = line[len("#Fields:") :].split()
+                    continue
+                entry = parse_w3c_line(line, w3c_fields)
+            elif file_format == "ndjson":
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    item = None
+                entry = traffic_entry_from_mapping(item) if isinstance(item, dict) else None
+            else:
+                entry = parse_nginx_line(line)
+
+            if entry is None:
+                stats["skipped"] += 1
+                continue
+            stats["parsed"] += 1
+            yield entry
+
+
+def compile_endpoint_matchers(endpoints: list[dict[str, Any]]) -> list[tuple[str, re.Pattern[str], dict[str, Any]]]:
+    matchers = []
+    for endpoint in endpoints:
+        template = urllib.parse.urlsplit(str(endpoint.get("path") or "/")).path
+        pattern = re.escape(template)
+        pattern = re.sub(r"\\\{[A-Za-z_][A-Za-z0-9_]*\\\}", "[^/]+", pattern)
+        matchers.append((str(endpoint.get("method") or "GET").upper(), re.compile(f"^{pattern}$"), endpoint))
+    return matchers
+
+
+def match_endpoint(
+    matchers: list[tuple[str, re.Pattern[str], dict[str, Any]]],
+    method: str,
+    path: str,
+) -> Optional[dict[str, Any]]:
+    path_only = urllib.parse.urlsplit(path).path
+    for matcher_method, pattern, endpoint in matchers:
+        if matcher_method == method and pattern.match(path_only):
+            return endpoint
+    return None
+
+
+async def run_replay(args: argparse.Namespace) -> int:
+    config_path = Path(args.config).resolve()
+    config = load_config(config_path)
+    base_url, endpoints = apply_global_overrides(config, args)
+    if args.fairness:
+        config.setdefault("fairness", {})["enabled"] = True
+    if args.trace:
+        config.setdefault("tracing", {})["enabled"] = True
+
+    source = Path(args.source).resolve()
+    if not source.exists():
+        raise FileNotFoundError(f"Arquivo de captura nao encontrado: {source}")
+
+    replay_cfg = config.get("replay") or {}
+    file_format = args.format or detect_traffic_format(source)
+    if file_format not in TRAFFIC_FORMATS:
+        raise ValueError(f"Formato de captura invalido: {file_format}. Use: {', '.join(TRAFFIC_FORMATS)}")
+    speed = args.speed if args.speed is not None else to_float(replay_cfg.get("speed"), 1.0)
+    client_key_mode = str(args.client_key or replay_cfg.get("clientKey") or "user").lower()
+    max_clients = max(args.max_clients or to_int(replay_cfg.get("maxClients"), 500), 1)
+    concurrency = max(args.concurrency or to_int(replay_cfg.get("concurrency"), 200), 1)
+    auth_enabled = bool((config.get("auth") or {}).get("enabled"))
+    default_auth = str(replay_cfg.get("defaultAuth") or ("bearer" if auth_enabled else "none"))
+
+    scenario_cfg = {
+        "source": str(source),
+        "format": file_format,
+        "speed": speed,
+        "clientKey": client_key_mode,
+        "maxClients": max_clients,
+        "concurrency": concurrency,
+        # a captura ja contem os retries reais dos apps
+        "retry": False,
+    }
+
+    print("=== ConsertaPraMim Load Test Replay ===")
+    print(f"Config: {config_path}")
+    print(f"Source: {source} ({file_format})")
+    print(f"Base URL: {base_url}")
+    print(f"Speed: {'as-fast-as-possible' if speed <= 0 else f'{speed}x'} | Client key: {client_key_mode}")
+
+    matchers = compile_endpoint_matchers(endpoints)
+    run_id = str(uuid.uuid4())
+    started_epoch = time.time()
+    started_utc = utc_now_iso()
+    metrics = MetricsCollector(started_epoch=started_epoch, fairness=create_fairness_tracker(config))
+    metrics.tracing_enabled = bool((config.get("tracing") or {}).get("enabled", False))
+    # logins nao existem na captura: ficam fora das metricas do trafego reproduzido
+    login_metrics = MetricsCollector(started_epoch=started_epoch)
+    schedule_lag = LatencyHistogram()
+    parse_stats: Counter = Counter()
+
+    shared_client = httpx.AsyncClient(
+        timeout=httpx.Timeout(max(args.timeout, 1.0)),
+        verify=not args.insecure,
+        limits=httpx.Limits(max_keepalive_connections=concurrency, max_connections=concurrency),
+    )
+    sessions: OrderedDict[str, VuSession] = OrderedDict()
+    clients_seen = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    in_flight: set[asyncio.Task[None]] = set()
+
+    def session_for(client_key: str) -> VuSession:
+        nonlocal clients_seen
+        session = sessions.get(client_key)
+        if session is not None:
+            sessions.move_to_end(client_key)
+            return session
+
+        clients_seen += 1
+        session = VuSession(
+            vu_index=clients_seen,
+            scenario_name="replay",
+            base_url=base_url,
+            scenario_cfg=scenario_cfg,
+            global_cfg=config,
+            endpoints=endpoints,
+            metrics=metrics,
+            timeout_seconds=max(args.timeout, 1.0),
+            insecure_tls=args.insecure,
+            random_seed=args.seed,
+            http_client=shared_client,
+            retry_enabled=False,
+            login_metrics=login_metrics,
+        )
+        sessions[client_key] = session
+        if len(sessions) > max_clients:
+            sessions.popitem(last=False)
+        return session
+
+    def client_key_for(entry: TrafficEntry) -> str:
+        if client_key_mode == "tenant":
+            key = entry.tenant_id or entry.user or entry.remote_addr
+        elif client_key_mode == "ip":
+            key = entry.remote_addr or entry.user
+        else:
+            key = entry.user or entry.client_id or entry.remote_addr
+        return str(key or "anonymous")
+
+    async def replay_entry(entry: TrafficEntry) -> None:
+        try:
+            session = session_for(client_key_for(entry))
+            if entry.tenant_id and entry.tenant_id != session.tenant_id:
+                session.tenant_id = entry.tenant_id
+                if metrics.fairness is not None:
+                    metrics.fairness.register(session.vu_index, session.client_id, session.tenant_id, session.account)
+
+            matched = match_endpoint(matchers, entry.method, entry.path)
+            if matched is not None:
+                endpoint = matched
+                endpoint_key = f"{entry.method} {matched.get('path')}"
+            else:
+                endpoint = {"auth": default_auth}
+                endpoint_key = f"{entry.method} {normalize_path_template(entry.path)}"
+
+            body: Optional[Any] = None
+            if entry.body:
+                try:
+                    body = json.loads(entry.body)
+                except ValueError:
+                    body = None
+            elif entry.method not in ("GET", "HEAD", "DELETE") and isinstance(endpoint.get("bodyTemplate"), dict):
+                body = copy.deepcopy(endpoint.get("bodyTemplate"))
+
+            await session.send_request(
+                endpoint=endpoint,
+                endpoint_key=endpoint_key,
+                method=entry.method,
+                resolved_path=entry.path if entry.path.startswith("/") else "/" + entry.path,
+                body=body,
+            )
+        finally:
+            semaphore.release()
+
+    first_timestamp: Optional[float] = None
+    last_timestamp: Optional[float] = None
+    dispatched = 0
+    source_error: Optional[TrafficFormatError] = None
+    wall_start = time.perf_counter()
+    deadline = (wall_start + args.duration) if args.duration else None
+
+    try:
+        try:
+            for entry in iter_traffic_entries(source, file_format, parse_stats):
+                if args.limit and dispatched >= args.limit:
+                    break
+                if first_timestamp is None:
+                    first_timestamp = entry.timestamp
+                last_timestamp = entry.timestamp
+
+                due = wall_start
+                if speed > 0:
+                    due = wall_start + max(entry.timestamp - first_timestamp, 0.0) / speed
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+
+                await semaphore.acquire()
+                if speed > 0:
+                    schedule_lag.record(max(time.perf_counter() - due, 0.0) * 1000.0)
+
+                task = asyncio.create_task(replay_entry(entry))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                dispatched += 1
+        except TrafficFormatError as exc:
+            # o que ja foi disparado continua no relatorio; o run termina com falha
+            source_error = exc
+            print(f"\nAVISO: {exc} Replay interrompido.")
+
+        if in_flight:
+            await asyncio.gather(*list(in_flight))
+    finally:
+        await shared_client.aclose()
+
+    elapsed_seconds = max(time.time() - started_epoch, 0.0)
+    report = metrics.build_report(
+        run_id=run_id,
+        scenario_name="replay",
+        started_at_utc=started_utc,
+        finished_at_utc=utc_now_iso(),
+        duration_seconds=elapsed_seconds,
+        base_url=base_url,
+        scenario_config=scenario_cfg,
+        resolved_endpoints=endpoints,
+    )
+    report["replay"] = {
+        "source": str(source),
+        "format": file_format,
+        "speed": speed,
+        "entriesDispatched": dispatched,
+        "entriesSkipped": parse_stats.get("skipped", 0),
+        "entriesDropped": source_error.dropped if source_error is not None else 0,
+        "sourceError": str(source_error) if source_error is not None else None,
+        "clients": clients_seen,
+        "logins": {
+            **login_metrics.build_summary(elapsed_seconds),
+            "latencyMs": login_metrics.build_latency_summary(),
+            "topErrors": [
+                {"message": message, "count": count}
+                for message, count in login_metrics.error_catalog_counts.most_common(5)
+            ],
+        },
+        "capturedSpanSeconds": round((last_timestamp or 0.0) - (first_timestamp or 0.0), 2),
+        "scheduleLagMs": {
+            "p50": round(schedule_lag.percentile(50), 2),
+            "p95": round(schedule_lag.percentile(95), 2),
+            "max": round(schedule_lag.max, 2),
+        },
+    }
+
+    exit_code = await finalize_report(report, config, args)
+    return exit_code or (1 if source_error is not None else 0)
 
-        print(
-            f"[publish] Run publicado com sucesso em {import_url}. "
-            f"id={response_json.get('id')} runId={response_json.get('externalRunId')} "
-            f"created={response_json.get('created')}"
-        )
-        return True
 
+GENERATOR_MIN_CHUNK_BYTES = 8 * 1024 * 1024
+GENERATOR_MAX_QUERY_VARIANTS = 32
+GENERATOR_MAX_SAMPLE_PATHS = 16
 
-def render_html_report(report: dict[str, Any]) -> str:
-    summary = report.get("summary", {})
-    latency = report.get("latencyMs", {})
-    statuses = report.get("statusCodes", [])
-    top_hits = report.get("topEndpointsByHits", [])
-    top_errors = report.get("topErrors", [])
-    failures = report.get("failureSamples", [])
 
-    def rows_for_status() -> str:
-        if not statuses:
-            return "<tr><td colspan='3'>(none)</td></tr>"
-        return "".join(
-            f"<tr><td>{item.get('statusCode')}</td><td>{item.get('count')}</td><td>{item.get('percentage')}%</td></tr>"
-            for item in statuses
-        )
+def json_shape(value: Any) -> str:
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{key}:{json_shape(value[key])}" for key in sorted(value)) + "}"
+    if isinstance(value, list):
+        return "[" + (json_shape(value[0]) if value else "") + "]"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "number"
+    if value is None:
+        return "null"
+    return "string"
 
-    def rows_for_top_hits() -> str:
-        if not top_hits:
-            return "<tr><td colspan='5'>(none)</td></tr>"
-        return "".join(
-            "<tr>"
-            f"<td>{item.get('endpoint')}</td>"
-            f"<td>{item.get('hits')}</td>"
-            f"<td>{item.get('p95LatencyMs')} ms</td>"
-            f"<td>{item.get('errorRatePercent')}%</td>"
-            f"<td>{item.get('avgLatencyMs')} ms</td>"
-            "</tr>"
-            for item in top_hits
-        )
 
-    def rows_for_errors() -> str:
-        if not top_errors:
-            return "<tr><td colspan='3'>(none)</td></tr>"
-        return "".join(
-            "<tr>"
-            f"<td>{item.get('message')}</td>"
-            f"<td>{item.get('count')}</td>"
-            f"<td>{', '.join(item.get('endpoints', []))}</td>"
-            "</tr>"
-            for item in top_errors
-        )
+def endpoint_name_for_template(method: str, template: str) -> str:
+    words = []
+    for segment in template.strip("/").split("/"):
+        if not segment or segment.lower() == "api":
+            continue
+        if segment.startswith("{"):
+            words.append("by_" + re.sub(r"(?<!^)(?=[A-Z])", "_", segment.strip("{}")).lower())
+        else:
+            words.append(re.sub(r"[^a-z0-9]+", "_", segment.lower()).strip("_"))
+    name = "_".join(word for word in words if word) or "root"
+    return name if method == "GET" else f"{method.lower()}_{name}"
+
+
+def split_traffic_chunks(path: Path, workers: int) -> list[tuple[int, int]]:
+    size = path.stat().st_size
+    chunk_count = max(min(workers * 4, size // GENERATOR_MIN_CHUNK_BYTES), 1)
+    step = -(-size // chunk_count)
+    return [(start, min(start + step, size)) for start in range(0, size, step)] or [(0, 0)]
+
+
+def read_w3c_fields(path: Path) -> list[str]:
+    with path.open("r", encoding="utf-8-sig", errors="replace") as handle:
+        for line in handle:
+            if not line.startswith("#"):
+                break
+            if line.startswith("#Fields:"):
+                return line[len("#Fields:") :].split()
+    return []
+
+
+def scan_traffic_chunk(
+    path: str,
+    file_format: str,
+    byte_range: Optional[tuple[int, int]],
+    w3c_fields: list[str],
+    client_key_mode: str,
+    session_gap_seconds: float,
+) -> dict[str, Any]:
+    stats: Counter = Counter()
+    routes: dict[str, dict[str, Any]] = {}
+    think_time = LatencyHistogram()
+    per_second: Counter = Counter()
+    last_seen: dict[str, tuple[float, float]] = {}
+    first_timestamp: Optional[float] = None
+    last_timestamp: Optional[float] = None
+
+    for entry in iter_traffic_entries(Path(path), file_format, stats, byte_range, w3c_fields):
+        template = normalize_path_template(entry.path)
+        key = f"{entry.method} {template}"
+        route = routes.get(key)
+        if route is None:
+            route = {
+                "method": entry.method,
+                "template": template,
+                "count": 0,
+                "authenticated": 0,
+                "errors": 0,
+                "samplePath": entry.path,
+                "samplePaths": [],
+                "latency": LatencyHistogram(),
+                "queries": Counter(),
+                "bodies": {},
+            }
+            routes[key] = route
+
+        route["count"] += 1
+        if len(route["samplePaths"]) < GENERATOR_MAX_SAMPLE_PATHS and entry.path not in route["samplePaths"]:
+            route["samplePaths"].append(entry.path)
+        if entry.user:
+            route["authenticated"] += 1
+        if entry.status_code is not None and entry.status_code >= 400:
+            route["errors"] += 1
+        if entry.duration_ms is not None:
+            route["latency"].record(entry.duration_ms)
+
+        query = urllib.parse.urlsplit(entry.path).query
+        if query and (query in route["queries"] or len(route["queries"]) < GENERATOR_MAX_QUERY_VARIANTS):
+            route["queries"][query] += 1
+
+        if entry.body:
+            try:
+                body = json.loads(entry.body)
+            except ValueError:
+                body = None
+            if isinstance(body, dict):
+                shape = json_shape(body)
+                sample = route["bodies"].get(shape)
+                if sample is None:
+                    route["bodies"][shape] = [1, body]
+                else:
+                    sample[0] += 1
 
-    def rows_for_failures() -> str:
-        if not failures:
-            return "<tr><td colspan='7'>(none)</td></tr>"
-        return "".join(
-            "<tr>"
-            f"<td>{item.get('timestampUtc')}</td>"
-            f"<td>{item.get('method')}</td>"
-            f"<td>{item.get('path')}</td>"
-            f"<td>{item.get('statusCode')}</td>"
-            f"<td>{item.get('correlationId')}</td>"
-            f"<td>{item.get('errorType')}</td>"
-            f"<td>{truncate_text(str(item.get('errorMessage') or ''), 140)}</td>"
-            "</tr>"
-            for item in failures
-        )
+        if client_key_mode == "tenant":
+            client_key = entry.tenant_id or entry.user or entry.remote_addr
+        elif client_key_mode == "ip":
+            client_key = entry.remote_addr or entry.user
+        else:
+            client_key = entry.user or entry.client_id or entry.remote_addr
+        if client_key:
+            previous = last_seen.get(client_key)
+            if previous is not None:
+                gap_ms = (entry.timestamp - previous[0]) * 1000.0 - previous[1]
+                if 0 <= gap_ms <= session_gap_seconds * 1000.0:
+                    think_time.record(gap_ms)
+            last_seen[client_key] = (entry.timestamp, entry.duration_ms or 0.0)
+
+        per_second[int(entry.timestamp)] += 1
+        first_timestamp = entry.timestamp if first_timestamp is None else min(first_timestamp, entry.timestamp)
+        last_timestamp = entry.timestamp if last_timestamp is None else max(last_timestamp, entry.timestamp)
+
+    return {
+        "parsed": stats.get("parsed", 0),
+        "skipped": stats.get("skipped", 0),
+        "routes": routes,
+        "thinkTime": think_time,
+        "perSecond": per_second,
+        "firstTimestamp": first_timestamp,
+        "lastTimestamp": last_timestamp,
+        "clients": len(last_seen),
+    }
 
-    return f"""<!doctype html>
-<html lang="pt-BR">
-<head>
-  <meta charset="utf-8"/>
-  <meta name="viewport" content="width=device-width, initial-scale=1"/>
-  <title>Load Test Report - {report.get('runId')}</title>
-  <style>
-    body {{ font-family: Arial, sans-serif; margin: 20px; color: #1f2937; }}
-    h1, h2 {{ margin: 0 0 12px; }}
-    .grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(240px, 1fr)); gap: 10px; margin-bottom: 16px; }}
-    .card {{ border: 1px solid #d1d5db; border-radius: 8px; padding: 10px; background: #f9fafb; }}
-    table {{ width: 100%; border-collapse: collapse; margin: 12px 0 20px; font-size: 13px; }}
-    th, td {{ border: 1px solid #d1d5db; padding: 6px 8px; text-align: left; vertical-align: top; }}
-    th {{ background: #f3f4f6; }}
-    code {{ background: #f3f4f6; padding: 2px 4px; border-radius: 4px; }}
-  </style>
-</head>
-<body>
-  <h1>Load Test Report</h1>
-  <p><strong>RunId:</strong> <code>{report.get('runId')}</code></p>
-  <p><strong>Scenario:</strong> {report.get('scenario')} | <strong>BaseUrl:</strong> {report.get('baseUrl')}</p>
-  <p><strong>Inicio:</strong> {report.get('startedAtUtc')} | <strong>Fim:</strong> {report.get('finishedAtUtc')} | <strong>DuraÃ§Ã£o:</strong> {report.get('durationSeconds')}s</p>
 
-  <div class="grid">
-    <div class="card"><strong>Total requests</strong><br/>{summary.get('totalRequests', 0)}</div>
-    <div class="card"><strong>Sucesso</strong><br/>{summary.get('successfulRequests', 0)}</div>
-    <div class="card"><strong>Falhas</strong><br/>{summary.get('failedRequests', 0)} ({summary.get('errorRatePercent', 0)}%)</div>
-    <div class="card"><strong>RPS mÃ©dio/pico</strong><br/>{summary.get('rpsAvg', 0)} / {summary.get('rpsPeak', 0)}</div>
-    <div class="card"><strong>LatÃªncia p50</strong><br/>{latency.get('p50', 0)} ms</div>
-    <div class="card"><strong>LatÃªncia p95/p99</strong><br/>{latency.get('p95', 0)} / {latency.get('p99', 0)} ms</div>
-  </div>
+def merge_traffic_scans(scans: list[dict[str, Any]]) -> dict[str, Any]:
+    merged: dict[str, Any] = {
+        "parsed": 0,
+        "skipped": 0,
+        "routes": {},
+        "thinkTime": LatencyHistogram(),
+        "perSecond": Counter(),
+        "firstTimestamp": None,
+        "lastTimestamp": None,
+        "clients": 0,
+    }
+    for scan in scans:
+        merged["parsed"] += scan["parsed"]
+        merged["skipped"] += scan["skipped"]
+        merged["clients"] = max(merged["clients"], scan["clients"])
+        merged["thinkTime"].merge(scan["thinkTime"])
+        merged["perSecond"].update(scan["perSecond"])
+        for bound, pick in (("firstTimestamp", min), ("lastTimestamp", max)):
+            if scan[bound] is not None:
+                merged[bound] = scan[bound] if merged[bound] is None else pick(merged[bound], scan[bound])
+
+        for key, route in scan["routes"].items():
+            target = merged["routes"].get(key)
+            if target is None:
+                merged["routes"][key] = route
+                continue
+            target["count"] += route["count"]
+            target["authenticated"] += route["authenticated"]
+            target["errors"] += route["errors"]
+            target["latency"].merge(route["latency"])
+            target["queries"].update(route["queries"])
+            for sample_path in route["samplePaths"]:
+                if len(target["samplePaths"]) < GENERATOR_MAX_SAMPLE_PATHS and sample_path not in target["samplePaths"]:
+                    target["samplePaths"].append(sample_path)
+            for shape, (count, body) in route["bodies"].items():
+                if shape in target["bodies"]:
+                    target["bodies"][shape][0] += count
+                else:
+                    target["bodies"][shape] = [count, body]
+    return merged
 
-  <h2>Status codes</h2>
-  <table>
-    <thead><tr><th>Status</th><th>Contagem</th><th>%</th></tr></thead>
-    <tbody>{rows_for_status()}</tbody>
-  </table>
 
-  <h2>Top endpoints por hits</h2>
-  <table>
-    <thead><tr><th>Endpoint</th><th>Hits</th><th>P95</th><th>Error rate</th><th>MÃ©dia</th></tr></thead>
-    <tbody>{rows_for_top_hits()}</tbody>
-  </table>
+def build_generated_scenario(
+    merged: dict[str, Any],
+    *,
+    config_endpoints: list[dict[str, Any]],
+    scenario_name: str,
+    top: int,
+    min_share_percent: float,
+    duration_seconds: int,
+) -> dict[str, Any]:
+    total = sum(route["count"] for route in merged["routes"].values())
+    ranked = sorted(merged["routes"].values(), key=lambda route: route["count"], reverse=True)
+    matchers = compile_endpoint_matchers(config_endpoints)
+
+    endpoints: list[dict[str, Any]] = []
+    used_names: Counter = Counter()
+    dropped = 0
+    for route in ranked:
+        share = (route["count"] / total * 100.0) if total else 0.0
+        if len(endpoints) >= top or share < min_share_percent:
+            dropped += route["count"]
+            continue
+
+        method = route["method"]
+        template = route["template"]
+        known = match_endpoint(matchers, method, route["samplePath"])
+        name = str(known.get("name")) if known and known.get("name") else endpoint_name_for_template(method, template)
+        used_names[name] += 1
+        if used_names[name] > 1:
+            name = f"{name}_{used_names[name]}"
+
+        path = template
+        if route["queries"]:
+            query, query_count = route["queries"].most_common(1)[0]
+            if query_count * 2 >= route["count"]:
+                path = f"{template}?{query}"
+
+        if known:
+            auth = str(known.get("auth") or "none")
+        else:
+            auth = "bearer" if route["authenticated"] * 2 >= route["count"] else "none"
+
+        endpoint: dict[str, Any] = {
+            "name": name,
+            "method": method,
+            "path": path,
+            "auth": auth,
+            "weight": round(share, 2),
+        }
+        if known and known.get("fallbackPath"):
+            # o fallback escrito a mao (ex.: a listagem que captura o id) vale mais que paths amostrados
+            endpoint["fallbackPath"] = known.get("fallbackPath")
+        elif "{" in template:
+            samples = route["samplePaths"] or [route["samplePath"]]
+            endpoint["fallbackPath"] = samples if len(samples) > 1 else samples[0]
+        if route["bodies"]:
+            endpoint["bodyTemplate"] = max(route["bodies"].values(), key=lambda item: item[0])[1]
+        if known and known.get("capture"):
+            endpoint["capture"] = known.get("capture")
+
+        latency = route["latency"]
+        endpoint["observed"] = {
+            "hits": route["count"],
+            "errorRatePercent": round(route["errors"] / route["count"] * 100.0, 2),
+            "p50LatencyMs": round(latency.percentile(50), 2) if latency.count else None,
+            "p95LatencyMs": round(latency.percentile(95), 2) if latency.count else None,
+        }
+        endpoints.append(endpoint)
+
+    span_seconds = max((merged["lastTimestamp"] or 0.0) - (merged["firstTimestamp"] or 0.0), 1.0)
+    rps_avg = merged["parsed"] / span_seconds
+    rps_peak = max(merged["perSecond"].values(), default=0)
+
+    think_time = merged["thinkTime"]
+    think_p10 = think_time.percentile(10) if think_time.count else 250.0
+    think_p90 = think_time.percentile(90) if think_time.count else 1200.0
+
+    latency_all = LatencyHistogram()
+    for route in merged["routes"].values():
+        latency_all.merge(route["latency"])
+    cycle_seconds = (think_time.mean() if think_time.count else 500.0) / 1000.0 + latency_all.mean() / 1000.0
+    vus = max(int(math.ceil(rps_avg * max(cycle_seconds, 0.001))), 1)
+
+    scenario = {
+        "vus": vus,
+        "durationSeconds": duration_seconds,
+        "rampUpSeconds": max(min(duration_seconds // 10, 60), 1),
+        "thinkTimeMinMs": int(round(think_p10)),
+        "thinkTimeMaxMs": int(round(max(think_p90, think_p10))),
+        "errorInjectionRatePercent": 0,
+    }
+    if think_time.count:
+        scenario["thinkTime"] = {
+            "model": "lognormal",
+            "medianMs": round(think_time.percentile(50), 2),
+            "p90Ms": round(think_p90, 2),
+            "maxMs": round(think_time.percentile(99), 2),
+        }
 
-  <h2>Top erros</h2>
-  <table>
-    <thead><tr><th>Mensagem normalizada</th><th>Contagem</th><th>Endpoints</th></tr></thead>
-    <tbody>{rows_for_errors()}</tbody>
-  </table>
+    return {
+        "scenarios": {scenario_name: scenario},
+        "endpoints": endpoints,
+        "capture": {
+            "entriesParsed": merged["parsed"],
+            "entriesSkipped": merged["skipped"],
+            "routes": len(merged["routes"]),
+            "routesKept": len(endpoints),
+            "hitsDroppedPercent": round(dropped / total * 100.0, 2) if total else 0.0,
+            "spanSeconds": round(span_seconds, 2),
+            "rpsAvg": round(rps_avg, 2),
+            "rpsPeak": rps_peak,
+            "thinkTimeMs": {
+                "samples": think_time.count,
+                "p10": round(think_p10, 2),
+                "p50": round(think_time.percentile(50), 2) if think_time.count else None,
+                "p90": round(think_p90, 2),
+                "mean": round(think_time.mean(), 2) if think_time.count else None,
+            },
+        },
+    }
 
-  <h2>Amostras de falha</h2>
-  <table>
-    <thead><tr><th>Timestamp</th><th>MÃ©todo</th><th>Path</th><th>Status</th><th>CorrelationId</th><th>Tipo</th><th>Erro</th></tr></thead>
-    <tbody>{rows_for_failures()}</tbody>
-  </table>
-</body>
-</html>"""
+
+def run_generate(args: argparse.Namespace) -> int:
+    config_path = Path(args.config).resolve()
+    config = load_config(config_path)
+    config_endpoints = config.get("endpoints") if isinstance(config.get("endpoints"), list) else []
+
+    sources = [Path(item).resolve() for item in args.sources]
+    for source in sources:
+        if not source.exists():
+            raise FileNotFoundError(f"Arquivo de captura nao encontrado: {source}")
+
+    workers = max(args.workers or (os.cpu_count() or 1), 1)
+    tasks: list[tuple[str, str, Optional[tuple[int, int]], list[str], str, float]] = []
+    for source in sources:
+        file_format = args.format or detect_traffic_format(source)
+        if file_format not in TRAFFIC_FORMATS:
+            raise ValueError(f"Formato de captura invalido: {file_format}. Use: {', '.join(TRAFFIC_FORMATS)}")
+        w3c_fields = read_w3c_fields(source) if file_format == "w3c" else []
+        chunks: list[Optional[tuple[int, int]]] = [None] if file_format == "har" else list(split_traffic_chunks(source, workers))
+        for chunk in chunks:
+            tasks.append((str(source), file_format, chunk, w3c_fields, args.client_key, args.session_gap))
+
+    print("=== ConsertaPraMim Load Test Generator ===")
+    print(f"Sources: {', '.join(str(source) for source in sources)}")
+    print(f"Chunks: {len(tasks)} | Workers: {min(workers, len(tasks))}")
+
+    started = time.perf_counter()
+    if len(tasks) == 1 or workers == 1:
+        scans = [scan_traffic_chunk(*task) for task in tasks]
+    else:
+        spawn_context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=spawn_context) as pool:
+            scans = list(pool.map(scan_traffic_chunk, *zip(*tasks)))
+    merged = merge_traffic_scans(scans)
+    elapsed = time.perf_counter() - started
+
+    if not merged["parsed"]:
+        raise ValueError("Nenhuma entrada valida encontrada na captura.")
+
+    generated = build_generated_scenario(
+        merged,
+        config_endpoints=config_endpoints,
+        scenario_name=args.scenario_name,
+        top=max(args.top, 1),
+        min_share_percent=max(args.min_share, 0.0),
+        duration_seconds=max(args.duration, 1),
+    )
+    generated["capture"]["sources"] = [str(source) for source in sources]
+    generated["capture"]["generatedAtUtc"] = utc_now_iso()
+
+    if args.output:
+        output_path = Path(args.output).resolve()
+    else:
+        output_path = Path(args.output_dir).resolve() / f"loadtest-generated-{sources[0].stem}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(generated, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    capture = generated["capture"]
+    scenario = generated["scenarios"][args.scenario_name]
+    print(
+        f"\nEntradas: {capture['entriesParsed']} (ignoradas: {capture['entriesSkipped']}) em {elapsed:.1f}s "
+        f"({capture['entriesParsed'] / max(elapsed, 0.001):.0f}/s)"
+    )
+    print(f"Rotas: {capture['routes']} | mantidas: {capture['routesKept']} | hits descartados: {capture['hitsDroppedPercent']}%")
+    print(f"RPS medio/pico na captura: {capture['rpsAvg']}/{capture['rpsPeak']}")
+    print(
+        f"Cenario '{args.scenario_name}': vus={scenario['vus']} think={scenario['thinkTimeMinMs']}..{scenario['thinkTimeMaxMs']}ms"
+    )
+    for endpoint in generated["endpoints"][:10]:
+        print(f"- {endpoint['method']} {endpoint['path']} weight={endpoint['weight']} auth={endpoint['auth']}")
+    print(f"\nArquivo gerado: {output_path}")
+    return 0
 
 
 def load_config(config_path: Path) -> dict[str, Any]:
@@ -1164,6 +9200,19 @@ def load_config(config_path: Path) -> dict[str, Any]:
     if not isinstance(data, dict):
         raise ValueError("Arquivo de configuracao invalido. Esperado objeto JSON.")
 
+    for scenario_cfg in (data.get("scenarios") or {}).values():
+        think_cfg = scenario_cfg.get("thinkTime") if isinstance(scenario_cfg, dict) else None
+        if isinstance(think_cfg, dict) and think_cfg.get("file"):
+            think_path = Path(str(think_cfg["file"]))
+            if not think_path.is_absolute():
+                think_cfg["file"] = str((config_path.parent / think_path).resolve())
+
+    for feeder_cfg in (data.get("feeders") or {}).values():
+        if isinstance(feeder_cfg, dict) and feeder_cfg.get("file"):
+            feeder_path = Path(str(feeder_cfg["file"]))
+            if not feeder_path.is_absolute():
+                feeder_cfg["file"] = str((config_path.parent / feeder_path).resolve())
+
     return data
 
 
@@ -1180,7 +9229,40 @@ def resolve_scenario(config: dict[str, Any], scenario_name: str) -> dict[str, An
     return scenario
 
 
-def parse_args() -> argparse.Namespace:
+def apply_global_overrides(config: dict[str, Any], args: argparse.Namespace) -> tuple[str, list[dict[str, Any]]]:
+    if args.base_url:
+        config["baseUrl"] = args.base_url
+    base_url = str(config.get("baseUrl") or "").rstrip("/")
+    if not base_url:
+        raise ValueError("baseUrl nao informado no config nem via --base-url")
+
+    if args.auth_password:
+        auth_cfg = config.get("auth") or {}
+        accounts = auth_cfg.get("accounts") or []
+        for account in accounts:
+            account["password"] = args.auth_password
+        auth_cfg["passwordOverride"] = args.auth_password
+
+    endpoints = config.get("endpoints")
+    if not isinstance(endpoints, list) or not endpoints:
+        raise ValueError("Configuracao invalida: endpoints precisa ser uma lista nao vazia.")
+
+    return base_url, endpoints
+
+
+def add_publish_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--publish-admin", action="store_true", help="Publica o resultado no endpoint admin de loadtests")
+    parser.add_argument("--publish-url", default=None, help="URL absoluta para POST /api/admin/loadtests/import")
+    parser.add_argument("--publish-token", default=None, help="Bearer token admin para publicacao")
+    parser.add_argument("--publish-login-url", default=None, help="URL de login admin para obter token automaticamente")
+    parser.add_argument("--publish-email", default=None, help="Email admin para login automatico de publicacao")
+    parser.add_argument("--publish-password", default=None, help="Senha admin para login automatico de publicacao")
+    parser.add_argument("--publish-source", default=None, help="Identificador de origem salvo no run importado")
+    parser.add_argument("--publish-no-compress", action="store_true", help="Envia o payload de publicacao sem gzip")
+    parser.add_argument("--publish-timeout", type=float, default=None, help="Timeout (s) de conexao/leitura da publicacao admin (padrao: --timeout)")
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="ConsertaPraMim API Load Test Runner")
     parser.add_argument("--config", default=str(Path(__file__).resolve().parent / "loadtest.config.json"), help="Caminho do arquivo de configuracao JSON")
     parser.add_argument("--scenario", default="smoke", help="Nome do cenario em loadtest.config.json")
@@ -1188,21 +9270,162 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--vus", type=int, default=None, help="Sobrescreve quantidade de clientes virtuais (VUs)")
     parser.add_argument("--duration", type=int, default=None, help="Sobrescreve durationSeconds")
     parser.add_argument("--ramp-up", type=float, default=None, help="Sobrescreve rampUpSeconds")
-    parser.add_argument("--think-min", type=int, default=None, help="Sobrescreve thinkTimeMinMs")
-    parser.add_argument("--think-max", type=int, default=None, help="Sobrescreve thinkTimeMaxMs")
+    parser.add_argument("--think-min", type=int, default=None, help="Sobrescreve thinkTimeMinMs (e troca o bloco thinkTime por uniform)")
+    parser.add_argument("--think-max", type=int, default=None, help="Sobrescreve thinkTimeMaxMs (e troca o bloco thinkTime por uniform)")
     parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_SECONDS, help="Timeout HTTP por request")
     parser.add_argument("--insecure", action="store_true", help="Desabilita validacao TLS (self-signed em dev)")
     parser.add_argument("--seed", type=int, default=42, help="Seed para reproducibilidade")
     parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR), help="Diretorio de saida dos relatorios")
     parser.add_argument("--auth-password", default=None, help="Sobrescreve senha de todas as contas de auth no config")
-    parser.add_argument("--publish-admin", action="store_true", help="Publica o resultado no endpoint admin de loadtests")
-    parser.add_argument("--publish-url", default=None, help="URL absoluta para POST /api/admin/loadtests/import")
-    parser.add_argument("--publish-token", default=None, help="Bearer token admin para publicacao")
-    parser.add_argument("--publish-login-url", default=None, help="URL de login admin para obter token automaticamente")
-    parser.add_argument("--publish-email", default=None, help="Email admin para login automatico de publicacao")
-    parser.add_argument("--publish-password", default=None, help="Senha admin para login automatico de publicacao")
-    parser.add_argument("--publish-source", default=None, help="Identificador de origem salvo no run importado")
-    return parser.parse_args()
+    add_publish_arguments(parser)
+    parser.add_argument("--raw-log", action="store_true", help="Grava log binario com uma amostra por request (loadtest-raw-<runId>.bin)")
+    parser.add_argument("--shard-index", type=int, default=0, help="Indice (base 0) deste processo quando a carga e dividida entre workers")
+    parser.add_argument("--shard-count", type=int, default=1, help="Total de processos workers que dividem os feeders")
+    parser.add_argument("--trace", action="store_true", help="Envia traceparent W3C em todos os requests (tracing.enabled; implicito com --otlp-file/--otlp-endpoint)")
+    parser.add_argument("--otlp-file", action="store_true", help="Exporta spans de cliente em OTLP JSON (loadtest-spans-<runId>.otlp.jsonl)")
+    parser.add_argument("--otlp-endpoint", default=None, help="Envia spans de cliente via OTLP/HTTP JSON (ex.: http://localhost:4318/v1/traces)")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Expoe metricas OpenMetrics/Prometheus do gerador nesta porta (0 = porta livre)")
+    parser.add_argument("--metrics-host", default="127.0.0.1", help="Interface do endpoint de metricas (use 0.0.0.0 para scrape remoto)")
+    parser.add_argument("--publish-live-interval", type=float, default=None, help="Publica snapshots parciais do run no admin a cada N segundos (0 desliga)")
+    parser.add_argument("--fairness", action="store_true", help="Quebra latencia/erros por VU, tenant e conta com indice de Jain e dispersao do p95 por VU")
+    parser.add_argument("--server-metrics", action="store_true", help="Amostra CPU/memoria/health do servidor durante o run (bloco serverMetrics do config)")
+    parser.add_argument("--drain-timeout", type=float, default=None, help="Segundos aguardando requests em andamento apos Ctrl+C/SIGTERM (padrao: drainTimeoutSeconds do cenario ou 10)")
+    parser.add_argument("--cache-bust", type=float, default=None, help="Sobrescreve cache.bustPercent do cenario (100 = todo request ignora o cache, para comparar)")
+    return parser.parse_args(argv)
+
+
+def parse_analyze_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="loadtest_runner.py analyze",
+        description="Analisa um log binario de amostras gerado com --raw-log",
+    )
+    parser.add_argument("raw_log", help="Caminho do arquivo loadtest-raw-<runId>.bin")
+    parser.add_argument("--correlation-id", action="append", default=None, help="X-Correlation-Id para localizar (pode repetir)")
+    parser.add_argument("--bucket-seconds", type=float, default=None, help="Largura das linhas do heatmap em segundos")
+    parser.add_argument("--output", default=None, help="Salva a analise em JSON no caminho informado")
+    return parser.parse_args(argv)
+
+
+def parse_correlate_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="loadtest_runner.py correlate",
+        description="Cruza o log binario (--raw-log) com as duracoes registradas pela API (monitoramento admin) por X-Correlation-Id",
+    )
+    parser.add_argument("raw_log", help="Caminho do arquivo loadtest-raw-<runId>.bin")
+    parser.add_argument("--server-file", default=None, help="Export do monitoramento (CSV, JSON do endpoint de export, lista de requests ou NDJSON)")
+    parser.add_argument("--config", default=str(Path(__file__).resolve().parent / "loadtest.config.json"), help="Config usado para baseUrl e credenciais de adminPublish")
+    parser.add_argument("--base-url", default=None, help="Sobrescreve baseUrl da configuracao")
+    parser.add_argument("--export-url", default=None, help="URL absoluta de /api/admin/monitoring/requests/export")
+    parser.add_argument("--range", default=None, help="Janela do monitoramento (1h, 2h, 4h, 6h, 8h, 12h, 24h, 7d, 30d; padrao: menor janela que cobre o run)")
+    parser.add_argument("--admin-token", default=None, help="Bearer token admin")
+    parser.add_argument("--admin-login-url", default=None, help="URL de login admin (padrao: adminPublish.loginUrl)")
+    parser.add_argument("--admin-email", default=None, help="Email admin (padrao: adminPublish.email)")
+    parser.add_argument("--admin-password", default=None, help="Senha admin (padrao: adminPublish.password)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Timeout (s) do export")
+    parser.add_argument("--insecure", action="store_true", help="Desabilita validacao TLS (self-signed em dev)")
+    parser.add_argument("--output", default=None, help="Caminho do JSON de saida (padrao: loadtest-correlation-<runId>.json ao lado do raw log)")
+    return parser.parse_args(argv)
+
+
+def parse_matrix_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="loadtest_runner.py matrix",
+        description="Executa uma matriz de cenarios/parametros e gera um relatorio consolidado",
+    )
+    parser.add_argument("--config", default=str(Path(__file__).resolve().parent / "loadtest.config.json"), help="Caminho do arquivo de configuracao JSON")
+    parser.add_argument("--scenarios", default=None, help="Lista de cenarios separados por virgula (padrao: matrix.scenarios do config)")
+    parser.add_argument("--sweep", action="append", default=None, help="Varredura de parametro do cenario, ex.: vus=50,100,200 ou thinkTimeMs=100,500 (pode repetir)")
+    parser.add_argument("--isolated", action=argparse.BooleanOptionalAction, default=None, help="Executa cada celula em um processo isolado (--no-isolated sobrescreve matrix.isolated do config)")
+    parser.add_argument("--parallel", type=int, default=None, help="Quantidade de celulas executadas simultaneamente")
+    parser.add_argument("--duration", type=int, default=None, help="Sobrescreve durationSeconds de todas as celulas")
+    parser.add_argument("--base-url", default=None, help="Sobrescreve baseUrl da configuracao")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_SECONDS, help="Timeout HTTP por request")
+    parser.add_argument("--insecure", action="store_true", help="Desabilita validacao TLS (self-signed em dev)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed para reproducibilidade")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR), help="Diretorio de saida dos relatorios")
+    parser.add_argument("--auth-password", default=None, help="Sobrescreve senha de todas as contas de auth no config")
+    return parser.parse_args(argv)
+
+
+def parse_autotune_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="loadtest_runner.py autotune",
+        description="Busca a maior vazao sustentavel ajustando VUs ate o limite dos SLOs de p95 e taxa de erro",
+    )
+    parser.add_argument("--config", default=str(Path(__file__).resolve().parent / "loadtest.config.json"), help="Caminho do arquivo de configuracao JSON")
+    parser.add_argument("--scenarios", default=None, help="Cenarios (mix de endpoints) separados por virgula (padrao: autotune.scenarios do config)")
+    parser.add_argument("--strategy", default=None, choices=AUTOTUNE_STRATEGIES, help="binary (dobra VUs e depois busca binaria) ou aimd (aumento aditivo, reducao multiplicativa)")
+    parser.add_argument("--start-vus", type=int, default=None, help="VUs do primeiro passo")
+    parser.add_argument("--max-vus", type=int, default=None, help="Limite superior de VUs")
+    parser.add_argument("--step-seconds", type=int, default=None, help="Duracao da janela medida de cada passo")
+    parser.add_argument("--warmup", type=float, default=None, help="Segundos descartados apos o ramp-up de cada passo")
+    parser.add_argument("--max-steps", type=int, default=None, help="Quantidade maxima de passos por cenario")
+    parser.add_argument("--slo-p95", type=float, default=None, help="SLO de latencia p95 em ms")
+    parser.add_argument("--slo-error-rate", type=float, default=None, help="SLO de taxa de erro em %%")
+    parser.add_argument("--base-url", default=None, help="Sobrescreve baseUrl da configuracao")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_SECONDS, help="Timeout HTTP por request")
+    parser.add_argument("--insecure", action="store_true", help="Desabilita validacao TLS (self-signed em dev)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed para reproducibilidade")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR), help="Diretorio de saida dos relatorios")
+    parser.add_argument("--auth-password", default=None, help="Sobrescreve senha de todas as contas de auth no config")
+    return parser.parse_args(argv)
+
+
+def parse_echo_hub_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="loadtest_runner.py echo-hub",
+        description="Hub SignalR local (JSON/WebSockets) que ecoa mensagens de chat para testes offline",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface de escuta")
+    parser.add_argument("--port", type=int, default=5199, help="Porta de escuta")
+    parser.add_argument("--drop-after", type=float, default=0.0, help="Derruba cada conexao apos N segundos para simular quedas (0 desliga)")
+    return parser.parse_args(argv)
+
+
+def parse_replay_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="loadtest_runner.py replay",
+        description="Reproduz trafego capturado (access log nginx, W3C/IIS, NDJSON ou HAR) contra a API",
+    )
+    parser.add_argument("source", help="Arquivo de captura (access log, .ndjson/.jsonl ou .har)")
+    parser.add_argument("--format", default=None, choices=TRAFFIC_FORMATS, help="Formato da captura (padrao: deteccao automatica)")
+    parser.add_argument("--speed", type=float, default=None, help="Multiplicador de velocidade (1 = tempo real, 2 = 2x, 0 = o mais rapido possivel)")
+    parser.add_argument("--client-key", default=None, choices=("user", "tenant", "ip"), help="Campo usado para agrupar requests em clientes virtuais")
+    parser.add_argument("--max-clients", type=int, default=None, help="Maximo de sessoes de cliente mantidas em memoria (LRU)")
+    parser.add_argument("--concurrency", type=int, default=None, help="Maximo de requests simultaneos em voo")
+    parser.add_argument("--limit", type=int, default=None, help="Reproduz no maximo N entradas da captura")
+    parser.add_argument("--fairness", action="store_true", help="Quebra latencia/erros por VU, tenant e conta com indice de Jain e dispersao do p95 por VU")
+    parser.add_argument("--trace", action="store_true", help="Envia traceparent W3C em todos os requests (tracing.enabled)")
+    parser.add_argument("--duration", type=int, default=None, help="Interrompe o replay apos N segundos")
+    parser.add_argument("--config", default=str(Path(__file__).resolve().parent / "loadtest.config.json"), help="Caminho do arquivo de configuracao JSON")
+    parser.add_argument("--base-url", default=None, help="Sobrescreve baseUrl da configuracao")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_SECONDS, help="Timeout HTTP por request")
+    parser.add_argument("--insecure", action="store_true", help="Desabilita validacao TLS (self-signed em dev)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed para reproducibilidade")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR), help="Diretorio de saida dos relatorios")
+    parser.add_argument("--auth-password", default=None, help="Sobrescreve senha de todas as contas de auth no config")
+    add_publish_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def parse_generate_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="loadtest_runner.py generate",
+        description="Gera endpoints e cenario a partir de capturas de trafego (access log, NDJSON ou HAR)",
+    )
+    parser.add_argument("sources", nargs="+", help="Arquivos de captura")
+    parser.add_argument("--format", default=None, choices=TRAFFIC_FORMATS, help="Formato da captura (padrao: deteccao automatica)")
+    parser.add_argument("--workers", type=int, default=None, help="Processos usados na leitura (padrao: quantidade de CPUs)")
+    parser.add_argument("--client-key", default="user", choices=("user", "tenant", "ip"), help="Campo que identifica o cliente ao medir think time")
+    parser.add_argument("--session-gap", type=float, default=300.0, help="Intervalos maiores que N segundos nao contam como think time")
+    parser.add_argument("--top", type=int, default=40, help="Quantidade maxima de rotas geradas")
+    parser.add_argument("--min-share", type=float, default=0.1, help="Descarta rotas com menos de N%% dos hits")
+    parser.add_argument("--scenario-name", default="captured", help="Nome do cenario gerado")
+    parser.add_argument("--duration", type=int, default=300, help="durationSeconds do cenario gerado")
+    parser.add_argument("--config", default=str(Path(__file__).resolve().parent / "loadtest.config.json"), help="Config usado para reaproveitar nome/auth/capture de endpoints conhecidos")
+    parser.add_argument("--output", default=None, help="Caminho do JSON gerado (padrao: output/loadtest-generated-<arquivo>.json)")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR), help="Diretorio de saida quando --output nao e informado")
+    return parser.parse_args(argv)
 
 
 async def main_async(args: argparse.Namespace) -> int:
@@ -1210,12 +9433,13 @@ async def main_async(args: argparse.Namespace) -> int:
     config = load_config(config_path)
 
     scenario_cfg = resolve_scenario(config, args.scenario)
-
-    if args.base_url:
-        config["baseUrl"] = args.base_url
-    base_url = str(config.get("baseUrl") or "").rstrip("/")
-    if not base_url:
-        raise ValueError("baseUrl nao informado no config nem via --base-url")
+    base_url, endpoints = apply_global_overrides(config, args)
+    if args.fairness:
+        config.setdefault("fairness", {})["enabled"] = True
+    if args.server_metrics:
+        config.setdefault("serverMetrics", {})["enabled"] = True
+    if args.trace or args.otlp_file or args.otlp_endpoint:
+        config.setdefault("tracing", {})["enabled"] = True
 
     if args.vus is not None:
         scenario_cfg["vus"] = args.vus
@@ -1223,20 +9447,17 @@ async def main_async(args: argparse.Namespace) -> int:
         scenario_cfg["durationSeconds"] = args.duration
     if args.ramp_up is not None:
         scenario_cfg["rampUpSeconds"] = args.ramp_up
+    if args.think_min is not None or args.think_max is not None:
+        # os limites da linha de comando valem sobre o bloco thinkTime: vira uniform entre eles
+        think_cfg = scenario_cfg.pop("thinkTime", None)
+        if think_cfg:
+            print(f"Aviso: --think-min/--think-max substituem thinkTime (model={think_cfg.get('model') or 'uniform'}) por uniform.")
     if args.think_min is not None:
         scenario_cfg["thinkTimeMinMs"] = args.think_min
     if args.think_max is not None:
         scenario_cfg["thinkTimeMaxMs"] = args.think_max
-
-    if args.auth_password:
-        auth_cfg = config.get("auth") or {}
-        accounts = auth_cfg.get("accounts") or []
-        for account in accounts:
-            account["password"] = args.auth_password
-
-    endpoints = config.get("endpoints")
-    if not isinstance(endpoints, list) or not endpoints:
-        raise ValueError("Configuracao invalida: endpoints precisa ser uma lista nao vazia.")
+    if args.cache_bust is not None:
+        scenario_cfg["cache"] = {**(scenario_cfg.get("cache") or {}), "bustPercent": args.cache_bust}
 
     print("=== ConsertaPraMim Load Test ===")
     print(f"Config: {config_path}")
@@ -1244,36 +9465,97 @@ async def main_async(args: argparse.Namespace) -> int:
     print(f"Base URL: {base_url}")
     print(
         f"VUs: {scenario_cfg.get('vus')} | Duration(s): {scenario_cfg.get('durationSeconds')} | "
-        f"RampUp(s): {scenario_cfg.get('rampUpSeconds', 0)}"
+        f"RampUp(s): {scenario_cfg.get('rampUpSeconds', 0)} | Executor: {scenario_cfg.get('executor') or 'constant'}"
     )
-    print(
-        f"Think(ms): {scenario_cfg.get('thinkTimeMinMs')}..{scenario_cfg.get('thinkTimeMaxMs')} | "
-        f"Error Injection(%): {scenario_cfg.get('errorInjectionRatePercent', 0)}"
+    think_cfg = scenario_cfg.get("thinkTime")
+    think_label = (
+        json.dumps(think_cfg, ensure_ascii=False)
+        if isinstance(think_cfg, dict)
+        else f"{scenario_cfg.get('thinkTimeMinMs')}..{scenario_cfg.get('thinkTimeMaxMs')}"
     )
+    print(f"Think(ms): {think_label} | Error Injection(%): {scenario_cfg.get('errorInjectionRatePercent', 0)}")
 
-    report = await run_scenario(
-        scenario_name=args.scenario,
-        base_url=base_url,
-        scenario_cfg=scenario_cfg,
-        global_cfg=config,
-        endpoints=endpoints,
-        timeout_seconds=max(args.timeout, 1.0),
-        insecure_tls=args.insecure,
-        random_seed=args.seed,
-    )
+    publisher = await create_admin_publisher(config, args)
+    publish_cfg = config.get("adminPublish") or {}
+    live_interval = args.publish_live_interval
+    if live_interval is None:
+        live_interval = to_float(publish_cfg.get("liveIntervalSeconds"), 0.0)
+    if publisher is not None and live_interval > 0:
+        print(f"Publicacao ao vivo no admin a cada {live_interval:g}s")
+
+    metrics_exporter = None
+    if args.metrics_port is not None:
+        metrics_exporter = MetricsExporter(args.metrics_host, args.metrics_port)
+        await metrics_exporter.start()
+        print(f"Metricas OpenMetrics: http://{args.metrics_host}:{metrics_exporter.port}/metrics")
+
+    stop_event = RunStopEvent()
+    restore_signals = install_stop_handlers(stop_event)
+    try:
+        try:
+            report = await run_scenario(
+                scenario_name=args.scenario,
+                base_url=base_url,
+                scenario_cfg=scenario_cfg,
+                global_cfg=config,
+                endpoints=endpoints,
+                timeout_seconds=max(args.timeout, 1.0),
+                insecure_tls=args.insecure,
+                random_seed=args.seed,
+                raw_log_dir=(Path(args.output_dir).resolve() if args.raw_log else None),
+                shard_index=args.shard_index,
+                shard_count=args.shard_count,
+                stop_event=stop_event,
+                drain_timeout_seconds=args.drain_timeout,
+                progress_callback=(functools.partial(publisher.publish, quiet=True) if publisher is not None else None),
+                progress_interval_seconds=live_interval,
+                metrics_exporter=metrics_exporter,
+                otlp_dir=(Path(args.output_dir).resolve() if args.otlp_file else None),
+                otlp_endpoint=args.otlp_endpoint,
+                snapshot_dir=Path(args.output_dir).resolve(),
+            )
+        finally:
+            restore_signals()
+
+        return await finalize_report(report, config, args, publisher=publisher)
+    finally:
+        if publisher is not None:
+            await publisher.close()
+        if metrics_exporter is not None:
+            await metrics_exporter.close()
 
+
+async def finalize_report(
+    report: dict[str, Any],
+    config: dict[str, Any],
+    args: argparse.Namespace,
+    publisher: Optional[AdminPublisher] = None,
+) -> int:
     print_report(report)
 
     output_dir = Path(args.output_dir).resolve()
-    json_path, txt_path = save_reports(report, output_dir)
-
-    published = await publish_report_to_admin(report, config, args)
+    saved, published = await asyncio.gather(
+        save_reports(report, output_dir),
+        publish_report_to_admin(report, config, args, publisher),
+        return_exceptions=True,
+    )
+    if isinstance(saved, BaseException):
+        raise saved
+    json_path, txt_path, _ = saved
+    if isinstance(published, BaseException):
+        # falha de login/upload no admin nao invalida um run que ja tem resultado salvo
+        print(f"[publish] Falha ao publicar o run: {type(published).__name__}: {published}")
+        published = False
 
     print("\nRelatorios gerados:")
     print(f"- JSON: {json_path}")
     print(f"- TXT:  {txt_path}")
     print(f"- Latest JSON: {output_dir / 'loadtest-report-latest.json'}")
     print(f"- Latest HTML: {output_dir / 'loadtest-report-latest.html'}")
+    if report.get("rawLog"):
+        print(f"- Raw log: {report['rawLog'].get('path')}")
+        if report["rawLog"].get("droppedRecords"):
+            print(f"  AVISO: {report['rawLog']['droppedRecords']} amostras descartadas (escrita em disco nao acompanhou a carga)")
     if args.publish_admin:
         print(f"- Publicacao admin: {'OK' if published else 'falhou'}")
 
@@ -1282,7 +9564,23 @@ async def main_async(args: argparse.Namespace) -> int:
 
 def main() -> int:
     try:
-        args = parse_args()
+        argv = sys.argv[1:]
+        if argv and argv[0] == "analyze":
+            return run_analyze(parse_analyze_args(argv[1:]))
+        if argv and argv[0] == "correlate":
+            return asyncio.run(run_correlate(parse_correlate_args(argv[1:])))
+        if argv and argv[0] == "matrix":
+            return asyncio.run(run_matrix(parse_matrix_args(argv[1:])))
+        if argv and argv[0] == "autotune":
+            return asyncio.run(run_autotune(parse_autotune_args(argv[1:])))
+        if argv and argv[0] == "replay":
+            return asyncio.run(run_replay(parse_replay_args(argv[1:])))
+        if argv and argv[0] == "echo-hub":
+            return asyncio.run(run_echo_hub(parse_echo_hub_args(argv[1:])))
+        if argv and argv[0] == "generate":
+            return run_generate(parse_generate_args(argv[1:]))
+
+        args = parse_args(argv)
         return asyncio.run(main_async(args))
     except KeyboardInterrupt:
         print("\nExecucao interrompida pelo usuario.")
@@ -0,0 +1,4 @@
+﻿@echo off
+setlocal
+python "%~dp0loadtest_runner.py" autotune --config "%~dp0loadtest.config.json" --output-dir "%~dp0output" %*
+exit /b %errorlevel%